@@ -0,0 +1,85 @@
+"""Per tick REST latency with and without the shared exchange API session
+
+Starts a local HTTP stub that answers like the Binance /api/v3/time endpoint and compares
+a new connection per request (what every API object used to do) with the keep-alive SessionPool.
+
+    python3 benchmarks/bench_exchange_session.py --ticks 500
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.binance import PublicAPI as BPublicAPI  # noqa: E402
+from models.exchange.SessionPool import SessionPool  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send the headers and body in one segment, otherwise delayed ACKs dominate keep-alive timings
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({"serverTime": int(time.time() * 1000)}).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(func, ticks: int) -> list:
+    timings = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exchange API session benchmark")
+    parser.add_argument("--ticks", type=int, default=500, help="requests per run")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_port}"
+
+    def per_call():
+        # new API object and new connection on every tick
+        api = BPublicAPI()
+        requests.get(f"{stub_url}/api/v3/time", params={}).json()
+        return api
+
+    api = BPublicAPI()
+    api._api_url = stub_url  # pylint: disable=protected-access
+
+    def pooled():
+        api.auth_api("GET", "/api/v3/time")
+
+    results = {}
+    for name, func in [("per_call", per_call), ("pooled", pooled)]:
+        timed(func, 10)  # warm up
+        timings = timed(func, args.ticks)
+        results[name] = {"mean_ms": statistics.mean(timings), "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1]}
+
+    SessionPool.close()
+    server.shutdown()
+
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Memory use of the analysed candle frames, as exchanged and in the compact representation
+
+Runs add_all on the klines of the bench_tick.py fixture in each layout and projects the result to
+the frames of a multi-market host and to one long simulation. The results are written as JSON.
+
+    python3 benchmarks/bench_memory.py --output bench_memory.json
+    python3 benchmarks/bench_memory.py --bots 100 --sim-rows 1000000
+"""
+
+import os
+import sys
+import json
+import argparse
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Trading import TechnicalAnalysis  # noqa: E402
+from models.helper.CandleFrameHelper import REPORT_BOTS, REPORT_ROWS, compact_candles, compact_indicators, memory_report  # noqa: E402
+from bench_tick import FIXTURE, is_synthetic, load_candles  # noqa: E402
+
+
+def analysed(df: pd.DataFrame, compact: bool, float32: bool) -> pd.DataFrame:
+    df = compact_candles(df.copy()) if compact else df.copy()
+    ta = TechnicalAnalysis(df, len(df))
+    ta.add_all()
+    return compact_indicators(ta.get_df()) if float32 else ta.get_df()
+
+
+def physical_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candle frame memory report")
+    parser.add_argument("--output", type=str, default="bench_memory.json", help="JSON results file")
+    parser.add_argument("--rows", type=int, default=300, help="candles per bot, the adjusttotalperiods")
+    parser.add_argument("--bots", type=int, default=REPORT_BOTS, help="bots of the multi-market host")
+    parser.add_argument("--sim-rows", type=int, default=REPORT_ROWS, help="candles of the simulation")
+    parser.add_argument("--fixture", type=str, default=FIXTURE, help="Binance klines, the recorded ones if there are any or else the synthetic ones")
+    args = parser.parse_args()
+
+    df = load_candles(args.fixture).tail(args.rows)
+
+    results = {
+        "pandas": pd.__version__,
+        "physical_memory_bytes": physical_memory(),
+        "fixture": {"file": os.path.basename(args.fixture), "candles": len(df), "synthetic": is_synthetic(args.fixture)},
+        "layouts": {},
+    }
+
+    for name, compact, float32 in [("exchange", False, False), ("compact", True, False), ("compact_float32", True, True)]:
+        results["layouts"][name] = memory_report(analysed(df, compact, float32), args.bots, args.sim_rows)
+
+    with open(args.output, "w", encoding="utf8") as stream:
+        json.dump(results, stream, indent=4)
+
+    print(json.dumps(results, indent=4))
+
+    for name, report in results["layouts"].items():
+        print(
+            f"{name:<16} {report['bytes_per_row']:8.0f} bytes/candle"
+            f" {report['bots']['count']} bots: {report['bots']['total_bytes'] / 2**20:8.1f} MiB"
+            f" {report['simulation']['rows']} candles: {report['simulation']['total_bytes'] / 2**20:8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
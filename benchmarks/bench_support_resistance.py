@@ -0,0 +1,86 @@
+"""Support and resistance level detection, row by row against the NumPy implementation
+
+    python3 benchmarks/bench_support_resistance.py --rows 300 10000 100000
+"""
+
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Trading import TechnicalAnalysis  # noqa: E402
+
+
+def generate_candles(rows: int) -> pd.DataFrame:
+    rng = np.random.RandomState(1)
+    close = 30000 + np.cumsum(rng.randn(rows) * 50)
+    tsidx = pd.date_range("2020-01-01", periods=rows, freq="T")
+    return pd.DataFrame({"low": close - rng.rand(rows) * 30, "high": close + rng.rand(rows) * 30, "close": close}, index=tsidx)
+
+
+def legacy_levels(df: pd.DataFrame) -> list:
+    """The row by row implementation TechnicalAnalysis used before, with its distance test
+
+    Each level was compared with both values of the earlier (row, level) tuples, the NumPy
+    implementation keeps that so the levels are the same.
+    """
+
+    levels = []
+    for i in range(2, df.shape[0] - 2):
+        if df["low"][i] < df["low"][i - 1] and df["low"][i] < df["low"][i + 1] and df["low"][i + 1] < df["low"][i + 2] and df["low"][i - 1] < df["low"][i - 2]:
+            level = df["low"][i]
+        elif (
+            df["high"][i] > df["high"][i - 1]
+            and df["high"][i] > df["high"][i + 1]
+            and df["high"][i + 1] > df["high"][i + 2]
+            and df["high"][i - 1] > df["high"][i - 2]
+        ):
+            level = df["high"][i]
+        else:
+            continue
+
+        s = np.mean(df["high"] - df["low"])
+        if np.sum([abs(level - x) < s for x in levels]) == 0:
+            levels.append((i, level))
+
+    return levels
+
+
+def timed(func) -> tuple:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Support and resistance benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[300, 10000, 100000], help="candles per run")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="largest run of the row by row implementation")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.rows:
+        df = generate_candles(rows)
+
+        def vectorized():
+            ta = TechnicalAnalysis(df)
+            ta.levels = []
+            return ta._calculate_support_resistence_levels()  # pylint: disable=protected-access
+
+        levels, seconds = timed(vectorized)
+        results[rows] = {"levels": len(levels), "numpy_ms": seconds * 1000}
+
+        if rows <= args.legacy_max:
+            expected, seconds = timed(lambda: legacy_levels(df))
+            results[rows]["legacy_ms"] = seconds * 1000
+            results[rows]["same_levels"] = expected == levels
+
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Tick hot path benchmarks, replayed from the Binance klines in benchmarks/fixtures
+
+Times TechnicalAnalysis.add_all and each of its indicators, Strategy.get_action, the Binance
+WebSocketClient.on_message throughput, one execute_job tick split into its stages and a full
+simulation on the dummy exchange. The results are written as JSON so runs can be compared.
+
+The committed fixture is synthetic: a random walk in the /api/v3/klines response format, so the
+strategy does not see real market behaviour. ``--record`` saves real klines next to it and they are
+used from then on, the output names the fixture and whether it is synthetic.
+
+    python3 benchmarks/bench_tick.py --output bench_tick.json
+    python3 benchmarks/bench_tick.py --only add_all indicators --repeat 50
+    python3 benchmarks/bench_tick.py --record  # records the latest klines from Binance
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot  # noqa: E402
+from models.AppState import AppState  # noqa: E402
+from models.Strategy import Strategy  # noqa: E402
+from models.Trading import IncrementalTechnicalAnalysis, TechnicalAnalysis  # noqa: E402
+from models.TradingAccount import TradingAccount  # noqa: E402
+from models.exchange.binance import PublicAPI as BPublicAPI, WebSocketClient as BWebSocketClient  # noqa: E402
+from models.exchange.CandleRingBuffer import CandleRingBuffer  # noqa: E402
+from models.exchange.Granularity import Granularity  # noqa: E402
+from models.helper.TelegramBotHelper import TelegramBotHelper  # noqa: E402
+
+# klines recorded from Binance with --record, otherwise the synthetic ones committed with the benchmarks
+RECORDED_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "binance_klines_BTCGBP_1h.json")
+SYNTHETIC_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "binance_klines_BTCGBP_1h.synthetic.json")
+FIXTURE = RECORDED_FIXTURE if os.path.exists(RECORDED_FIXTURE) else SYNTHETIC_FIXTURE
+FIXTURE_MARKET = "BTCGBP"
+
+# updates of the open candle per closed candle, binance pushes the kline every two seconds
+OPEN_KLINE_UPDATES = 5
+
+
+def is_synthetic(path: str) -> bool:
+    return os.path.basename(path).endswith(".synthetic.json")
+
+
+def load_candles(path: str = FIXTURE) -> pd.DataFrame:
+    """The fixture klines, converted by the Binance API model like a live response"""
+
+    with open(path, "r", encoding="utf8") as stream:
+        klines = json.load(stream)
+
+    api = BPublicAPI()
+    api.auth_api = lambda method, uri, payload={}: klines
+    return api.get_historical_data(FIXTURE_MARKET, Granularity.ONE_HOUR)
+
+
+def record_candles(path: str = RECORDED_FIXTURE, limit: int = 1000) -> int:
+    """Saves the latest klines from Binance as the fixture"""
+
+    klines = BPublicAPI().auth_api("GET", "/api/v3/klines", {"symbol": FIXTURE_MARKET, "interval": "1h", "limit": limit})
+    if not isinstance(klines, list) or len(klines) == 0:
+        raise SystemExit("Unable to retrieve the Binance klines.")
+
+    with open(path, "w", encoding="utf8") as stream:
+        stream.write("[\n" + ",\n".join(json.dumps(kline, separators=(",", ":")) for kline in klines) + "\n]\n")
+    return len(klines)
+
+
+def summary(seconds: list) -> dict:
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        "runs": len(milliseconds),
+        "mean_ms": statistics.mean(milliseconds),
+        "median_ms": statistics.median(milliseconds),
+        "min_ms": min(milliseconds),
+        "max_ms": max(milliseconds),
+    }
+
+
+def measure(func, repeat: int, setup=None) -> dict:
+    """Calls func repeat times, setup runs before each call and is not timed"""
+
+    seconds = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        func() if setup is None else func(argument)
+        seconds.append(time.perf_counter() - start)
+    return summary(seconds)
+
+
+class StageTimer:
+    """Times the calls of the patched functions per stage, the outermost call only"""
+
+    def __init__(self) -> None:
+        self.seconds = {}
+        self.calls = {}
+        self._depth = {}
+        self._patches = []
+
+    def patch(self, owner: object, name: str, stage: str) -> None:
+        original = getattr(owner, name)
+        self.seconds.setdefault(stage, 0.0)
+        self.calls.setdefault(stage, 0)
+        self._depth.setdefault(stage, 0)
+
+        def timed(*args, **kwargs):
+            self._depth[stage] += 1
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._depth[stage] -= 1
+                if self._depth[stage] == 0:
+                    self.seconds[stage] += time.perf_counter() - start
+                    self.calls[stage] += 1
+
+        # instance attributes are deleted again, class attributes restored
+        self._patches.append((owner, name, original if name in vars(owner) else None))
+        setattr(owner, name, timed)
+
+    def restore(self) -> None:
+        for owner, name, original in reversed(self._patches):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patches = []
+
+    def result(self, ticks: int) -> dict:
+        return {
+            stage: {"calls": self.calls[stage], "total_ms": seconds * 1000, "per_tick_ms": seconds * 1000 / max(ticks, 1)}
+            for stage, seconds in self.seconds.items()
+        }
+
+
+def patch_stages(timer: StageTimer) -> None:
+    timer.patch(PyCryptoBot, "get_historical_data", "data")
+    timer.patch(PyCryptoBot, "get_ticker", "data")
+    timer.patch(TechnicalAnalysis, "add_all", "analysis")
+    timer.patch(IncrementalTechnicalAnalysis, "update", "analysis")
+    timer.patch(Strategy, "get_action", "strategy")
+    timer.patch(Console, "print", "console")
+    timer.patch(TelegramBotHelper, "_read_data", "json")
+    timer.patch(TelegramBotHelper, "_write_data", "json")
+    timer.patch(TelegramBotHelper, "_update_data", "json")
+
+
+def quiet(app: PyCryptoBot) -> None:
+    """Renders the console output into memory instead of the terminal and log file"""
+
+    app.console_term = Console(file=io.StringIO(), no_color=(not app.term_color), width=app.term_width)
+    app.console_log = Console(file=io.StringIO(), no_color=True, width=app.log_width)
+
+
+def bench_add_all(df: pd.DataFrame, repeat: int) -> dict:
+    return measure(lambda ta: ta.add_all(), repeat, lambda: TechnicalAnalysis(df.copy()))
+
+
+def bench_indicators(df: pd.DataFrame, repeat: int) -> dict:
+    """Each indicator add_all calls, in the order and with the columns add_all has at that point"""
+
+    seconds = {}
+
+    for _ in range(repeat):
+        ta = TechnicalAnalysis(df.copy())
+        depth = [0]
+
+        def timed(name, method):
+            def wrapper(*args, **kwargs):
+                depth[0] += 1
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    depth[0] -= 1
+                    if depth[0] == 0:
+                        seconds.setdefault(name, []).append(time.perf_counter() - start)
+
+            return wrapper
+
+        for name in dir(ta):
+            if name.startswith("add_") and name != "add_all":
+                setattr(ta, name, timed(name, getattr(ta, name)))
+
+        ta.add_all()
+
+    return {name: summary(values) for name, values in seconds.items()}
+
+
+def bench_strategy(df: pd.DataFrame, repeat: int) -> dict:
+    app = PyCryptoBot()
+    quiet(app)
+    app.account = TradingAccount(app)
+    app.state = AppState(app, app.account)
+    app.state.init_last_action()
+
+    ta = TechnicalAnalysis(df.tail(app.adjusttotalperiods).copy())
+    ta.add_all()
+    df_indicators = ta.get_df()
+    price = float(df_indicators["close"].iloc[-1])
+
+    def get_action():
+        strategy = Strategy(app, app.state, df_indicators)
+        return strategy.get_action(app.state, price, None, None)
+
+    return measure(get_action, repeat)
+
+
+def websocket_messages(df: pd.DataFrame) -> list:
+    messages = []
+    for ts, row in zip(df.index, df.itertuples()):
+        start = int(ts.timestamp() * 1000)
+        for update in range(OPEN_KLINE_UPDATES + 1):
+            closed = update == OPEN_KLINE_UPDATES
+            event_time = start + (3599999 if closed else (update + 1) * 2000)
+            messages.append(
+                {
+                    "e": "kline",
+                    "E": event_time,
+                    "s": FIXTURE_MARKET,
+                    "k": {
+                        "t": start,
+                        "T": start + 3599999,
+                        "s": FIXTURE_MARKET,
+                        "i": "1h",
+                        "o": f"{row.open:.2f}",
+                        "c": f"{row.close:.2f}",
+                        "h": f"{row.high:.2f}",
+                        "l": f"{row.low:.2f}",
+                        "v": f"{row.volume:.5f}",
+                        "V": f"{row.volume:.5f}",
+                        "x": closed,
+                    },
+                }
+            )
+            messages.append({"e": "24hrMiniTicker", "E": event_time, "s": FIXTURE_MARKET, "c": f"{row.close:.2f}"})
+    return messages
+
+
+def bench_websocket(df: pd.DataFrame, repeat: int, history: int = 300) -> dict:
+    """Messages per second for the candles after the history the client is seeded with"""
+
+    messages = websocket_messages(df.iloc[history:])
+
+    def client():
+        ws = BWebSocketClient([FIXTURE_MARKET], Granularity.ONE_HOUR)
+        ws.on_open()
+        # seeded like the first kline message does, without the REST request
+        candles = CandleRingBuffer(FIXTURE_MARKET, Granularity.ONE_HOUR.to_short, history)
+        candles.load(df.iloc[:history])
+        ws._candles[FIXTURE_MARKET] = candles  # pylint: disable=protected-access
+        return ws
+
+    def replay(ws):
+        for msg in messages:
+            ws.on_message(msg)
+
+    result = measure(replay, repeat, client)
+    result["messages"] = len(messages)
+    result["messages_per_second"] = len(messages) / (result["median_ms"] / 1000)
+    return result
+
+
+def bench_tick(df: pd.DataFrame, repeat: int) -> dict:
+    """execute_job of a test mode bot with telegram bot control, the exchange replaced by the fixture"""
+
+    timer = StageTimer()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = PyCryptoBot()
+        quiet(app)
+        app.telegrambotcontrol = True
+        app.telegramdatafolder = folder
+        app.telegram_bot = TelegramBotHelper(app)
+
+        window = df.tail(app.adjusttotalperiods).copy()
+        window["market"] = app.market
+        ticker = (str(window["date"].iloc[-1]), float(window["close"].iloc[-1]))
+        app.get_historical_data = lambda *args, **kwargs: window.copy()
+        app.get_ticker = lambda *args, **kwargs: ticker
+
+        app.account = TradingAccount(app)
+        app.state = AppState(app, app.account)
+        app.state.init_last_action()
+        app.app_started = True
+
+        seconds = []
+        patch_stages(timer)
+        timer.patch(app, "get_historical_data", "data")
+        timer.patch(app, "get_ticker", "data")
+
+        try:
+            # the first tick calculates all indicators, the others update them incrementally
+            for _ in range(repeat + 1):
+                # every tick refreshes the candles, like the first tick after a candle closed
+                app.trading_data = pd.DataFrame()
+                start = time.perf_counter()
+                app.execute_job()
+                seconds.append(time.perf_counter() - start)
+                list(map(app.s.cancel, app.s.queue))
+        finally:
+            timer.restore()
+
+    result = summary(seconds[1:])
+    result["first_ms"] = seconds[0] * 1000
+    result["stages"] = timer.result(repeat + 1)
+    return result
+
+
+def bench_simulation(df: pd.DataFrame, repeat: int) -> dict:
+    """Fast simulation on the dummy exchange over all fixture candles"""
+
+    seconds = []
+    ticks = 0
+    timer = StageTimer()
+    patch_stages(timer)
+
+    try:
+        for _ in range(repeat):
+            app = PyCryptoBot()
+            quiet(app)
+            app.is_sim = "fast"
+            app.account = TradingAccount(app)
+            app.state = AppState(app, app.account)
+            app.state.init_last_action()
+            app.state.last_buy_size = 1000
+            app.state.first_buy_size = 1000
+            app.trading_data = df.copy()
+            app.trading_data["market"] = app.market
+            app.app_started = True
+
+            start = time.perf_counter()
+            # the simulation summary is printed to stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                app.execute_job()
+                app.s.run()
+            seconds.append(time.perf_counter() - start)
+            ticks += app.state.iterations
+    finally:
+        timer.restore()
+
+    result = summary(seconds)
+    result["ticks"] = ticks // repeat
+    result["per_tick_ms"] = result["median_ms"] / max(result["ticks"], 1)
+    result["stages"] = timer.result(ticks)
+    return result
+
+
+BENCHMARKS = {
+    "add_all": bench_add_all,
+    "indicators": bench_indicators,
+    "strategy": bench_strategy,
+    "websocket": bench_websocket,
+    "tick": bench_tick,
+    "simulation": bench_simulation,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick hot path benchmarks")
+    parser.add_argument("--output", type=str, default="bench_tick.json", help="JSON results file")
+    parser.add_argument("--only", type=str, nargs="+", choices=list(BENCHMARKS.keys()), help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per benchmark")
+    parser.add_argument("--sim-repeat", type=int, default=1, help="runs of the full simulation")
+    parser.add_argument("--rows", type=int, default=300, help="candles for add_all, the indicators and the strategy")
+    parser.add_argument("--fixture", type=str, help="Binance klines, the recorded ones if there are any or else the synthetic ones")
+    parser.add_argument("--record", action="store_true", help="record the fixture from Binance and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        path = args.fixture or RECORDED_FIXTURE
+        print(f"Recorded {record_candles(path)} klines into {path}")
+        return
+
+    args.fixture = args.fixture or FIXTURE
+    df = load_candles(args.fixture)
+
+    app = PyCryptoBot()
+    results = {
+        "version": app.get_version_from_readme(app),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "fixture": {"file": os.path.basename(args.fixture), "candles": len(df), "synthetic": is_synthetic(args.fixture)},
+        "benchmarks": {},
+    }
+
+    for name in args.only or BENCHMARKS.keys():
+        if name in ["add_all", "indicators", "strategy"]:
+            results["benchmarks"][name] = BENCHMARKS[name](df.tail(args.rows), args.repeat)
+        elif name == "simulation":
+            results["benchmarks"][name] = BENCHMARKS[name](df, args.sim_repeat)
+        else:
+            results["benchmarks"][name] = BENCHMARKS[name](df, args.repeat)
+
+    with open(args.output, "w", encoding="utf8") as stream:
+        json.dump(results, stream, indent=4)
+
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Monte-Carlo and walk-forward sampling of simulations over one local candle history"""
+
+import numpy as np
+import pandas as pd
+
+from controllers.PyCryptoBot import PyCryptoBot
+from controllers.Optimizer import load_history, simulate_all
+
+# distribution of these per sample metrics in the report
+DISTRIBUTION_METRICS = ["margin", "win_rate", "max_drawdown", "profit_loss", "sell_count"]
+
+
+class MonteCarlo:
+    """Simulates many windows of the candles between simstartdate and simenddate
+
+    The candles and indicators are loaded once, the windows are slices of the same frame simulated in
+    parallel worker processes. The samples are ``samples`` random windows or, with ``walkforward``, windows
+    starting every ``walkforward`` candles. A window is ``window`` candles long, adjusttotalperiods by default
+    as the fast-sample simulation. The indicators of a window are warmed up by the candles before it.
+    """
+
+    def __init__(self, app: PyCryptoBot, samples: int = 100, window: int = None, walkforward: int = None, seed: int = None) -> None:
+        self.app = app
+        self.samples = samples
+        self.window = window if window is not None else app.adjusttotalperiods
+        self.walkforward = walkforward
+        self.seed = seed
+
+        if self.window < 2:
+            raise ValueError("window must be at least 2 candles")
+
+        if walkforward is not None and walkforward < 1:
+            raise ValueError("walkforward must be at least 1 candle")
+
+    def windows(self, rows: int) -> list:
+        """(start, stop) iloc of every sample"""
+
+        if rows < self.window:
+            raise ValueError(f"{rows} candles between simstartdate and simenddate, a window needs {self.window}")
+
+        if self.walkforward is not None:
+            return [(start, start + self.window) for start in range(0, rows - self.window + 1, self.walkforward)]
+
+        starts = np.random.default_rng(self.seed).integers(0, rows - self.window + 1, size=self.samples)
+        return [(int(start), int(start) + self.window) for start in starts]
+
+    def run(self, processes: int = None) -> pd.DataFrame:
+        """Simulates every window and returns one row per sample"""
+
+        # the whole history, the fast-sample windows are drawn from it
+        self.app.is_sim = "fast"
+
+        trading_data, sma50200_1h_cache = self.load()
+        windows = self.windows(len(trading_data))
+
+        # the windows are the simulation period
+        self.app.simstartdate = None
+        self.app.simenddate = None
+
+        results = simulate_all(self.app, trading_data, sma50200_1h_cache, [{}] * len(windows), windows, processes)
+
+        df = pd.DataFrame(results)
+        df.insert(0, "start", [str(trading_data.index[start]) for start, _ in windows])
+        df.insert(1, "end", [str(trading_data.index[stop - 1]) for _, stop in windows])
+        return df
+
+    def load(self) -> tuple:
+        return load_history(self.app)
+
+    @staticmethod
+    def distribution(df: pd.DataFrame) -> pd.DataFrame:
+        """Mean, standard deviation and percentiles of the sample metrics"""
+
+        metrics = [metric for metric in DISTRIBUTION_METRICS if metric in df]
+        return df[metrics].astype(float).describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95]).T
@@ -0,0 +1,237 @@
+"""Runs the bots of several markets in one process"""
+
+import time
+import sched
+import multiprocessing
+
+from rich.console import Console
+
+from controllers.PyCryptoBot import PyCryptoBot
+from models.helper.StartupProfileHelper import StartupProfile
+from views.PyCryptoBot import RichText
+
+# the exchanges drop websocket connections after 24 hours, a shared connection is restarted after 23
+WEBSOCKET_MAX_AGE = 82800
+
+# seconds between the checks of the shared connections' age
+WEBSOCKET_CHECK_SECONDS = 60
+
+
+class BotScheduler:
+    """The part of the sched.scheduler interface a bot uses, on a scheduler shared by many bots
+
+    ``queue`` only lists the bot's own events, ``list(map(self.s.cancel, self.s.queue))`` in the bot
+    must not cancel the jobs of the other markets. Every job runs through ``guard(action, argument, kwargs)``.
+    """
+
+    def __init__(self, scheduler: sched.scheduler, guard) -> None:
+        self.scheduler = scheduler
+        self.guard = guard
+        self._events = {}
+
+    @property
+    def queue(self) -> list:
+        self._forget_finished()
+        return list(self._events.values())
+
+    def enter(self, delay, priority, action, argument=(), kwargs={}):
+        self._forget_finished()
+        event = self.scheduler.enter(delay, priority, self.guard, (action, argument, kwargs))
+        self._events[id(event)] = event
+        return event
+
+    def cancel(self, event) -> None:
+        self._events.pop(id(event), None)
+        self.scheduler.cancel(event)
+
+    def run(self, blocking: bool = True):
+        return self.scheduler.run(blocking)
+
+    def _forget_finished(self) -> None:
+        self._events = {id(event): event for event in self.scheduler.queue if id(event) in self._events}
+
+
+class MultiMarketRunner:
+    """One PyCryptoBot per market on a shared scheduler, with one websocket per exchange and granularity
+
+    Every bot has its own config, account, state and telegram files, only the scheduler, the websocket,
+    the log file and the exchange API sessions are shared. With ``workers`` above 1 the markets are split
+    between that many processes.
+    """
+
+    def __init__(self, app: PyCryptoBot) -> None:
+        # only plain values, the runner is passed to the worker processes
+        self.config_file = app.config_file
+        self.exchange = app.exchange.value
+        self.logfile = app.logfile
+        self.log_width = app.log_width
+        self.markets = list(dict.fromkeys(app.markets))
+        self.workers = max(1, min(app.workers, len(self.markets)))
+
+        self.scheduler = None
+        self.bots = []
+        self.websockets = []
+
+    def run(self) -> None:
+        if self.workers == 1:
+            self.run_markets(self.markets)
+            return
+
+        processes = []
+        for worker in range(self.workers):
+            process = multiprocessing.Process(target=self.run_markets, args=(self.markets[worker :: self.workers],), name=f"pycryptobot-{worker}")
+            process.start()
+            processes.append(process)
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
+
+    def run_markets(self, markets: list) -> None:
+        """Starts the bots of the markets and runs the scheduler until all bots have stopped"""
+
+        self.scheduler = sched.scheduler(time.time, time.sleep)
+
+        # the bot started from the command line truncated the log file, the bots append to it from every worker
+        console_log = Console(file=open(self.logfile, "a"), no_color=True, width=self.log_width)
+
+        for market in markets:
+            bot = PyCryptoBot(config_file=self.config_file, exchange=self.exchange, market=market, console_log=console_log)
+            bot.s = BotScheduler(self.scheduler, self._guard(bot))
+            self.bots.append(bot)
+
+        self._start_websockets()
+        self._start_user_data_stream()
+
+        try:
+            for bot in self.bots:
+                with StartupProfile.step(f"initialise {bot.market}"):
+                    self._start(bot)
+
+            StartupProfile.report(self.bots[0].console_term if len(self.bots) > 0 else None)
+
+            self.scheduler.run()
+
+        except (KeyboardInterrupt, SystemExit):
+            for bot in self.bots:
+                RichText.notify("Shutting down bot...", bot, "warning")
+                try:
+                    bot.telegram_bot.remove_active_bot()
+                except Exception:
+                    pass
+
+        finally:
+            for websocket in self.websockets:
+                try:
+                    websocket.close()
+                except Exception:
+                    pass
+
+    def _start_websockets(self) -> None:
+        # one connection per granularity, the exchange multiplexes the markets on it
+        groups = {}
+        for bot in self.bots:
+            if bot.websocket and not bot.is_sim:
+                groups.setdefault(bot.granularity, []).append(bot)
+
+        for bots in groups.values():
+            websocket = bots[0].get_websocket_client([bot.market for bot in bots])
+            if websocket is None:
+                continue
+
+            RichText.notify(f"Opening websocket for {len(bots)} markets", bots[0], "normal")
+            websocket.start()
+            self.websockets.append(websocket)
+            for bot in bots:
+                bot.websocket_connection = websocket
+                bot.shared_websocket = True
+
+        if len(groups) > 0:
+            self.scheduler.enter(WEBSOCKET_CHECK_SECONDS, 1, self._restart_websockets)
+
+    def _restart_websockets(self) -> None:
+        # once per connection, the bots of a shared websocket do not restart it themselves
+        websockets = {id(bot.websocket_connection): (bot, bot.websocket_connection) for bot in self.bots if bot.shared_websocket}
+
+        for bot, websocket in websockets.values():
+            if websocket.time_elapsed <= WEBSOCKET_MAX_AGE:
+                continue
+
+            RichText.notify("Websocket requires a restart every 23 hours!", bot, "normal")
+            try:
+                websocket.close()
+                websocket.start()
+            except Exception as e:  # pylint: disable=broad-except
+                RichText.notify(f"Unable to restart the websocket: {repr(e)}", bot, "error")
+
+        # the scheduler stops once the bots have stopped
+        if len(self.bots) > 0:
+            self.scheduler.enter(WEBSOCKET_CHECK_SECONDS, 1, self._restart_websockets)
+
+    def _start_user_data_stream(self) -> None:
+        # the bots trade from the same account, one stream keeps the state of all markets
+        bots = [bot for bot in self.bots if bot.userdatastream and bot.is_live and not bot.is_sim]
+        if len(bots) == 0:
+            return
+
+        stream = bots[0].get_user_data_stream([bot.market for bot in bots])
+        if stream is None:
+            return
+
+        RichText.notify(f"Opening user data stream for {len(bots)} markets", bots[0], "normal")
+        stream.start()
+        self.websockets.append(stream)
+        for bot in bots:
+            bot.user_data_stream = stream
+
+    def _start(self, bot: PyCryptoBot) -> None:
+        smartswitchstatus = "enabled" if bot.smart_switch else "disabled"
+        message = f"Starting {bot.exchange.value} bot for {bot.market} using granularity {bot.print_granularity()}. Smartswitch {smartswitchstatus}"
+
+        if bot.startmethod in ("standard", "telegram") and not bot.disabletelegram:
+            bot.notify_telegram(message)
+
+        bot.initialise()
+        bot.s.enter(0, 1, bot.execute_job, ())
+
+    def _guard(self, bot: PyCryptoBot):
+        """Runs a job of the bot, an exception or exit only stops that bot"""
+
+        def guard(action, argument, kwargs):
+            try:
+                action(*argument, **kwargs)
+
+            except KeyboardInterrupt:
+                raise
+
+            except SystemExit:
+                self._stop(bot)
+
+            except Exception as e:  # pylint: disable=broad-except
+                if bot.autorestart:
+                    RichText.notify(f"Restarting {bot.market} in 30 seconds after exception: {repr(e)}", bot, "critical")
+                    if not bot.disabletelegram:
+                        bot.notify_telegram(f"Auto restarting bot for {bot.market} after exception: {repr(e)}")
+
+                    list(map(bot.s.cancel, bot.s.queue))
+                    bot.s.enter(30, 1, bot.execute_job, ())
+                else:
+                    if not bot.disabletelegramerrormsgs:
+                        bot.notify_telegram(f"Bot for {bot.market} got an exception: {repr(e)}")
+                    RichText.notify(repr(e), bot, "critical")
+                    self._stop(bot)
+
+        return guard
+
+    def _stop(self, bot: PyCryptoBot) -> None:
+        list(map(bot.s.cancel, bot.s.queue))
+        try:
+            bot.telegram_bot.remove_active_bot()
+        except Exception:
+            pass
+
+        if bot in self.bots:
+            self.bots.remove(bot)
@@ -0,0 +1,278 @@
+"""Parameter sweep over simulations, every combination runs on the same candles and indicators"""
+
+import io
+import os
+import sched
+import time
+import random
+import itertools
+import contextlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from controllers.PyCryptoBot import PyCryptoBot
+from models.AppState import AppState
+from models.Backtest import Backtest
+from models.Trading import TechnicalAnalysis
+from models.TradingAccount import TradingAccount
+from models.config.default_parser import default_config_parse, merge_config_and_args
+
+# options that change the candles or the indicators, the candles are loaded once per sweep
+DATA_OPTIONS = ["exchange", "market", "markets", "granularity", "live", "sim", "simstartdate", "simenddate", "adjusttotalperiods"]
+
+# settings of the bot the sweep was started with, kept for every combination
+FIXED_SETTINGS = ["exchange", "market", "base_currency", "quote_currency", "granularity", "is_live", "is_sim", "simstartdate", "simenddate", "adjusttotalperiods"]
+
+# _simulation_summary() values and trade statistics in the results, ranked by one of them
+METRICS = ["margin", "profit_loss", "fees", "value_buys", "buy_count", "sell_count", "last_trade_margin", "open_trade_margin", "win_rate", "max_drawdown"]
+
+# state of a worker process, see init_worker()
+_worker = {}
+
+
+class Optimizer:
+    """Grid or random search over bot options
+
+    The spec is the content of optimizer.json, the parameters are config.json options:
+
+        {"search": "grid", "rank": "margin", "params": {"trailingstoploss": [-1, -2, -3], "sellupperpcnt": {"min": 2, "max": 10, "step": 2}}}
+
+    A parameter is a list of values or a range, "search": "random" draws "samples" distinct combinations
+    (a range without a step is drawn uniformly). The candles are loaded and the indicators calculated once,
+    the process pool workers share the indicator frame read-only and simulate one combination at a time.
+    """
+
+    def __init__(self, app: PyCryptoBot, spec: dict) -> None:
+        self.app = app
+
+        self.search = spec.get("search", "grid")
+        self.samples = int(spec.get("samples", 100))
+        self.seed = spec.get("seed", None)
+        self.rank = spec.get("rank", "margin")
+        self.params = spec.get("params", {})
+
+        if self.search not in ["grid", "random"]:
+            raise ValueError("search must be grid or random")
+
+        if self.rank not in METRICS:
+            raise ValueError(f"rank must be one of {', '.join(METRICS)}")
+
+        if not isinstance(self.params, dict) or len(self.params) == 0:
+            raise ValueError("params must be a dictionary of config options")
+
+        for name in self.params:
+            if name in DATA_OPTIONS:
+                raise ValueError(f"{name} can not be swept, the candles are loaded once")
+
+    def combinations(self) -> list:
+        """Parameter combinations to simulate"""
+
+        names = list(self.params)
+
+        if self.search == "grid":
+            values = [self._values(self.params[name]) for name in names]
+            return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+        rng = random.Random(self.seed)
+        combinations, seen = [], set()
+
+        # a small grid has fewer distinct combinations than samples
+        for _ in range(self.samples * 100):
+            if len(combinations) == self.samples:
+                break
+
+            combination = tuple(self._draw(rng, self.params[name]) for name in names)
+            if combination not in seen:
+                seen.add(combination)
+                combinations.append(dict(zip(names, combination)))
+
+        return combinations
+
+    def run(self, processes: int = None) -> pd.DataFrame:
+        """Simulates every combination and returns the results, best first"""
+
+        if not self.app.is_sim:
+            self.app.is_sim = "fast"
+
+        trading_data, sma50200_1h_cache = self.load()
+        combinations = self.combinations()
+
+        results = simulate_all(self.app, trading_data, sma50200_1h_cache, combinations, [None] * len(combinations), processes)
+        return self.ranked(results)
+
+    def load(self) -> tuple:
+        return load_history(self.app)
+
+    def ranked(self, results: list) -> pd.DataFrame:
+        df = pd.DataFrame(results)
+        for metric in METRICS:
+            if metric not in df:
+                df[metric] = np.nan
+
+        # failed combinations last
+        return df.sort_values(self.rank, ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def _values(value) -> list:
+        if isinstance(value, list):
+            return value
+
+        if isinstance(value, dict):
+            if "step" not in value:
+                raise ValueError("a grid range needs min, max and step")
+
+            values = np.arange(value["min"], value["max"] + value["step"] / 2, value["step"])
+            if all(isinstance(value[key], int) for key in ["min", "max", "step"]):
+                return [int(v) for v in values]
+            return [round(float(v), 8) for v in values]
+
+        return [value]
+
+    @classmethod
+    def _draw(cls, rng: random.Random, value):
+        if isinstance(value, dict) and "step" not in value:
+            return round(rng.uniform(value["min"], value["max"]), 4)
+
+        return rng.choice(cls._values(value))
+
+
+def load_history(app: PyCryptoBot) -> tuple:
+    """Loads the candles of the simulation and calculates the indicators once"""
+
+    app.is_live = 0
+    _quiet(app)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.initialise(banner=False)
+
+    df = app.trading_data
+    if len(df) == 0:
+        raise ValueError(f"No candles to simulate for {app.market}")
+
+    if len(df.columns) <= 8:
+        technical_analysis = TechnicalAnalysis(df, len(df), app=app)
+        technical_analysis.add_all()
+        df = technical_analysis.get_df()
+
+    # fills the 1h golden cross cache the simulations read
+    app.is_1h_sma50200_bull(df.index.format()[0])
+
+    return df, app.sma50200_1h_cache
+
+
+def simulate_all(app: PyCryptoBot, trading_data: pd.DataFrame, sma50200_1h_cache, params: list, windows: list, processes: int = None) -> list:
+    """Simulates params[i] on the candles of windows[i] (iloc start, stop or None for all) in a process pool"""
+
+    processes = processes if processes is not None else os.cpu_count()
+    initargs = (
+        app.config_file,
+        app.exchange.value,
+        app.market,
+        {name: getattr(app, name) for name in FIXED_SETTINGS},
+        trading_data,
+        sma50200_1h_cache,
+    )
+
+    if processes <= 1:
+        init_worker(*initargs)
+        return [simulate(p, w) for p, w in zip(params, windows)]
+
+    # forked workers share the frame with this process, the others receive one copy each
+    chunksize = max(1, len(params) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=initargs) as executor:
+        return list(executor.map(simulate, params, windows, chunksize=chunksize))
+
+
+def _quiet(app: PyCryptoBot) -> None:
+    # one summary per combination, nothing else is written
+    app.simresultonly = True
+    app.disabletelegram = True
+    app.disabletracker = True
+    app.disablelog = True
+    app.save_graphs = False
+    app.logbuysellinjson = False
+    app.exitaftersell = False
+    app.debug = False
+
+
+def init_worker(config_file: str, exchange: str, market: str, settings: dict, trading_data: pd.DataFrame, sma50200_1h_cache) -> None:
+    app = PyCryptoBot(config_file=config_file, exchange=exchange, market=market)
+
+    config = app.config.get(exchange, {}) if isinstance(app.config, dict) else {}
+    config = merge_config_and_args(config if isinstance(config, dict) else {}, app.cli_args)
+
+    _worker["app"] = app
+    _worker["config"] = {key: value for key, value in config.items() if key not in DATA_OPTIONS}
+    _worker["settings"] = settings
+    _worker["trading_data"] = trading_data
+    _worker["sma50200_1h_cache"] = sma50200_1h_cache
+
+
+def simulate(params: dict, window: tuple = None) -> dict:
+    """Simulates one combination in a worker process"""
+
+    app = _worker["app"]
+
+    trading_data = _worker["trading_data"]
+    if window is not None:
+        trading_data = trading_data.iloc[window[0] : window[1]]
+
+    try:
+        # the options of the combination on top of the bot's config
+        default_config_parse(app, {**_worker["config"], **params})
+        for name, value in _worker["settings"].items():
+            setattr(app, name, value)
+        _quiet(app)
+
+        app.account = TradingAccount(app)
+        app.state = AppState(app, app.account)
+        app.state.init_last_action()
+        app.state.last_buy_size = 1000
+        app.state.first_buy_size = 1000
+
+        app.trade_tracker = app.trade_tracker.iloc[0:0]
+        app.sma50200_1h_cache = _worker["sma50200_1h_cache"]
+        app.insufficientfunds = False
+        app.sim_smartswitch = False
+        app.simulation_result = None
+        app.s = sched.scheduler(time.time, time.sleep)
+        app.app_started = True
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            if Backtest.is_supported(app):
+                app.trading_data = trading_data
+                Backtest(app).run()
+            else:
+                # e.g. smart switch, simulated one candle at a time
+                app.trading_data = trading_data.copy()
+                app.execute_job()
+                app.s.run()
+
+        return {**params, **_metrics(app)}
+
+    except (Exception, SystemExit) as err:  # pylint: disable=broad-except
+        return {**params, "error": repr(err)}
+
+
+def _metrics(app: PyCryptoBot) -> dict:
+    data = app.simulation_result["data"]
+    all_trades = data.get("all_trades", {})
+
+    # closed trades, the balance starts with the first buy
+    profit = app.trade_tracker.loc[app.trade_tracker["Action"] == "SELL", "Profit"].astype(float).to_numpy()
+    balance = app.state.first_buy_size + np.cumsum(np.insert(profit, 0, 0.0))
+    peak = np.maximum.accumulate(balance)
+
+    return {
+        "margin": all_trades.get("margin", 0.0),
+        "profit_loss": all_trades.get("profit_loss", 0.0),
+        "fees": all_trades.get("fees", 0.0),
+        "value_buys": all_trades.get("value_buys", 0.0),
+        "buy_count": data["buy_count"],
+        "sell_count": data["sell_count"],
+        "last_trade_margin": data["last_trade"].get("margin", 0.0),
+        "open_trade_margin": all_trades.get("open_trade_margin", 0.0),
+        "win_rate": round(float((profit > 0).mean() * 100), 2) if len(profit) > 0 else 0.0,
+        "max_drawdown": round(float(((balance - peak) / peak).min() * 100), 4),
+    }
@@ -20,22 +20,22 @@ from urllib3.exceptions import ReadTimeoutError
 from models.BotConfig import BotConfig
 from models.exchange.ExchangesEnum import Exchange
 from models.exchange.Granularity import Granularity
-from models.exchange.coinbase_pro import WebSocketClient as CWebSocketClient
-from models.exchange.coinbase_pro import AuthAPI as CAuthAPI, PublicAPI as CPublicAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI, PublicAPI as KPublicAPI
-from models.exchange.kucoin import WebSocketClient as KWebSocketClient
-from models.exchange.binance import AuthAPI as BAuthAPI, PublicAPI as BPublicAPI
-from models.exchange.binance import WebSocketClient as BWebSocketClient
-from models.exchange.coinbase import AuthAPI as CBAuthAPI
-from models.exchange.coinbase import WebSocketClient as CBWebSocketClient
+from models.exchange.SessionPool import SessionPool
+from models.exchange.RangeDownloader import RangeDownloader, RangeDownloadError
+from models.helper.StartupProfileHelper import LazyImport, StartupProfile
 from models.helper.TelegramBotHelper import TelegramBotHelper
 from models.helper.MarginHelper import calculate_margin
+from models.helper.CandleStoreHelper import CandleStore
+from models.helper.CandleFrameHelper import compact_candles
+from models.helper.ResampleHelper import Resampler, can_resample, resample
+from models.helper.LogPipelineHelper import LogPipeline, RichSink, StreamSink
 from models.TradingAccount import TradingAccount
 from models.Stats import Stats
 from models.AppState import AppState
 from models.helper.TextBoxHelper import TextBox
 from models.Strategy import Strategy
-from views.TradingGraphs import TradingGraphs
+from models.Backtest import Backtest
+from models.Trading import IncrementalTechnicalAnalysis
 from views.PyCryptoBot import RichText
 from utils.PyCryptoBot import truncate as _truncate
 from utils.PyCryptoBot import compare as _compare
@@ -65,6 +65,26 @@ except ImportError:
 
 pd.set_option("display.float_format", "{:.8f}".format)
 
+# downloads of a simulation range before giving up, each one only fetches the chunks that failed before
+RANGE_DOWNLOAD_ATTEMPTS = 3
+
+# only the clients of the exchange the bot trades on are loaded
+CWebSocketClient = LazyImport("models.exchange.coinbase_pro", "WebSocketClient")
+CUserDataWebSocketClient = LazyImport("models.exchange.coinbase_pro", "UserDataWebSocketClient")
+CAuthAPI = LazyImport("models.exchange.coinbase_pro", "AuthAPI")
+CPublicAPI = LazyImport("models.exchange.coinbase_pro", "PublicAPI")
+KAuthAPI = LazyImport("models.exchange.kucoin", "AuthAPI")
+KPublicAPI = LazyImport("models.exchange.kucoin", "PublicAPI")
+KWebSocketClient = LazyImport("models.exchange.kucoin", "WebSocketClient")
+KUserDataWebSocketClient = LazyImport("models.exchange.kucoin", "UserDataWebSocketClient")
+BAuthAPI = LazyImport("models.exchange.binance", "AuthAPI")
+BPublicAPI = LazyImport("models.exchange.binance", "PublicAPI")
+BWebSocketClient = LazyImport("models.exchange.binance", "WebSocketClient")
+BUserDataWebSocketClient = LazyImport("models.exchange.binance", "UserDataWebSocketClient")
+CBAuthAPI = LazyImport("models.exchange.coinbase", "AuthAPI")
+CBWebSocketClient = LazyImport("models.exchange.coinbase", "WebSocketClient")
+CBUserDataWebSocketClient = LazyImport("models.exchange.coinbase", "UserDataWebSocketClient")
+
 
 def signal_handler(signum):
     if signum == 2:
@@ -73,14 +93,27 @@ def signal_handler(signum):
 
 
 class PyCryptoBot(BotConfig):
-    def __init__(self, config_file: str = None, exchange: Exchange = None):
+    def __init__(self, config_file: str = None, exchange: Exchange = None, market: str = None, console_log: Console = None):
         self.config_file = config_file or "config.json"
-        super(PyCryptoBot, self).__init__(filename=self.config_file, exchange=exchange)
+        super(PyCryptoBot, self).__init__(filename=self.config_file, exchange=exchange, market=market)
 
-        self.console_term = Console(no_color=(not self.term_color), width=self.term_width)  # logs to the screen
-        self.console_log = Console(file=open(self.logfile, "w"), no_color=True, width=self.log_width)  # logs to file
+        if self.profile_startup:
+            # enabled in the config file, only the imports from here on are timed
+            StartupProfile.start()
 
-        self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
+        self.console_term = Console(no_color=(not self.term_color), width=self.term_width)  # logs to the screen
+        if console_log is None:
+            console_log = Console(file=open(self.logfile, "w"), no_color=True, width=self.log_width)  # logs to file
+        self.console_log = console_log
+
+        self.log_pipeline = LogPipeline(
+            [
+                RichSink(self.console_term, lambda: "DEBUG" if self.debug else (self.consoleloglevel if self.consolelog else None)),
+                RichSink(self.console_log, lambda: None if self.disablelog else self.fileloglevel),
+            ]
+        )
+        if self.eventlog:
+            self.log_pipeline.sinks.append(StreamSink(open(self.eventlog, "a"), lambda: self.fileloglevel, self.eventlogformat))
 
         self.s = sched.scheduler(time.time, time.sleep)
 
@@ -90,11 +123,18 @@ class PyCryptoBot(BotConfig):
         self.account = None
         self.state = None
         self.technical_analysis = None
+        self.incremental_analysis = IncrementalTechnicalAnalysis(app=self)
+        self.api_clients = {}
         self.websocket_connection = None
+        # the connection of several markets opened by MultiMarketRunner, which also restarts it
+        self.shared_websocket = False
+        self.user_data_stream = None
         self.ticker_self = None
         self.df_last = pd.DataFrame()
         self.trading_data = pd.DataFrame()
-        self.telegram_bot = TelegramBotHelper(self)
+        self.simulation_result = None
+        # the app of a --markets process is only its config, the bots of the markets are the running bots
+        self.telegram_bot = TelegramBotHelper(self, scanner=(market is None and len(self.markets) > 0))
 
         self.trade_tracker = pd.DataFrame(
             columns=[
@@ -117,6 +157,58 @@ class PyCryptoBot(BotConfig):
         else:
             self.enable_pandas_ta = False
 
+        SessionPool.configure(pool_size=self.httppoolsize, timeout=self.httptimeout)
+
+    def get_api_client(self, api, *args, **kwargs):
+        """Returns the exchange API object for the arguments, created and validated once per bot"""
+
+        key = (api, args, tuple(sorted(kwargs.items())))
+        if key not in self.api_clients:
+            self.api_clients[key] = api(*args, **kwargs)
+
+        return self.api_clients[key]
+
+    def get_websocket_client(self, markets: list):
+        """Returns a websocket client for the markets, one connection can serve several bots"""
+
+        if self.exchange == Exchange.BINANCE:
+            return BWebSocketClient(markets, self.granularity, app=self)
+        elif self.exchange == Exchange.COINBASE:
+            return CBWebSocketClient(markets, self.granularity, app=self)
+        elif self.exchange == Exchange.COINBASEPRO:
+            return CWebSocketClient(markets, self.granularity, app=self)
+        elif self.exchange == Exchange.KUCOIN:
+            return KWebSocketClient(markets, self.granularity, app=self)
+        return None
+
+    def get_user_data_stream(self, markets: list):
+        """Returns a user data stream for the account, balances and fills are pushed instead of polled"""
+
+        if self.exchange == Exchange.BINANCE:
+            ws_url = "wss://stream.binance.us:9443" if "binance.us" in self.api_url else "wss://stream.binance.com:9443"
+            return BUserDataWebSocketClient(self.api_key, self.api_secret, self.api_url, ws_url, recv_window=self.recv_window, app=self)
+        elif self.exchange == Exchange.COINBASE:
+            return CBUserDataWebSocketClient(self.api_key, self.api_secret, markets, app=self)
+        elif self.exchange == Exchange.COINBASEPRO:
+            return CUserDataWebSocketClient(self.api_key, self.api_secret, self.api_passphrase, markets, app=self)
+        elif self.exchange == Exchange.KUCOIN:
+            return KUserDataWebSocketClient(self.api_key, self.api_secret, self.api_passphrase, self.api_url, app=self)
+        return None
+
+    def is_websocket_ready(self) -> bool:
+        """True once the websocket has a ticker and all the candles of the bot's market"""
+
+        if not self.websocket_connection:
+            return False
+
+        tickers = self.websocket_connection.tickers
+        candles = self.websocket_connection.candles
+        if not isinstance(tickers, pd.DataFrame) or not isinstance(candles, pd.DataFrame):
+            return False
+
+        # a shared websocket has the data of other markets too
+        return (tickers["market"] == self.market).sum() == 1 and (candles["market"] == self.market).sum() == self.adjusttotalperiods
+
     def execute_job(self):
         """Trading bot job which runs at a scheduled interval"""
 
@@ -134,24 +226,26 @@ class PyCryptoBot(BotConfig):
         # If it not enabled in config while will always be False
         if not self.is_sim and not self.disabletelegram:
             control_status = self.telegram_bot.check_bot_control_status()
-            while control_status == "pause" or control_status == "paused":
+            if control_status == "pause" or control_status == "paused":
                 if control_status == "pause":
                     RichText.notify("Pausing bot", self, "normal")
                     self.notify_telegram(f"{self.market} bot is paused")
                     self.telegram_bot.update_bot_status("paused")
-                    if self.websocket:
+                    if self.websocket and not self.shared_websocket:
                         RichText.notify("Closing websocket...", self, "normal")
                         self.websocket_connection.close()
 
-                time.sleep(30)
-                control_status = self.telegram_bot.check_bot_control_status()
+                # checks the status again in 30 seconds, the other bots of a shared scheduler keep running
+                list(map(self.s.cancel, self.s.queue))
+                self.s.enter(30, 1, self.execute_job, ())
+                return
 
             if control_status == "start":
                 RichText.notify("Restarting bot", self, "normal")
                 self.notify_telegram(f"{self.market} bot has restarted")
                 self.telegram_bot.update_bot_status("active")
                 self.read_config(self.exchange)
-                if self.websocket:
+                if self.websocket and not self.shared_websocket:
                     RichText.notify("Starting websocket...", self, "normal")
                     self.websocket_connection.start()
 
@@ -164,16 +258,9 @@ class PyCryptoBot(BotConfig):
             if control_status == "reload":
                 RichText.notify(f"Reloading config parameters {self.market}", self, "normal")
                 self.read_config(self.exchange)
-                if self.websocket:
+                if self.websocket and not self.shared_websocket:
                     self.websocket_connection.close()
-                    if self.exchange == Exchange.BINANCE:
-                        self.websocket_connection = BWebSocketClient([self.market], self.granularity, app=self)
-                    elif self.exchange == Exchange.COINBASE:
-                        self.websocket_connection = CBWebSocketClient([self.market], self.granularity, app=self)
-                    elif self.exchange == Exchange.COINBASEPRO:
-                        self.websocket_connection = CWebSocketClient([self.market], self.granularity, app=self)
-                    elif self.exchange == Exchange.KUCOIN:
-                        self.websocket_connection = KWebSocketClient([self.market], self.granularity, app=self)
+                    self.websocket_connection = self.get_websocket_client([self.market])
                     self.websocket_connection.start()
 
                 list(map(self.s.cancel, self.s.queue))
@@ -197,8 +284,8 @@ class PyCryptoBot(BotConfig):
 
                 self.app_started = False
 
-        # reset self.websocket_connection every 23 hours if applicable
-        if self.websocket and not self.is_sim:
+        # reset self.websocket_connection every 23 hours if applicable, MultiMarketRunner restarts a shared one
+        if self.websocket and not self.is_sim and not self.shared_websocket:
             if self.websocket_connection.time_elapsed > 82800:
                 RichText.notify("Websocket requires a restart every 23 hours!", self, "normal")
                 RichText.notify("Stopping websocket...", self, "normal")
@@ -288,6 +375,7 @@ class PyCryptoBot(BotConfig):
                 return None
 
         # analyse the market data
+        _technical_analysis = None
         if self.is_sim and len(self.trading_data.columns) > 8:
             df = self.trading_data
 
@@ -355,7 +443,7 @@ class PyCryptoBot(BotConfig):
                     self.sim_smartswitch = False
 
             elif self.smart_switch == 1 and _technical_analysis is None:
-                trading_dataCopy = trading_data.copy()
+                trading_dataCopy = self.trading_data.copy()
                 _technical_analysis = TechnicalAnalysis(trading_dataCopy, self.adjusttotalperiods, app=self)
 
                 if "morning_star" not in df:
@@ -363,6 +451,11 @@ class PyCryptoBot(BotConfig):
 
                 df = _technical_analysis.get_df()
 
+        elif not self.is_sim and trading_myPta is False:
+            # only the live candle changes between polls, recalculate just that row
+            self.incremental_analysis.update(self.trading_data, len(self.trading_data))
+            _technical_analysis = TechnicalAnalysis(self.trading_data, len(self.trading_data), app=self)
+            df = _technical_analysis.get_df()
         else:
             _technical_analysis = TechnicalAnalysis(self.trading_data, len(self.trading_data), app=self)
             _technical_analysis.add_all()
@@ -763,18 +856,7 @@ class PyCryptoBot(BotConfig):
                     if candlestick_status == "":
                         return
 
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-                    self.table_console.add_row(
-                        RichText.styled_text("Bot1", "magenta"),
-                        RichText.styled_text(formatted_current_df_index, "white"),
-                        RichText.styled_text(self.market, "yellow"),
-                        RichText.styled_text(self.print_granularity(), "yellow"),
-                        RichText.styled_text(candlestick_status, "violet"),
-                    )
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
+                    self.log_pipeline.emit("normal", candlestick_status, self.market, self.print_granularity(), "violet", formatted_current_df_index)
 
                 def _notify(notification: str = "", level: str = "normal") -> None:
                     if notification == "":
@@ -791,18 +873,7 @@ class PyCryptoBot(BotConfig):
                     else:
                         color = "violet"
 
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-                    self.table_console.add_row(
-                        RichText.styled_text("Bot1", "magenta"),
-                        RichText.styled_text(formatted_current_df_index, "white"),
-                        RichText.styled_text(self.market, "yellow"),
-                        RichText.styled_text(self.print_granularity(), "yellow"),
-                        RichText.styled_text(notification, color),
-                    )
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
+                    self.log_pipeline.emit(level, notification, self.market, self.print_granularity(), color, formatted_current_df_index)
 
                 if not self.is_sim:
                     df_high = df[df["date"] <= current_sim_date]["close"].max()
@@ -902,20 +973,19 @@ class PyCryptoBot(BotConfig):
                 ]
 
                 if not self.is_sim or (self.is_sim and not self.simresultonly):
-                    self.table_console.add_row(*args)
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
+                    message = " ".join(arg.plain if isinstance(arg, Text) else str(arg) for arg in args)
+                    self.log_pipeline.emit("normal", message, self.market, self.print_granularity(), date=formatted_current_df_index, cells=args)
 
                     if self.enableml:
                         # Seasonal Autoregressive Integrated Moving Average (ARIMA) model (ML prediction for 3 intervals from now)
                         if not self.is_sim:
                             try:
-                                prediction = _technical_analysis.arima_model_prediction(int(self.granularity.to_integer / 60) * 3)  # 3 intervals from now
-                                _notify(
-                                    f"Seasonal ARIMA model predicts the closing self.price will be {str(round(prediction[1], 2))} at {prediction[0]} (delta: {round(prediction[1] - self.price, 2)})"
-                                )
+                                # fitted off the tick, the prediction is shown once the candle's model is ready
+                                prediction = _technical_analysis.seasonal_arima_model_prediction(int(self.granularity.to_integer / 60) * 3, wait=False)
+                                if prediction is not None:
+                                    _notify(
+                                        f"Seasonal ARIMA model predicts the closing self.price will be {str(round(prediction[1], 2))} at {prediction[0]} (delta: {round(prediction[1] - self.price, 2)})"
+                                    )
                             except Exception:
                                 pass
 
@@ -1052,96 +1122,20 @@ class PyCryptoBot(BotConfig):
 
                     # if not live
                     else:
-                        if self.state.last_buy_size == 0 and self.state.last_buy_filled == 0:
-                            # sim mode can now use buymaxsize as the amount used for a buy
-                            if self.buymaxsize > 0:
-                                self.state.last_buy_size = self.buymaxsize
-                                self.state.first_buy_size = self.buymaxsize
-                            else:
-                                # TODO: calculate correct buy amount based on quote currency balance
-                                self.state.last_buy_size = 1
-                                self.state.first_buy_size = 1
-                        # add option for buy last sell size
-                        elif (
-                            self.buymaxsize > 0
-                            and self.buylastsellsize
-                            and self.state.last_sell_size > self.state.minimum_order_quote(quote=self.state.last_sell_size, balancechk=True)
-                        ):
-                            self.state.last_buy_size = self.state.last_sell_size
-
-                        self.state.buy_count = self.state.buy_count + 1
-                        self.state.buy_sum = self.state.buy_sum + self.state.last_buy_size
-                        self.state.trailing_buy = False
-                        self.state.action = "DONE"
-                        self.state.trailing_buy_immediate = False
-
-                        if not self.disabletelegram:
-                            self.notify_telegram(
-                                self.market
-                                + " ("
-                                + self.print_granularity()
-                                + ") -  "
-                                + str(current_sim_date)
-                                + "\n - TEST BUY at "
-                                + str(self.price)
-                                + "\n - Buy Size: "
-                                + str(_truncate(self.state.last_buy_size, 4))
-                            )
-
-                        if not self.is_sim or (self.is_sim and not self.simresultonly):
-                            _notify(f"*** Executing SIMULATION Buy Order at {str(self.price)} ***", "info")
-
-                        bands = _technical_analysis.get_fibonacci_retracement_levels(float(self.price))
-
-                        if not self.is_sim:
-                            _notify(f"Fibonacci Retracement Levels: {str(bands)}")
-                            _technical_analysis.print_support_resistance_levels_v2()
-
-                        if len(bands) >= 1 and len(bands) <= 2:
-                            if len(bands) == 1:
-                                first_key = list(bands.keys())[0]
-                                if first_key == "ratio1":
-                                    self.state.fib_low = 0
-                                    self.state.fib_high = bands[first_key]
-                                if first_key == "ratio1_618":
-                                    self.state.fib_low = bands[first_key]
-                                    self.state.fib_high = bands[first_key] * 2
-                                else:
-                                    self.state.fib_low = bands[first_key]
-
-                            elif len(bands) == 2:
-                                first_key = list(bands.keys())[0]
-                                second_key = list(bands.keys())[1]
-                                self.state.fib_low = bands[first_key]
-                                self.state.fib_high = bands[second_key]
-
-                        self.trade_tracker = pd.concat(
-                            [
-                                self.trade_tracker,
-                                pd.DataFrame(
-                                    {
-                                        "Datetime": str(current_sim_date),
-                                        "Market": self.market,
-                                        "Action": "BUY",
-                                        "Price": self.price,
-                                        "Quote": self.state.last_buy_size,
-                                        "Base": float(self.state.last_buy_size) / float(self.price),
-                                        "DF_High": df[df["date"] <= current_sim_date]["close"].max(),
-                                        "DF_Low": df[df["date"] <= current_sim_date]["close"].min(),
-                                    },
-                                    index=[0],
-                                ),
-                            ],
+                        self._simulation_buy(
+                            current_sim_date,
+                            _technical_analysis,
+                            df[df["date"] <= current_sim_date]["close"].max(),
+                            df[df["date"] <= current_sim_date]["close"].min(),
+                            _notify,
                         )
 
-                        self.state.in_open_trade = True
-                        self.state.last_action = "BUY"
-                        self.state.last_api_call_datetime -= timedelta(seconds=60)
-
                     if self.save_graphs:
                         if self.adjusttotalperiods < 200:
                             _notify("Trading Graphs can only be generated when dataframe has more than 200 periods.")
                         else:
+                            from views.TradingGraphs import TradingGraphs  # matplotlib is only loaded to save graphs
+
                             tradinggraphs = TradingGraphs(_technical_analysis, self)
                             ts = datetime.now().timestamp()
                             filename = f"{self.market}_{self.print_granularity()}_buy_{str(ts)}.png"
@@ -1288,115 +1282,17 @@ class PyCryptoBot(BotConfig):
 
                     # if not live
                     else:
-                        # TODO - improve and confirm logic to simulate sell
-
-                        margin, profit, sell_fee = calculate_margin(
-                            buy_size=self.state.last_buy_size,
-                            buy_filled=self.state.last_buy_filled,
-                            buy_price=self.state.last_buy_price,
-                            buy_fee=self.state.last_buy_fee,
-                            sell_percent=self.get_sell_percent(),
-                            sell_price=self.price,
-                            sell_taker_fee=self.get_taker_fee(),
-                            app=self,
-                        )
-
-                        if self.state.last_buy_size > 0:
-                            margin_text = truncate(margin) + "%"
-                        else:
-                            margin_text = "0%"
-
-                        # save last buy before this sell to use in Sim Summary
-                        self.state.previous_buy_size = self.state.last_buy_size
-                        # preserve next sell values for simulator
-                        self.state.sell_count = self.state.sell_count + 1
-                        sell_size = (self.get_sell_percent() / 100) * (
-                            (self.price / self.state.last_buy_price) * (self.state.last_buy_size - self.state.last_buy_fee)
-                        )
-                        self.state.last_sell_size = sell_size - sell_fee
-                        self.state.sell_sum = self.state.sell_sum + self.state.last_sell_size
-
-                        # added to track profit and loss margins during sim runs
-                        self.state.margintracker += float(margin)
-                        self.state.profitlosstracker += float(profit)
-                        self.state.feetracker += float(sell_fee)
-                        self.state.buy_tracker += float(self.state.last_buy_size)
-
-                        if not self.disabletelegram:
-                            self.notify_telegram(
-                                self.market
-                                + " ("
-                                + self.print_granularity()
-                                + ") "
-                                + str(current_sim_date)
-                                + "\n - TEST SELL at "
-                                + str(str(self.price))
-                                + " (margin: "
-                                + margin_text
-                                + ", delta: "
-                                + str(
-                                    round(
-                                        self.price - self.state.last_buy_price,
-                                        precision,
-                                    )
-                                )
-                                + ")"
-                            )
-
-                        if self.price > 0:
-                            margin_text = truncate(margin) + "%"
-                        else:
-                            margin_text = "0%"
-
-                        if not self.is_sim or (self.is_sim and not self.simresultonly):
-                            _notify(
-                                f"*** Executing SIMULATION Sell Order at {str(self.price)} | Buy: {str(self.state.last_buy_price)} ({str(self.price - self.state.last_buy_price)}) | Profit: {str(profit)} on {_truncate(self.state.last_buy_size, precision)} | Fees: {str(round(sell_fee, precision))} | Margin: {margin_text} ***",
-                                "info",
-                            )
-
-                        self.trade_tracker = pd.concat(
-                            [
-                                self.trade_tracker,
-                                pd.DataFrame(
-                                    {
-                                        "Datetime": str(current_sim_date),
-                                        "Market": self.market,
-                                        "Action": "SELL",
-                                        "Price": self.price,
-                                        "Quote": self.state.last_sell_size,
-                                        "Base": self.state.last_buy_filled,
-                                        "Margin": margin,
-                                        "Profit": profit,
-                                        "Fee": sell_fee,
-                                        "DF_High": df[df["date"] <= current_sim_date]["close"].max(),
-                                        "DF_Low": df[df["date"] <= current_sim_date]["close"].min(),
-                                    },
-                                    index=[0],
-                                ),
-                            ],
+                        self._simulation_sell(
+                            current_sim_date,
+                            df[df["date"] <= current_sim_date]["close"].max(),
+                            df[df["date"] <= current_sim_date]["close"].min(),
+                            precision,
+                            _notify,
                         )
 
-                        self.state.in_open_trade = False
-                        self.state.last_api_call_datetime -= timedelta(seconds=60)
-                        self.state.last_action = "SELL"
-                        self.state.prevent_loss = False
-                        self.state.trailing_sell = False
-                        self.state.trailing_sell_immediate = False
-                        self.state.tsl_triggered = False
-
-                        if self.trailing_stop_loss:
-                            self.state.tsl_pcnt = float(self.trailing_stop_loss)
-
-                        if self.trailing_stop_loss_trigger:
-                            self.state.tsl_trigger = float(self.trailing_stop_loss_trigger)
-
-                        # adjust the next simulation buy with the current balance
-                        self.state.last_buy_size += profit
-
-                        self.state.tsl_max = False
-                        self.state.action = "DONE"
-
                     if self.save_graphs:
+                        from views.TradingGraphs import TradingGraphs
+
                         tradinggraphs = TradingGraphs(_technical_analysis, self)
                         ts = datetime.now().timestamp()
                         filename = f"{self.market}_{self.print_granularity()}_sell_{str(ts)}.png"
@@ -1420,7 +1316,7 @@ class PyCryptoBot(BotConfig):
 
             # summary at the end of the simulation
             if self.is_sim and self.state.iterations == len(df):
-                self._simulation_summary()
+                self.simulation_result = self._simulation_summary()
                 self._simulation_save_orders()
 
         if self.state.last_buy_size <= 0 and self.state.last_buy_price <= 0 and self.state.last_action != "BUY":
@@ -1486,12 +1382,7 @@ class PyCryptoBot(BotConfig):
 
         else:
             list(map(self.s.cancel, self.s.queue))
-            if (
-                self.websocket_connection
-                and self.websocket_connection is not None
-                and (isinstance(self.websocket_connection.tickers, pd.DataFrame) and len(self.websocket_connection.tickers) == 1)
-                and (isinstance(self.websocket_connection.candles, pd.DataFrame) and len(self.websocket_connection.candles) == self.adjusttotalperiods)
-            ):
+            if self.is_websocket_ready():
                 # poll every 5 seconds (self.websocket_connection)
                 self.s.enter(
                     5,
@@ -1549,6 +1440,12 @@ class PyCryptoBot(BotConfig):
                     self.websocket_connection = KWebSocketClient([self.market], self.granularit, app=self)
                     self.websocket_connection.start()
 
+            if self.userdatastream and self.is_live and not self.is_sim:
+                self.user_data_stream = self.get_user_data_stream([self.market])
+                if self.user_data_stream is not None:
+                    RichText.notify("Opening user data stream", self, "normal")
+                    self.user_data_stream.start()
+
             smartswitchstatus = "enabled" if self.smart_switch else "disabled"
             message += f" for {self.market} using granularity {self.print_granularity()}. Smartswitch {smartswitchstatus}"
 
@@ -1556,7 +1453,10 @@ class PyCryptoBot(BotConfig):
                 self.notify_telegram(message)
 
             # initialise and start application
-            self.initialise()
+            with StartupProfile.step("initialise"):
+                self.initialise()
+
+            StartupProfile.report(self.console_term)
 
             if self.is_sim and self.simenddate:
                 try:
@@ -1566,8 +1466,12 @@ class PyCryptoBot(BotConfig):
                     pass
 
             try:
-                self.execute_job()
-                self.s.run()
+                if self.simbacktest and Backtest.is_supported(self):
+                    # indicators and signals are calculated once, only the trade state is stepped per candle
+                    Backtest(self).run()
+                else:
+                    self.execute_job()
+                    self.s.run()
 
             except (KeyboardInterrupt, SystemExit):
                 raise
@@ -1608,6 +1512,11 @@ class PyCryptoBot(BotConfig):
                         self.websocket_connection.close()
                     except Exception:
                         pass
+                if self.user_data_stream is not None:
+                    try:
+                        self.user_data_stream.close()
+                    except Exception:
+                        pass
                 sys.exit(0)
             except SystemExit:
                 # pylint: disable=protected-access
@@ -1809,6 +1718,207 @@ class PyCryptoBot(BotConfig):
                         self.get_date_from_iso8601_str(str(end_date)).isoformat(),
                     )
 
+    def _simulation_buy(self, current_sim_date: str, technical_analysis: TechnicalAnalysis, df_high: float, df_low: float, notify) -> None:
+        """Simulated buy at the current price, shared by execute_job() and the vectorized backtest"""
+
+        if self.state.last_buy_size == 0 and self.state.last_buy_filled == 0:
+            # sim mode can now use buymaxsize as the amount used for a buy
+            if self.buymaxsize > 0:
+                self.state.last_buy_size = self.buymaxsize
+                self.state.first_buy_size = self.buymaxsize
+            else:
+                # TODO: calculate correct buy amount based on quote currency balance
+                self.state.last_buy_size = 1
+                self.state.first_buy_size = 1
+        # add option for buy last sell size
+        elif (
+            self.buymaxsize > 0
+            and self.buylastsellsize
+            and self.state.last_sell_size > self.state.minimum_order_quote(quote=self.state.last_sell_size, balancechk=True)
+        ):
+            self.state.last_buy_size = self.state.last_sell_size
+
+        self.state.buy_count = self.state.buy_count + 1
+        self.state.buy_sum = self.state.buy_sum + self.state.last_buy_size
+        self.state.trailing_buy = False
+        self.state.action = "DONE"
+        self.state.trailing_buy_immediate = False
+
+        if not self.disabletelegram:
+            self.notify_telegram(
+                self.market
+                + " ("
+                + self.print_granularity()
+                + ") -  "
+                + str(current_sim_date)
+                + "\n - TEST BUY at "
+                + str(self.price)
+                + "\n - Buy Size: "
+                + str(_truncate(self.state.last_buy_size, 4))
+            )
+
+        if not self.is_sim or (self.is_sim and not self.simresultonly):
+            notify(f"*** Executing SIMULATION Buy Order at {str(self.price)} ***", "info")
+
+        bands = technical_analysis.get_fibonacci_retracement_levels(float(self.price))
+
+        if not self.is_sim:
+            notify(f"Fibonacci Retracement Levels: {str(bands)}")
+            technical_analysis.print_support_resistance_levels_v2()
+
+        if len(bands) >= 1 and len(bands) <= 2:
+            if len(bands) == 1:
+                first_key = list(bands.keys())[0]
+                if first_key == "ratio1":
+                    self.state.fib_low = 0
+                    self.state.fib_high = bands[first_key]
+                if first_key == "ratio1_618":
+                    self.state.fib_low = bands[first_key]
+                    self.state.fib_high = bands[first_key] * 2
+                else:
+                    self.state.fib_low = bands[first_key]
+
+            elif len(bands) == 2:
+                first_key = list(bands.keys())[0]
+                second_key = list(bands.keys())[1]
+                self.state.fib_low = bands[first_key]
+                self.state.fib_high = bands[second_key]
+
+        self.trade_tracker = pd.concat(
+            [
+                self.trade_tracker,
+                pd.DataFrame(
+                    {
+                        "Datetime": str(current_sim_date),
+                        "Market": self.market,
+                        "Action": "BUY",
+                        "Price": self.price,
+                        "Quote": self.state.last_buy_size,
+                        "Base": float(self.state.last_buy_size) / float(self.price),
+                        "DF_High": df_high,
+                        "DF_Low": df_low,
+                    },
+                    index=[0],
+                ),
+            ],
+        )
+
+        self.state.in_open_trade = True
+        self.state.last_action = "BUY"
+        self.state.last_api_call_datetime -= timedelta(seconds=60)
+
+    def _simulation_sell(self, current_sim_date: str, df_high: float, df_low: float, precision: int, notify) -> None:
+        """Simulated sell at the current price, shared by execute_job() and the vectorized backtest"""
+
+        truncate = functools.partial(_truncate, n=precision)
+
+        # TODO - improve and confirm logic to simulate sell
+        margin, profit, sell_fee = calculate_margin(
+            buy_size=self.state.last_buy_size,
+            buy_filled=self.state.last_buy_filled,
+            buy_price=self.state.last_buy_price,
+            buy_fee=self.state.last_buy_fee,
+            sell_percent=self.get_sell_percent(),
+            sell_price=self.price,
+            sell_taker_fee=self.get_taker_fee(),
+            app=self,
+        )
+
+        if self.state.last_buy_size > 0:
+            margin_text = truncate(margin) + "%"
+        else:
+            margin_text = "0%"
+
+        # save last buy before this sell to use in Sim Summary
+        self.state.previous_buy_size = self.state.last_buy_size
+        # preserve next sell values for simulator
+        self.state.sell_count = self.state.sell_count + 1
+        sell_size = (self.get_sell_percent() / 100) * (
+            (self.price / self.state.last_buy_price) * (self.state.last_buy_size - self.state.last_buy_fee)
+        )
+        self.state.last_sell_size = sell_size - sell_fee
+        self.state.sell_sum = self.state.sell_sum + self.state.last_sell_size
+
+        # added to track profit and loss margins during sim runs
+        self.state.margintracker += float(margin)
+        self.state.profitlosstracker += float(profit)
+        self.state.feetracker += float(sell_fee)
+        self.state.buy_tracker += float(self.state.last_buy_size)
+
+        if not self.disabletelegram:
+            self.notify_telegram(
+                self.market
+                + " ("
+                + self.print_granularity()
+                + ") "
+                + str(current_sim_date)
+                + "\n - TEST SELL at "
+                + str(str(self.price))
+                + " (margin: "
+                + margin_text
+                + ", delta: "
+                + str(
+                    round(
+                        self.price - self.state.last_buy_price,
+                        precision,
+                    )
+                )
+                + ")"
+            )
+
+        if self.price > 0:
+            margin_text = truncate(margin) + "%"
+        else:
+            margin_text = "0%"
+
+        if not self.is_sim or (self.is_sim and not self.simresultonly):
+            notify(
+                f"*** Executing SIMULATION Sell Order at {str(self.price)} | Buy: {str(self.state.last_buy_price)} ({str(self.price - self.state.last_buy_price)}) | Profit: {str(profit)} on {_truncate(self.state.last_buy_size, precision)} | Fees: {str(round(sell_fee, precision))} | Margin: {margin_text} ***",
+                "info",
+            )
+
+        self.trade_tracker = pd.concat(
+            [
+                self.trade_tracker,
+                pd.DataFrame(
+                    {
+                        "Datetime": str(current_sim_date),
+                        "Market": self.market,
+                        "Action": "SELL",
+                        "Price": self.price,
+                        "Quote": self.state.last_sell_size,
+                        "Base": self.state.last_buy_filled,
+                        "Margin": margin,
+                        "Profit": profit,
+                        "Fee": sell_fee,
+                        "DF_High": df_high,
+                        "DF_Low": df_low,
+                    },
+                    index=[0],
+                ),
+            ],
+        )
+
+        self.state.in_open_trade = False
+        self.state.last_api_call_datetime -= timedelta(seconds=60)
+        self.state.last_action = "SELL"
+        self.state.prevent_loss = False
+        self.state.trailing_sell = False
+        self.state.trailing_sell_immediate = False
+        self.state.tsl_triggered = False
+
+        if self.trailing_stop_loss:
+            self.state.tsl_pcnt = float(self.trailing_stop_loss)
+
+        if self.trailing_stop_loss_trigger:
+            self.state.tsl_trigger = float(self.trailing_stop_loss_trigger)
+
+        # adjust the next simulation buy with the current balance
+        self.state.last_buy_size += profit
+
+        self.state.tsl_max = False
+        self.state.action = "DONE"
+
     def _simulation_summary(self) -> dict:
         simulation = {
             "config": {},
@@ -2000,6 +2110,9 @@ class PyCryptoBot(BotConfig):
             if not self.disabletelegram:
                 self.telegram_bot.remove_active_bot()
 
+        # the notifications of the simulation are above the summary
+        self.log_pipeline.flush()
+
         if self.simresultonly:
             print(json.dumps(simulation, sort_keys=True, indent=4))
         else:
@@ -2178,17 +2291,28 @@ class PyCryptoBot(BotConfig):
         config_option_row_str(
             "Market", "market", "coinbase, coinbasepro and kucoin: BTC-GBP, binance: BTCGBP etc.", break_below=False, default_value=None, arg_name="market"
         )
+        config_option_row_str("Markets", "markets", "Markets run in this process, comma separated", break_below=False, default_value=[], arg_name="markets")
+        config_option_row_int("Workers", "workers", "Number of processes to spread the markets across", default_value=1, arg_name="workers")
         config_option_row_enum("Granularity", "granularity", "Granularity of the data", break_below=True, default_value="3600", arg_name="granularity")
 
         config_option_row_bool(
             "Enable Debugging",
             "debug",
             "Enable debug level logging",
-            break_below=True,
+            break_below=False,
             store_invert=False,
             default_value=False,
             arg_name="debug",
         )
+        config_option_row_bool(
+            "Profile Startup",
+            "profile_startup",
+            "Report the import and initialisation time per module",
+            break_below=True,
+            store_invert=False,
+            default_value=False,
+            arg_name="profile_startup",
+        )
 
         config_option_row_str(
             "Sim Start Date",
@@ -2210,11 +2334,20 @@ class PyCryptoBot(BotConfig):
             "Sim Results Only",
             "simresultonly",
             "Simulation returns only the results",
-            break_below=True,
+            break_below=False,
             store_invert=False,
             default_value=False,
             arg_name="simresultonly",
         )
+        config_option_row_bool(
+            "Sim Backtest",
+            "simbacktest",
+            "Simulation calculates the indicators and signals once",
+            break_below=True,
+            store_invert=False,
+            default_value=False,
+            arg_name="simbacktest",
+        )
 
         config_option_row_bool(
             "Telegram Notifications",
@@ -2260,6 +2393,9 @@ class PyCryptoBot(BotConfig):
         config_option_row_str(
             "Log File", "logfile", "Use the log file at the given location", break_below=False, default_value="pycryptobot.log", arg_name="logfile"
         )
+        config_option_row_str(
+            "Event Log", "eventlog", "Also write the notifications to the file, one per line", break_below=False, default_value=None, arg_name="eventlog"
+        )
         config_option_row_str(
             "Trades File",
             "tradesfile",
@@ -2282,6 +2418,33 @@ class PyCryptoBot(BotConfig):
         config_option_row_bool(
             "Enable Websocket", "websocket", "Enable websockets for data retrieval", store_invert=False, default_value=False, arg_name="websocket"
         )
+        config_option_row_bool(
+            "Enable Candle Store", "usecandlestore", "Keep historical candles on disk between runs", store_invert=False, default_value=False, arg_name="candlestore"
+        )
+        config_option_row_bool(
+            "Float32 Indicators",
+            "indicatorfloat32",
+            "Store the indicator columns as float32 to halve their memory",
+            store_invert=False,
+            default_value=False,
+            arg_name="indicatorfloat32",
+        )
+        config_option_row_bool(
+            "Order History Cache",
+            "useorderhistorycache",
+            "Keep completed orders on disk and only request newer orders",
+            store_invert=False,
+            default_value=False,
+            arg_name="orderhistorycache",
+        )
+        config_option_row_bool(
+            "User Data Stream",
+            "userdatastream",
+            "Track balances and fills with the exchange user data stream",
+            store_invert=False,
+            default_value=False,
+            arg_name="userdatastream",
+        )
         config_option_row_bool(
             "Insufficient Funds Log",
             "enableinsufficientfundslogging",
@@ -2336,6 +2499,12 @@ class PyCryptoBot(BotConfig):
             default_value=5000,
             arg_name="recvwindow",
         )
+        config_option_row_int(
+            "HTTP Pool Size", "httppoolsize", "Exchange API keep-alive connections, integer between 1 and 100", default_value=10, arg_name="httppoolsize"
+        )
+        config_option_row_int(
+            "HTTP Timeout", "httptimeout", "Exchange API request timeout in seconds, integer between 1 and 300", default_value=30, arg_name="httptimeout"
+        )
         config_option_row_bool(
             "Exit After Sell",
             "exitaftersell",
@@ -2628,18 +2797,7 @@ class PyCryptoBot(BotConfig):
             else:
                 color = "violet"
 
-            self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-            self.table_console.add_row(
-                RichText.styled_text("Bot1", "magenta"),
-                RichText.styled_text(datetime.today().strftime("%Y-%m-%d %H:%M:%S"), "white"),
-                RichText.styled_text(self.market, "yellow"),
-                RichText.styled_text(self.print_granularity(), "yellow"),
-                RichText.styled_text(notification, color),
-            )
-            self.console_term.print(self.table_console)
-            if self.disablelog is False:
-                self.console_log.print(self.table_console)
-            self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
+            self.log_pipeline.emit(level, notification, self.market, self.print_granularity(), color)
 
         if self.is_sim:
             df_first = None
@@ -2669,50 +2827,14 @@ class PyCryptoBot(BotConfig):
                     else:
                         _notify(f"Retrieving {granularity.to_short} market data from the exchange.")
 
-                df_first = simend
-                df_first -= timedelta(minutes=((granularity.to_integer / 60) * 200))
-                df1 = self.get_historical_data(
-                    market,
-                    granularity,
-                    None,
-                    str(df_first.isoformat()),
-                    str(simend.isoformat()),
-                )
-
-                result_df_cache = df1
-                originalSimStart = self.get_date_from_iso8601_str(str(simstart))
-                adding_extra_candles = False
-                while df_first.isoformat(timespec="milliseconds") > simstart.isoformat(timespec="milliseconds") or df_first.isoformat(
-                    timespec="milliseconds"
-                ) > originalSimStart.isoformat(timespec="milliseconds"):
-                    end_date = df_first
-                    df_first -= timedelta(minutes=(self.adjusttotalperiods * (granularity.to_integer / 60)))
-
-                    if df_first.isoformat(timespec="milliseconds") < simstart.isoformat(timespec="milliseconds"):
-                        df_first = self.get_date_from_iso8601_str(str(simstart))
-
-                    df2 = self.get_historical_data(
-                        market,
-                        granularity,
-                        None,
-                        str(df_first.isoformat()),
-                        str(end_date.isoformat()),
-                    )
+                # adjusttotalperiods candles before the start date to warm up the indicators as live, at least 200 candles
+                range_start = simstart - timedelta(minutes=(self.adjusttotalperiods * (granularity.to_integer / 60)))
+                range_start = min(range_start, simend - timedelta(minutes=((granularity.to_integer / 60) * 200)))
 
-                    # check to see if there are an extra 300 candles available to be used, if not just use the original starting point
-                    if self.adjusttotalperiods >= 300 and adding_extra_candles is True and len(df2) <= 0:
-                        self.extra_candles_found = False
-                        simstart = originalSimStart
-                    else:
-                        result_df_cache = pd.concat([df2.copy(), df1.copy()]).drop_duplicates()
-                        df1 = result_df_cache
+                result_df_cache = self.get_historical_data_range(market, granularity, range_start, simend)
 
-                    # create df with 300 candles or adjusted total periods before the required start_date to match live
-                    if df_first.isoformat(timespec="milliseconds") == simstart.isoformat(timespec="milliseconds"):
-                        if adding_extra_candles is False:
-                            simstart -= timedelta(minutes=(self.adjusttotalperiods * (granularity.to_integer / 60)))
-                        adding_extra_candles = True
-                        self.extra_candles_found = True
+                # check to see if there are an extra 300 candles available to be used, if not just use the original starting point
+                self.extra_candles_found = self.adjusttotalperiods < 300 or (len(result_df_cache) > 0 and result_df_cache.index[0] < simstart)
 
             if len(result_df_cache) > 0 and "morning_star" not in result_df_cache:
                 result_df_cache.sort_values(by=["date"], ascending=True, inplace=True)
@@ -2733,11 +2855,14 @@ class PyCryptoBot(BotConfig):
         end: str = "",
     ) -> pd.DataFrame:
         if self.is_sim:
+            # the finest granularity is requested from the exchange, the others are resampled from it
             if self.sell_smart_switch == 1:
                 self.ema1226_5m_cache = self.get_smart_switch_df(self.ema1226_5m_cache, market, Granularity.FIVE_MINUTES, start, end)
-            self.ema1226_15m_cache = self.get_smart_switch_df(self.ema1226_15m_cache, market, Granularity.FIFTEEN_MINUTES, start, end)
-            self.ema1226_1h_cache = self.get_smart_switch_df(self.ema1226_1h_cache, market, Granularity.ONE_HOUR, start, end)
-            self.ema1226_6h_cache = self.get_smart_switch_df(self.ema1226_6h_cache, market, Granularity.SIX_HOURS, start, end)
+                self.ema1226_15m_cache = self.get_resampled_df(self.ema1226_15m_cache, self.ema1226_5m_cache, market, Granularity.FIFTEEN_MINUTES)
+            else:
+                self.ema1226_15m_cache = self.get_smart_switch_df(self.ema1226_15m_cache, market, Granularity.FIFTEEN_MINUTES, start, end)
+            self.ema1226_1h_cache = self.get_resampled_df(self.ema1226_1h_cache, self.ema1226_15m_cache, market, Granularity.ONE_HOUR)
+            self.ema1226_6h_cache = self.get_resampled_df(self.ema1226_6h_cache, self.ema1226_15m_cache, market, Granularity.SIX_HOURS)
 
             if len(self.ema1226_15m_cache) == 0:
                 raise Exception(f"No data return for selected date range {start} - {end}")
@@ -2784,6 +2909,27 @@ class PyCryptoBot(BotConfig):
             else:
                 return self.ema1226_1h_cache
 
+    def get_resampled_df(self, df: pd.DataFrame, df_base: pd.DataFrame, market, granularity: Granularity) -> pd.DataFrame:
+        """Simulation candles resampled from df_base, only the candles before df_base are requested from the exchange"""
+
+        if isinstance(df, pd.DataFrame) and len(df) > 0:
+            return df
+
+        df = resample(df_base, granularity)
+        if len(df) == 0:
+            return df
+
+        # indicator warm up, as get_smart_switch_df() adds adjusttotalperiods candles before the start date
+        end_date = df["date"].iloc[0] - timedelta(seconds=granularity.to_integer)
+        start_date = end_date - timedelta(seconds=granularity.to_integer * self.adjusttotalperiods)
+        df_history = self.get_historical_data(market, granularity, None, start_date.isoformat(), end_date.isoformat())
+
+        if isinstance(df_history, pd.DataFrame) and len(df_history) > 0:
+            df_history = df_history.loc[df_history["date"] < df["date"].iloc[0], df.columns]
+            df = pd.concat([df_history.astype(df.dtypes.to_dict()), df])
+
+        return df
+
     def get_historical_data_chained(self, market, granularity: Granularity, max_iterations: int = 1) -> pd.DataFrame:
         df1 = self.get_historical_data(market, granularity, None)
 
@@ -2809,6 +2955,52 @@ class PyCryptoBot(BotConfig):
 
         return result_df
 
+    def get_historical_data_api(self):
+        """The API client the historical data is requested from"""
+
+        if self.exchange == Exchange.COINBASE:
+            return self.get_api_client(CBAuthAPI, self.api_key, self.api_secret, self.api_url, app=self)
+        elif self.exchange == Exchange.BINANCE:
+            return self.get_api_client(BPublicAPI, api_url=self.api_url, app=self)
+        elif self.exchange == Exchange.KUCOIN:
+            return self.get_api_client(KPublicAPI, api_url=self.api_url, app=self)
+        else:  # returns data from coinbase pro if not specified
+            return self.get_api_client(CPublicAPI, app=self)
+
+    def get_historical_data_range(self, market, granularity: Granularity, start: datetime, end: datetime) -> pd.DataFrame:
+        """Candles between the two dates, downloaded in parallel chunks and resumed when chunks fail"""
+
+        api = self.get_historical_data_api()
+        downloader = RangeDownloader(self.exchange, granularity, lambda chunk_start, chunk_end: api.get_historical_data(market, granularity, None, chunk_start, chunk_end))
+
+        iso8601start = start.strftime("%Y-%m-%dT%H:%M:%S")
+        iso8601end = end.strftime("%Y-%m-%dT%H:%M:%S")
+
+        attempt = 1
+        while True:
+            try:
+                if self.usecandlestore:
+                    # the downloader fetches the ranges missing from the local candle store
+                    df = CandleStore(self.exchange.value, market, granularity).get_historical_data(iso8601start, iso8601end, downloader.download)
+                else:
+                    df = downloader.download(iso8601start, iso8601end)
+                break
+            except RangeDownloadError as err:
+                if attempt >= RANGE_DOWNLOAD_ATTEMPTS:
+                    raise
+                RichText.notify(f"{str(err)}, resuming the download.", self, "warning")
+                attempt += 1
+
+        if len(downloader.gaps) > 0:
+            gap_start, gap_end = max(downloader.gaps, key=lambda gap: gap[1] - gap[0])
+            RichText.notify(
+                f"{market} {granularity.to_short} data has {len(downloader.gaps)} gaps, the largest between {gap_start} and {gap_end}.",
+                self,
+                "warning",
+            )
+
+        return compact_candles(df)
+
     def get_historical_data(
         self,
         market,
@@ -2817,32 +3009,29 @@ class PyCryptoBot(BotConfig):
         iso8601start="",
         iso8601end="",
     ):
-        if self.exchange == Exchange.COINBASE:
-            api = CBAuthAPI(self.api_key, self.api_secret, self.api_url, app=self)
-
-        elif self.exchange == Exchange.BINANCE:
-            api = BPublicAPI(api_url=self.api_url, app=self)
-
-        elif self.exchange == Exchange.KUCOIN:  # returns data from coinbase if not specified
-            api = KPublicAPI(api_url=self.api_url, app=self)
+        api = self.get_historical_data_api()
 
-            # Kucoin only returns 100 rows if start not specified, make sure we get the right amount
-            if not self.is_sim and iso8601start == "":
-                start = datetime.now() - timedelta(minutes=(granularity.to_integer / 60) * self.adjusttotalperiods)
-                iso8601start = str(start.isoformat()).split(".")[0]
+        # Kucoin only returns 100 rows if start not specified, make sure we get the right amount
+        if self.exchange == Exchange.KUCOIN and not self.is_sim and iso8601start == "":
+            start = datetime.now() - timedelta(minutes=(granularity.to_integer / 60) * self.adjusttotalperiods)
+            iso8601start = str(start.isoformat()).split(".")[0]
 
-        else:  # returns data from coinbase pro if not specified
-            api = CPublicAPI(app=self)
-
-        if iso8601start != "" and iso8601end == "" and self.exchange != Exchange.BINANCE:
-            return api.get_historical_data(
+        if self.usecandlestore and websocket is None and iso8601start != "" and iso8601end != "":
+            # only the ranges missing from the local candle store are requested from the exchange
+            df = CandleStore(self.exchange.value, market, granularity).get_historical_data(
+                iso8601start,
+                iso8601end,
+                lambda start, end: api.get_historical_data(market, granularity, None, start, end),
+            )
+        elif iso8601start != "" and iso8601end == "" and self.exchange != Exchange.BINANCE:
+            df = api.get_historical_data(
                 market,
                 granularity,
                 None,
                 iso8601start,
             )
         elif iso8601start != "" and iso8601end != "":
-            return api.get_historical_data(
+            df = api.get_historical_data(
                 market,
                 granularity,
                 None,
@@ -2850,32 +3039,35 @@ class PyCryptoBot(BotConfig):
                 iso8601end,
             )
         else:
-            return api.get_historical_data(market, granularity, websocket)
+            df = api.get_historical_data(market, granularity, websocket)
+
+        # the market and granularity once per frame instead of a string per candle
+        return compact_candles(df)
 
     def get_ticker(self, market, websocket):
         if self.exchange == Exchange.COINBASE:
-            api = CBAuthAPI(self.api_key, self.api_secret, self.api_url, app=self)
+            api = self.get_api_client(CBAuthAPI, self.api_key, self.api_secret, self.api_url, app=self)
             return api.get_ticker(market, websocket)
         if self.exchange == Exchange.BINANCE:
-            api = BPublicAPI(api_url=self.api_url, app=self)
+            api = self.get_api_client(BPublicAPI, api_url=self.api_url, app=self)
             return api.get_ticker(market, websocket)
         elif self.exchange == Exchange.KUCOIN:
-            api = KPublicAPI(api_url=self.api_url, app=self)
+            api = self.get_api_client(KPublicAPI, api_url=self.api_url, app=self)
             return api.get_ticker(market, websocket)
         else:  # returns data from coinbase pro if not specified
-            api = CPublicAPI(app=self)
+            api = self.get_api_client(CPublicAPI, app=self)
             return api.get_ticker(market, websocket)
 
     def get_time(self):
         if self.exchange == Exchange.COINBASE:
-            return CPublicAPI(app=self).get_time()
+            return self.get_api_client(CPublicAPI, app=self).get_time()
         elif self.exchange == Exchange.COINBASEPRO:
-            return CPublicAPI(app=self).get_time()
+            return self.get_api_client(CPublicAPI, app=self).get_time()
         elif self.exchange == Exchange.KUCOIN:
-            return KPublicAPI(app=self).get_time()
+            return self.get_api_client(KPublicAPI, app=self).get_time()
         elif self.exchange == Exchange.BINANCE:
             try:
-                return BPublicAPI(app=self).get_time()
+                return self.get_api_client(BPublicAPI, app=self).get_time()
             except ReadTimeoutError:
                 return ""
         else:
@@ -2974,6 +3166,16 @@ class PyCryptoBot(BotConfig):
     def get_additional_df(self, short_granularity, websocket) -> pd.DataFrame:
         granularity = Granularity.convert_to_enum(short_granularity)
 
+        if can_resample(self.granularity, granularity) and len(self.trading_data) > 0:
+            # resampled from the bot candles, the exchange is only asked for the history once
+            if granularity not in self.resamplers:
+                df = self.get_historical_data(self.market, granularity, None)
+                if not isinstance(df, pd.DataFrame) or len(df) == 0:
+                    raise Exception(f"Additional DF Error: no {short_granularity} candles")
+                self.resamplers[granularity] = Resampler(granularity, df, self.adjusttotalperiods)
+
+            return self.resamplers[granularity].update(self.trading_data)
+
         idx, next_idx = (None, 0)
         for i in range(len(self.df_data)):
             if isinstance(self.df_data[i], list) and self.df_data[i][0] == short_granularity:
@@ -3002,7 +3204,8 @@ class PyCryptoBot(BotConfig):
                     datetime.timestamp(datetime.utcnow()) - granularity.to_integer >= datetime.timestamp(df["date"].iloc[row])
                 )
             ):
-                df = self.get_historical_data(self.market, self.granularity, self.websocket_connection)
+                # the websocket only has candles of the bot granularity
+                df = self.get_historical_data(self.market, granularity, self.websocket_connection if granularity == self.granularity else None)
                 row = -1
             else:
                 # if ticker hasn't run yet or hasn't updated, return the original df
@@ -5,12 +5,14 @@ from numpy import array as np_array, min as np_min, ptp as np_ptp
 
 from models.TradingAccount import TradingAccount
 from models.exchange.ExchangesEnum import Exchange
-from models.exchange.binance import AuthAPI as BAuthAPI
-from models.exchange.coinbase import AuthAPI as CBAuthAPI
-from models.exchange.coinbase_pro import AuthAPI as CAuthAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI
+from models.helper.StartupProfileHelper import LazyImport
 from views.PyCryptoBot import RichText
 
+BAuthAPI = LazyImport("models.exchange.binance", "AuthAPI")
+CBAuthAPI = LazyImport("models.exchange.coinbase", "AuthAPI")
+CAuthAPI = LazyImport("models.exchange.coinbase_pro", "AuthAPI")
+KAuthAPI = LazyImport("models.exchange.kucoin", "AuthAPI")
+
 
 class AppState:
     def __init__(self, app, account: TradingAccount) -> None:
@@ -0,0 +1,268 @@
+"""Precompute-once simulation engine"""
+
+import sys
+import functools
+import pandas as pd
+
+from models.Strategy import Strategy
+from models.Trading import TechnicalAnalysis
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.helper.MarginHelper import calculate_margin
+from utils.PyCryptoBot import truncate as _truncate
+from views.PyCryptoBot import RichText
+
+
+class Backtest:
+    """Vectorized replacement for the scheduler driven simulation loop
+
+    The indicators are calculated once over the whole history, the standard buy and sell signals are then
+    evaluated as boolean columns and only the trade state (trailing buy/sell, trailing stop loss, prevent loss,
+    sell at loss, etc.) is stepped row by row. The signals and checks are the Strategy's and the trades are booked
+    by the same helpers as execute_job(), the outcome is the same as running execute_job() once per candle.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.state = app.state
+
+    @staticmethod
+    def is_supported(app) -> bool:
+        """Returns True if the simulation can be run without the per candle execute_job() loop"""
+
+        if not app.is_sim or app.is_live:
+            return False
+
+        # these change the data or the strategy while the simulation is running
+        if app.smart_switch or app.enable_custom_strategy or app.enable_pandas_ta:
+            return False
+
+        # these need the per candle output
+        if app.save_graphs or app.logbuysellinjson or app.debug:
+            return False
+
+        if app.exchange == Exchange.BINANCE and app.granularity == Granularity.ONE_DAY and len(app.trading_data) < 250:
+            return False
+
+        return True
+
+    def run(self) -> dict:
+        """Runs the simulation and returns the simulation summary"""
+
+        app = self.app
+        state = self.state
+        df = app.trading_data
+
+        if len(df) == 0:
+            return None
+
+        # runs once at the start of a simulation (see execute_job)
+        start = 0
+        if app.simstartdate is not None:
+            try:
+                start = df.index.get_loc(str(app.get_date_from_iso8601_str(app.simstartdate)))
+            except KeyError:
+                RichText.notify("Simulation data is invalid, unable to locate interval using date key.", app, "error")
+                sys.exit(0)
+
+        app.app_started = False
+
+        if len(df.columns) <= 8:
+            TechnicalAnalysis(df, len(df), app=app).add_all()
+
+        # the state based checks do not use the dataframe, one strategy serves every candle
+        strategy = Strategy(app, state, df, start + 1)
+
+        signals = self._signals(strategy, df)
+        close = df["close"].to_numpy()
+        # the close high of the last adjusttotalperiods candles, the dataframe execute_job() gives the strategy
+        window_high = df["close"].rolling(app.adjusttotalperiods, min_periods=1).max().to_numpy()
+        df_high = df["close"].cummax().to_numpy()
+        df_low = df["close"].cummin().to_numpy()
+
+        dates = [f"{index} 00:00:00" if len(index) == 10 else index for index in df.index.format()]
+        goldencross = self._goldencross(dates, start)
+
+        taker_fee = app.get_taker_fee()
+        sell_percent = app.get_sell_percent()
+
+        for i in range(start, len(df)):
+            state.iterations = i + 1
+            current_sim_date = dates[i]
+            app.price = price = float(close[i])
+
+            if price < 0.000001:
+                raise Exception(f"{app.market} is unsuitable for trading, quote self.price is less than 0.000001!")
+
+            # strategy.get_action()
+            if state.last_action != "BUY" and strategy.is_buy_allowed(state, price, window_high[i], bool(signals["goldencross"][i])) and bool(signals["buy"][i]):
+                state.action = "BUY"
+            elif state.last_action not in ["", "SELL"] and bool(signals["sell"][i]):
+                state.action = "SELL"
+            else:
+                state.action = "WAIT"
+
+            immediate_action = False
+            margin, profit, sell_fee, change_pcnt_high = 0, 0, 0, 0
+
+            if state.last_buy_size > 0 and state.last_buy_price > 0 and price > 0 and state.last_action == "BUY":
+                # update last buy high
+                if price > state.last_buy_high:
+                    state.last_buy_high = price
+
+                if state.last_buy_high > 0:
+                    change_pcnt_high = ((price / state.last_buy_high) - 1) * 100
+                else:
+                    change_pcnt_high = 0
+
+                # buy and sell calculations
+                state.last_buy_fee = round(state.last_buy_size * taker_fee, 8)
+                state.last_buy_filled = round(((state.last_buy_size - state.last_buy_fee) / state.last_buy_price), 8)
+
+                margin, profit, sell_fee = calculate_margin(
+                    buy_size=state.last_buy_size,
+                    buy_filled=state.last_buy_filled,
+                    buy_price=state.last_buy_price,
+                    buy_fee=state.last_buy_fee,
+                    sell_percent=sell_percent,
+                    sell_price=price,
+                    sell_taker_fee=taker_fee,
+                    app=app,
+                )
+
+                # the resistance level is only used when selling at resistance
+                price_exit = self._technical_analysis(i).get_trade_exit(price) if app.sellatresistance else price
+
+                # handle immediate sell actions
+                if app.manual_trades_only is False and strategy.is_sell_trigger(state, price, price_exit, margin, change_pcnt_high):
+                    state.action = "SELL"
+                    immediate_action = True
+
+            # handle overriding wait actions
+            if app.manual_trades_only is True or (state.action != "WAIT" and strategy.is_wait_trigger(margin, goldencross[i])):
+                state.action = "WAIT"
+                immediate_action = False
+
+            if state.action == "BUY" and immediate_action is not True:
+                state.action, state.trailing_buy, _, immediate_action = strategy.check_trailing_buy(state, price)
+
+            if state.action == "SELL" and immediate_action is not True:
+                state.action, state.trailing_sell, _, immediate_action = strategy.check_trailing_sell(state, price)
+
+            precision = 4
+            if price < 0.01:
+                precision = 8
+
+            truncate = functools.partial(_truncate, n=precision)
+
+            if state.last_action == "BUY":
+                # save margin for summary if open trade
+                state.open_trade_margin_float = margin
+                state.open_trade_margin = truncate(margin) + "%" if state.last_buy_size > 0 else "0%"
+
+            if state.action == "BUY":
+                self._buy(i, current_sim_date, price, df_high[i], df_low[i])
+            elif state.action == "SELL":
+                self._sell(current_sim_date, df_high[i], df_low[i], precision)
+
+            state.last_df_index = df.index[i : i + 1].format()[0]
+
+        simulation = app.simulation_result = app._simulation_summary()
+        app._simulation_save_orders()
+
+        return simulation
+
+    def _signals(self, strategy: Strategy, df: pd.DataFrame) -> dict:
+        """Strategy.is_buy_signal() and Strategy.is_sell_signal() criteria for every candle"""
+
+        warning = strategy.disabled_signals_warning()
+        if warning != "":
+            RichText.notify(warning, self.app, "warning")
+            buy_signal = sell_signal = pd.Series(False, index=df.index)
+        else:
+            buy_signal = strategy.buy_signals(df)
+            sell_signal = strategy.sell_signals(df)
+
+        return {
+            "buy": buy_signal.to_numpy(),
+            "goldencross": df["goldencross"].astype(bool).to_numpy(),
+            "sell": sell_signal.to_numpy(),
+        }
+
+    def _goldencross(self, dates: list, start: int) -> list:
+        """Simulation golden cross for every candle, see PyCryptoBot.is_1h_sma50200_bull()"""
+
+        app = self.app
+
+        if app.adjusttotalperiods < 200 or len(dates) == 0:
+            return [False] * len(dates)
+
+        # populates the 1h cache the same way the first execute_job() would
+        first = None
+        if not isinstance(app.sma50200_1h_cache, pd.DataFrame):
+            first = app.is_1h_sma50200_bull(dates[start])
+
+        if not isinstance(app.sma50200_1h_cache, pd.DataFrame):
+            return [False] * len(dates)
+
+        try:
+            ta = TechnicalAnalysis(app.sma50200_1h_cache.copy(), app=app)
+
+            if "sma50" not in ta.get_df():
+                ta.add_sma(50)
+
+            if "sma200" not in ta.get_df():
+                ta.add_sma(200)
+
+            df_data = ta.get_df()
+            bull = (df_data["sma50"] > df_data["sma200"]).to_numpy()
+            rows = pd.DatetimeIndex(df_data["date"]).searchsorted(pd.DatetimeIndex(dates), side="right")
+        except Exception:
+            return [False] * len(dates)
+
+        # the sma200 needs 200 candles on or before the simulation date
+        goldencross = [bool(bull[row - 1]) if row >= 200 else False for row in rows]
+
+        if first is not None:
+            goldencross[start] = first
+
+        return goldencross
+
+    def _technical_analysis(self, i: int) -> TechnicalAnalysis:
+        """TechnicalAnalysis of the candles the strategy sees on the simulation date"""
+
+        df = self.app.trading_data
+        return TechnicalAnalysis(df.iloc[max(0, i + 1 - self.app.adjusttotalperiods) : i + 1].copy(), self.app.adjusttotalperiods, app=self.app)
+
+    def _buy(self, i: int, current_sim_date: str, price: float, df_high: float, df_low: float) -> None:
+        state = self.state
+
+        state.last_buy_price = price
+        state.last_buy_high = state.last_buy_price
+
+        self.app._simulation_buy(current_sim_date, self._technical_analysis(i), df_high, df_low, functools.partial(self._notify, current_sim_date))
+
+    def _sell(self, current_sim_date: str, df_high: float, df_low: float, precision: int) -> None:
+        app = self.app
+
+        app._simulation_sell(current_sim_date, df_high, df_low, precision, functools.partial(self._notify, current_sim_date))
+
+        if app.exitaftersell:
+            RichText.notify("Exit after sell! (\"exitaftersell\" is enabled)", app, "warning")
+            sys.exit(0)
+
+    def _notify(self, current_sim_date: str, notification: str = "", level: str = "normal") -> None:
+        app = self.app
+
+        if level == "warning":
+            color = "dark_orange"
+        elif level == "error":
+            color = "red1"
+        elif level == "critical":
+            color = "red1 blink"
+        elif level == "info":
+            color = "yellow blink"
+        else:
+            color = "violet"
+
+        app.log_pipeline.emit(level, notification, app.market, app.print_granularity(), color, current_sim_date)
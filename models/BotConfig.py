@@ -27,11 +27,17 @@ class BotConfig:
     def __init__(self, *args, **kwargs):
         self.cli_args = self._parse_arguments()
 
+        if kwargs.get("market") is not None:
+            # one of the markets of a multi-market process
+            self.cli_args["market"] = kwargs["market"]
+            self.cli_args["markets"] = None
+
         if self.cli_args["init"]:
             ConfigBuilder().init()
             sys.exit()
 
         self.debug = False
+        self.profile_startup = False
 
         self.configbuilder = False
 
@@ -74,6 +80,7 @@ class BotConfig:
 
         self.logbuysellinjson = False
         self.telegramdatafolder = "."
+        self.telegramjsonexport = False
 
         self.buypercent = 100
         self.sellpercent = 100
@@ -103,6 +110,7 @@ class BotConfig:
         self.statdetail = False
         self.nobuynearhighpcnt = 3
         self.simresultonly = False
+        self.simbacktest = False
 
         self.disablebullonly = False
         self.disablebuynearhigh = False
@@ -139,6 +147,8 @@ class BotConfig:
         self.fileloglevel = "DEBUG"
         self.consolelog = True
         self.consoleloglevel = "INFO"
+        self.eventlog = self.cli_args["eventlog"] if self.cli_args["eventlog"] else None
+        self.eventlogformat = "json"
 
         self.ema1226_5m_cache = None
         self.ema1226_15m_cache = None
@@ -149,10 +159,20 @@ class BotConfig:
         self.ticker_date = None
         self.ticker_price = None
         self.df_data = list(range(0, 10))  # [0,1,2,3,4,5,6,7,8,9]
+        # coarser candles derived from the bot granularity, see get_additional_df()
+        self.resamplers = {}
 
         self.sim_smartswitch = False
 
         self.usekucoincache = False
+        self.usecandlestore = False
+        self.indicatorfloat32 = False
+        self.useorderhistorycache = False
+        self.userdatastream = False
+        self.httppoolsize = 10
+        self.httptimeout = 30
+        self.markets = []
+        self.workers = 1
         self.adjusttotalperiods = 300
         self.manual_trades_only = False
 
@@ -241,6 +261,8 @@ class BotConfig:
                 self._chat_client = Telegram(telegram["token"], telegram["client_id"])
                 if "datafolder" in telegram:
                     self.telegramdatafolder = telegram["datafolder"]
+                if "jsonexport" in telegram:
+                    self.telegramjsonexport = bool(telegram["jsonexport"])
                 self.telegram = True
 
             if "scanner" in self.config:
@@ -385,9 +407,12 @@ class BotConfig:
         parser.add_argument("--live", type=int, help="Live order execution")
         parser.add_argument("--graphs", type=int, help="Save graph images of trades")
         parser.add_argument("--debug", type=int, help="Enable debug level logging")
+        parser.add_argument("--profile-startup", action="store_true", help="report the import and initialisation time per module")
 
         parser.add_argument("--exchange", type=str, help="'coinbase', 'coinbasepro', 'binance', 'kucoin', 'dummy'")
         parser.add_argument("--market", type=str, help="coinbase, coinbasepro and kucoin: BTC-GBP, binance: BTCGBP etc.")
+        parser.add_argument("--markets", type=str, help="Run several markets in one process, comma separated e.g. BTC-GBP,ETH-GBP")
+        parser.add_argument("--workers", type=int, help="Number of processes to spread --markets across, integer between 1 and 64")
         parser.add_argument(
             "--granularity",
             type=str,
@@ -397,12 +422,14 @@ class BotConfig:
         parser.add_argument("--config", type=str, help="Use the config file at the given location. e.g 'myconfig.json'")
         parser.add_argument("--api_key_file", type=str, help="Use the API key file at the given location. e.g 'myapi.key'")
         parser.add_argument("--logfile", type=str, help="Use the log file at the given location. e.g 'mymarket.log'")
+        parser.add_argument("--eventlog", type=str, help="Also write the notifications to the file, one per line. e.g 'mymarket.jsonl'")
         parser.add_argument("--tradesfile", type=str, help="Path to file to log trades done during simulation. eg './trades/BTCBUSD-trades.csv")
 
         parser.add_argument("--sim", type=str, help="Simulation modes: fast, fast-sample, slow-sample")
         parser.add_argument("--simstartdate", type=str, help="Start date for sample simulation e.g '2021-01-15'")
         parser.add_argument("--simenddate", type=str, help="End date for sample simulation e.g '2021-01-15' or 'now'")
         parser.add_argument("--simresultonly", action="store_true", help="show simulation result only")
+        parser.add_argument("--simbacktest", action="store_true", help="calculate simulation indicators and signals once")
 
         parser.add_argument("--telegram", type=int, help="Telegram notifications")
         parser.add_argument("--telegrambotcontrol", type=int, help="Control your bot(s) with Telegram")
@@ -425,8 +452,14 @@ class BotConfig:
         parser.add_argument("--predictions", type=int, help="Enable AI / Machine Learning Predictions")
         parser.add_argument("--startmethod", type=str, help="Bot start method ('scanner', 'standard', 'telegram')")
         parser.add_argument("--recvwindow", type=int, help="Binance exchange API recvwindow, integer between 5000 and 60000")
+        parser.add_argument("--httppoolsize", type=int, help="Exchange API keep-alive connections, integer between 1 and 100")
+        parser.add_argument("--httptimeout", type=int, help="Exchange API request timeout in seconds, integer between 1 and 300")
         parser.add_argument("--lastaction", type=str, help="Manually set the last action performed by the bot (BUY, SELL)")
         parser.add_argument("--kucoincache", type=int, help="Enable the Kucoin cache")
+        parser.add_argument("--candlestore", type=int, help="Keep historical candles on disk between runs")
+        parser.add_argument("--indicatorfloat32", type=int, help="Store the indicator columns as float32 to halve their memory")
+        parser.add_argument("--orderhistorycache", type=int, help="Keep completed orders on disk and only request newer orders")
+        parser.add_argument("--userdatastream", type=int, help="Track balances and fills with the exchange user data stream")
         parser.add_argument("--exitaftersell", type=int, help="Exit the bot after a sell order")
 
         parser.add_argument("--adjusttotalperiods", type=int, help="Adjust data points in historical trading data")
@@ -0,0 +1,257 @@
+"""Local market screener, the TradingView screener indicators calculated for all markets at once"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+RATINGS = ["STRONG_SELL", "SELL", "NEUTRAL", "BUY", "STRONG_BUY"]
+RATING_SCORES = np.array([-5, -2.5, 0, 2.5, 5])
+
+MOVING_AVERAGE_PERIODS = [10, 20, 30, 50, 100, 200]
+
+# candles per market, the 200 period moving averages of the rating need a warm up
+MINIMUM_CANDLES = 250
+
+OUTPUT_COLUMNS = [
+    "market",
+    "score",
+    "recommend",
+    "volume",
+    "volatility",
+    "adx",
+    "adx+di",
+    "adx-di",
+    "macd",
+    "macd.signal",
+    "bollinger_upper",
+    "bollinger_lower",
+    "rsi",
+    "stoch_d",
+    "stoch_k",
+    "williamsr",
+    "rating",
+    "buy_next",
+    "atr72_pcnt",
+]
+
+
+class Screener:
+    """Stacks the last candles of every market into 2-D arrays (markets x candles) and scores them together
+
+    The indicators are the ones the TradingView screener returns: Bollinger Bands (20, 2), Keltner Channels
+    (EMA 20, 2 x ATR 10), ADX/DI (14), MACD (12, 26, 9), RSI (14), Stochastic (14, 3, 3), Williams %R (14),
+    ATR (14) and volume. The rating replaces TradingView's "Recommend.All" with the same buy/sell votes on
+    the moving averages (SMA/EMA 10-200) and on the oscillators calculated here.
+    """
+
+    def __init__(self, candles: dict, periods: int = MINIMUM_CANDLES) -> None:
+        # markets without enough candles can not be compared with the others, e.g. markets listed recently
+        self.markets = [market for market, df in candles.items() if df is not None and len(df) >= periods]
+        self.skipped = [market for market, df in candles.items() if df is not None and len(df) < periods]
+
+        def stack(column: str) -> np.ndarray:
+            if len(self.markets) == 0:
+                return np.empty((0, periods))
+            return np.vstack([candles[market][column].to_numpy(dtype="float64")[-periods:] for market in self.markets])
+
+        self.high = stack("high")
+        self.low = stack("low")
+        self.close = stack("close")
+        self.volume = stack("volume")
+
+    def indicators(self) -> pd.DataFrame:
+        """Latest indicator values, one row per market"""
+
+        high, low, close = self.high, self.low, self.close
+
+        true_range = _true_range(high, low, close)
+        atr = _rolling_sum(true_range, 14) / 14
+
+        middle = _rolling_mean(close, 20)
+        deviation = _rolling_window(close, 20).std(axis=2)
+        keltner = _ema(close, 20)
+        keltner_range = 2 * _rolling_sum(true_range, 10) / 10
+
+        adx, plus_di, minus_di = _average_directional_index(high, low, true_range, 14)
+
+        macd = _ema(close, 12) - _ema(close, 26)
+        macd_signal = _ema(macd, 9)
+
+        rsi = _relative_strength_index(close, 14)
+
+        highest = _rolling_window(high, 14).max(axis=2)
+        lowest = _rolling_window(low, 14).min(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stoch_k = _rolling_mean(100 * (close - lowest) / (highest - lowest), 3)
+            williams_r = -100 * (highest - close) / (highest - lowest)
+        stoch_d = _rolling_mean(stoch_k, 3)
+
+        recommend_ma = np.mean(
+            [np.sign(close[:, -1] - ma[:, -1]) for period in MOVING_AVERAGE_PERIODS for ma in [_rolling_mean(close, period), _ema(close, period)]],
+            axis=0,
+        )
+        recommend_other = np.mean(
+            [
+                _vote(rsi < 30, rsi > 70, rsi),
+                _vote((stoch_k < 20) & (stoch_d < 20) & (stoch_k > stoch_d), (stoch_k > 80) & (stoch_d > 80) & (stoch_k < stoch_d)),
+                _vote((adx > 20) & (plus_di > minus_di), (adx > 20) & (plus_di < minus_di)),
+                _vote(macd > macd_signal, macd < macd_signal),
+                _vote(williams_r < -80, williams_r > -20, williams_r),
+            ],
+            axis=0,
+        )
+
+        df = pd.DataFrame(
+            {
+                "recommend": (recommend_ma + recommend_other) / 2,
+                "volume": self.volume[:, -1],
+                "high": high[:, -1],
+                "low": low[:, -1],
+                "close": close[:, -1],
+                "bollinger_upper": middle[:, -1] + 2 * deviation[:, -1],
+                "bollinger_lower": middle[:, -1] - 2 * deviation[:, -1],
+                "keltner_upper": keltner[:, -1] + keltner_range[:, -1],
+                "keltner_lower": keltner[:, -1] - keltner_range[:, -1],
+                "adx": adx[:, -1],
+                "adx+di": plus_di[:, -1],
+                "adx-di": minus_di[:, -1],
+                "macd": macd[:, -1],
+                "macd.signal": macd_signal[:, -1],
+                "rsi": rsi[:, -1],
+                "stoch_k": stoch_k[:, -1],
+                "stoch_d": stoch_d[:, -1],
+                "williamsr": williams_r[:, -1],
+                "atr": atr[:, -1],
+            },
+            index=pd.Index(self.markets, name="market"),
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["volatility"] = (
+                (
+                    np.abs((df["bollinger_upper"] - df["bollinger_lower"]) / df["bollinger_lower"]) * 100
+                    + np.abs((df["keltner_upper"] - df["keltner_lower"]) / df["keltner_lower"]) * 100
+                )
+                / 2
+                + np.abs((df["high"] - df["low"]) / df["low"]) * 100
+            ).abs() / 2
+
+        df["rating"] = np.array(RATINGS)[np.digitize(df["recommend"], [-0.5, -0.1, 0.1, 0.5], right=True)]
+
+        return df
+
+    def score(
+        self,
+        indicators: pd.DataFrame,
+        adx_threshold: float = 25,
+        volume_threshold: float = 20000,
+        volatility_threshold: float = 9,
+        minimum_volatility: float = 5,
+        minimum_volume: float = 20000,
+        minimum_quote_price: float = 0.0000001,
+    ) -> pd.Series:
+        """The screener.py score of every market"""
+
+        df = indicators
+        score = RATING_SCORES[df["rating"].map(RATINGS.index).to_numpy()].copy()
+
+        score += ((df["adx"].abs() >= adx_threshold) & (df["adx+di"] > df["adx-di"]) & (df["adx+di"] > df["adx"].abs())).to_numpy()
+        score += (df["volume"] >= volume_threshold).to_numpy()
+        score += (df["macd"].abs() > df["macd.signal"].abs()).to_numpy()
+        score += (df["volatility"] >= volatility_threshold).to_numpy()
+        score -= 100 * (df["volatility"] < minimum_volatility).to_numpy()
+        score -= 100 * (df["volume"] < minimum_volume).to_numpy()
+        score -= 100 * (df["close"] < minimum_quote_price).to_numpy()
+        score += ((df["rsi"] > 20) & (df["rsi"] <= 30)).to_numpy()
+        score += ((df["stoch_d"] > 20) & (df["stoch_d"] <= 30)).to_numpy()
+        score += (df["stoch_k"] > df["stoch_d"]).to_numpy()
+        score += (df["williamsr"] <= -30).to_numpy()
+
+        return pd.Series(score, index=df.index, name="score")
+
+    def screen(self, ratings: list, selection_score: float, **thresholds) -> pd.DataFrame:
+        """Markets with a rating in ratings and a score of at least selection_score, as the screener output"""
+
+        df = self.indicators()
+        df["score"] = self.score(df, **thresholds)
+
+        # division by zero on flat markets, TradingView does not return these
+        valid = np.isfinite(df.drop(columns=["rating"]).to_numpy(dtype="float64")).all(axis=1)
+        df = df[valid & (df["score"] >= selection_score) & df["rating"].isin(ratings)]
+
+        df = df.reset_index()
+        df["atr72_pcnt"] = (df["atr"] / df["close"] * 100).round(2).clip(lower=0)
+        df["buy_next"] = df["rating"].str.contains("BUY").map({True: "SEND IT!", False: False})
+
+        return df[OUTPUT_COLUMNS]
+
+
+def _rolling_window(values: np.ndarray, window: int) -> np.ndarray:
+    # markets x candles x window, the first window - 1 candles are NaN
+    padded = np.concatenate([np.full((values.shape[0], window - 1), np.nan), values], axis=1)
+    return sliding_window_view(padded, window, axis=1)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    cumsum = np.cumsum(values, axis=1)
+    result = np.full(values.shape, np.nan)
+    result[:, window - 1] = cumsum[:, window - 1]
+    result[:, window:] = cumsum[:, window:] - cumsum[:, :-window]
+    return result
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_window(values, window).mean(axis=2)
+
+
+def _ema(values: np.ndarray, span: int = None, alpha: float = None) -> np.ndarray:
+    # pandas ewm(adjust=False) per row, NaN values at the start are skipped
+    if alpha is None:
+        alpha = 2 / (span + 1)
+
+    result = np.full(values.shape, np.nan)
+    previous = np.full(values.shape[0], np.nan)
+    for column in range(values.shape[1]):
+        value = values[:, column]
+        previous = np.where(np.isnan(previous), value, np.where(np.isnan(value), previous, alpha * value + (1 - alpha) * previous))
+        result[:, column] = previous
+    return result
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def _average_directional_index(high: np.ndarray, low: np.ndarray, true_range: np.ndarray, interval: int) -> tuple:
+    # the rolling sum version TechnicalAnalysis.add_adx uses
+    up = np.diff(high, axis=1, prepend=np.nan)
+    down = -np.diff(low, axis=1, prepend=np.nan)
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    tr = _rolling_sum(true_range, interval)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = _rolling_sum(plus_dm, interval) / tr * 100
+        minus_di = _rolling_sum(minus_dm, interval) / tr * 100
+        dx = np.abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+
+    return _rolling_mean(dx, interval), plus_di, minus_di
+
+
+def _relative_strength_index(close: np.ndarray, period: int) -> np.ndarray:
+    change = np.diff(close, axis=1, prepend=np.nan)
+    gain = _ema(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), alpha=1 / period)
+    loss = _ema(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), alpha=1 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def _vote(buy: np.ndarray, sell: np.ndarray, rising: np.ndarray = None) -> np.ndarray:
+    # +1 buy, -1 sell, 0 neutral on the last candle, oscillators also need to be turning
+    buy = buy[:, -1]
+    sell = sell[:, -1]
+    if rising is not None:
+        buy = buy & (rising[:, -1] > rising[:, -2])
+        sell = sell & (rising[:, -1] < rising[:, -2])
+    return buy.astype(float) - sell.astype(float)
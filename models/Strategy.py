@@ -1,5 +1,5 @@
 from datetime import datetime
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from utils.PyCryptoBot import truncate as _truncate
 from models.AppState import AppState
 from views.PyCryptoBot import RichText
@@ -56,25 +56,22 @@ class Strategy:
         else:
             self._df_last = self.app.get_interval(df)
 
-    def is_buy_signal(self, state, price) -> bool:
+    def is_buy_allowed(self, state, price: float, df_high: float = None, goldencross: bool = None) -> bool:
+        """Buy signal exclusions: near the dataframe close high, insufficient funds and bull only
+
+        The close high and the golden cross default to the dataframe of the strategy. In a simulation that is
+        the last adjusttotalperiods candles up to the simulation date, a backtest passes the same values.
+        """
+
         self.state = state
 
+        if df_high is None:
+            df_high = self._df["close"].max()
+
         # buy signal exclusion (if disabled, do not buy within 3% of the dataframe close high)
-        if (
-            self.state.last_action == "SELL"
-            and self.app.disablebuynearhigh is True
-            and (price > (self._df["close"].max() * (1 - self.app.nobuynearhighpcnt / 100)))
-        ):
+        if self.state.last_action == "SELL" and self.app.disablebuynearhigh is True and (price > (df_high * (1 - self.app.nobuynearhighpcnt / 100))):
             if not self.app.is_sim or (self.app.is_sim and not self.app.simresultonly):
-                log_text = (
-                    "Ignoring Buy Signal (price "
-                    + str(price)
-                    + " within "
-                    + str(self.app.nobuynearhighpcnt)
-                    + "% of high "
-                    + str(self._df["close"].max())
-                    + ")"
-                )
+                log_text = "Ignoring Buy Signal (price " + str(price) + " within " + str(self.app.nobuynearhighpcnt) + "% of high " + str(df_high) + ")"
                 RichText.notify(log_text, self.app, "warning")
 
             return False
@@ -85,18 +82,18 @@ class Strategy:
             return False
 
         # if Bull Only is set and no goldencross, return False
-        if self.app.disablebullonly is False and bool(self._df_last["goldencross"].values[0]) is False:
-            return False
+        if self.app.disablebullonly is False:
+            if goldencross is None:
+                goldencross = bool(self._df_last["goldencross"].values[0])
 
-        # Custom Strategy options
-        if self.CS_ready:
-            if self.CS.buySignal():
-                return True
-            else:
-                # If Custom Strategy active, don't process standard signals, return False
+            if goldencross is False:
                 return False
 
-        # if standard EMA and MACD are disabled, do not run below tests
+        return True
+
+    def disabled_signals_warning(self) -> str:
+        """The warning if the standard buy and sell signals are disabled, otherwise an empty string"""
+
         if (
             self.app.disablebuyema
             and self.app.disablebuymacd
@@ -105,9 +102,61 @@ class Strategy:
             and self.app.disablebuybbands_s1
             and self.app.disablebuybbands_s2
         ):
-            log_text = "No strategy? EMA, MACD, OBV, ER, and BB indicators are all disabled!"
-            RichText.notify(log_text, self.app, "warning")
+            return "No strategy? EMA, MACD, OBV, ER, and BB indicators are all disabled!"
+
+        # required technical indicators or candle sticks for the standard signals
+        if self.app.disablebuyema and self.app.disablebuymacd and self.app.disablebuybbands_s1 and self.app.disablebuybbands_s2:
+            return "No strategy? EMA, MACD, and BB indicators are all disabled!"
 
+        return ""
+
+    def buy_signals(self, df: DataFrame) -> Series:
+        """Standard buy signal 1 or buy signal 2 criteria for every candle of the dataframe"""
+
+        # criteria for a buy signal 1
+        buy_signal_1 = (
+            (df["ema12gtema26co"].astype(bool) | self.app.disablebuyema)
+            & (df["macdgtsignal"].astype(bool) | self.app.disablebuymacd)
+            & ((df["obv_pc"].astype(float) > -5) | self.app.disablebuyobv)  # TODO: why is this hard coded?
+            & (df["eri_buy"].astype(bool) | self.app.disablebuyelderray)
+            & (df["closegtbb20_upperco"].astype(bool) | self.app.disablebuybbands_s1)
+            & (df["closegtbb20_upperco"].astype(bool) | self.app.disablebuybbands_s2)
+        )
+
+        # criteria for buy signal 2 (optionally add additional buy signals)
+        buy_signal_2 = df["closegtbb20_upperco"].astype(bool) | self.app.disablebuybbands_s2
+
+        return buy_signal_1 | buy_signal_2
+
+    def sell_signals(self, df: DataFrame) -> Series:
+        """Standard sell signal criteria for every candle of the dataframe"""
+
+        # criteria for a sell signal 1
+        return (
+            (df["ema12ltema26co"].astype(bool) | self.app.disablebuyema)
+            & (df["macdltsignal"].astype(bool) | self.app.disablebuymacd)
+            & (df["closeltbb20_lowerco"].astype(bool) | self.app.disablebuybbands_s1)
+            & (df["closeltbb20_midco"].astype(bool) | self.app.disablebuybbands_s2)
+        )
+
+    def is_buy_signal(self, state, price) -> bool:
+        self.state = state
+
+        if not self.is_buy_allowed(state, price):
+            return False
+
+        # Custom Strategy options
+        if self.CS_ready:
+            if self.CS.buySignal():
+                return True
+            else:
+                # If Custom Strategy active, don't process standard signals, return False
+                return False
+
+        # if standard EMA and MACD are disabled, do not run below tests
+        warning = self.disabled_signals_warning()
+        if warning != "":
+            RichText.notify(warning, self.app, "warning")
             return False
 
         # required technical indicators or candle sticks for standard sell signal strategy
@@ -119,38 +168,11 @@ class Strategy:
         if self.app.disablebuybbands_s1 is False or self.app.disablebuybbands_s2 is False:
             required_indicators.append("closegtbb20_upperco")
 
-        if len(required_indicators) == 0:
-            RichText.notify("No strategy? EMA, MACD, and BB indicators are all disabled!", self.app, "warning")
-            return False
-
         for indicator in required_indicators:
             if indicator not in self._df_last:
                 raise AttributeError(f"'{indicator}' not in Pandas dataframe")
 
-        # criteria for a buy signal 1
-        if (
-            (bool(self._df_last["ema12gtema26co"].values[0]) is True or self.app.disablebuyema)
-            and (bool(self._df_last["macdgtsignal"].values[0]) is True or self.app.disablebuymacd)
-            and (float(self._df_last["obv_pc"].values[0]) > -5 or self.app.disablebuyobv)  # TODO: why is this hard coded?
-            and (bool(self._df_last["eri_buy"].values[0]) is True or self.app.disablebuyelderray)
-            and (bool(self._df_last["closegtbb20_upperco"].values[0]) is True or self.app.disablebuybbands_s1)
-            and (bool(self._df_last["closegtbb20_upperco"].values[0]) is True or self.app.disablebuybbands_s2)
-            and self.state.last_action != "BUY"
-        ):  # required for all strategies
-            if self.app.debug:
-                RichText.notify("*** Buy Signal ***", self.app, "debug")
-                for indicator in required_indicators:
-                    RichText.notify(f"{indicator}: {self._df_last[indicator].values[0]}", self.app, "debug")
-                RichText.notify(f"last_action: {self.state.last_action}", self.app, "debug")
-
-            return True
-
-        # criteria for buy signal 2 (optionally add additional buy signals)
-        elif (
-            (bool(self._df_last["closegtbb20_upperco"].values[0]) is True or self.app.disablebuybbands_s2)
-            and self.state.last_action != "BUY"
-        ):  # required for all strategies
-
+        if bool(self.buy_signals(self._df_last).values[0]) is True and self.state.last_action != "BUY":  # required for all strategies
             if self.app.debug:
                 RichText.notify("*** Buy Signal ***", self.app, "debug")
                 for indicator in required_indicators:
@@ -170,18 +192,9 @@ class Strategy:
                 # If Custom Strategy active, don't process standard signals, return False
                 return False
 
-        if (
-            self.app.disablebuyema
-            and self.app.disablebuymacd
-            and self.app.disablebuyobv
-            and self.app.disablebuyelderray
-            and self.app.disablebuybbands_s1
-            and self.app.disablebuybbands_s2
-        ):
-            # if custom trade signals is enabled, don't alert, just return False
-            if self.CS_ready is False:
-                RichText.notify("No strategy? EMA, MACD, OBV, ER, and BB indicators are all disabled!", self.app, "warning")
-
+        warning = self.disabled_signals_warning()
+        if warning != "":
+            RichText.notify(warning, self.app, "warning")
             return False
 
         # required technical indicators or candle sticks for standard sell signal strategy
@@ -195,21 +208,11 @@ class Strategy:
         if self.app.disablebuybbands_s2 is False:
             required_indicators.append("closeltbb20_midco")
 
-        if len(required_indicators) == 0:
-            RichText.notify("No strategy? EMA, MACD, and BB indicators are all disabled!", self.app, "warning")
-            return False
-
         for indicator in required_indicators:
             if indicator not in self._df_last:
                 raise AttributeError(f"'{indicator}' not in Pandas dataframe")
 
-        # criteria for a sell signal 1
-        if (
-            (bool(self._df_last["ema12ltema26co"].values[0]) is True or self.app.disablebuyema)
-            and (bool(self._df_last["macdltsignal"].values[0]) is True or self.app.disablebuymacd)
-            and (bool(self._df_last["closeltbb20_lowerco"].values[0]) is True or self.app.disablebuybbands_s1)
-            and (bool(self._df_last["closeltbb20_midco"].values[0]) is True or self.app.disablebuybbands_s2)
-        ):
+        if bool(self.sell_signals(self._df_last).values[0]) is True:
             if self.app.debug:
                 RichText.notify("*** Sell Signal ***", self.app, "debug")
                 for indicator in required_indicators:
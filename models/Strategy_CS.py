@@ -51,7 +51,7 @@ class Strategy_CS:
         # EMA6hBull = self.app.is6hEMA1226Bull(current_sim_date, websocket)
 
         # name and add the dataframe
-        df_1h = self.app.getAdditionalDf("1h", websocket).copy()
+        df_1h = self.app.get_additional_df("1h", websocket).copy()
         # set variable to call technical analysis in Trading_Pta (or myPta)
         ta_1h = self.TA(df_1h)
         # add any individual signals/inicators or add_all()
@@ -63,7 +63,7 @@ class Strategy_CS:
         data_1h = self.app.get_interval(df_1h)
 
         # repeat for any additional, don't recommend more than 1 or 2 additional, adds overhead and API calls
-        df_6h = self.app.getAdditionalDf("6h", websocket).copy()
+        df_6h = self.app.get_additional_df("6h", websocket).copy()
         ta_6h = self.TA(df_6h, self.app.adjusttotalperiods)
         ta_6h.add_ema(5, True)
         ta_6h.add_ema(10, True)
@@ -1,29 +1,39 @@
 """Technical analysis on a trading Pandas DataFrame"""
 
-import warnings
 import pandas_ta as ta
 
 from re import compile
+from bisect import bisect_left
+from math import copysign
+from sys import float_info as sys_float_info
 from numpy import (
     abs,
+    array_equal,
+    concatenate,
+    empty,
+    errstate,
+    float64,
+    flatnonzero,
     floor,
     max,
     maximum,
-    mean,
     minimum,
     nan,
     ndarray,
     round,
-    sum as np_sum,
+    sqrt,
     where,
+    zeros,
 )
 from pandas import concat, DataFrame, Series
 from datetime import datetime, timedelta
-from statsmodels.tsa.statespace.sarimax import SARIMAX, SARIMAXResultsWrapper
-from statsmodels.tools.sm_exceptions import ConvergenceWarning
+from typing import TYPE_CHECKING
+from models.helper.CandleFrameHelper import compact_indicators
+from models.helper.SeasonalArimaHelper import SeasonalArima, to_periods
 from views.PyCryptoBot import RichText
 
-warnings.simplefilter("ignore", ConvergenceWarning)
+if TYPE_CHECKING:
+    from statsmodels.tsa.statespace.sarimax import SARIMAXResultsWrapper
 
 
 class TechnicalAnalysis:
@@ -64,6 +74,9 @@ class TechnicalAnalysis:
         self.levels = []
         self.total_periods = total_periods
 
+        # indicator columns as float32, see compact_indicators()
+        self.float32 = bool(getattr(app, "indicatorfloat32", False))
+
     def get_df(self) -> DataFrame:
         """Returns the Pandas DataFrame"""
 
@@ -108,6 +121,9 @@ class TechnicalAnalysis:
         self.add_adx_buy_signals()
         self.add_bbands_buy_signals()
 
+        if self.float32:
+            compact_indicators(self.df)
+
     """Candlestick References
     https://commodity.com/technical-analysis
     https://www.investopedia.com
@@ -772,30 +788,38 @@ class TechnicalAnalysis:
         # self.df["williamsr" + str(period)] = self.df["williamsr" + str(period)].replace(nan, -50)
         self.df["williamsr" + str(period)] = ta.willr(high=self.df["high"], close=self.df["close"], low=self.df["low"], interval=period, fillna=self.df.close)
 
-    def seasonal_arima_model(self) -> SARIMAXResultsWrapper:
-        """Returns the Seasonal ARIMA Model for price predictions"""
+    def seasonal_arima_model(self, wait: bool = True) -> "SARIMAXResultsWrapper":
+        """Returns the Seasonal ARIMA Model for price predictions
 
-        # hyperparameters for SARIMAX
-        if not self.df.index.freq:
-            freq = str(self.df["granularity"].iloc[-1]).replace("m", "T").replace("h", "H").replace("d", "D")
-            if freq.isdigit():
-                freq += "S"
-            self.df.index = self.df.index.to_period(freq)
-        model = SARIMAX(self.df["close"], trend="n", order=(0, 1, 0), seasonal_order=(1, 1, 1, 12))
-        return model.fit(disp=-1)
+        Parameters
+        ----------
+        wait : bool
+            Wait for the model to be fitted, otherwise None is returned while it is fitted
+        """
+
+        granularity = str(self.df["granularity"].iloc[-1]) if "granularity" in self.df else ""
+        market = str(self.df["market"].iloc[-1]) if "market" in self.df else ""
+        close = to_periods(self.df["close"], granularity)
+
+        if wait:
+            return SeasonalArima.fit(close, market, granularity)
+        return SeasonalArima.fitted(close, market, granularity)
 
     def seasonal_arima_model_fitted_values(self):  # TODO: annotate return type
         """Returns the Seasonal ARIMA Model for price predictions"""
 
-        return self.seasonal_arima_model().fittedvalues
+        # the model is indexed by candle periods
+        return self.seasonal_arima_model().fittedvalues.set_axis(self.df.index)
 
-    def seasonal_arima_model_prediction(self, minutes: int = 180) -> tuple:
+    def seasonal_arima_model_prediction(self, minutes: int = 180, wait: bool = True) -> tuple:
         """Returns seasonal ARIMA model prediction
 
         Parameters
         ----------
         minutes     : int
             Number of minutes to predict
+        wait        : bool
+            Wait for the model to be fitted, otherwise None is returned while it is fitted
         """
 
         if not isinstance(minutes, int):
@@ -804,11 +828,13 @@ class TechnicalAnalysis:
         if minutes < 1 or minutes > 4320:
             raise ValueError("Predication minutes is out of range")
 
-        results_ARIMA = self.seasonal_arima_model()
+        results_ARIMA = self.seasonal_arima_model(wait)
+        if results_ARIMA is None:
+            return None
 
         start_ts = self.df.last_valid_index()
         end_ts = start_ts + timedelta(minutes=minutes)
-        pred = results_ARIMA.predict(start=str(start_ts), end=str(end_ts), dynamic=True)
+        pred = results_ARIMA.predict(start=start_ts, end=end_ts, dynamic=True)
 
         try:
             if len(pred) == 0:
@@ -1288,50 +1314,691 @@ class TechnicalAnalysis:
     def _calculate_support_resistence_levels(self):
         """Support and Resistance levels. (private function)"""
 
-        for i in range(2, self.df.shape[0] - 2):
-            if self._is_support(self.df, i):
-                level = self.df["low"][i]
-                if self._is_far_from_level(level):
-                    self.levels.append((i, level))
-            elif self._is_resistance(self.df, i):
-                level = self.df["high"][i]
-                if self._is_far_from_level(level):
-                    self.levels.append((i, level))
-        return self.levels
-
-    def _is_support(self, df, i) -> bool:
-        """Is support level? (private function)"""
-
         try:
-            c1 = df["low"][i] < df["low"][i - 1]
-            c2 = df["low"][i] < df["low"][i + 1]
-            c3 = df["low"][i + 1] < df["low"][i + 2]
-            c4 = df["low"][i - 1] < df["low"][i - 2]
-            support = c1 and c2 and c3 and c4
-            return support
-        except Exception:
-            support = False
-            return support
+            low = self.df["low"].to_numpy(dtype=float64)
+            high = self.df["high"].to_numpy(dtype=float64)
+        except (KeyError, TypeError, ValueError):
+            return self.levels
+
+        support = self._is_support(low)
+        resistance = self._is_resistance(high) & ~support
+
+        # a level closer than the average candle range to an earlier level is ignored, the nearest
+        # earlier levels either side are found in the sorted levels. As the row by row version compared
+        # the level with both values of each (row, level) tuple, a level close to the row number of an
+        # earlier level is ignored too.
+        distance = (self.df["high"] - self.df["low"]).mean()
+        sorted_levels = sorted([value for entry in self.levels for value in entry])
+
+        for i in flatnonzero(support | resistance):
+            level = low[i] if support[i] else high[i]
+            position = bisect_left(sorted_levels, level)
+            if position > 0 and abs(level - sorted_levels[position - 1]) < distance:
+                continue
+            if position < len(sorted_levels) and abs(level - sorted_levels[position]) < distance:
+                continue
+
+            sorted_levels.insert(position, level)
+            sorted_levels.insert(bisect_left(sorted_levels, int(i)), int(i))
+            self.levels.append((int(i), level))
 
-    def _is_resistance(self, df, i) -> bool:
-        """Is resistance level? (private function)"""
+        return self.levels
 
-        try:
-            c1 = df["high"][i] > df["high"][i - 1]
-            c2 = df["high"][i] > df["high"][i + 1]
-            c3 = df["high"][i + 1] > df["high"][i + 2]
-            c4 = df["high"][i - 1] > df["high"][i - 2]
-            resistance = c1 and c2 and c3 and c4
-            return resistance
-        except Exception:
-            resistance = False
-            return resistance
+    def _is_support(self, low: ndarray) -> ndarray:
+        """Is support level? Lower than the two candles either side, which fall towards it (private function)"""
 
-    def _is_far_from_level(self, level) -> float:
-        """Is far from support level? (private function)"""
+        support = zeros(len(low), dtype=bool)
+        if len(low) > 4:
+            support[2:-2] = (low[2:-2] < low[1:-3]) & (low[2:-2] < low[3:-1]) & (low[3:-1] < low[4:]) & (low[1:-3] < low[:-4])
+        return support
 
-        s = mean(self.df["high"] - self.df["low"])
-        return np_sum([abs(level - x) < s for x in self.levels]) == 0
+    def _is_resistance(self, high: ndarray) -> ndarray:
+        """Is resistance level? Higher than the two candles either side, which rise towards it (private function)"""
+
+        resistance = zeros(len(high), dtype=bool)
+        if len(high) > 4:
+            resistance[2:-2] = (high[2:-2] > high[1:-3]) & (high[2:-2] > high[3:-1]) & (high[3:-1] > high[4:]) & (high[1:-3] > high[:-4])
+        return resistance
 
     def _truncate(self, f, n) -> float:
         return floor(f * 10**n) / 10**n
+
+
+class _RollingKernel:
+    """Running aggregate over a fixed window, updated one row at a time (private class)"""
+
+    __slots__ = ()
+
+    def copy(self):
+        """Returns an independent copy of the running state"""
+
+        other = self.__class__.__new__(self.__class__)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def push(self, values: ndarray, i: int, window: int) -> None:
+        """Moves the window so that it ends on values[i]"""
+
+        if i >= window:
+            self.remove(values[i - window])
+        self.add(values[i])
+
+
+class _RollingMean(_RollingKernel):
+    """Kahan summed rolling/expanding mean, matching pandas bit for bit (private class)"""
+
+    __slots__ = ("nobs", "sum_x", "neg_ct", "comp_add", "comp_remove", "same", "prev")
+
+    def __init__(self) -> None:
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev = nan
+
+    def add(self, val: float) -> None:
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            self.same = self.same + 1 if val == self.prev else 1
+            self.prev = val
+
+    def remove(self, val: float) -> None:
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def mean(self, min_periods: int) -> float:
+        if self.nobs >= min_periods and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same >= self.nobs:
+                result = self.prev
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return nan
+
+
+class _RollingSum(_RollingKernel):
+    """Kahan summed rolling sum, matching pandas bit for bit (private class)"""
+
+    __slots__ = ("nobs", "sum_x", "comp_add", "comp_remove", "same", "prev")
+
+    def __init__(self) -> None:
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev = nan
+
+    def add(self, val: float) -> None:
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            self.same = self.same + 1 if val == self.prev else 1
+            self.prev = val
+
+    def remove(self, val: float) -> None:
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+
+    def sum(self, min_periods: int) -> float:
+        if self.nobs == 0 == min_periods:
+            return 0.0
+        if self.nobs >= min_periods:
+            if self.same >= self.nobs:
+                return self.prev * self.nobs
+            return self.sum_x
+        return nan
+
+
+class _RollingVar(_RollingKernel):
+    """Welford rolling variance, matching pandas bit for bit (private class)"""
+
+    __slots__ = ("nobs", "mean_x", "ssqdm_x", "comp_add", "comp_remove", "same", "prev")
+
+    def __init__(self) -> None:
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev = None
+
+    def add(self, val: float) -> None:
+        if val != val:
+            return
+        if self.prev is None:
+            self.prev = val
+        self.nobs += 1
+        self.same = self.same + 1 if val == self.prev else 1
+        self.prev = val
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        self.mean_x = self.mean_x + t / self.nobs
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def remove(self, val: float) -> None:
+        if val == val:
+            self.nobs -= 1
+            if self.nobs:
+                prev_mean = self.mean_x - self.comp_remove
+                y = val - self.comp_remove
+                t = y - self.mean_x
+                self.comp_remove = t + self.mean_x - y
+                self.mean_x = self.mean_x - t / self.nobs
+                self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+            else:
+                self.mean_x = 0.0
+                self.ssqdm_x = 0.0
+
+    def var(self, min_periods: int, ddof: int = 1) -> float:
+        if self.nobs >= min_periods and self.nobs > ddof:
+            if self.nobs == 1 or self.same >= self.nobs:
+                return 0.0
+            return self.ssqdm_x / (self.nobs - ddof)
+        return nan
+
+
+class _ExponentialMean:
+    """Exponentially weighted mean, matching pandas ewm().mean() bit for bit (private class)"""
+
+    __slots__ = ("alpha", "adjust", "min_periods", "weighted", "old_wt", "nobs", "started")
+
+    def __init__(self, com: float, adjust: bool = True, min_periods: int = 0) -> None:
+        self.alpha = 1.0 / (1.0 + com)
+        self.adjust = adjust
+        self.min_periods = min_periods if min_periods > 1 else 1
+        self.weighted = nan
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def copy(self):
+        """Returns an independent copy of the running state"""
+
+        other = _ExponentialMean.__new__(_ExponentialMean)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def push(self, cur: float) -> float:
+        """Adds the next observation and returns the mean at that row"""
+
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            weighted = self.weighted
+            if weighted == weighted:
+                if is_observation:
+                    self.old_wt *= 1.0 - self.alpha
+                    new_wt = 1.0 if self.adjust else self.alpha
+                    if weighted != cur:
+                        self.weighted = (self.old_wt * weighted + new_wt * cur) / (self.old_wt + new_wt)
+                    self.old_wt = self.old_wt + new_wt if self.adjust else 1.0
+            elif is_observation:
+                self.weighted = cur
+
+        return self.weighted if self.nobs >= self.min_periods else nan
+
+
+def _divide(dividend: float, divisor: float) -> float:
+    """IEEE division as done by pandas, inf/nan instead of ZeroDivisionError (private function)"""
+
+    return float64(dividend) / float64(divisor)
+
+
+def _zsqrt(value: float) -> float:
+    """Square root as used by pandas rolling().std() (private function)"""
+
+    return 0.0 if value < 0 else sqrt(value)
+
+
+class IncrementalTechnicalAnalysis:
+    _FBB_RATIOS = [("0_236", 0.236), ("0_382", 0.382), ("0_5", 0.5), ("0_618", 0.618), ("0_786", 0.786), ("1", 1)]
+
+    def __init__(self, app: object = None) -> None:
+        """Incremental TechnicalAnalysis.add_all()
+
+        Keeps the rolling state of every indicator add_all() produces so that when only the
+        last candle is mutated (live ticker) or new candles are appended, only those rows are
+        recalculated. Results are identical to a full add_all() on the same data.
+
+        Any other change (different window, removed rows, different total_periods layout) or a
+        pandas_ta build that does not reproduce the kernels exactly falls back to add_all().
+
+        Parameters
+        ----------
+        app : object
+            PyCryptoBot app, used for notifications and its indicatorfloat32 option
+        """
+
+        self.app = app
+        self.total_periods = None
+        self.incremental = False
+        self.supported = True
+
+        # indicator columns of data as float32, the rolling state stays float64
+        self.float32 = bool(getattr(app, "indicatorfloat32", False))
+
+        self._columns = []
+        self._inputs = {}
+        self._out = {}
+        self._kernels = {}
+        self._saved = {}
+        self._sma_periods = []
+        self._crosses = []
+        self._stoch_epsilon = False
+
+    def update(self, data: DataFrame, total_periods: int = None) -> DataFrame:
+        """Adds the TechnicalAnalysis.add_all() columns to data (in place) and returns it"""
+
+        if not isinstance(data, DataFrame):
+            raise TypeError("Data is not a Pandas dataframe.")
+
+        if total_periods is None:
+            total_periods = len(data)
+
+        with errstate(all="ignore"):
+            start, inputs = self._changed_from(data, total_periods)
+            if start is None:
+                self._seed(data, total_periods)
+                return compact_indicators(data) if self.float32 else data
+
+            length = len(data)
+            self._inputs = inputs
+            self._resize(length)
+
+            self._kernels = {name: kernel.copy() for name, kernel in self._saved.items()}
+            for i in range(start, length):
+                if i == length - 1:
+                    self._saved = {name: kernel.copy() for name, kernel in self._kernels.items()}
+                self._step(i)
+
+            if self._stoch_epsilon != bool((self._out["_rsi_range"] == 0).any()):
+                # non_zero_range() in pandas_ta shifts every row, start again
+                self._seed(data, total_periods)
+                return compact_indicators(data) if self.float32 else data
+
+            self._finalise()
+
+        self.total_periods = total_periods
+        for column in self._columns:
+            values = self._out[column]
+            data[column] = values.astype("float32") if self.float32 and values.dtype == "float64" else values.copy()
+
+        return data
+
+    def _changed_from(self, data: DataFrame, total_periods: int) -> tuple:
+        """Returns the first row that needs recalculating, None if a full seed is required (private function)"""
+
+        if not self.incremental or self._layout(total_periods) != self._layout(self.total_periods) or total_periods < 26:
+            return None, None
+
+        previous = self._inputs
+        previous_length = len(previous["close"])
+        if len(data) < previous_length:
+            return None, None
+
+        inputs = {}
+        for name in ["high", "low", "close", "volume"]:
+            if name not in data:
+                return None, None
+            values = data[name].to_numpy(dtype="float64", copy=True)
+            if not array_equal(values[: previous_length - 1], previous[name][: previous_length - 1]):
+                return None, None
+            inputs[name] = values
+
+        return previous_length - 1, inputs
+
+    @staticmethod
+    def _layout(total_periods: int) -> tuple:
+        """Which optional indicators add_all() includes (private function)"""
+
+        if total_periods is None:
+            return None
+        return total_periods >= 50, total_periods >= 200
+
+    def _seed(self, data: DataFrame, total_periods: int) -> None:
+        """Runs add_all() and rebuilds the rolling state from it (private function)"""
+
+        self.incremental = False
+        self.total_periods = total_periods
+        base_columns = set(data.columns)
+
+        technical_analysis = TechnicalAnalysis(data, total_periods, app=self.app)
+        # the rolling state is float64, the seed is compared with it
+        technical_analysis.float32 = False
+        technical_analysis.add_all()
+
+        if total_periods < 26 or not self.supported:
+            return
+
+        self._sma_periods = [5, 8, 13, 20]
+        self._crosses = [("ema8", "ema12"), ("ema12", "ema26")]
+        if total_periods >= 50:
+            self._sma_periods.append(50)
+        if total_periods >= 200:
+            self._sma_periods.append(200)
+            self._crosses += [("sma5", "sma8"), ("sma8", "sma13"), ("sma50", "sma200")]
+        self._crosses.append(("macd", "signal"))
+
+        self._inputs = {name: data[name].to_numpy(dtype="float64", copy=True) for name in ["high", "low", "close", "volume"]}
+        self._out = {}
+        self._stoch_epsilon = False
+        self._replay(len(data))
+        if bool((self._out["_rsi_range"] == 0).any()):
+            self._stoch_epsilon = True
+            self._replay(len(data))
+
+        self._columns = [column for column in data.columns if column in self._out]
+        expected = {column for column in self._out if not column.startswith("_")}
+        added = set(data.columns) - base_columns
+        if expected != set(self._columns) or not added.issubset(expected):
+            self.supported = False
+            return
+
+        for column in self._columns:
+            values = data[column].to_numpy()
+            if values.dtype.kind == "f":
+                matches = values.dtype == self._out[column].dtype and array_equal(values, self._out[column], equal_nan=True)
+            else:
+                matches = values.dtype == self._out[column].dtype and array_equal(values, self._out[column])
+            if not matches:
+                # e.g. pandas_ta using TA-Lib, stay on add_all() from now on
+                self.supported = False
+                if self.app is not None:
+                    RichText.notify(f"Incremental analysis disabled, '{column}' differs from add_all()", self.app, "debug")
+                return
+
+        self.incremental = True
+
+    def _replay(self, length: int) -> None:
+        """Calculates every row from scratch (private function)"""
+
+        self._kernels = {
+            "cma": _RollingMean(),
+            "close_var": _RollingVar(),
+            "tp_mean": _RollingMean(),
+            "tp_var": _RollingVar(),
+            "rsi_positive": _ExponentialMean(com=13.0, min_periods=14),
+            "rsi_negative": _ExponentialMean(com=13.0, min_periods=14),
+            "stochrsi_k": _RollingMean(),
+            "stochrsi_d": _RollingMean(),
+            "signal": _ExponentialMean(com=4.0, adjust=False),
+            "tr_sum": _RollingSum(),
+            "+dm_sum": _RollingSum(),
+            "-dm_sum": _RollingSum(),
+            "dx_mean": _RollingMean(),
+        }
+        for period in self._sma_periods:
+            self._kernels[f"sma{period}"] = _RollingMean()
+        for period in [8, 12, 13, 26]:
+            self._kernels[f"ema{period}"] = _ExponentialMean(com=(period - 1) / 2.0, adjust=False)
+
+        self._out = {}
+        self._resize(length)
+        for i in range(length):
+            if i == length - 1:
+                self._saved = {name: kernel.copy() for name, kernel in self._kernels.items()}
+            self._step(i)
+        self._finalise()
+
+    def _resize(self, length: int) -> None:
+        """Allocates (or extends) the per row output arrays (private function)"""
+
+        float_columns = (
+            ["close_pc", "close_cpc", "cma"]
+            + [f"sma{period}" for period in self._sma_periods]
+            + ["ema8", "ema12", "ema26", "bb20_upper", "bb20_mid", "bb20_lower", "fbb_mid"]
+            + [f"fbb_upper{name}" for name, _ in self._FBB_RATIOS]
+            + [f"fbb_lower{name}" for name, _ in self._FBB_RATIOS]
+            + ["rolling_mean", "rolling_std", "support", "resistance", "rsi14", "stochrsi14k", "stochrsi14d"]
+            + ["williamsr14", "macd", "signal", "obv", "obv_pc", "elder_ray_bull", "elder_ray_bear", "-di14", "+di14", "adx14"]
+            + ["_cprod", "_ema8", "_ema12", "_ema13", "_ema26", "_macd", "_tp", "_rsi", "_rsi_range", "_stoch", "_stochrsi_k"]
+            + ["_tr", "_+dm", "_-dm", "_-di", "_+di", "_dx", "_adx"]
+        )
+        bool_columns = ["goldencross", "deathcross", "eri_buy", "eri_sell"]
+        for first, second in self._crosses:
+            for name in [f"{first}gt{second}", f"{first}lt{second}"]:
+                bool_columns += [name, name + "co"]
+        for name in ["closegtbb20_upper", "closeltbb20_mid", "closeltbb20_lower", "closegtbb20_mid"]:
+            bool_columns += [name, name + "co"]
+
+        for columns, dtype in [(float_columns, "float64"), (bool_columns, "bool")]:
+            for column in columns:
+                values = self._out.get(column)
+                if values is None:
+                    self._out[column] = empty(length, dtype=dtype)
+                elif len(values) < length:
+                    self._out[column] = concatenate([values, empty(length - len(values), dtype=dtype)])
+
+    def _cross(self, name: str, value: bool, i: int) -> None:
+        """Row of a gt/lt signal and its crossover column (private function)"""
+
+        out = self._out
+        out[name][i] = value
+        out[name + "co"][i] = value and (i == 0 or value != out[name][i - 1])
+
+    def _step(self, i: int) -> None:
+        """Calculates row i from the state left by row i - 1 (private function)"""
+
+        high, low, close, volume = self._inputs["high"], self._inputs["low"], self._inputs["close"], self._inputs["volume"]
+        out, kernels = self._out, self._kernels
+        price = close[i]
+        previous = close[i - 1] if i > 0 else nan
+
+        # change percentage and cumulative returns
+        close_pc = _divide(price, previous) - 1
+        if close_pc != close_pc:
+            close_pc = 0.0
+        out["close_pc"][i] = close_pc
+        out["_cprod"][i] = out["_cprod"][i - 1] * (1 + close_pc) if i > 0 else 1 + close_pc
+        out["close_cpc"][i] = out["_cprod"][i] - 1
+
+        kernels["cma"].add(price)
+        out["cma"][i] = kernels["cma"].mean(1)
+
+        for period in self._sma_periods:
+            kernels[f"sma{period}"].push(close, i, period)
+            sma = kernels[f"sma{period}"].mean(period)
+            out[f"sma{period}"][i] = price if sma != sma else sma
+        sma20 = kernels["sma20"].mean(20)
+
+        # pandas_ta seeds its ema with the sma of the first period
+        for period in [8, 12, 13, 26]:
+            if i < period - 1:
+                value = nan
+            elif i == period - 1:
+                value = Series(close[:period]).mean()
+            else:
+                value = price
+            ema = kernels[f"ema{period}"].push(value)
+            out[f"_ema{period}"][i] = ema
+            if period != 13:
+                out[f"ema{period}"][i] = price if ema != ema else ema
+
+        if len(self._sma_periods) == 6:
+            out["goldencross"][i] = out["sma50"][i] > out["sma200"][i]
+            out["deathcross"][i] = out["sma50"][i] < out["sma200"][i]
+        else:
+            out["goldencross"][i] = False
+            out["deathcross"][i] = False
+
+        # bollinger bands (ddof=0) and support/resistance (ddof=1) share the close variance
+        kernels["close_var"].push(close, i, 20)
+        mid = out["sma20"][i]
+        deviation = 2.0 * sqrt(kernels["close_var"].var(20, 0))
+        upper = mid + deviation
+        lower = mid - deviation
+        out["bb20_upper"][i] = price if upper != upper else upper
+        out["bb20_mid"][i] = mid
+        out["bb20_lower"][i] = price if lower != lower else lower
+
+        rolling_std = _zsqrt(kernels["close_var"].var(20, 1))
+        out["rolling_mean"][i] = sma20
+        out["rolling_std"][i] = rolling_std
+        out["support"][i] = sma20 - 2 * rolling_std
+        out["resistance"][i] = sma20 + 2 * rolling_std
+
+        out["_tp"][i] = (high[i] + low[i] + price) / 3
+        kernels["tp_mean"].push(out["_tp"], i, 20)
+        kernels["tp_var"].push(out["_tp"], i, 20)
+        fbb_mid = kernels["tp_mean"].mean(20)
+        fbb_sd = 3 * _zsqrt(kernels["tp_var"].var(20, 1))
+        fbb_mid = 0.0 if fbb_mid != fbb_mid else fbb_mid
+        fbb_sd = 0.0 if fbb_sd != fbb_sd else fbb_sd
+        out["fbb_mid"][i] = fbb_mid
+        for name, ratio in self._FBB_RATIOS:
+            out[f"fbb_upper{name}"][i] = fbb_mid + (ratio * fbb_sd)
+            out[f"fbb_lower{name}"][i] = fbb_mid - (ratio * fbb_sd)
+
+        # rsi
+        change = price - previous
+        average_gain = kernels["rsi_positive"].push(0.0 if change < 0 else change)
+        average_loss = kernels["rsi_negative"].push(0.0 if change > 0 else change)
+        rsi = _divide(100.0 * average_gain, average_gain + abs(average_loss))
+        out["_rsi"][i] = rsi
+        out["rsi14"][i] = 50.0 if rsi != rsi else rsi
+
+        # stochastic rsi
+        if i >= 13:
+            window = out["_rsi"][i - 13 : i + 1]
+            lowest, highest = window.min(), window.max()
+        else:
+            lowest = highest = nan
+        out["_rsi_range"][i] = highest - lowest
+        rsi_range = highest - lowest + sys_float_info.epsilon if self._stoch_epsilon else highest - lowest
+        out["_stoch"][i] = _divide(100 * (rsi - lowest), rsi_range)
+        kernels["stochrsi_k"].push(out["_stoch"], i, 3)
+        out["_stochrsi_k"][i] = kernels["stochrsi_k"].mean(3)
+        kernels["stochrsi_d"].push(out["_stochrsi_k"], i, 3)
+        stochrsi_k = out["_stochrsi_k"][i]
+        stochrsi_d = kernels["stochrsi_d"].mean(3)
+        out["stochrsi14k"][i] = 50.0 if stochrsi_k != stochrsi_k else stochrsi_k
+        out["stochrsi14d"][i] = 50.0 if stochrsi_d != stochrsi_d else stochrsi_d
+
+        # williams %r
+        if i >= 13:
+            lowest, highest = low[i - 13 : i + 1].min(), high[i - 13 : i + 1].max()
+        else:
+            lowest = highest = nan
+        williamsr = 100 * (_divide(price - lowest, highest - lowest) - 1)
+        out["williamsr14"][i] = price if williamsr != williamsr else williamsr
+
+        # macd (pandas_ta swaps fast=26, slow=12 around)
+        macd = out["_ema12"][i] - out["_ema26"][i]
+        out["_macd"][i] = macd
+        if i < 33:
+            value = nan
+        elif i == 33:
+            value = Series(out["_macd"][25:34]).mean()
+        else:
+            value = macd
+        signal = kernels["signal"].push(value)
+        out["macd"][i] = 0.0 if macd != macd else macd
+        out["signal"][i] = 0.0 if signal != signal else signal
+
+        # on balance volume
+        if price == previous:
+            obv = 0.0
+        elif price > previous:
+            obv = volume[i]
+        elif price < previous:
+            obv = -volume[i]
+        else:
+            obv = volume[0]
+        if i > 0:
+            obv = out["obv"][i - 1] + obv
+            obv_pc = (_divide(obv, out["obv"][i - 1]) - 1) * 100
+        else:
+            obv_pc = nan
+        out["obv"][i] = obv
+        out["obv_pc"][i] = round(0.0 if obv_pc != obv_pc else obv_pc, 2)
+
+        # elder ray index
+        bull = high[i] - out["_ema13"][i]
+        bear = low[i] - out["_ema13"][i]
+        bull = 0.0 if bull != bull else bull
+        bear = 0.0 if bear != bear else bear
+        previous_bull = out["elder_ray_bull"][i - 1] if i > 0 else nan
+        previous_bear = out["elder_ray_bear"][i - 1] if i > 0 else nan
+        out["elder_ray_bull"][i] = bull
+        out["elder_ray_bear"][i] = bear
+        out["eri_buy"][i] = (bear < 0 and bear > previous_bear) or bull > previous_bull
+        out["eri_sell"][i] = (bull > 0 and bull < previous_bull) or bear < previous_bear
+
+        for first, second in self._crosses:
+            self._cross(f"{first}gt{second}", out[first][i] > out[second][i], i)
+            self._cross(f"{first}lt{second}", out[first][i] < out[second][i], i)
+
+        # average directional index, column means are filled in by _finalise()
+        minus_dm = low[i - 1] - low[i] if i > 0 else nan
+        plus_dm = high[i] - high[i - 1] if i > 0 else nan
+        plus_dm = plus_dm if plus_dm > minus_dm and plus_dm > 0 else 0.0
+        minus_dm = minus_dm if minus_dm > plus_dm and minus_dm > 0 else 0.0
+        true_ranges = [high[i] - low[i], abs(high[i] - previous), abs(low[i] - previous)]
+        true_ranges = [value for value in true_ranges if value == value]
+        true_range = nan
+        for value in true_ranges:
+            if true_range != true_range or value > true_range:
+                true_range = value
+        out["_+dm"][i] = plus_dm
+        out["_-dm"][i] = minus_dm
+        out["_tr"][i] = true_range
+        for name, values in [("tr_sum", out["_tr"]), ("+dm_sum", out["_+dm"]), ("-dm_sum", out["_-dm"])]:
+            kernels[name].push(values, i, 14)
+        tr14 = kernels["tr_sum"].sum(14)
+        plus_di = _divide(kernels["+dm_sum"].sum(14), tr14) * 100
+        minus_di = _divide(kernels["-dm_sum"].sum(14), tr14) * 100
+        out["_+di"][i] = plus_di
+        out["_-di"][i] = minus_di
+        out["_dx"][i] = _divide(abs(plus_di - minus_di), plus_di + minus_di) * 100
+        kernels["dx_mean"].push(out["_dx"], i, 14)
+        out["_adx"][i] = kernels["dx_mean"].mean(14)
+
+        self._cross("closegtbb20_upper", price > out["bb20_upper"][i], i)
+        self._cross("closeltbb20_mid", price < out["bb20_mid"][i], i)
+        self._cross("closeltbb20_lower", price < out["bb20_lower"][i], i)
+        self._cross("closegtbb20_mid", price > out["bb20_mid"][i], i)
+
+    def _finalise(self) -> None:
+        """Columns that depend on every row, ADX is filled with its column mean (private function)"""
+
+        out = self._out
+        for column, raw in [("-di14", "_-di"), ("+di14", "_+di"), ("adx14", "_adx")]:
+            series = Series(out[raw])
+            out[column] = series.fillna(series.mean()).to_numpy()
+
+        out["adx14_trend"] = where(out["+di14"] > out["-di14"], "bull", "bear").astype(object)
+        out["adx14_strength"] = where(out["adx14"] > 25, "strong", where(out["adx14"] < 20, "weak", "normal")).astype(object)
@@ -9,10 +9,13 @@ import pandas as pd
 
 from utils.PyCryptoBot import truncate
 from models.exchange.ExchangesEnum import Exchange
-from models.exchange.binance import AuthAPI as BAuthAPI
-from models.exchange.coinbase import AuthAPI as CAuthAPI
-from models.exchange.coinbase_pro import AuthAPI as CBAuthAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI
+from models.helper.StartupProfileHelper import LazyImport
+from models.helper.OrderHistoryHelper import OrderHistory
+
+BAuthAPI = LazyImport("models.exchange.binance", "AuthAPI")
+CAuthAPI = LazyImport("models.exchange.coinbase", "AuthAPI")
+CBAuthAPI = LazyImport("models.exchange.coinbase_pro", "AuthAPI")
+KAuthAPI = LazyImport("models.exchange.kucoin", "AuthAPI")
 
 
 class TradingAccount:
@@ -81,6 +84,41 @@ class TradingAccount:
             if not p.match(market):
                 raise TypeError("Kucoin market is invalid.")
 
+    def _get_accounts(self, model) -> pd.DataFrame:
+        """Balances pushed by the user data stream, the REST API when they are out of date"""
+
+        state = self.app.user_data_stream.state if self.app.user_data_stream is not None else None
+
+        df = state.get_balances() if state is not None else None
+        if df is None:
+            df = model.get_accounts()
+            if state is not None:
+                state.set_balances(df)
+        return df
+
+    def _get_live_orders(self, model, market: str, action: str, status: str) -> pd.DataFrame:
+        """Completed orders of a market come from the user data stream or the order history cache"""
+
+        state = self.app.user_data_stream.state if self.app.user_data_stream is not None else None
+
+        if (not self.app.useorderhistorycache and state is None) or market == "" or status != "done":
+            return model.get_orders(market, action, status)
+
+        orders = state.get_orders(market) if state is not None else None
+        if orders is None:
+            if self.app.useorderhistorycache:
+                # only newer orders are requested
+                orders = OrderHistory(self.app.exchange.value, market).get_orders(lambda start: model.get_orders(market, "", "done", iso8601start=start))
+            else:
+                orders = model.get_orders(market, "", "done")
+
+            if state is not None:
+                state.set_orders(market, orders)
+
+        if action != "" and isinstance(orders, pd.DataFrame) and len(orders) > 0:
+            orders = orders[orders["action"] == action]
+        return orders
+
     def get_orders(self, market="", action="", status="all"):
         """Retrieves orders either live or simulation
 
@@ -117,7 +155,7 @@ class TradingAccount:
                     app=self.app
                 )
                 # retrieve orders from live Binance account portfolio
-                self.orders = model.get_orders(market, action, status)
+                self.orders = self._get_live_orders(model, market, action, status)
                 return self.orders
             else:
                 # return dummy orders
@@ -138,7 +176,7 @@ class TradingAccount:
                     app=self.app
                 )
                 # retrieve orders from live Kucoin account portfolio
-                self.orders = model.get_orders(market, action, status)
+                self.orders = self._get_live_orders(model, market, action, status)
                 return self.orders
             else:
                 if market == "":
@@ -156,7 +194,7 @@ class TradingAccount:
                     app=self.app
                 )
                 # retrieve orders from live Coinbase Pro account portfolio
-                self.orders = model.get_orders(market, action, status)
+                self.orders = self._get_live_orders(model, market, action, status)
                 return self.orders
             else:
                 # return dummy orders
@@ -179,7 +217,7 @@ class TradingAccount:
                     app=self.app
                 )
                 # retrieve orders from live Coinbase Pro account portfolio
-                self.orders = model.get_orders(market, action, status)
+                self.orders = self._get_live_orders(model, market, action, status)
                 return self.orders
             else:
                 # return dummy orders
@@ -201,7 +239,7 @@ class TradingAccount:
                     app=self.app
                 )
                 # retrieve orders from live Coinbase Pro account portfolio
-                self.orders = model.get_orders(market, action, status)
+                self.orders = self._get_live_orders(model, market, action, status)
                 return self.orders
             else:
                 # return dummy orders
@@ -249,7 +287,7 @@ class TradingAccount:
                 )
                 trycnt, maxretry = (0, 5)
                 while trycnt <= maxretry:
-                    df = model.get_accounts()
+                    df = self._get_accounts(model)
 
                     if isinstance(df, pd.DataFrame) and len(df) > 0:
                         if currency == "":
@@ -349,7 +387,7 @@ class TradingAccount:
                     recv_window=self.app.recv_window,
                     app=self.app
                 )
-                df = model.get_account()
+                df = self._get_accounts(model)
                 if isinstance(df, pd.DataFrame):
                     if currency == "":
                         # retrieve all balances
@@ -453,7 +491,7 @@ class TradingAccount:
                 )
                 trycnt, maxretry = (0, 5)
                 while trycnt <= maxretry:
-                    df = model.get_accounts()
+                    df = self._get_accounts(model)
 
                     if len(df) > 0:
                         # retrieve all balances, but check the resp
@@ -515,7 +553,7 @@ class TradingAccount:
                 )
                 trycnt, maxretry = (0, 5)
                 while trycnt <= maxretry:
-                    df = model.get_accounts()
+                    df = self._get_accounts(model)
 
                     if len(df) > 0:
                         # retrieve all balances, but check the resp
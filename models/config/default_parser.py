@@ -196,6 +196,12 @@ def default_config_parse(app, config):
                 # default for coinbase pro and binance
                 app.market = "BTC-GBP"
 
+    if "markets" in config and config["markets"] is not None:
+        markets = config["markets"].split(",") if isinstance(config["markets"], str) else config["markets"]
+        if not isinstance(markets, list):
+            raise TypeError("markets must be a list or a comma separated string")
+        app.markets = [market.strip() for market in markets if market.strip() != ""]
+
     if "granularity" in config and config["granularity"] is not None:
         app.smart_switch = 0
         if isinstance(config["granularity"], str) and not config["granularity"].isnumeric() is True:
@@ -211,6 +217,7 @@ def default_config_parse(app, config):
         term_width = 180
 
     config_option_bool(option_name="debug", option_default=False, store_name="debug", store_invert=False)
+    config_option_bool(option_name="profile_startup", option_default=False, store_name="profile_startup", store_invert=False)
 
     config_option_bool(option_name="termcolor", option_default=True, store_name="term_color", store_invert=False)
     config_option_int(option_name="termwidth", option_default=term_width, store_name="term_width", value_min=60, value_max=420)
@@ -225,6 +232,7 @@ def default_config_parse(app, config):
     config_option_date(option_name="simstartdate", option_default=None, store_name="simstartdate", date_format="%Y-%m-%d", allow_now=False)
     config_option_date(option_name="simenddate", option_default=None, store_name="simenddate", date_format="%Y-%m-%d", allow_now=True)
     config_option_bool(option_name="simresultonly", option_default=False, store_name="simresultonly", store_invert=False)
+    config_option_bool(option_name="simbacktest", option_default=False, store_name="simbacktest", store_invert=False)
 
     config_option_bool(option_name="telegram", option_default=False, store_name="disabletelegram", store_invert=True)
     config_option_bool(option_name="telegrambotcontrol", option_default=False, store_name="telegrambotcontrol", store_invert=False)
@@ -247,8 +255,15 @@ def default_config_parse(app, config):
     config_option_bool(option_name="predictions", option_default=False, store_name="enableml", store_invert=False)
     config_option_str(option_name="startmethod", option_default="standard", store_name="startmethod", valid_options=["scanner", "standard", "telegram"])
     config_option_int(option_name="recvwindow", option_default=5000, store_name="recv_window", value_min=5000, value_max=60000)
+    config_option_int(option_name="httppoolsize", option_default=10, store_name="httppoolsize", value_min=1, value_max=100)
+    config_option_int(option_name="httptimeout", option_default=30, store_name="httptimeout", value_min=1, value_max=300)
+    config_option_int(option_name="workers", option_default=1, store_name="workers", value_min=1, value_max=64)
     config_option_str(option_name="lastaction", option_default=None, store_name="last_action", valid_options=["BUY", "SELL"])
     config_option_bool(option_name="kucoincache", option_default=False, store_name="usekucoincache", store_invert=False)
+    config_option_bool(option_name="candlestore", option_default=False, store_name="usecandlestore", store_invert=False)
+    config_option_bool(option_name="indicatorfloat32", option_default=False, store_name="indicatorfloat32", store_invert=False)
+    config_option_bool(option_name="orderhistorycache", option_default=False, store_name="useorderhistorycache", store_invert=False)
+    config_option_bool(option_name="userdatastream", option_default=False, store_name="userdatastream", store_invert=False)
     config_option_bool(option_name="exitaftersell", option_default=False, store_name="exitaftersell", store_invert=False)
 
     config_option_int(option_name="adjusttotalperiods", option_default=300, store_name="adjusttotalperiods", value_min=200, value_max=500)
@@ -51,3 +51,19 @@ def parser(app, logger_config):
                     raise TypeError('consoleloglevel must be one of: "CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"')
             else:
                 raise TypeError("consoleloglevel must be type of str")
+
+    if "eventlog" in logger_config:
+        if isinstance(logger_config["eventlog"], str):
+            if app.eventlog is None:
+                app.eventlog = logger_config["eventlog"]
+        else:
+            raise TypeError("eventlog must be type of str")
+
+    if "eventlogformat" in logger_config:
+        if isinstance(logger_config["eventlogformat"], str):
+            if logger_config["eventlogformat"] in ("json", "plain"):
+                app.eventlogformat = logger_config["eventlogformat"]
+            else:
+                raise TypeError('eventlogformat must be one of: "json", "plain"')
+        else:
+            raise TypeError("eventlogformat must be type of str")
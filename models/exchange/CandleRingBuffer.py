@@ -0,0 +1,93 @@
+"""Fixed size candle buffer for the exchange websocket clients"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ["low", "high", "open", "close", "volume"]
+
+
+class CandleRingBuffer:
+    """The last ``capacity`` candles of one market, updated in place
+
+    Every slot is written twice (``i`` and ``i + capacity``) so the candles are always one contiguous,
+    date ordered slice of the array and the DataFrame returned by ``to_df`` can use it without a copy.
+    """
+
+    def __init__(self, market: str, granularity: str, capacity: int = 300) -> None:
+        self.market = market
+        self.granularity = granularity
+        self.capacity = capacity
+
+        self._ts = np.zeros(capacity * 2, dtype="datetime64[ns]")
+        self._ohlcv = np.zeros((capacity * 2, len(CANDLE_COLUMNS)), dtype="float64")
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ts(self):
+        """Open time of the newest candle, None if the buffer is empty"""
+
+        if self._size == 0:
+            return None
+        return self._ts[self._head + self._size - 1]
+
+    def load(self, df: pd.DataFrame) -> None:
+        """Replaces the buffer with the last candles of a historical data DataFrame"""
+
+        df = df.tail(self.capacity)
+        with self._lock:
+            self._head = 0
+            self._size = len(df)
+            for offset in [0, self.capacity]:
+                self._ts[offset : offset + self._size] = pd.DatetimeIndex(df["date"]).values
+                self._ohlcv[offset : offset + self._size] = df[CANDLE_COLUMNS].to_numpy(dtype="float64")
+
+    def update(self, ts, low: float, high: float, open: float, close: float, volume: float) -> None:
+        """Overwrites the newest candle if it has the same open time, adds a new candle if it is newer"""
+
+        ts = np.datetime64(ts, "ns")
+        last_ts = self.last_ts
+
+        with self._lock:
+            if last_ts is not None and ts == last_ts:
+                slot = (self._head + self._size - 1) % self.capacity
+            elif last_ts is None or ts > last_ts:
+                if self._size < self.capacity:
+                    slot = (self._head + self._size) % self.capacity
+                    self._size += 1
+                else:
+                    slot = self._head
+                    self._head = (self._head + 1) % self.capacity
+            else:
+                # older than the newest candle, already in the buffer or out of range
+                return
+
+            for index in [slot, slot + self.capacity]:
+                self._ts[index] = ts
+                self._ohlcv[index] = (low, high, open, close, volume)
+
+    def to_df(self, copy: bool = False) -> pd.DataFrame:
+        """Returns the candles as a historical data DataFrame
+
+        Without ``copy`` the price columns are a view on the buffer and change with the next update.
+        """
+
+        with self._lock:
+            # the index must not change under pandas, only the price columns can be a view
+            ts = self._ts[self._head : self._head + self._size].copy()
+            ohlcv = self._ohlcv[self._head : self._head + self._size]
+            if copy:
+                ohlcv = ohlcv.copy()
+
+        tsidx = pd.DatetimeIndex(ts, name="ts")
+        df = pd.DataFrame(ohlcv, index=tsidx, columns=CANDLE_COLUMNS, copy=False)
+        df.insert(0, "granularity", self.granularity)
+        df.insert(0, "market", self.market)
+        df.insert(0, "date", tsidx)
+
+        return df
@@ -0,0 +1,145 @@
+"""Historical candles of long date ranges, fetched in exchange sized chunks on a thread pool"""
+
+import time
+import threading
+import pandas as pd
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.exchange.RateLimiter import RateLimiter
+
+# candles per request, Coinbase and Coinbase Pro return at most 300 and the Binance client asks for 300
+CHUNK_CANDLES = 300
+
+# requests in flight at once, the exchange rate limit still applies
+WORKERS = 4
+
+# attempts per chunk, waiting RETRY_WAIT, 2 * RETRY_WAIT, ... seconds in between
+RETRIES = 3
+RETRY_WAIT = 1.0
+
+ISO8601_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class RangeDownloadError(Exception):
+    """Chunks of the range still failed after the retries, ``download()`` again fetches only those"""
+
+    def __init__(self, failed: list, error: Exception) -> None:
+        self.failed = failed
+        self.error = error
+        super().__init__(f"{len(failed)} chunks of historical data failed to download: {repr(error)}")
+
+
+class RangeDownloader:
+    """Candles of one market and granularity between two dates
+
+    The range is split into chunks of ``chunk_candles`` candles, the chunks are fetched by ``workers``
+    threads with ``fetch(iso8601start, iso8601end)`` after taking a "klines" request from the exchange's
+    rate limiter. The fetched chunks are kept: when some of them fail, calling ``download()`` again for
+    the same range only fetches the failed ones. The result is built with one concatenation at the end
+    and ``gaps`` lists the missing candles inside it.
+    """
+
+    def __init__(
+        self,
+        exchange: Exchange,
+        granularity: Granularity,
+        fetch: Callable[[str, str], pd.DataFrame],
+        chunk_candles: int = CHUNK_CANDLES,
+        workers: int = WORKERS,
+        retries: int = RETRIES,
+    ) -> None:
+        self.exchange = exchange
+        self.granularity = granularity
+        self.fetch = fetch
+        self.chunk_candles = chunk_candles
+        self.workers = workers
+        self.retries = retries
+
+        self.gaps = []
+        self._chunks = {}  # (start, end) -> DataFrame
+        self._lock = threading.Lock()
+
+    def chunks(self, start: pd.Timestamp, end: pd.Timestamp) -> list:
+        """The (start, end) of each request, end included, the last chunk may be shorter"""
+
+        step = pd.Timedelta(seconds=self.granularity.to_integer)
+        span = step * self.chunk_candles
+
+        chunks = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + span - step, end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + step
+        return chunks
+
+    def download(self, iso8601start: str, iso8601end: str) -> pd.DataFrame:
+        """The candles of the range oldest first, raises RangeDownloadError if chunks are missing"""
+
+        chunks = self.chunks(pd.Timestamp(iso8601start), pd.Timestamp(iso8601end))
+        with self._lock:
+            pending = [chunk for chunk in chunks if chunk not in self._chunks]
+
+        failed = []
+        error = None
+        if len(pending) > 0:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending)), thread_name_prefix="download") as executor:
+                for chunk, result in zip(pending, executor.map(self._fetch_chunk, pending)):
+                    if isinstance(result, Exception):
+                        failed.append(chunk)
+                        error = result
+                    else:
+                        with self._lock:
+                            self._chunks[chunk] = result
+
+        if len(failed) > 0:
+            raise RangeDownloadError(failed, error)
+
+        with self._lock:
+            frames = [self._chunks[chunk] for chunk in chunks if len(self._chunks[chunk]) > 0]
+
+        if len(frames) == 0:
+            self.gaps = []
+            return pd.DataFrame()
+
+        df = pd.concat(frames)
+        df = df[~df.index.duplicated(keep="last")]
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")
+
+        self.gaps = self.find_gaps(df)
+        return df
+
+    def find_gaps(self, df: pd.DataFrame) -> list:
+        """(last candle, next candle) where candles are missing in between"""
+
+        if len(df) < 2:
+            return []
+
+        dates = pd.Series(pd.to_datetime(df.index))
+        missing = dates.diff() > pd.Timedelta(seconds=self.granularity.to_integer)
+        return list(zip(dates.shift(1)[missing], dates[missing]))
+
+    def _fetch_chunk(self, chunk: tuple):
+        # an exception is returned, the other chunks are still fetched
+        error = None
+        for attempt in range(self.retries):
+            if attempt > 0:
+                time.sleep(RETRY_WAIT * attempt)
+
+            RateLimiter.acquire(self.exchange, "klines")
+            try:
+                df = self.fetch(chunk[0].strftime(ISO8601_FORMAT), chunk[1].strftime(ISO8601_FORMAT))
+            except Exception as err:
+                error = err
+                continue
+
+            if not isinstance(df, pd.DataFrame):
+                error = TypeError(f"Historical data is not a DataFrame: {type(df)}")
+                continue
+            return df
+
+        return error
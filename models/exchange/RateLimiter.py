@@ -0,0 +1,89 @@
+"""Token bucket rate limits for the exchange REST APIs"""
+
+import time
+import threading
+
+from models.exchange.ExchangesEnum import Exchange
+
+# documented public REST limits
+#   binance:     1200 request weight per minute, klines weight 2, 24hr ticker (all symbols) weight 40
+#   coinbase:    10 public requests per second
+#   coinbasepro: 10 public requests per second, bursts up to 15
+#   kucoin:      30 public requests per 3 seconds
+# as (weight per second, burst weight), for per window limits burst + rate * window stays within the limit
+EXCHANGE_LIMITS = {
+    Exchange.BINANCE: (15.0, 300.0),
+    Exchange.COINBASE: (8.0, 2.0),
+    Exchange.COINBASEPRO: (10.0, 15.0),
+    Exchange.KUCOIN: (8.0, 6.0),
+}
+
+# request weights that are not 1
+REQUEST_WEIGHTS = {
+    Exchange.BINANCE: {"klines": 2, "ticker_24hr": 40},
+}
+
+
+class TokenBucket:
+    """Thread safe token bucket, ``acquire`` blocks until the request weight is available"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive.")
+
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: float = 1) -> float:
+        """Takes the weight from the bucket and returns the seconds spent waiting"""
+
+        weight = min(weight, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return waited
+
+                delay = (weight - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """One shared token bucket per exchange"""
+
+    _buckets = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, exchange: Exchange) -> TokenBucket:
+        """Returns the token bucket of the exchange, None if the exchange has no limit"""
+
+        if exchange not in EXCHANGE_LIMITS:
+            return None
+
+        with cls._lock:
+            if exchange not in cls._buckets:
+                cls._buckets[exchange] = TokenBucket(*EXCHANGE_LIMITS[exchange])
+            return cls._buckets[exchange]
+
+    @classmethod
+    def acquire(cls, exchange: Exchange, request: str = None) -> float:
+        """Waits until the exchange allows the request, returns the seconds spent waiting"""
+
+        bucket = cls.get(exchange)
+        if bucket is None:
+            return 0.0
+
+        return bucket.acquire(REQUEST_WEIGHTS.get(exchange, {}).get(request, 1))
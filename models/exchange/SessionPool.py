@@ -0,0 +1,70 @@
+"""Shared HTTP connection pools for the exchange REST APIs"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session with a default timeout, requests itself waits forever"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class SessionPool:
+    """One keep-alive session per exchange API URL, shared by every API object in the process
+
+    The exchange API objects are cheap to create but a new connection is a new TCP and TLS handshake,
+    reusing the session keeps the connection open between polls.
+    """
+
+    pool_size = DEFAULT_POOL_SIZE
+    timeout = DEFAULT_TIMEOUT
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT) -> None:
+        """Sets the connection pool size and request timeout (seconds) of new sessions"""
+
+        if pool_size != cls.pool_size or timeout != cls.timeout:
+            cls.pool_size = pool_size
+            cls.timeout = timeout
+            cls.close()
+
+    @classmethod
+    def session(cls, api_url: str) -> requests.Session:
+        """Returns the session for the API URL"""
+
+        session = cls._sessions.get(api_url)
+        if session is not None:
+            return session
+
+        with cls._lock:
+            if api_url not in cls._sessions:
+                session = TimeoutSession(cls.timeout)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._sessions[api_url] = session
+
+            return cls._sessions[api_url]
+
+    @classmethod
+    def close(cls) -> None:
+        """Closes all sessions and their connections"""
+
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions = {}
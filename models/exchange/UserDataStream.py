@@ -0,0 +1,222 @@
+"""Exchange user data streams, account changes pushed over an authenticated websocket"""
+
+import json
+import time
+import threading
+import pandas as pd
+from datetime import datetime
+from websocket import create_connection, WebSocketTimeoutException, WebSocketConnectionClosedException
+
+from views.PyCryptoBot import RichText
+
+# pushed data is trusted for this long, then it is reconciled with the REST API once
+RECONCILE_INTERVAL = 300
+
+
+class AccountState:
+    """Balances and completed orders of a live account, kept up to date by a user data stream
+
+    The balances and the completed orders of each market come from the REST API. Exchanges that push
+    balances update them in place, an order event marks the orders of its market (and balances that are
+    not pushed) as out of date so the next request goes to the REST API again. Everything is out of
+    date while the stream is disconnected and after ``reconcile_interval`` seconds.
+    """
+
+    def __init__(self, reconcile_interval: int = RECONCILE_INTERVAL) -> None:
+        self.reconcile_interval = reconcile_interval
+        self.connected = False
+
+        self._lock = threading.Lock()
+        self._balances = None
+        self._balances_synced = 0.0
+        self._orders = {}
+        self._orders_synced = {}
+
+    def connect(self) -> None:
+        with self._lock:
+            self.connected = True
+
+    def disconnect(self) -> None:
+        # events may be missed until the stream is back
+        with self._lock:
+            self.connected = False
+            self._balances_synced = 0.0
+            self._orders_synced = {}
+
+    def _is_fresh(self, synced: float) -> bool:
+        return self.connected and synced > 0 and time.monotonic() - synced < self.reconcile_interval
+
+    def get_balances(self) -> pd.DataFrame:
+        """The balances, None if they have to be requested from the exchange"""
+
+        with self._lock:
+            if self._balances is None or not self._is_fresh(self._balances_synced):
+                return None
+            return self._balances.copy()
+
+    def set_balances(self, df: pd.DataFrame) -> None:
+        """Balances from the REST API, the exchange APIs return an empty DataFrame on errors"""
+
+        if not isinstance(df, pd.DataFrame) or len(df) == 0 or "currency" not in df:
+            return
+
+        with self._lock:
+            self._balances = df.reset_index(drop=True)
+            self._balances_synced = time.monotonic()
+
+    def update_balance(self, currency: str, **columns) -> None:
+        """Pushed balance of a currency, only kept once the other balances are known"""
+
+        with self._lock:
+            if self._balances is None:
+                return
+
+            rows = self._balances.index[self._balances["currency"] == currency]
+            if len(rows) == 0:
+                self._balances.loc[len(self._balances), "currency"] = currency
+                rows = self._balances.index[-1:]
+
+            for column, value in columns.items():
+                if column not in self._balances:
+                    self._balances[column] = None
+                self._balances.loc[rows, column] = value
+
+    def invalidate_balances(self) -> None:
+        with self._lock:
+            self._balances_synced = 0.0
+
+    def get_orders(self, market: str) -> pd.DataFrame:
+        """Completed orders of the market, None if they have to be requested from the exchange"""
+
+        with self._lock:
+            if market not in self._orders or not self._is_fresh(self._orders_synced.get(market, 0.0)):
+                return None
+            return self._orders[market].copy()
+
+    def set_orders(self, market: str, df: pd.DataFrame) -> None:
+        """Completed orders of the market from the REST API"""
+
+        if not isinstance(df, pd.DataFrame):
+            return
+
+        with self._lock:
+            self._orders[market] = df
+            self._orders_synced[market] = time.monotonic()
+
+    def invalidate_orders(self, market: str = None) -> None:
+        with self._lock:
+            if market is None:
+                self._orders_synced = {}
+            else:
+                self._orders_synced.pop(market, None)
+
+
+class UserDataStream:
+    """Authenticated websocket that keeps an AccountState up to date, reconnects until it is closed
+
+    Subclasses return the websocket url and the subscribe messages and translate the exchange events
+    into AccountState updates.
+    """
+
+    # seconds between keepalive() calls
+    keepalive_interval = 30
+
+    # seconds a recv() waits before the stream checks for stop and keepalive
+    recv_timeout = 5
+
+    def __init__(self, app: object = None, reconcile_interval: int = RECONCILE_INTERVAL) -> None:
+        self.app = app
+        self.state = AccountState(reconcile_interval)
+
+        self.stop = True
+        self.ws = None
+        self.thread = None
+        self.start_time = None
+        self.message_count = 0
+
+        self._keepalive_at = 0.0
+
+    def get_url(self) -> str:
+        raise NotImplementedError
+
+    def get_subscriptions(self) -> list:
+        return []
+
+    def keepalive(self) -> None:
+        self.ws.ping("keepalive")
+
+    def on_message(self, msg: dict) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        self.stop = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.stop = True
+        self._disconnect()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(self.recv_timeout * 2)
+
+    def _run(self) -> None:
+        retry = 0
+        while not self.stop:
+            try:
+                self._connect()
+                retry = 0
+                self._listen()
+            except Exception as err:  # pylint: disable=broad-except
+                self.on_error(err)
+            finally:
+                self.state.disconnect()
+                self._disconnect()
+
+            # back off up to a minute, REST is used meanwhile
+            self._sleep(min(60, 5 * 2**retry))
+            retry += 1
+
+    def _sleep(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        while not self.stop and time.monotonic() < until:
+            time.sleep(0.1)
+
+    def _connect(self) -> None:
+        self.ws = create_connection(self.get_url(), timeout=self.recv_timeout)
+        for subscription in self.get_subscriptions():
+            self.ws.send(json.dumps(subscription))
+
+        self.state.connect()
+        self.start_time = datetime.now()
+        self._keepalive_at = time.monotonic() + self.keepalive_interval
+
+    def _listen(self) -> None:
+        while not self.stop:
+            if time.monotonic() >= self._keepalive_at:
+                self.keepalive()
+                self._keepalive_at = time.monotonic() + self.keepalive_interval
+
+            try:
+                data = self.ws.recv()
+            except WebSocketTimeoutException:
+                continue
+
+            if data == "":
+                # closed by the exchange
+                return
+
+            self.message_count += 1
+            self.on_message(json.loads(data))
+
+    def _disconnect(self) -> None:
+        try:
+            if self.ws is not None:
+                self.ws.close()
+        except WebSocketConnectionClosedException:
+            pass
+        finally:
+            self.ws = None
+
+    def on_error(self, e: Exception) -> None:
+        if self.app and not self.stop:
+            RichText.notify(f"User data stream error: {e}", self.app, "error")
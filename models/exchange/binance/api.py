@@ -1,5 +1,6 @@
 """Remotely control your Binance account via their API : https://binance-docs.github.io/apidocs/spot/en"""
 
+import functools
 import hashlib
 import hmac
 import json
@@ -14,10 +15,12 @@ from urllib.parse import urlencode
 import numpy as np
 import pandas as pd
 import requests
-from requests import Session
 from websocket import create_connection, WebSocketConnectionClosedException
 
 from models.exchange.Granularity import Granularity
+from models.exchange.CandleRingBuffer import CandleRingBuffer
+from models.exchange.SessionPool import SessionPool
+from models.exchange.UserDataStream import UserDataStream, RECONCILE_INTERVAL
 from views.PyCryptoBot import RichText
 
 DEFAULT_MAKER_FEE_RATE = 0.0015  # added 0.0005 to allow for self.price movements
@@ -107,19 +110,21 @@ class AuthAPI(AuthAPIBase):
             raise SystemExit(err)
 
     def _dispatch_request(self, method: str):
-        session = Session()
-        session.headers.update(
+        # the session is shared with other API objects, the API key is sent per request
+        session = SessionPool.session(self._api_url)
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "X-MBX-APIKEY": self._api_key,
+        }
+        return functools.partial(
             {
-                "Content-Type": "application/json; charset=utf-8",
-                "X-MBX-APIKEY": self._api_key,
-            }
+                "GET": session.get,
+                "DELETE": session.delete,
+                "PUT": session.put,
+                "POST": session.post,
+            }.get(method, session.get),
+            headers=headers,
         )
-        return {
-            "GET": session.get,
-            "DELETE": session.delete,
-            "PUT": session.put,
-            "POST": session.post,
-        }.get(method, "GET")
 
     def createHash(self, uri: str = ""):
         return hmac.new(self._api_secret.encode("utf-8"), uri.encode("utf-8"), hashlib.sha256).hexdigest()
@@ -207,6 +212,26 @@ class AuthAPI(AuthAPIBase):
 
         return self.get_accounts()
 
+    def get_listen_key(self) -> str:
+        """Creates a user data stream listen key, valid for 60 minutes without a keepalive"""
+
+        try:
+            # POST /api/v3/userDataStream
+            resp = self._dispatch_request("POST")(url=f"{self._api_url}/api/v3/userDataStream")
+            return resp.json().get("listenKey")
+        except Exception:
+            return None
+
+    def keepalive_listen_key(self, listen_key: str) -> bool:
+        """Extends the validity of a user data stream listen key"""
+
+        try:
+            # PUT /api/v3/userDataStream
+            resp = self._dispatch_request("PUT")(url=f"{self._api_url}/api/v3/userDataStream", params={"listenKey": listen_key})
+            return resp.status_code == 200
+        except Exception:
+            return False
+
     def get_fees(self, market: str = "") -> pd.DataFrame:
         """Retrieves a account fees"""
 
@@ -340,8 +365,8 @@ class AuthAPI(AuthAPIBase):
         except Exception:
             return pd.DataFrame()
 
-    def get_orders(self, market: str = "", action: str = "", status: str = "done", order_history: list = []) -> pd.DataFrame:
-        """Retrieves your list of orders with optional filtering"""
+    def get_orders(self, market: str = "", action: str = "", status: str = "done", order_history: list = [], iso8601start: str = "") -> pd.DataFrame:
+        """Retrieves your list of orders with optional filtering, iso8601start only returns the orders created since"""
 
         # if market provided
         markets = None
@@ -413,12 +438,12 @@ class AuthAPI(AuthAPIBase):
                 if full_scan is True:
                     print(f"add to order history to prevent full scan: {self.order_history}")
             else:
+                payload = {"symbol": market, "recvWindow": self.recv_window}
+                if iso8601start != "":
+                    payload["startTime"] = int(datetime.timestamp(datetime.strptime(iso8601start, "%Y-%m-%dT%H:%M:%S")) * 1000)
+
                 # GET /api/v3/allOrders
-                resp = self.auth_api(
-                    "GET",
-                    "/api/v3/allOrders",
-                    {"symbol": market, "recvWindow": self.recv_window},
-                )
+                resp = self.auth_api("GET", "/api/v3/allOrders", payload)
 
                 if isinstance(resp, str) and resp.endswith("Invalid symbol."):
                     return "Invalid market."
@@ -919,12 +944,9 @@ class PublicAPI(AuthAPIBase):
 
         using_websocket = False
         if websocket is not None:
-            if websocket.candles is not None:
-                try:
-                    df = websocket.candles.loc[websocket.candles["market"] == market]
-                    using_websocket = True
-                except Exception:
-                    pass
+            # copy, the bot updates the current candle in place
+            df = websocket.get_candles(market)
+            using_websocket = df is not None
 
         if websocket is None or (websocket is not None and using_websocket is False):
             if iso8601start != "" and iso8601end == "":
@@ -1080,7 +1102,7 @@ class PublicAPI(AuthAPIBase):
             raise TypeError("URI is not a string.")
 
         try:
-            resp = requests.get(f"{self._api_url}{uri}", params=payload)
+            resp = SessionPool.session(self._api_url).get(f"{self._api_url}{uri}", params=payload)
 
             if resp.status_code != 200:
                 resp_message = resp.json()["msg"]
@@ -1334,11 +1356,54 @@ class WebSocketClient(WebSocket, AuthAPIBase):
         self._ws_url = ws_url
         self.markets = markets
         self.granularity = granularity
-        self.tickers = None
-        self.candles = None
+        self._tickers = {}
+        self._candles = {}
         self.start_time = None
         self.time_elapsed = 0
 
+    @property
+    def tickers(self) -> pd.DataFrame:
+        """Latest ticker per market, None until the first ticker message"""
+
+        if len(self._tickers) == 0:
+            return None
+
+        markets = list(self._tickers.keys())
+        dates, prices = zip(*[self._tickers[market] for market in markets])
+
+        tsidx = pd.DatetimeIndex(list(dates), name="ts")
+        df = pd.DataFrame({"date": tsidx, "market": markets, "price": list(prices)}, index=tsidx)
+        df["candle"] = df["date"].dt.floor(freq=self.granularity.get_frequency)
+        return df
+
+    @tickers.setter
+    def tickers(self, value) -> None:
+        if value is None:
+            self._tickers = {}
+
+    @property
+    def candles(self) -> pd.DataFrame:
+        """Candles of all markets, None until the first kline message"""
+
+        if len(self._candles) == 0:
+            return None
+        elif len(self._candles) == 1:
+            return next(iter(self._candles.values())).to_df()
+
+        return pd.concat([candles.to_df() for candles in self._candles.values()]).sort_values(by=["date"], kind="stable")
+
+    @candles.setter
+    def candles(self, value) -> None:
+        if value is None:
+            self._candles = {}
+
+    def get_candles(self, market: str, copy: bool = True) -> pd.DataFrame:
+        """Candles of one market, without ``copy`` the prices are a view on the websocket buffer"""
+
+        if market not in self._candles:
+            return None
+        return self._candles[market].to_df(copy=copy)
+
     def on_open(self):
         self.start_time = datetime.now()
         self.message_count = 0
@@ -1348,111 +1413,87 @@ class WebSocketClient(WebSocket, AuthAPIBase):
             self.time_elapsed = round((datetime.now() - self.start_time).total_seconds())
 
         if "e" in msg:
-            df = None
             if msg["e"] == "24hrMiniTicker" and "E" in msg and "s" in msg and "c" in msg:
-                # create dataframe from websocket message
-                df = pd.DataFrame(
-                    columns=["date", "market", "price"],
-                    data=[
-                        [
-                            self.convert_time(msg["E"]) - timedelta(hours=1),
-                            msg["s"],
-                            msg["c"],
-                        ]
-                    ],
+                # latest price per market, the DataFrame is only created when it is read
+                self._tickers[msg["s"]] = (
+                    np.datetime64(self.convert_time(msg["E"]) - timedelta(hours=1), "ns"),
+                    float(msg["c"]),
                 )
 
-                # set column types
-                df["date"] = df["date"].astype("datetime64[ns]")
-                df["price"] = df["price"].astype("float64")
-                df["candle"] = df["date"].dt.floor(freq=self.granularity.get_frequency)
-
-            if df is not None:
-                # insert first entry
-                if self.tickers is None and len(df) > 0:
-                    self.tickers = df
-                # append future entries without duplicates
-                elif self.tickers is not None and len(df) > 0:
-                    self.tickers = pd.concat([self.tickers, df]).drop_duplicates(subset="market", keep="last").reset_index(drop=True)
-
-                # convert dataframes to a time series
-                tsidx = pd.DatetimeIndex(pd.to_datetime(self.tickers["date"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))
-                self.tickers.set_index(tsidx, inplace=True)
-                self.tickers.index.name = "ts"
-
             if msg["e"] == "kline" and "s" in msg and "k" in msg:
                 k = msg["k"]
                 if "i" in k and "t" in k and "o" in k and "h" in k and "c" in k and "l" in k and "v" in k:
-                    # create dataframe from websocket message
-                    df = pd.DataFrame(
-                        columns=[
-                            "date",
-                            "market",
-                            "granularity",
-                            "low",
-                            "high",
-                            "open",
-                            "close",
-                            "volume",
-                        ],
-                        data=[
-                            [
-                                self.convert_time(k["t"]) - timedelta(hours=1),
-                                msg["s"],
-                                k["i"],
-                                float(k["l"]),
-                                float(k["h"]),
-                                float(k["o"]),
-                                float(k["c"]),
-                                float(k["V"]),
-                            ]
-                        ],
-                    )
-
-                    if self.candles is None:
-                        resp = PublicAPI().get_historical_data(df["market"].values[0], self.granularity)
+                    if msg["s"] not in self._candles:
+                        candles = CandleRingBuffer(msg["s"], self.granularity.to_short, 300)
+                        resp = PublicAPI().get_historical_data(msg["s"], self.granularity)
                         if len(resp) > 0:
-                            self.candles = resp
-                        else:
-                            self.candles = pd.DataFrame(
-                                columns=[
-                                    "date",
-                                    "market",
-                                    "granularity",
-                                    "low",
-                                    "high",
-                                    "open",
-                                    "close",
-                                    "volume",
-                                ],
-                                data=[],
-                            )
+                            candles.load(resp)
+                        self._candles[msg["s"]] = candles
 
                     if k["i"] == self.granularity.to_short and k["x"] is True:
-                        try:
-                            self.candles.drop(index=str(self.tickers[self.tickers["market"] == msg["s"]].candle[0]), inplace=True)
-                        except KeyError:
-                            pass
-
-                        # check if the current candle exists
-                        candle_exists = ((self.candles["date"] == df["date"].values[0]) & (self.candles["market"] == df["market"].values[0])).any()
-                        if not candle_exists:
-                            self.candles = pd.concat([self.candles, df])
-
-                        tsidx = pd.DatetimeIndex(pd.to_datetime(self.candles["date"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))
-                        self.candles.set_index(tsidx, inplace=True)
-                        self.candles.index.name = "ts"
-
-                    if self.candles is not None:
-                        # keep last 300 candles per market
-                        self.candles = self.candles.groupby("market").tail(300)
-                        # sort columns by date
-                        self.candles = self.candles.copy().sort_values(by=["date"])
-                        # set correct column types
-                        self.candles["open"] = self.candles["open"].astype("float64")
-                        self.candles["high"] = self.candles["high"].astype("float64")
-                        self.candles["close"] = self.candles["close"].astype("float64")
-                        self.candles["low"] = self.candles["low"].astype("float64")
-                        self.candles["volume"] = self.candles["volume"].astype("float64")
+                        # replaces the open candle from the historical data or adds the next candle
+                        self._candles[msg["s"]].update(
+                            self.convert_time(k["t"]) - timedelta(hours=1),
+                            float(k["l"]),
+                            float(k["h"]),
+                            float(k["o"]),
+                            float(k["c"]),
+                            float(k["V"]),
+                        )
 
         self.message_count += 1
+
+
+class UserDataWebSocketClient(UserDataStream):
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        api_url: str = "https://api.binance.com",
+        ws_url: str = "wss://stream.binance.com:9443",
+        recv_window: int = 5000,
+        app: object = None,
+        reconcile_interval: int = RECONCILE_INTERVAL,
+    ) -> None:
+        """Binance user data stream (listen key), pushes the balances and order updates of the account"""
+
+        if api_url == "https://api.binance.us":
+            valid_ws_urls = ["wss://stream.binance.us:9443", "wss://stream.binance.us:9443/"]
+        else:
+            valid_ws_urls = ["wss://stream.binance.com:9443", "wss://stream.binance.com:9443/"]
+
+        # validate Binance Websocket URL
+        if ws_url not in valid_ws_urls:
+            raise ValueError("Binance WebSocket URL is invalid")
+
+        if ws_url[-1] != "/":
+            ws_url = ws_url + "/"
+
+        super().__init__(app, reconcile_interval)
+
+        self.api = AuthAPI(api_key, api_secret, api_url, recv_window=recv_window, app=app)
+        self.listen_key = None
+        self._ws_url = ws_url
+
+    # the listen key expires after 60 minutes
+    keepalive_interval = 1800
+
+    def get_url(self) -> str:
+        self.listen_key = self.api.get_listen_key()
+        if not self.listen_key:
+            raise ConnectionError("Unable to create a Binance listen key.")
+
+        return f"{self._ws_url}ws/{self.listen_key}"
+
+    def keepalive(self) -> None:
+        self.api.keepalive_listen_key(self.listen_key)
+
+    def on_message(self, msg: dict) -> None:
+        if msg.get("e") == "outboundAccountPosition":
+            # the balances that changed, in the format of /api/v3/account
+            for balance in msg.get("B", []):
+                self.state.update_balance(balance["a"], balance=balance["f"], available=balance["f"])
+
+        elif msg.get("e") == "executionReport" and msg.get("X") != "NEW":
+            # the order history is requested again, the cursor of the order history cache keeps that small
+            self.state.invalidate_orders(msg.get("s"))
@@ -16,6 +16,8 @@ from requests import Request
 from threading import Thread
 from websocket import create_connection, WebSocketConnectionClosedException
 from models.exchange.Granularity import Granularity
+from models.exchange.SessionPool import SessionPool
+from models.exchange.UserDataStream import UserDataStream, RECONCILE_INTERVAL
 from views.PyCryptoBot import RichText
 
 MARGIN_ADJUSTMENT = 0.0025
@@ -299,8 +301,8 @@ class AuthAPI(AuthAPIBase):
         return float(fees["taker_fee_rate"].to_string(index=False).strip())
 
     # wallet:orders:read
-    def get_orders(self, market: str = "", action: str = "", status: str = "all") -> pd.DataFrame:
-        """Retrieves your list of orders with optional filtering"""
+    def get_orders(self, market: str = "", action: str = "", status: str = "all", iso8601start: str = "") -> pd.DataFrame:
+        """Retrieves your list of orders with optional filtering, iso8601start only returns the orders created since"""
 
         # if market provided
         if market != "":
@@ -330,6 +332,8 @@ class AuthAPI(AuthAPIBase):
                     payload["order_status"] = "FILLED"
                 else:
                     payload["order_status"] = status.upper()
+            if iso8601start != "":
+                payload["start_date"] = f"{iso8601start}Z"
 
             df = self.auth_api("GET", "api/v3/brokerage/orders/historical/batch", payload)
         except Exception:
@@ -768,11 +772,11 @@ class AuthAPI(AuthAPIBase):
         while trycnt <= connretry:
             try:
                 if method == "DELETE":
-                    resp = requests.delete(self._api_url + uri, auth=self)
+                    resp = SessionPool.session(self._api_url).delete(self._api_url + uri, auth=self)
                 elif method == "GET":
-                    resp = requests.get(self._api_url + uri, params=payload, auth=self)
+                    resp = SessionPool.session(self._api_url).get(self._api_url + uri, params=payload, auth=self)
                 elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload, auth=self)
+                    resp = SessionPool.session(self._api_url).post(self._api_url + uri, json=payload, auth=self)
 
                 # api error handling
                 if "error_details" in resp.json():
@@ -1844,3 +1848,67 @@ class WebSocketClient(WebSocket):
 
         self.message_count += 1
 """
+
+
+class UserDataWebSocketClient(UserDataStream):
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        markets: list = None,
+        ws_url: str = "wss://advanced-trade-ws.coinbase.com",
+        app: object = None,
+        reconcile_interval: int = RECONCILE_INTERVAL,
+    ) -> None:
+        """Coinbase Advanced Trade authenticated "user" channel, pushes the orders of the account
+
+        Balances are not pushed, they are requested again after an order update.
+        """
+
+        valid_ws_urls = [
+            "wss://advanced-trade-ws.coinbase.com",
+            "wss://advanced-trade-ws.coinbase.com/",
+        ]
+
+        # validate Coinbase Websocket URL
+        if ws_url not in valid_ws_urls:
+            raise ValueError("Coinbase WebSocket URL is invalid")
+
+        super().__init__(app, reconcile_interval)
+
+        self.markets = markets if isinstance(markets, list) else [markets]
+
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._ws_url = ws_url
+
+    def get_url(self) -> str:
+        return self._ws_url
+
+    def get_subscriptions(self) -> list:
+        timestamp = str(int(time.time()))
+        message = timestamp + "user" + ",".join(self.markets)
+        signature = hmac.new(self._api_secret.encode("utf-8"), message.encode("utf-8"), digestmod=hashlib.sha256).hexdigest()
+
+        return [
+            {
+                "type": "subscribe",
+                "product_ids": self.markets,
+                "channel": "user",
+                "api_key": self._api_key,
+                "timestamp": timestamp,
+                "signature": signature,
+            }
+        ]
+
+    def on_message(self, msg: dict) -> None:
+        if msg.get("channel") != "user":
+            return
+
+        for event in msg.get("events", []):
+            if event.get("type") != "update":
+                continue
+
+            for order in event.get("orders", []):
+                self.state.invalidate_orders(order.get("product_id"))
+            self.state.invalidate_balances()
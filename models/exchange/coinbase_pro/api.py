@@ -16,6 +16,8 @@ from requests import Request
 from threading import Thread
 from websocket import create_connection, WebSocketConnectionClosedException
 from models.exchange.Granularity import Granularity
+from models.exchange.SessionPool import SessionPool
+from models.exchange.UserDataStream import UserDataStream, RECONCILE_INTERVAL
 from views.PyCryptoBot import RichText
 
 MARGIN_ADJUSTMENT = 0.0025
@@ -216,8 +218,8 @@ class AuthAPI(AuthAPIBase):
         except Exception:
             return 0
 
-    def get_orders(self, market: str = "", action: str = "", status: str = "all") -> pd.DataFrame:
-        """Retrieves your list of orders with optional filtering"""
+    def get_orders(self, market: str = "", action: str = "", status: str = "all", iso8601start: str = "") -> pd.DataFrame:
+        """Retrieves your list of orders with optional filtering, iso8601start only returns the orders created since"""
 
         # if market provided
         if market != "":
@@ -237,7 +239,10 @@ class AuthAPI(AuthAPIBase):
 
         try:
             # GET /orders?status
-            resp = self.auth_api("GET", f"orders?status={status}")
+            if iso8601start != "":
+                resp = self.auth_api("GET", f"orders?status={status}&start_date={iso8601start}Z")
+            else:
+                resp = self.auth_api("GET", f"orders?status={status}")
             if len(resp) > 0:
                 if status == "open":
                     df = resp.copy()[
@@ -567,11 +572,11 @@ class AuthAPI(AuthAPIBase):
         while trycnt <= connretry:
             try:
                 if method == "DELETE":
-                    resp = requests.delete(self._api_url + uri, auth=self)
+                    resp = SessionPool.session(self._api_url).delete(self._api_url + uri, auth=self)
                 elif method == "GET":
-                    resp = requests.get(self._api_url + uri, auth=self)
+                    resp = SessionPool.session(self._api_url).get(self._api_url + uri, auth=self)
                 elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload, auth=self)
+                    resp = SessionPool.session(self._api_url).post(self._api_url + uri, json=payload, auth=self)
 
                 trycnt += 1
                 resp.raise_for_status()
@@ -886,9 +891,9 @@ class PublicAPI(AuthAPIBase):
         while trycnt <= connretry:
             try:
                 if method == "GET":
-                    resp = requests.get(self._api_url + uri)
+                    resp = SessionPool.session(self._api_url).get(self._api_url + uri)
                 elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload)
+                    resp = SessionPool.session(self._api_url).post(self._api_url + uri, json=payload)
 
                 trycnt += 1
                 resp.raise_for_status()
@@ -1338,3 +1343,64 @@ class WebSocketClient(WebSocket):
             self.candles = self.candles.groupby("market").tail(300)
 
         self.message_count += 1
+
+
+class UserDataWebSocketClient(UserDataStream):
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        api_passphrase: str = "",
+        markets: list = None,
+        ws_url: str = "wss://ws-feed.pro.coinbase.com",
+        app: object = None,
+        reconcile_interval: int = RECONCILE_INTERVAL,
+    ) -> None:
+        """Coinbase Pro authenticated "user" channel, pushes the orders of the account
+
+        Balances are not pushed, they are requested again after a fill.
+        """
+
+        valid_ws_urls = [
+            "wss://ws-feed.pro.coinbase.com",
+            "wss://ws-feed.pro.coinbase.com/",
+        ]
+
+        # validate Coinbase Pro Websocket URL
+        if ws_url not in valid_ws_urls:
+            raise ValueError("Coinbase Pro WebSocket URL is invalid")
+
+        super().__init__(app, reconcile_interval)
+
+        self.markets = markets if isinstance(markets, list) else [markets]
+
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._api_passphrase = api_passphrase
+        self._ws_url = ws_url
+
+    def get_url(self) -> str:
+        return self._ws_url
+
+    def get_subscriptions(self) -> list:
+        timestamp = str(time.time())
+        message = timestamp + "GET" + "/users/self/verify"
+        hmac_key = base64.b64decode(self._api_secret)
+        signature = hmac.new(hmac_key, message.encode("ascii"), hashlib.sha256)
+
+        return [
+            {
+                "type": "subscribe",
+                "product_ids": self.markets,
+                "channels": ["user"],
+                "signature": base64.b64encode(signature.digest()).decode("utf-8"),
+                "key": self._api_key,
+                "passphrase": self._api_passphrase,
+                "timestamp": timestamp,
+            }
+        ]
+
+    def on_message(self, msg: dict) -> None:
+        if msg.get("type") in ["match", "done"]:
+            self.state.invalidate_orders(msg.get("product_id"))
+            self.state.invalidate_balances()
@@ -20,6 +20,9 @@ from views.PyCryptoBot import RichText
 from threading import Thread
 from websocket import create_connection, WebSocketConnectionClosedException
 from models.exchange.Granularity import Granularity
+from models.exchange.SessionPool import SessionPool
+from models.exchange.UserDataStream import UserDataStream, RECONCILE_INTERVAL
+from models.helper.OrderCacheHelper import OrderCache
 from urllib import parse
 
 MARGIN_ADJUSTMENT = 0.0025
@@ -122,6 +125,8 @@ class AuthAPI(AuthAPIBase):
                 os.makedirs(cache_path)
 
             self._cache_path = cache_path
+            self._order_cache = OrderCache(os.path.join(cache_path, "kucoin_orders"))
+            # single file cache of older versions, imported by the first build
             self._cache_filepath = cache_path + os.path.sep + "kucoin_order_cache.json"
             self._cache_lock_filepath = cache_path + os.path.sep + "kucoin_order_cache.lock"
 
@@ -264,8 +269,8 @@ class AuthAPI(AuthAPIBase):
         df = df.reset_index()
         return df
 
-    def get_orders(self, market: str = "", action: str = "", status: str = "all") -> pd.DataFrame:
-        """Retrieves your list of orders with optional filtering"""
+    def get_orders(self, market: str = "", action: str = "", status: str = "all", iso8601start: str = "") -> pd.DataFrame:
+        """Retrieves your list of orders with optional filtering, iso8601start only returns the orders created since"""
 
         # if market provided
         if market != "":
@@ -287,8 +292,12 @@ class AuthAPI(AuthAPIBase):
         if self.usekucoincache:
             self.buildOrderHistoryCache()
 
+        uri = f"api/v1/orders?symbol={market}"
+        if iso8601start != "":
+            uri += f"&startAt={int(pd.Timestamp(iso8601start, tz='UTC').value // 10**6)}"
+
         # GET /orders?status
-        resp = self.auth_api("GET", f"api/v1/orders?symbol={market}", use_order_cache=self.usekucoincache, use_pagination=self.usepagination)
+        resp = self.auth_api("GET", uri, use_order_cache=self.usekucoincache, use_pagination=self.usepagination)
         if len(resp) > 0:
             if status == "active":
                 df = resp.copy()[
@@ -622,116 +631,65 @@ class AuthAPI(AuthAPIBase):
     def buildOrderHistoryCache(self, days_to_keep=45, enable_purge=True) -> bool:
         """Intelligently builds an order history cache to use in subsequent api calls"""
 
-        if exists(self._cache_lock_filepath):
-            # Lock file exists - wait
-            last_modified_lock = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_lock_filepath)))
-            while exists(self._cache_lock_filepath):
-                try:
-                    last_modified_lock = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_lock_filepath)))
-                    if last_modified_lock > 1799:
-                        # lock has existed for longer than 30 mins - try and salvage
-                        break
-                except Exception:
-                    pass
+        cache = self._order_cache
+        if cache.is_fresh():
+            return True
+
+        # one bot builds, the others wait for the lock and find the cache fresh
+        with cache.lock():
+            if cache.is_fresh():
+                return True
+
+            self._import_legacy_order_cache()
+
+            now = int(round(time.time() * 1000))
+            hour = 1 * 3600 * 1000
+            day = 24 * hour
+
+            purgeAfter = now - (day * days_to_keep)
+            startAt = cache.cursor if cache.cursor is not None else now - (30 * day)
+
+            break_build = False
+            last_timestamp_check = now - (12 * hour)
+
+            while (now - (12 * hour)) > startAt:
+
+                st_dt = datetime.fromtimestamp(startAt / 1000.0)
+                st_str = st_dt.strftime("%m/%d/%Y, %H:%M:%S")
+                print(f"Start at HR: {st_str}")
+
+                print("Doing historic orders build... ")
+                resp = self.auth_api("GET", f"api/v1/orders?startAt={startAt}", use_pagination=True)
+                if last_timestamp_check == startAt:
+                    resp = self.auth_api("GET", "api/v1/orders?", use_pagination=True)
+                    break_build = True
+                if len(resp) > 0:
+                    cache.append(resp)
+
+                    if "createdAt" in resp.columns:
+                        startAt = max(startAt, int(resp["createdAt"].max()) + 1)
+                        last_timestamp_check = startAt
+
+                if break_build:
+                    break
+
+                # Kucoin rate limit
                 time.sleep(5)
 
-        if exists(self._cache_filepath):
-            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_filepath)))
+            if enable_purge:
+                cache.purge(purgeAfter)
 
-            # If last build over a day ago
-            if last_modified.seconds < 21599:
-                # print (f"Last modified cache: {last_modified.seconds}")
-                return True
+            cache.mark_built(startAt)
 
-        # pd.set_option('display.max_rows', 4000)
-
-        now = int(round(time.time() * 1000))
-        hour = 1 * 3600 * 1000
-        day = 24 * hour
-        week = 7 * day
-        month = day * 30  # noqa: F841
-        # Date of Kucoin Starting
-        since = 1504224000000
-        end = min(since + week, now)  # noqa: F841
-
-        purgeAfter = now - (day * days_to_keep)
-        # endAt = min(since + week, now)
-        startAt = now - (30 * day)
-
-        break_build = False
-        last_timestamp_check = now - (12 * hour)
-
-        # Validate the json cache file
-        if not self.validateJSONFile(self._cache_filepath):
-            # Delete the json file so it can be rebuilt
-            if exists(self._cache_filepath):
-                os.remove(self._cache_filepath)
-
-        # If a previous cache file exists - load it up into the df
-        if exists(self._cache_filepath):
-            df = pd.read_json(self._cache_filepath)
-        else:
-            df = pd.DataFrame()
-
-        if not df.empty:
-            if len(df.columns) > 1:
-                if "createdAt" in df.columns:
-                    df = df.sort_values(by="createdAt", ascending=True)
-                    startAt = df.createdAt.iloc[-1] + 1
-
-        while (now - (12 * hour)) > startAt:
-
-            st_dt = datetime.fromtimestamp(startAt / 1000.0)
-            st_str = st_dt.strftime("%m/%d/%Y, %H:%M:%S")
-            print(f"Start at HR: {st_str}")
-
-            # Create the lock file
-            if not exists(self._cache_lock_filepath):
-                with open(self._cache_lock_filepath, "w") as fp:
-                    pass
-                fp.close()
-
-            print("Doing historic orders build... ")
-            resp = self.auth_api("GET", f"api/v1/orders?startAt={startAt}", use_pagination=True)
-            if last_timestamp_check == startAt:
-                # print ("Hit Last timestamp check")
-                resp = self.auth_api("GET", "api/v1/orders?", use_pagination=True)
-                break_build = True
-            if len(resp) > 0:
-                df = df.append(resp)
-                df = df.drop_duplicates("id")
-                df = df.reset_index(drop=True)
-
-                if "createdAt" in df.columns:
-                    df = df.sort_values(by="createdAt", ascending=True)
-                    startAt = df.createdAt.iloc[-1] + 1
-                    last_timestamp_check = startAt
-
-            if break_build:
-                break
+        return True
 
-            time.sleep(5)
-
-        df = df.drop_duplicates("id")
-        # Purge anything older than a month
-        if enable_purge:
-            df = df[df["createdAt"] > purgeAfter]
-        # Do final sort
-        if "createdAt" in df.columns:
-            df = df.sort_values(by="createdAt", ascending=True)
-            startAt = df.createdAt.iloc[-1] + 1
-        df = df.reset_index(drop=True)
-
-        # Remove json cache - and then recreate with latest data
-        if exists(self._cache_filepath):
-            os.remove(self._cache_filepath)
-        time.sleep(1)
-        df.to_json(self._cache_filepath, orient="records")
-        time.sleep(1)
-        # Delete Lock File
-        if exists(self._cache_lock_filepath):
-            os.remove(self._cache_lock_filepath)
-        return df
+    def _import_legacy_order_cache(self) -> None:
+        if self.validateJSONFile(self._cache_filepath):
+            self._order_cache.append(pd.read_json(self._cache_filepath))
+
+        for filepath in [self._cache_filepath, self._cache_lock_filepath]:
+            if exists(filepath):
+                os.remove(filepath)
 
     def auth_api(
         self,
@@ -781,11 +739,11 @@ class AuthAPI(AuthAPIBase):
                     symbol = None
 
                 if method == "DELETE":
-                    resp = requests.delete(self._api_url + uri, auth=self)
+                    resp = SessionPool.session(self._api_url).delete(self._api_url + uri, auth=self)
                 elif method == "GET":
-                    resp = requests.get(self._api_url + uri, auth=self)
+                    resp = SessionPool.session(self._api_url).get(self._api_url + uri, auth=self)
                 elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload, auth=self)
+                    resp = SessionPool.session(self._api_url).post(self._api_url + uri, json=payload, auth=self)
 
                 trycnt += 1
                 resp.raise_for_status()
@@ -831,17 +789,12 @@ class AuthAPI(AuthAPIBase):
                         if int(df["code"].values[0]) != 200000:
                             raise RuntimeError(df["msg"].iloc[0])
 
-                    # If a previous cache file exists - load it up into the df
-                    if use_order_cache and exists(self._cache_filepath) and "v1/orders" in uri and method == "GET":
-                        if exists(self._cache_lock_filepath):
-                            # Lock file exists - wait
-                            while exists(self._cache_lock_filepath):
-                                time.sleep(5)
-                        cache_df = pd.read_json(self._cache_filepath)
-                        df = df.append(cache_df)
-                        df = df.drop_duplicates("id")
-                    else:
-                        cache_df = None
+                    # add the cached orders of the market (or of every market)
+                    if use_order_cache and "v1/orders" in uri and method == "GET":
+                        cache_df = self._order_cache.read(symbol)
+                        if len(cache_df) > 0:
+                            df = pd.concat([df, cache_df])
+                            df = df.drop_duplicates("id")
 
                     if use_pagination:
                         # Get subsequent pages - if in original AuthAPI call
@@ -1148,9 +1101,9 @@ class PublicAPI(AuthAPIBase):
         while trycnt <= connretry:
             try:
                 if method == "GET":
-                    resp = requests.get(self._api_url + uri)
+                    resp = SessionPool.session(self._api_url).get(self._api_url + uri)
                 elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload)
+                    resp = SessionPool.session(self._api_url).post(self._api_url + uri, json=payload)
 
                 trycnt += 1
                 resp.raise_for_status()
@@ -1592,3 +1545,56 @@ class WebSocketClient(WebSocket):
             # print(json.dumps(msg, indent=4, sort_keys=True))
 
         self.message_count += 1
+
+
+class UserDataWebSocketClient(UserDataStream):
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        api_passphrase: str = "",
+        api_url: str = "https://api.kucoin.com",
+        app: object = None,
+        reconcile_interval: int = RECONCILE_INTERVAL,
+    ) -> None:
+        """Kucoin private channels, pushes the balances and orders of the account"""
+
+        super().__init__(app, reconcile_interval)
+
+        self.api = AuthAPI(api_key, api_secret, api_passphrase, api_url, app=app)
+
+    def get_url(self) -> str:
+        # POST /api/v1/bullet-private
+        api_url = self.api._api_url  # pylint: disable=protected-access
+        resp = SessionPool.session(api_url).post(api_url + "api/v1/bullet-private", auth=self.api, timeout=10)
+        resp.raise_for_status()
+
+        data = resp.json()["data"]
+        server = data["instanceServers"][0]
+
+        # the server expects a ping within pingInterval (ms)
+        self.keepalive_interval = max(1, int(server.get("pingInterval", 18000)) / 1000 / 2)
+
+        return f"{server['endpoint']}?token={data['token']}&connectId={int(time.time() * 1000)}"
+
+    def get_subscriptions(self) -> list:
+        return [
+            {"id": int(time.time() * 1000), "type": "subscribe", "topic": "/account/balance", "privateChannel": True, "response": True},
+            {"id": int(time.time() * 1000) + 1, "type": "subscribe", "topic": "/spotMarket/tradeOrders", "privateChannel": True, "response": True},
+        ]
+
+    def keepalive(self) -> None:
+        self.ws.send(json.dumps({"id": str(int(time.time() * 1000)), "type": "ping"}))
+
+    def on_message(self, msg: dict) -> None:
+        if msg.get("type") != "message":
+            return
+
+        data = msg.get("data", {})
+        if msg.get("topic") == "/account/balance":
+            # only the trade account, as get_accounts()
+            if str(data.get("relationEvent", "")).startswith("trade"):
+                self.state.update_balance(data["currency"], balance=data["total"], available=data["available"], holds=data["hold"])
+
+        elif msg.get("topic") == "/spotMarket/tradeOrders" and data.get("type") in ["match", "filled", "canceled"]:
+            self.state.invalidate_orders(data.get("symbol"))
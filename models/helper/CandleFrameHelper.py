@@ -0,0 +1,88 @@
+"""Memory use of the candle DataFrames, and converting them to their compact representation"""
+
+import pandas as pd
+
+# the same value on every row of a candle frame, stored once as a category instead of a string per row
+LABEL_COLUMNS = ["market", "granularity"]
+
+# the exchange data, kept as float64 so prices and volumes are exact
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# frames projected by memory_report(), the bots of a multi-market host and the candles of a long simulation
+REPORT_BOTS = 100
+REPORT_ROWS = 1000000
+
+
+def compact_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """The candles with the market and granularity columns as categoricals
+
+    A categorical stores the value once and an int8 code per row, ``df["market"].iloc[-1]`` is still the
+    string (or the number of seconds for the granularity) and comparisons with the value work as before.
+    """
+
+    if not isinstance(df, pd.DataFrame):
+        return df
+
+    columns = {column: "category" for column in LABEL_COLUMNS if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype)}
+    if len(columns) == 0:
+        return df
+    return df.astype(columns)
+
+
+def compact_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts the float64 indicator columns to float32 in place, the candle columns are not changed
+
+    Halves the size of the indicators for about seven significant digits, enough for the strategy's
+    comparisons but close crossovers of two averages may flip a candle earlier or later.
+    """
+
+    for column in df.columns:
+        if column not in OHLCV_COLUMNS and df[column].dtype == "float64":
+            df[column] = df[column].astype("float32")
+    return df
+
+
+def memory_usage(df: pd.DataFrame) -> dict:
+    """Bytes of the frame by group of columns: timestamps, labels, ohlcv, indicators, signals and other"""
+
+    usage = df.memory_usage(index=True, deep=True)
+    groups = {"timestamps": int(usage["Index"]), "labels": 0, "ohlcv": 0, "indicators": 0, "signals": 0, "other": 0}
+
+    for column in df.columns:
+        if column == "date":
+            group = "timestamps"
+        elif column in LABEL_COLUMNS:
+            group = "labels"
+        elif column in OHLCV_COLUMNS:
+            group = "ohlcv"
+        elif df[column].dtype.kind == "f":
+            group = "indicators"
+        elif df[column].dtype.kind == "b":
+            group = "signals"
+        else:
+            group = "other"
+        groups[group] += int(usage[column])
+
+    return groups
+
+
+def memory_report(df: pd.DataFrame, bots: int = REPORT_BOTS, rows: int = REPORT_ROWS) -> dict:
+    """Memory use of the frame and of ``bots`` frames like it and one frame of ``rows`` candles
+
+    The labels are projected from the frame's per row cost, which overstates the categoricals by their
+    categories but is exact for the per row strings.
+    """
+
+    groups = memory_usage(df)
+    total = sum(groups.values())
+    bytes_per_row = total / max(len(df), 1)
+
+    return {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "groups": groups,
+        "total_bytes": total,
+        "bytes_per_row": bytes_per_row,
+        "bots": {"count": bots, "total_bytes": total * bots},
+        "simulation": {"rows": rows, "total_bytes": int(bytes_per_row * rows)},
+    }
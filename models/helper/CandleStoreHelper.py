@@ -0,0 +1,230 @@
+"""Local candle store shared by all bots and simulations"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Callable
+
+from models.exchange.Granularity import Granularity
+from models.helper.FileLockHelper import file_lock
+
+CANDLE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("low", "<f8"),
+        ("high", "<f8"),
+        ("open", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+# candles per response of the exchanges, a full page may not be the whole range requested
+PAGE_CANDLES = 300
+
+
+class CandleStore:
+    """Closed candles per exchange/market/granularity as memory-mapped NumPy files
+
+    Each series is a sorted structured array (``<market>-<granularity>.npy``) and a json file with the
+    granularity value the exchange API returns and the date ranges that have already been fetched.
+    Empty responses are not recorded, an API error must not leave a permanent hole in the store.
+    The fetches are not locked, the files of a series are read, merged and written under an OS lock
+    on ``<market>-<granularity>.lock`` so the candles and ranges of another process are kept.
+    """
+
+    def __init__(self, exchange: str, market: str, granularity: Granularity, cache_path: str = "cache") -> None:
+        self.market = market
+        self.granularity = granularity
+
+        self._path = os.path.join(cache_path, "candles", str(exchange))
+        self._filepath = os.path.join(self._path, f"{market}-{granularity.to_integer}.npy")
+        self._meta_filepath = os.path.join(self._path, f"{market}-{granularity.to_integer}.json")
+        self._lock_filepath = os.path.join(self._path, f"{market}-{granularity.to_integer}.lock")
+
+    def get_historical_data(self, iso8601start: str, iso8601end: str, fetch: Callable[[str, str], pd.DataFrame]) -> pd.DataFrame:
+        """Returns the candles between the two dates, fetch(start, end) is only called for the missing ranges"""
+
+        start = pd.Timestamp(iso8601start).value
+        end = pd.Timestamp(iso8601end).value
+        step = self.granularity.to_integer * 10**9
+
+        meta = self._read_meta()
+        pending = self._gaps(meta["ranges"], start, end)
+        fetched = []
+        granularity = meta["granularity"]
+
+        while len(pending) > 0:
+            chunk_start, chunk_end = pending.pop(0)
+            df = fetch(self._to_iso8601(chunk_start), self._to_iso8601(chunk_end))
+            if granularity is None and len(df) > 0:
+                granularity = df["granularity"].iloc[0]
+                granularity = granularity.item() if isinstance(granularity, np.generic) else granularity
+
+            fetched.append((chunk_start, chunk_end, df))
+            pending += self._remainder(df, chunk_start, chunk_end)
+
+        if len(fetched) > 0:
+            # the live candle is still changing, only closed candles are stored
+            closed = pd.Timestamp.utcnow().tz_localize(None).value - step
+            candles = [self._to_array(df) for _, _, df in fetched]
+
+            with file_lock(self._lock_filepath):
+                # another process may have written the series since it was read
+                meta = self._read_meta()
+                if meta["granularity"] is None:
+                    meta["granularity"] = granularity
+
+                self._append(self._merge(candles), closed)
+
+                for chunk_candles, (chunk_start, chunk_end, _) in zip(candles, fetched):
+                    if len(chunk_candles) == 0:
+                        continue
+
+                    # a full page only covers the candles it returned, the rest of the chunk was requested again
+                    if len(chunk_candles) >= PAGE_CANDLES:
+                        chunk_start = max(chunk_start, chunk_candles["ts"].min())
+                        chunk_end = min(chunk_end, chunk_candles["ts"].max())
+                    meta["ranges"] = self._add_range(meta["ranges"], chunk_start, min(chunk_end, closed))
+
+                self._write_meta(meta)
+
+        candles = self._read()
+        candles = candles[np.searchsorted(candles["ts"], start, side="left") : np.searchsorted(candles["ts"], end, side="right")]
+        df = self._to_df(candles, meta["granularity"])
+
+        if len(fetched) > 0:
+            # keep the live candle from the exchange
+            frames = [frame for _, _, frame in fetched if len(frame) > 0]
+            df = pd.concat([df] + [frame[frame.index > df.index.max()] if len(df) > 0 else frame for frame in frames])
+            df = df[~df.index.duplicated(keep="last")].sort_index()
+
+        return df
+
+    @staticmethod
+    def _remainder(df: pd.DataFrame, start: int, end: int) -> list:
+        """The parts of the chunk a full page did not return, exchanges page from the oldest or the newest end"""
+
+        if len(df) < PAGE_CANDLES:
+            return []
+
+        dates = pd.DatetimeIndex(df["date"]).asi8
+        first, last = dates.min(), dates.max()
+
+        # each part is smaller than the chunk, an exchange that ignores the dates can not loop
+        remainder = []
+        if start < first < end:
+            remainder.append((start, int(first)))
+        if start < last < end:
+            remainder.append((int(last), end))
+        return remainder
+
+    @staticmethod
+    def _to_iso8601(value: int) -> str:
+        return pd.Timestamp(value).strftime("%Y-%m-%dT%H:%M:%S")
+
+    @staticmethod
+    def _gaps(ranges: list, start: int, end: int) -> list:
+        gaps = []
+        cursor = start
+
+        for range_start, range_end in ranges:
+            if range_end < cursor:
+                continue
+            if range_start > end:
+                break
+            if range_start > cursor:
+                gaps.append((cursor, range_start))
+            cursor = max(cursor, range_end)
+
+        if cursor < end:
+            gaps.append((cursor, end))
+
+        return gaps
+
+    @staticmethod
+    def _add_range(ranges: list, start: int, end: int) -> list:
+        if end <= start:
+            return ranges
+
+        merged = []
+        for range_start, range_end in sorted(ranges + [[start, end]]):
+            if len(merged) > 0 and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+
+        return merged
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._meta_filepath, "r", encoding="utf8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {"granularity": None, "ranges": []}
+
+    def _write_meta(self, meta: dict) -> None:
+        self._replace(self._meta_filepath, lambda fh: fh.write(json.dumps(meta).encode("utf8")))
+
+    def _read(self) -> np.ndarray:
+        try:
+            return np.load(self._filepath, mmap_mode="r")
+        except (OSError, ValueError):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+    def _append(self, candles: np.ndarray, closed: int) -> None:
+        # call with the lock held, the stored candles are read again
+        candles = candles[candles["ts"] <= closed]
+        if len(candles) == 0:
+            return
+
+        stored = np.array(self._read())
+        self._replace(self._filepath, lambda fh: np.save(fh, self._merge([stored, candles])))
+
+    def _replace(self, filepath: str, write: Callable) -> None:
+        # other bots may be reading the store, replace the file in one step
+        if not os.path.exists(self._path):
+            os.makedirs(self._path)
+
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "wb") as fh:
+            write(fh)
+        os.replace(tmp_filepath, filepath)
+
+    @staticmethod
+    def _merge(arrays: list) -> np.ndarray:
+        candles = np.concatenate(arrays)
+        # newest candle wins
+        _, index = np.unique(candles["ts"][::-1], return_index=True)
+        return candles[::-1][index]
+
+    @staticmethod
+    def _to_array(df: pd.DataFrame) -> np.ndarray:
+        candles = np.empty(len(df), dtype=CANDLE_DTYPE)
+        if len(df) == 0:
+            return candles
+
+        candles["ts"] = pd.DatetimeIndex(df["date"]).asi8
+        for column in ["low", "high", "open", "close", "volume"]:
+            candles[column] = df[column].to_numpy(dtype="float64")
+        return candles
+
+    def _to_df(self, candles: np.ndarray, granularity) -> pd.DataFrame:
+        tsidx = pd.DatetimeIndex(candles["ts"].astype("datetime64[ns]"), name="ts")
+
+        df = pd.DataFrame(
+            {
+                "date": tsidx,
+                "market": self.market,
+                "granularity": granularity,
+                "low": candles["low"],
+                "high": candles["high"],
+                "open": candles["open"],
+                "close": candles["close"],
+                "volume": candles["volume"],
+            },
+            index=tsidx,
+        )
+
+        return df
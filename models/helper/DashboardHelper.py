@@ -0,0 +1,189 @@
+"""Web GUI dashboard data shared by every callback and browser session"""
+
+import time
+import threading
+from datetime import datetime, timedelta
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from models.helper.StateStoreHelper import StateStore
+
+COLUMNS = [
+    "Uptime",
+    "Trading Pair",
+    "Exchange",
+    "Action",
+    "Current self.price",
+    "From DF High",
+    "DF High",
+    "Margin",
+    "Delta",
+    "TSLT",
+    "PVLT",
+    "ERI",
+    "BULL",
+    "EMA",
+    "MACD",
+    "OBV",
+    "Margincolor",
+]
+
+INDICATORS = ["BULL", "ERI", "EMA", "MACD", "OBV"]
+
+# the table (a DataFrame and its records), the sum of the active margins and of the closed trade margins of the last 7 days
+Snapshot = namedtuple("Snapshot", ["df", "records", "margin_current", "margin_7d_total"])
+
+
+def get_uptime(date: str) -> str:
+    """Bot instance uptime tracking"""
+    now = str(datetime.now())
+    # If date passed from datetime.now() remove milliseconds
+    if date.find(".") != -1:
+        dt = date.split(".")[0]
+        date = dt
+    if now.find(".") != -1:
+        dt = now.split(".")[0]
+        now = dt
+
+    now = now.replace("T", " ")
+    now = f"{now}"
+    # Add time in case only a date is passed in
+    date = date.replace("T", " ") if date.find("T") != -1 else date
+    # Add time in case only a date is passed in
+    new_date_str = f"{date} 00:00:00" if len(date) == 10 else date
+
+    started = datetime.strptime(new_date_str, "%Y-%m-%d %H:%M:%S")
+    now = datetime.strptime(now, "%Y-%m-%d %H:%M:%S")
+    duration = now - started
+    duration_in_s = duration.total_seconds()
+    hours = divmod(duration_in_s, 3600)[0]
+    duration_in_s -= 3600 * hours
+    minutes = divmod(duration_in_s, 60)[0]
+    return f"{round(hours)}h {round(minutes)}m"
+
+
+class Dashboard:
+    """Table rows of the active bots and the margin gauges, rebuilt only from what changed in the state store
+
+    The state store records when each bot and the data.json sections were last changed, a refresh reads
+    those times and parses only the bots that changed since the previous one. Refreshes are at most
+    ``refresh_interval`` seconds apart, every browser tab and callback gets the same snapshot.
+    """
+
+    def __init__(self, store: StateStore, refresh_interval: float = 2.0) -> None:
+        self.store = store
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._versions = {}
+        self._trades = {}
+        self._shared_version = None
+        self._snapshot = None
+        self._refreshed = 0.0
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._refreshed >= self.refresh_interval:
+                self._snapshot = self._refresh()
+                self._refreshed = time.monotonic()
+
+            return self._snapshot
+
+    def _refresh(self) -> Snapshot:
+        versions = self.store.versions("active")
+
+        for market in list(self._rows):
+            if market not in versions:
+                del self._rows[market]
+
+        for market, version in versions.items():
+            if self._versions.get(market) == version and market in self._rows:
+                continue
+
+            document = self.store.get_bot(market)
+            row = self._row(market, document) if document is not None else None
+            if row is None:
+                self._rows.pop(market, None)
+            else:
+                self._rows[market] = row
+
+        self._versions = versions
+
+        shared_version = self.store.shared_version()
+        if shared_version != self._shared_version:
+            self._trades = self.store.get_shared()["trades"]
+            self._shared_version = shared_version
+
+        rows = []
+        for row in self._rows.values():
+            # the uptime changes without the bot
+            rows.append({**row, "Uptime": get_uptime(row["Uptime"])})
+
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        if len(df) > 0:
+            df = df.sort_values(by="Action", ascending=[True], inplace=False, kind="stable")
+
+        return Snapshot(df, df.to_dict(orient="records"), float(df["Margin"].sum()) * 100, self._margin_7d_total())
+
+    def _margin_7d_total(self) -> float:
+        week = (datetime.now() + timedelta(-7)).isoformat()
+
+        margin_calculation = 0.0
+        for trade_datetime, trade in self._trades.items():
+            try:
+                if datetime.strptime(trade_datetime, "%Y-%m-%d %H:%M:%S").isoformat() > week:
+                    margin_calculation += float(trade["margin"][: trade["margin"].find("%")])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        return margin_calculation
+
+    @staticmethod
+    def _percent(value) -> float:
+        if not isinstance(value, str) or value.strip() == "":
+            return np.nan
+        try:
+            return float(value.rstrip("%")) * 0.01
+        except ValueError:
+            return np.nan
+
+    @classmethod
+    def _row(cls, market: str, data: dict) -> dict:
+        """Table row of a bot, the started time in Uptime, None if the bot has not sent its first update yet"""
+
+        try:
+            started = data["botcontrol"]["started"]
+            margin = data["margin"]
+            from_df_high = data["from_df_high"]
+            exchange = data["exchange"]
+            signal = data["signal"]
+            price = data["price"]
+        except (KeyError, TypeError):
+            return None
+
+        margincolor = None
+        if isinstance(margin, str) and "%" in margin:
+            margincolor = "#99413d" if "-" in margin else "#3D9970"
+        elif isinstance(from_df_high, str) and "%" in from_df_high:
+            margincolor = "#99413d" if "-" in from_df_high else "#3D9970"
+
+        indicators = data.get("indicators", {})
+
+        return {
+            "Uptime": started,
+            "Trading Pair": market,
+            "Exchange": exchange,
+            "Action": signal,
+            "Current self.price": price,
+            "From DF High": cls._percent(from_df_high),
+            "DF High": data.get("df_high", ""),
+            "Margin": cls._percent(margin),
+            "Delta": np.nan,
+            "TSLT": str(data.get("trailingstoplosstriggered", "")),
+            "PVLT": str(data.get("preventlosstriggered", "")),
+            **{indicator: str(indicators.get(indicator, "")) for indicator in INDICATORS},
+            "Margincolor": margincolor,
+        }
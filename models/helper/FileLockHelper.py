@@ -0,0 +1,42 @@
+"""Exclusive OS file locks shared between processes"""
+
+import os
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def file_lock(filepath: str):
+    """Holds an exclusive lock on the file (created if missing), blocks until it is free
+
+    The lock is released when the block exits or when its process ends.
+    """
+
+    if not os.path.exists(os.path.dirname(filepath) or "."):
+        os.makedirs(os.path.dirname(filepath))
+
+    with open(filepath, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            # msvcrt.LK_LOCK gives up after 10 seconds
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,201 @@
+"""Queued notifications written to the terminal, the log file and machine readable logs by a background thread"""
+
+import json
+import queue
+import atexit
+import threading
+from datetime import datetime
+from collections import namedtuple
+from typing import Callable, Union
+
+from rich.table import Table
+from rich.text import Text
+from rich.console import Console
+
+from models.helper.LogHelper import Logger
+
+# RichText.notify() levels, as the logging module levels
+LEVELS = {
+    "emergency": 60,
+    "alert": 55,
+    "critical": 50,
+    "error": 40,
+    "warning": 30,
+    "notice": 25,
+    "info": 20,
+    "normal": 20,
+    "debug": 10,
+}
+
+# date is the candle date of the tick lines, cells replace the default row (Bot1, date, market, granularity, message)
+LogRecord = namedtuple("LogRecord", ["time", "level", "market", "granularity", "message", "style", "date", "cells", "sinks"])
+
+
+class LogSink:
+    """Destination of the notifications at or above a level
+
+    The level is a logger level name ("INFO") or a function returning one, None disables the sink.
+    A function is called for every notification, e.g. the log file follows --nolog.
+    """
+
+    def __init__(self, level: Union[str, Callable[[], str]] = "DEBUG") -> None:
+        self._level = level
+
+    @property
+    def level(self) -> int:
+        level = self._level() if callable(self._level) else self._level
+        if level is None:
+            return None
+        return Logger.get_level(level)
+
+    def accepts(self, level: int) -> bool:
+        threshold = self.level
+        return threshold is not None and level >= threshold
+
+    def write(self, records: list) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RichSink(LogSink):
+    """The table rows printed by the bot so far, one table per batch"""
+
+    def __init__(self, console: Console, level: Union[str, Callable[[], str]] = "DEBUG") -> None:
+        super().__init__(level)
+        self.console = console
+
+    def write(self, records: list) -> None:
+        table = Table(title=None, box=None, show_header=False, show_footer=False)
+        for record in records:
+            if record.cells is not None:
+                table.add_row(*record.cells)
+            else:
+                table.add_row(
+                    Text("Bot1", style="magenta"),
+                    Text(record.date if record.date is not None else record.time.strftime("%Y-%m-%d %H:%M:%S"), style="white"),
+                    Text(record.market, style="yellow"),
+                    Text(record.granularity, style="yellow"),
+                    Text(record.message, style=record.style),
+                )
+        self.console.print(table)
+
+
+class StreamSink(LogSink):
+    """One line per notification, plain text or JSON lines"""
+
+    def __init__(self, stream, level: Union[str, Callable[[], str]] = "DEBUG", fmt: str = "json") -> None:
+        super().__init__(level)
+        if fmt not in ["json", "plain"]:
+            raise ValueError("fmt must be json or plain")
+
+        self.stream = stream
+        self.fmt = fmt
+
+    def write(self, records: list) -> None:
+        lines = []
+        for record in records:
+            if self.fmt == "json":
+                line = {
+                    "time": record.time.isoformat(timespec="milliseconds"),
+                    "level": record.level,
+                    "market": record.market,
+                    "granularity": record.granularity,
+                    "message": record.message,
+                }
+                if record.date is not None:
+                    line["date"] = record.date
+                lines.append(json.dumps(line))
+            else:
+                lines.append(
+                    f"{record.time.strftime('%Y-%m-%d %H:%M:%S')} {record.level.upper():<9} {record.market} {record.granularity} {record.message}"
+                )
+
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class LogPipeline:
+    """Notifications are filtered by level when they are sent, queued and written by one thread in batches
+
+    A notification below the level of every sink is dropped before anything is formatted. The writer thread
+    takes everything queued (up to ``batch_size``) and writes it to each sink at once.
+    """
+
+    def __init__(self, sinks: list = None, batch_size: int = 256) -> None:
+        self.sinks = sinks if sinks is not None else []
+        self.batch_size = batch_size
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def emit(
+        self,
+        level: str,
+        message: str,
+        market: str = "",
+        granularity: str = "",
+        style: str = None,
+        date: str = None,
+        cells: list = None,
+    ) -> bool:
+        """Queues the notification, False if no sink takes the level"""
+
+        sinks = tuple(sink for sink in self.sinks if sink.accepts(LEVELS[level]))
+        if len(sinks) == 0:
+            return False
+
+        self._start()
+        self._queue.put(LogRecord(datetime.today(), level, market, granularity, message, style, date, cells, sinks))
+        return True
+
+    def flush(self) -> None:
+        """Waits for the queued notifications to be written"""
+
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                # the writer is a daemon thread, the last notifications are written on exit
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for sink in self.sinks:
+                records = [record for record in batch if sink in record.sinks]
+                if len(records) == 0:
+                    continue
+
+                try:
+                    sink.write(records)
+                except Exception as err:  # pylint: disable=broad-except
+                    # a broken sink must not stop the others
+                    print(f"Log sink error: {err}")
+
+            for _ in batch:
+                self._queue.task_done()
@@ -0,0 +1,115 @@
+"""Last lines of growing log files, only the appended bytes are read again"""
+
+import os
+import threading
+from collections import deque
+
+# bytes read at a time when looking for the last lines
+BLOCK_SIZE = 64 * 1024
+
+# files followed at once, the least recently opened one is dropped
+MAX_ENTRIES = 16
+
+
+class LogTail:
+    """Last ``lines`` lines of a log file
+
+    The first read goes backwards from the end of the file one block at a time until it has the lines,
+    every later read starts at the offset the previous one stopped at. A file that was replaced (log
+    rotation) or truncated is read from its end again.
+    """
+
+    _entries = {}
+    _lock = threading.Lock()
+
+    def __init__(self, file_name: str, lines: int = 1000) -> None:
+        self.file_name = file_name
+        self.maxlines = lines
+
+        self._file_lock = threading.Lock()
+        self._lines = deque(maxlen=lines)
+        self._partial = b""
+        self._offset = 0
+        self._file_id = None
+
+    @classmethod
+    def get(cls, file_name: str, lines: int = 1000) -> "LogTail":
+        """The tail of the file shared by every caller"""
+
+        key = (os.path.abspath(file_name), lines)
+        with cls._lock:
+            if key not in cls._entries:
+                if len(cls._entries) >= MAX_ENTRIES:
+                    del cls._entries[next(iter(cls._entries))]
+                cls._entries[key] = cls(file_name, lines)
+            return cls._entries[key]
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries = {}
+
+    def tail(self) -> list:
+        """The last lines, the last one may still be written"""
+
+        with self._file_lock:
+            self._update()
+
+            lines = list(self._lines)
+            if len(self._partial) > 0:
+                lines.append(self._decode(self._partial))
+            return lines[-self.maxlines :]
+
+    def _update(self) -> None:
+        try:
+            with open(self.file_name, "rb") as log_file:
+                stat = os.fstat(log_file.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+
+                if file_id != self._file_id or stat.st_size < self._offset:
+                    # a new or rotated file
+                    self._file_id = file_id
+                    self._read_last_lines(log_file, stat.st_size)
+                elif stat.st_size > self._offset:
+                    log_file.seek(self._offset)
+                    self._append(log_file.read(stat.st_size - self._offset))
+                    self._offset = stat.st_size
+        except FileNotFoundError:
+            self._file_id = None
+            self._lines.clear()
+            self._partial = b""
+            self._offset = 0
+
+    def _read_last_lines(self, log_file, size: int) -> None:
+        self._lines.clear()
+        self._partial = b""
+
+        blocks = []
+        newlines = 0
+        position = size
+        # one more line break than lines, the first line of the blocks may be cut
+        while position > 0 and newlines <= self.maxlines:
+            length = min(BLOCK_SIZE, position)
+            position -= length
+            log_file.seek(position)
+            block = log_file.read(length)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+
+        data = b"".join(reversed(blocks))
+        if position > 0:
+            data = data[data.index(b"\n") + 1 :]
+
+        self._append(data)
+        self._offset = size
+
+    def _append(self, data: bytes) -> None:
+        data = self._partial + data
+        lines = data.split(b"\n")
+        # bytes after the last line break are kept until the line is complete
+        self._partial = lines.pop()
+        self._lines.extend(self._decode(line) for line in lines)
+
+    @staticmethod
+    def _decode(line: bytes) -> str:
+        return line.rstrip(b"\r").decode("utf8", errors="replace")
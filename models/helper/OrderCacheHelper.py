@@ -0,0 +1,182 @@
+"""Append-only order cache shared by the bots of an exchange account"""
+
+import io
+import os
+import json
+import time
+import shutil
+import threading
+import pandas as pd
+from datetime import datetime, timezone
+
+from models.helper.FileLockHelper import file_lock
+
+# a cache built less than this long ago is not built again
+REBUILD_INTERVAL = 21600
+
+# parsed partitions kept in memory, the most recent days, an older day is parsed again when it is read
+MAX_PARTITIONS = 1000
+
+
+class OrderCache:
+    """Orders in ``<path>/<market>/<YYYY-MM-DD>.jsonl``, one JSON line per order
+
+    New orders are appended to the partition of their market and creation day, an order that is already
+    cached is skipped, the history is never written again. A build holds an OS lock on ``<path>/.lock``:
+    the other processes wait for the lock (not polling) and then find the cache fresh, a lock is released
+    when its process ends. Readers do not lock, partitions only grow by whole lines, and keep the parsed
+    partitions of the most recent days in memory: a partition is parsed from the offset it had been read to.
+    """
+
+    # (partition path) -> {"size": bytes parsed, "orders": DataFrame}
+    _partitions = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path: str, rebuild_interval: int = REBUILD_INTERVAL) -> None:
+        self.path = path
+        self.rebuild_interval = rebuild_interval
+
+        self._state_filepath = os.path.join(path, "state.json")
+        self._lock_filepath = os.path.join(path, ".lock")
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+    @property
+    def cursor(self) -> int:
+        """Creation time (ms) to request the next orders from, None before the first build"""
+
+        return self._state().get("cursor")
+
+    def is_fresh(self) -> bool:
+        return time.time() - self._state().get("built", 0.0) < self.rebuild_interval
+
+    def lock(self):
+        """Exclusive build lock across processes, blocks until it is free"""
+
+        return file_lock(self._lock_filepath)
+
+    def append(self, orders: pd.DataFrame) -> int:
+        """Appends the orders that are not cached yet (call with the lock held), returns how many"""
+
+        if not isinstance(orders, pd.DataFrame) or len(orders) == 0 or not {"id", "symbol", "createdAt"}.issubset(orders.columns):
+            return 0
+
+        orders = orders.drop_duplicates("id", keep="last")
+        days = pd.to_datetime(orders["createdAt"], unit="ms", utc=True).dt.strftime("%Y-%m-%d")
+
+        count = 0
+        for (market, day), group in orders.groupby([orders["symbol"], days], sort=False):
+            filepath = os.path.join(self.path, str(market), f"{day}.jsonl")
+            cached = self._read_partition(filepath)
+            if len(cached) > 0:
+                group = group[~group["id"].isin(cached["id"])]
+            if len(group) == 0:
+                continue
+
+            if not os.path.exists(os.path.dirname(filepath)):
+                os.makedirs(os.path.dirname(filepath))
+
+            # one write of whole lines, a reader never parses half an order
+            lines = group.to_json(orient="records", lines=True).rstrip("\n") + "\n"
+            with open(filepath, "ab") as partition:
+                partition.write(lines.encode("utf8"))
+
+            count += len(group)
+
+        return count
+
+    def read(self, market: str = None) -> pd.DataFrame:
+        """Cached orders of the market (all markets if None), oldest first"""
+
+        markets = [market] if market is not None else sorted(self._markets())
+
+        frames = []
+        for name in markets:
+            folder = os.path.join(self.path, name)
+            if not os.path.isdir(folder):
+                continue
+            for partition in sorted(os.listdir(folder)):
+                if partition.endswith(".jsonl"):
+                    frames.append(self._read_partition(os.path.join(folder, partition)))
+
+        frames = [frame for frame in frames if len(frame) > 0]
+        if len(frames) == 0:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True).drop_duplicates("id", keep="last")
+        return df.sort_values(by="createdAt", ascending=True, kind="stable").reset_index(drop=True)
+
+    def purge(self, before: int) -> None:
+        """Removes the days before the creation time (ms)"""
+
+        first_day = datetime.fromtimestamp(before / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        for name in self._markets():
+            folder = os.path.join(self.path, name)
+            for partition in os.listdir(folder):
+                if partition.endswith(".jsonl") and partition[: -len(".jsonl")] < first_day:
+                    filepath = os.path.join(folder, partition)
+                    os.remove(filepath)
+                    with OrderCache._lock:
+                        OrderCache._partitions.pop(filepath, None)
+            if len(os.listdir(folder)) == 0:
+                shutil.rmtree(folder, ignore_errors=True)
+
+    def mark_built(self, cursor: int) -> None:
+        """Records a complete build, the next one requests the orders from the cursor"""
+
+        tmp_filepath = f"{self._state_filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "w", encoding="utf8") as state_file:
+            json.dump({"cursor": int(cursor), "built": time.time()}, state_file)
+        os.replace(tmp_filepath, self._state_filepath)
+
+    def _markets(self) -> list:
+        return [name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name))]
+
+    def _state(self) -> dict:
+        try:
+            with open(self._state_filepath, "r", encoding="utf8") as state_file:
+                state = json.load(state_file)
+            if isinstance(state, dict):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _read_partition(self, filepath: str) -> pd.DataFrame:
+        with OrderCache._lock:
+            entry = OrderCache._partitions.get(filepath)
+
+            try:
+                size = os.path.getsize(filepath)
+            except OSError:
+                OrderCache._partitions.pop(filepath, None)
+                return pd.DataFrame()
+
+            if entry is None or size < entry["size"]:
+                # new, or purged and written again
+                entry = {"size": 0, "orders": pd.DataFrame()}
+
+            if size > entry["size"]:
+                with open(filepath, "rb") as partition:
+                    partition.seek(entry["size"])
+                    data = partition.read(size - entry["size"])
+
+                # only whole lines, the rest is parsed once it is complete
+                data = data[: data.rfind(b"\n") + 1]
+                if len(data) > 0:
+                    orders = pd.read_json(io.BytesIO(data), orient="records", lines=True, dtype=False, convert_dates=False)
+                    entry = {
+                        "size": entry["size"] + len(data),
+                        "orders": pd.concat([entry["orders"], orders], ignore_index=True) if len(entry["orders"]) > 0 else orders,
+                    }
+
+            OrderCache._partitions[filepath] = entry
+
+            if len(OrderCache._partitions) > MAX_PARTITIONS:
+                # the oldest days first, they are complete and read the least
+                by_day = sorted(OrderCache._partitions, key=lambda path: (os.path.basename(path), path))
+                for path in by_day[: len(OrderCache._partitions) - MAX_PARTITIONS]:
+                    del OrderCache._partitions[path]
+
+            return entry["orders"]
@@ -0,0 +1,112 @@
+"""Local order history cache shared by all exchanges"""
+
+import os
+import time
+import pickle
+import threading
+import pandas as pd
+from typing import Callable
+
+# orders that were still open when the cursor moved past them are picked up by a full sync
+FULL_SYNC_INTERVAL = 21600
+
+
+class OrderHistory:
+    """Completed orders per exchange/market, kept in memory and in ``cache/orders/<exchange>/<market>.pkl``
+
+    The cursor is the creation time of the newest cached order. Every call requests the orders created
+    from the cursor onwards and replaces the cached orders from that second, the full history is only
+    requested when there is no cache yet or the last full sync is older than ``full_sync_interval``.
+    A failed or empty full sync keeps the cached orders, the exchange APIs return an empty DataFrame on errors.
+    """
+
+    _entries = {}
+    _lock = threading.Lock()
+
+    def __init__(self, exchange: str, market: str, cache_path: str = "cache", full_sync_interval: int = FULL_SYNC_INTERVAL) -> None:
+        self.exchange = str(exchange)
+        self.market = market
+        self.full_sync_interval = full_sync_interval
+
+        self._path = os.path.join(cache_path, "orders", self.exchange)
+        self._filepath = os.path.join(self._path, f"{market}.pkl")
+
+    @property
+    def cursor(self) -> str:
+        """Creation time of the newest cached order (ISO 8601, seconds), None without a cache"""
+
+        return self._entry()["cursor"]
+
+    def get_orders(self, fetch: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """Returns the completed orders, fetch(iso8601start) returns the orders created from iso8601start ("" for all)"""
+
+        with OrderHistory._lock:
+            entry = self._entry()
+            full_sync = entry["cursor"] is None or time.time() - entry["synced"] >= self.full_sync_interval
+
+            df = fetch("" if full_sync else entry["cursor"])
+            if not isinstance(df, pd.DataFrame):
+                # e.g. "Invalid market." from Binance
+                return df
+
+            if len(df) > 0 and "created_at" in df:
+                if full_sync:
+                    orders = df
+                else:
+                    cached = entry["orders"]
+                    cursor = pd.Timestamp(entry["cursor"], tz="UTC")
+                    # the Kucoin order cache ignores the start time
+                    orders = pd.concat([cached[self._created_at(cached) < cursor], df[self._created_at(df) >= cursor]])
+
+                orders = orders.iloc[self._created_at(orders).argsort(kind="stable")].reset_index(drop=True)
+                entry = {
+                    "cursor": self._created_at(orders).max().floor("s").strftime("%Y-%m-%dT%H:%M:%S"),
+                    "synced": time.time() if full_sync else entry["synced"],
+                    "orders": orders,
+                }
+                self._write(entry)
+            elif full_sync and entry["cursor"] is None:
+                return df
+
+            return entry["orders"].copy()
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forgets the orders held in memory, the cache files are read again"""
+
+        with cls._lock:
+            cls._entries = {}
+
+    @staticmethod
+    def _created_at(df: pd.DataFrame) -> pd.Series:
+        # the exchanges return naive and UTC timestamps
+        return pd.to_datetime(df["created_at"], utc=True)
+
+    def _entry(self) -> dict:
+        key = (self.exchange, self.market)
+        if key not in OrderHistory._entries:
+            OrderHistory._entries[key] = self._read()
+        return OrderHistory._entries[key]
+
+    def _read(self) -> dict:
+        try:
+            with open(self._filepath, "rb") as fh:
+                entry = pickle.load(fh)
+            if isinstance(entry, dict) and isinstance(entry.get("orders"), pd.DataFrame):
+                return entry
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            pass
+
+        return {"cursor": None, "synced": 0.0, "orders": pd.DataFrame()}
+
+    def _write(self, entry: dict) -> None:
+        OrderHistory._entries[(self.exchange, self.market)] = entry
+
+        # other bots may be reading the cache, replace the file in one step
+        if not os.path.exists(self._path):
+            os.makedirs(self._path)
+
+        tmp_filepath = f"{self._filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "wb") as fh:
+            pickle.dump(entry, fh)
+        os.replace(tmp_filepath, self._filepath)
@@ -0,0 +1,99 @@
+"""Coarser candles derived locally from a finer candle series"""
+
+import numpy as np
+import pandas as pd
+
+from models.exchange.Granularity import Granularity
+from models.helper.CandleFrameHelper import compact_candles
+
+CANDLE_COLUMNS = ["date", "market", "granularity", "low", "high", "open", "close", "volume"]
+
+
+def can_resample(base: Granularity, granularity: Granularity) -> bool:
+    """True if the candles of granularity are made of whole base candles"""
+
+    return granularity.to_integer > base.to_integer and granularity.to_integer % base.to_integer == 0
+
+
+def resample(df: pd.DataFrame, granularity: Granularity) -> pd.DataFrame:
+    """Aggregates the candles of df into granularity candles
+
+    The buckets start at multiples of the granularity since the epoch (UTC), as the exchange candles do.
+    A first bucket that starts before df is incomplete and dropped, the last bucket may be the live candle.
+    """
+
+    if len(df) == 0:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    base_value = df["granularity"].iloc[0]
+    base = Granularity.convert_to_enum(base_value)
+    if not can_resample(base, granularity):
+        raise ValueError(f"{base.to_short} candles can not be resampled to {granularity.to_short}")
+
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values(by="date", kind="stable")
+
+    dates = pd.DatetimeIndex(df["date"])
+    buckets = dates.floor(f"{granularity.to_integer}S").asi8
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    if buckets[0] != dates.asi8[0]:
+        starts = starts[1:]
+        if len(starts) == 0:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    first = starts[0]
+    ends = np.r_[starts[1:], len(df)] - 1
+    tsidx = pd.DatetimeIndex(buckets[starts], name="ts")
+
+    resampled = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": df["market"].iloc[0],
+            "granularity": _granularity_value(base_value, base, granularity),
+            "low": np.minimum.reduceat(df["low"].to_numpy(dtype=float)[first:], starts - first),
+            "high": np.maximum.reduceat(df["high"].to_numpy(dtype=float)[first:], starts - first),
+            "open": df["open"].to_numpy(dtype=float)[starts],
+            "close": df["close"].to_numpy(dtype=float)[ends],
+            "volume": np.add.reduceat(df["volume"].to_numpy(dtype=float)[first:], starts - first),
+        },
+        index=tsidx,
+    )
+    return compact_candles(resampled)
+
+
+def _granularity_value(value, base: Granularity, granularity: Granularity):
+    # the granularity column in the format of the exchange, e.g. 3600 or "1h"
+    if value == base.to_short:
+        return granularity.to_short
+    if value == base.to_medium:
+        return granularity.to_medium
+    return granularity.to_integer
+
+
+class Resampler:
+    """Candles of one granularity kept up to date from a finer base series
+
+    The frame starts with the candles from the exchange (the history before the base series), every update
+    rebuilds the candles from the last one held onwards with the base candles, the rest is left as it is.
+    With ``max_candles`` only that many of the latest candles are kept, as a live bot runs for months.
+    """
+
+    def __init__(self, granularity: Granularity, df: pd.DataFrame = None, max_candles: int = None) -> None:
+        self.granularity = granularity
+        self.max_candles = max_candles
+        self.df = df[CANDLE_COLUMNS] if isinstance(df, pd.DataFrame) and len(df) > 0 else pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    def update(self, df_base: pd.DataFrame) -> pd.DataFrame:
+        """Adds the base candles and returns the candles"""
+
+        if len(self.df) > 0:
+            df_base = df_base[df_base["date"] >= self.df["date"].iloc[-1]]
+
+        resampled = resample(df_base, self.granularity)
+        if len(resampled) > 0:
+            self.df = pd.concat([self.df[self.df["date"] < resampled["date"].iloc[0]], resampled])
+            if self.max_candles is not None and len(self.df) > self.max_candles:
+                self.df = self.df.iloc[-self.max_candles :]
+
+        return self.df
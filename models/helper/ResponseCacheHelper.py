@@ -0,0 +1,171 @@
+"""Values that stay valid until the next candle closes, computed once for concurrent callers"""
+
+import time
+import threading
+from typing import Any, Callable, Hashable, Union
+
+from models.exchange.Granularity import Granularity
+
+# seconds after a candle closed before it is requested from the exchange
+SETTLE_SECONDS = 3
+
+# candle entries viewed within this many seconds are refreshed in the background when they expire
+REFRESH_WINDOW = 1800
+
+# entries kept at once, the least recently viewed one is dropped
+MAX_ENTRIES = 256
+
+
+def next_candle_close(granularity: Union[Granularity, int], now: float) -> float:
+    """Time the candle open at ``now`` closes, candles start at multiples of the granularity since the epoch"""
+
+    seconds = granularity.to_integer if isinstance(granularity, Granularity) else int(granularity)
+    return (int(now // seconds) + 1) * seconds
+
+
+class _Entry:
+    def __init__(self, value: Any, expires: float, viewed: float, compute: Callable, granularity) -> None:
+        self.value = value
+        self.expires = expires
+        self.viewed = viewed
+        self.compute = compute
+        self.granularity = granularity
+
+
+class _Flight:
+    """A computation other callers of the same key wait for"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """Computed values by key, e.g. the analysis of (exchange, market, granularity)
+
+    A value computed for a granularity expires when the current candle closes, any other value after
+    ``ttl`` seconds. Concurrent callers of a key that is not cached wait for one computation. With
+    ``refresh`` a background thread computes the candle values viewed in the last ``refresh_window``
+    seconds again shortly after the candle closed, the next view is served from the cache.
+    """
+
+    def __init__(self, refresh: bool = True, refresh_window: int = REFRESH_WINDOW, clock: Callable[[], float] = time.time) -> None:
+        self.refresh = refresh
+        self.refresh_window = refresh_window
+        self.clock = clock
+
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._refresher = None
+
+    def get(self, key: Hashable, compute: Callable[[], Any], granularity: Union[Granularity, int] = None, ttl: float = 60) -> Any:
+        """The cached value of the key, ``compute()`` if it has expired"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() < entry.expires:
+                entry.viewed = self.clock()
+                return entry.value
+
+        value = self._load(key, compute, granularity, ttl)
+
+        if self.refresh and granularity is not None:
+            self._start_refresher()
+            self._wakeup.set()
+
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+    def _load(self, key: Hashable, compute: Callable[[], Any], granularity, ttl: float, viewed: bool = True) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # the data is as old as the start of the computation, one that spans a candle close expires at once
+            started = self.clock()
+            flight.value = compute()
+            now = self.clock()
+            expires = next_candle_close(granularity, started) if granularity is not None else started + ttl
+
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                # a background refresh is not a view
+                last_viewed = now if viewed or previous is None else previous.viewed
+                self._entries[key] = _Entry(flight.value, expires, last_viewed, compute, granularity)
+
+                while len(self._entries) > MAX_ENTRIES:
+                    oldest = min(self._entries, key=lambda name: self._entries[name].viewed)
+                    del self._entries[oldest]
+
+            return flight.value
+
+        except Exception as err:
+            flight.error = err
+            raise
+
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _start_refresher(self) -> None:
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="response-cache-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            due, wait = self._due()
+            for key, entry in due:
+                try:
+                    self._load(key, entry.compute, entry.granularity, 0, viewed=False)
+                except Exception:
+                    # computed again by the next view
+                    with self._lock:
+                        if self._entries.get(key) is entry:
+                            del self._entries[key]
+
+            if len(due) == 0:
+                self._wakeup.wait(wait)
+
+    def _due(self) -> tuple:
+        """The entries to compute again now and the seconds until the next one is due"""
+
+        now = self.clock()
+        due = []
+        wait = self.refresh_window
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.granularity is None:
+                    continue
+
+                refresh_at = entry.expires + SETTLE_SECONDS
+                if now - entry.viewed >= self.refresh_window:
+                    # no longer viewed, dropped once it has expired
+                    if now >= entry.expires:
+                        del self._entries[key]
+                elif now >= refresh_at:
+                    due.append((key, entry))
+                else:
+                    wait = min(wait, refresh_at - now)
+
+        return due, wait
@@ -0,0 +1,144 @@
+"""Seasonal ARIMA models fitted on a worker pool, once per candle and warm started from the previous candle"""
+
+import warnings
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from pandas import DatetimeIndex, Period, Series
+
+# the price prediction model, SARIMAX(0,1,0)(1,1,1,12)
+ORDER = (0, 1, 0)
+SEASONAL_ORDER = (1, 1, 1, 12)
+
+# threads fitting models at once
+WORKERS = 2
+
+# markets and granularities a model is kept for, the least recently fitted one is dropped
+MAX_MODELS = 64
+
+
+def to_periods(close: Series, granularity: str) -> Series:
+    """The closing prices indexed by candle periods, as SARIMAX requires a frequency"""
+
+    if not isinstance(close.index, DatetimeIndex) or close.index.freq:
+        return close
+
+    freq = str(granularity).replace("m", "T").replace("h", "H").replace("d", "D")
+    if freq.isdigit():
+        freq += "S"
+
+    close = close.copy()
+    close.index = close.index.to_period(freq)
+    return close
+
+
+class SeasonalArima:
+    """Fitted models by (market, granularity)
+
+    A model is fitted once per last candle, the callers of the same candle share the fit. When a candle has
+    closed the model is fitted to the new window starting from the parameters of the previous candle's
+    model, which converges in a few iterations instead of a cold fit's dozens. Fits run on a thread
+    pool: ``submit()`` returns a future, ``fitted()`` never waits.
+    """
+
+    # (market, granularity) -> (candle, results)
+    _models = {}
+    # (market, granularity, candle) -> Future
+    _fits = {}
+    _lock = threading.Lock()
+    _executor = None
+
+    @classmethod
+    def submit(cls, close: Series, market: str = "", granularity: str = "") -> Future:
+        """Future of the model fitted to the closing prices, the last index is the candle"""
+
+        key = (market, str(granularity))
+        candle = cls._candle(close)
+
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is not None and model[0] == candle:
+                future = Future()
+                future.set_result(model[1])
+                return future
+
+            future = cls._fits.get(key + (candle,))
+            if future is not None:
+                return future
+
+            start_params = model[1].params if model is not None else None
+            future = cls._pool().submit(cls._run, key, candle, close.copy(), start_params)
+            cls._fits[key + (candle,)] = future
+
+        return future
+
+    @classmethod
+    def fit(cls, close: Series, market: str = "", granularity: str = "", timeout: float = None):
+        """The fitted model, waits for the fit"""
+
+        return cls.submit(close, market, granularity).result(timeout)
+
+    @classmethod
+    def fitted(cls, close: Series, market: str = "", granularity: str = ""):
+        """The model of the candle if it is fitted, otherwise starts the fit and returns None"""
+
+        future = cls.submit(close, market, granularity)
+        if future.done() and future.exception() is None:
+            return future.result()
+        return None
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._models = {}
+
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="sarimax")
+        return cls._executor
+
+    @staticmethod
+    def _candle(close: Series) -> tuple:
+        # the close of the open candle changes, its model is fitted on the first call
+        if len(close) == 0:
+            return (None, 0)
+
+        last = close.index[-1]
+        if isinstance(last, Period):
+            last = last.to_timestamp()
+        return (last, len(close))
+
+    @staticmethod
+    def _fit(close: Series, start_params=None):
+        # statsmodels takes over a second to import, only bots that predict load it
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+        warnings.simplefilter("ignore", ConvergenceWarning)
+
+        model = SARIMAX(close, trend="n", order=ORDER, seasonal_order=SEASONAL_ORDER)
+        return model.fit(disp=-1, start_params=start_params)
+
+    @classmethod
+    def _run(cls, key: tuple, candle: tuple, close: Series, start_params):
+        # the model is kept before the future is done, a caller that waited finds it
+        try:
+            results = cls._fit(close, start_params)
+        except Exception:
+            with cls._lock:
+                cls._fits.pop(key + (candle,), None)
+            raise
+
+        with cls._lock:
+            cls._fits.pop(key + (candle,), None)
+
+            # a graph of older candles does not replace the model of the latest candle
+            model = cls._models.get(key)
+            if model is None or model[0][0] is None or candle[0] is None or not candle[0] < model[0][0]:
+                cls._models.pop(key, None)
+                cls._models[key] = (candle, results)
+                while len(cls._models) > MAX_MODELS:
+                    del cls._models[next(iter(cls._models))]
+
+        return results
@@ -0,0 +1,169 @@
+"""Imports loaded on first use and the time the bot takes to start"""
+
+import sys
+import time
+import importlib
+import threading
+import contextlib
+
+from rich import box
+from rich.table import Table
+from rich.console import Console
+
+# modules listed in the report, the slowest first
+REPORT_ROWS = 25
+
+
+class LazyImport:
+    """``name`` of ``module``, imported the first time it is called or one of its attributes is read
+
+    Stands in for ``from module import name`` when only some configurations use the name, e.g. the
+    exchange clients: a Binance bot never loads the Coinbase or Kucoin clients.
+    """
+
+    def __init__(self, module: str, name: str) -> None:
+        self._module = module
+        self._name = name
+        self._target = None
+
+    @property
+    def target(self):
+        if self._target is None:
+            self._target = getattr(importlib.import_module(self._module), self._name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.target(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # only attributes that are not set in __init__ get here
+        return getattr(self.target, name)
+
+    def __repr__(self) -> str:
+        return f"<LazyImport {self._module}.{self._name}>"
+
+
+class _TimingFinder:
+    """Meta path finder timing the modules the other finders load, installed first on sys.meta_path"""
+
+    def __init__(self, profile: "StartupProfile") -> None:
+        self.profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            loader = spec.loader
+            # builtin and frozen modules are loaded by the importer classes, they are not timed
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+                try:
+                    loader.exec_module = self.profile._timed(fullname, loader.exec_module)
+                except AttributeError:
+                    pass
+            return spec
+
+        return None
+
+    def invalidate_caches(self) -> None:
+        pass
+
+
+class StartupProfile:
+    """Import time of every module (with and without the modules it imports) and duration of the startup steps
+
+    Started before the bot is imported for the complete picture (``--profile-startup`` on the command line),
+    only the modules loaded by the imports in the current thread are timed.
+    """
+
+    _active = None
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.imports = {}  # module -> [total seconds, own seconds]
+        self.steps = []  # (name, seconds)
+
+        self._thread = threading.get_ident()
+        self._stack = []
+        self._finder = _TimingFinder(self)
+
+    @classmethod
+    def start(cls) -> "StartupProfile":
+        """Times the imports from now on, a profile that is already running is returned"""
+
+        if cls._active is None:
+            cls._active = cls()
+            sys.meta_path.insert(0, cls._active._finder)
+        return cls._active
+
+    @classmethod
+    def active(cls) -> "StartupProfile":
+        return cls._active
+
+    @classmethod
+    def stop(cls) -> "StartupProfile":
+        profile = cls._active
+        if profile is not None:
+            if profile._finder in sys.meta_path:
+                sys.meta_path.remove(profile._finder)
+            cls._active = None
+        return profile
+
+    @classmethod
+    @contextlib.contextmanager
+    def step(cls, name: str):
+        """Times a startup step, does nothing when no profile is running"""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if cls._active is not None:
+                cls._active.steps.append((name, time.perf_counter() - start))
+
+    @classmethod
+    def report(cls, console: Console = None, rows: int = REPORT_ROWS) -> None:
+        """Stops the profile and prints the slowest imports and the steps"""
+
+        profile = cls.stop()
+        if profile is None:
+            return
+
+        console = console or Console()
+        total = time.perf_counter() - profile.started
+
+        table = Table(title=f"Startup profile ({total:.3f}s)", box=box.SIMPLE)
+        table.add_column("Module / step", justify="left", no_wrap=True)
+        table.add_column("Total (s)", justify="right")
+        table.add_column("Self (s)", justify="right")
+
+        for name, (inclusive, own) in sorted(profile.imports.items(), key=lambda item: item[1][0], reverse=True)[:rows]:
+            table.add_row(name, f"{inclusive:.3f}", f"{own:.3f}")
+
+        table.add_section()
+        for name, seconds in profile.steps:
+            table.add_row(f"[bold]{name}[/bold]", f"{seconds:.3f}", "")
+
+        console.print(table)
+
+    def _timed(self, fullname: str, exec_module):
+        def timed_exec_module(module):
+            if threading.get_ident() != self._thread:
+                return exec_module(module)
+
+            # the time of the nested imports is subtracted from the importing module's own time
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return exec_module(module)
+            finally:
+                inclusive = time.perf_counter() - start
+                nested = self._stack.pop()
+                self.imports[fullname] = [inclusive, max(inclusive - nested, 0.0)]
+                if len(self._stack) > 0:
+                    self._stack[-1] += inclusive
+
+        return timed_exec_module
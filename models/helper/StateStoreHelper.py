@@ -0,0 +1,346 @@
+"""Bot control and telegram data shared by the bots and the telegram bot"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import contextlib
+from datetime import datetime
+from typing import Callable
+
+# the sections of data.json
+SECTIONS = ["trades", "markets", "scannerexceptions", "opentrades"]
+
+# json files in telegram_data that are not bots
+NOT_BOTS = ["data.json", "settings.json"]
+
+_DELETED = object()
+
+
+class StateStore:
+    """Bot documents and the data.json sections in ``<datafolder>/telegram_data/state.db``
+
+    A bot is one row, its JSON document next to the indexed columns the bot lists are queried on, each
+    data.json section entry (a trade, a market, ...) is one row. The database is in WAL mode so readers
+    never wait for a writer, every change is one short transaction: update_bot() reads and writes the
+    document in the same transaction and merge_bot()/merge_shared() only write what was changed since
+    the document was read. The json files of an existing telegram_data folder are imported once,
+    with ``export_json`` they are written again after every change for the tools that read them.
+    """
+
+    _stores = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path: str, export_json: bool = False) -> None:
+        self.path = path
+        self.export_json = export_json
+
+        self._filepath = os.path.join(path, "state.db")
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS bots (market TEXT PRIMARY KEY, exchange TEXT, status TEXT, startmethod TEXT, margin TEXT,"
+                " started REAL, watchdog_ping REAL, updated REAL NOT NULL, document TEXT NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS bots_status ON bots (status)")
+            db.execute("CREATE INDEX IF NOT EXISTS bots_exchange ON bots (exchange)")
+            db.execute("CREATE TABLE IF NOT EXISTS shared (section TEXT, key TEXT, value TEXT NOT NULL, PRIMARY KEY (section, key))")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            if db.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone() is None:
+                self._import_json(db)
+                db.execute("INSERT INTO meta (key, value) VALUES ('imported', ?)", (datetime.now().isoformat(),))
+
+    @classmethod
+    def open(cls, datafolder: str, export_json: bool = False) -> "StateStore":
+        """The store of the data folder, one per process"""
+
+        path = os.path.abspath(os.path.join(datafolder, "telegram_data"))
+        with cls._lock:
+            # a removed data folder starts again, a forked process (a multi market bot) opens its own
+            if path not in cls._stores or cls._stores[path]._pid != os.getpid() or not os.path.isfile(cls._stores[path]._filepath):
+                cls._stores[path] = cls(path, export_json)
+            store = cls._stores[path]
+
+        store.export_json = store.export_json or export_json
+        return store
+
+    def get_bot(self, market: str) -> dict:
+        """The document of the bot, None if it is not running"""
+
+        row = self._connection().execute("SELECT document FROM bots WHERE market = ?", (market,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put_bot(self, market: str, document: dict) -> None:
+        with self._transaction() as db:
+            self._write_bot(db, market, document)
+
+    def update_bot(self, market: str, update: Callable[[dict], None]) -> dict:
+        """Changes the document of a running bot in place, returns it (None if the bot is not running)"""
+
+        with self._transaction() as db:
+            row = db.execute("SELECT document FROM bots WHERE market = ?", (market,)).fetchone()
+            if row is None:
+                return None
+
+            document = json.loads(row[0])
+            update(document)
+            self._write_bot(db, market, document)
+            return document
+
+    def merge_bot(self, market: str, before: dict, after: dict) -> None:
+        """Writes the changes from before to after into the current document of the bot"""
+
+        changes = _changes(before, after)
+        if len(changes) == 0:
+            return
+
+        with self._transaction() as db:
+            row = db.execute("SELECT document FROM bots WHERE market = ?", (market,)).fetchone()
+            document = json.loads(row[0]) if row is not None else {}
+            for path, value in changes:
+                _apply(document, path, value)
+            self._write_bot(db, market, document)
+
+    def delete_bot(self, market: str) -> None:
+        with self._transaction() as db:
+            db.execute("DELETE FROM bots WHERE market = ?", (market,))
+
+        if self.export_json:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.path, f"{market}.json"))
+
+    def last_updated(self, market: str) -> float:
+        """Time of the last change of the bot (seconds since the epoch), None if it is not running"""
+
+        row = self._connection().execute("SELECT updated FROM bots WHERE market = ?", (market,)).fetchone()
+        return row[0] if row is not None else None
+
+    def bots(self, status: str = None, exchange: str = None, startmethod: str = None, open_trade: bool = False) -> list:
+        """Sorted markets of the running bots, a document without the field is not filtered out"""
+
+        where, params = self._filter(status, exchange, startmethod, open_trade)
+        return [row[0] for row in self._connection().execute(f"SELECT market FROM bots{where} ORDER BY market", params)]
+
+    def versions(self, status: str = None) -> dict:
+        """Time of the last change of each running bot (filtered as bots()), a changed bot has a new time"""
+
+        where, params = self._filter(status)
+        return dict(self._connection().execute(f"SELECT market, updated FROM bots{where}", params).fetchall())
+
+    def shared_version(self) -> float:
+        """Time of the last change of the data.json sections"""
+
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'shared_updated'").fetchone()
+        return float(row[0]) if row is not None else 0.0
+
+    def hung_bots(self, status: str = "active", ping_timeout: int = 600, start_timeout: int = 300) -> list:
+        """Sorted markets of the bots that are not in the status or have not sent a watchdog ping in time"""
+
+        now = time.time()
+        sql = (
+            "SELECT market FROM bots WHERE status IS NULL OR NOT (status = ? AND"
+            " ((watchdog_ping IS NOT NULL AND watchdog_ping > ?) OR (watchdog_ping IS NULL AND started > ?))) ORDER BY market"
+        )
+        return [row[0] for row in self._connection().execute(sql, (status, now - ping_timeout, now - start_timeout))]
+
+    def get_shared(self) -> dict:
+        """The data.json document"""
+
+        document = {section: {} for section in SECTIONS}
+        for section, key, value in self._connection().execute("SELECT section, key, value FROM shared ORDER BY rowid"):
+            document.setdefault(section, {})[key] = json.loads(value)
+        return document
+
+    def set_shared(self, section: str, key: str, value, replace: bool = True) -> None:
+        with self._transaction() as db:
+            verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+            db.execute(f"{verb} INTO shared (section, key, value) VALUES (?, ?, ?)", (section, key, json.dumps(value)))
+            self._shared_changed(db)
+
+    def delete_shared(self, section: str, key: str) -> None:
+        with self._transaction() as db:
+            db.execute("DELETE FROM shared WHERE section = ? AND key = ?", (section, key))
+            self._shared_changed(db)
+
+    def merge_shared(self, before: dict, after: dict) -> None:
+        """Writes the changes from before to after into the current data.json sections"""
+
+        changes = _changes(before, after)
+        if len(changes) == 0:
+            return
+
+        with self._transaction() as db:
+            for path, value in changes:
+                section = path[0]
+                if len(path) == 1:
+                    # a whole section
+                    db.execute("DELETE FROM shared WHERE section = ?", (section,))
+                    if isinstance(value, dict):
+                        db.executemany(
+                            "INSERT INTO shared (section, key, value) VALUES (?, ?, ?)",
+                            [(section, key, json.dumps(item)) for key, item in value.items()],
+                        )
+                    continue
+
+                key = path[1]
+                if len(path) > 2:
+                    row = db.execute("SELECT value FROM shared WHERE section = ? AND key = ?", (section, key)).fetchone()
+                    item = json.loads(row[0]) if row is not None else {}
+                    _apply(item, path[2:], value)
+                    value = item
+
+                if value is _DELETED:
+                    db.execute("DELETE FROM shared WHERE section = ? AND key = ?", (section, key))
+                else:
+                    db.execute("INSERT OR REPLACE INTO shared (section, key, value) VALUES (?, ?, ?)", (section, key, json.dumps(value)))
+
+            self._shared_changed(db)
+
+    @staticmethod
+    def _filter(status: str = None, exchange: str = None, startmethod: str = None, open_trade: bool = False) -> tuple:
+        where, params = [], []
+        for column, value in [("status", status), ("exchange", exchange), ("startmethod", startmethod)]:
+            if value is not None:
+                where.append(f"({column} IS NULL OR {column} = ?)")
+                params.append(value)
+
+        if open_trade:
+            where.append("(status IS NULL OR margin IS NULL OR margin != ' ')")
+
+        return (" WHERE " + " AND ".join(where) if len(where) > 0 else ""), params
+
+    def export(self) -> None:
+        """Writes every bot and data.json as json files"""
+
+        db = self._connection()
+        for market, document in db.execute("SELECT market, document FROM bots"):
+            self._write_json(f"{market}.json", json.loads(document))
+        self._write_json("data.json", self.get_shared())
+
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per thread, the telegram bot answers in several threads
+        db = getattr(self._local, "db", None)
+        # sqlite connections can not be used across a fork, the forked process connects again
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self._filepath, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        db = self._connection()
+        # takes the write lock at the start, a read-modify-write can not interleave with another writer
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _write_bot(self, db: sqlite3.Connection, market: str, document: dict) -> None:
+        botcontrol = document.get("botcontrol", {}) if isinstance(document.get("botcontrol"), dict) else {}
+        db.execute(
+            "INSERT OR REPLACE INTO bots (market, exchange, status, startmethod, margin, started, watchdog_ping, updated, document)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                market,
+                document.get("exchange"),
+                botcontrol.get("status"),
+                botcontrol.get("startmethod"),
+                document.get("margin") if isinstance(document.get("margin"), str) else None,
+                _timestamp(botcontrol.get("started")),
+                _timestamp(botcontrol.get("watchdog_ping")),
+                time.time(),
+                json.dumps(document),
+            ),
+        )
+
+        if self.export_json:
+            self._write_json(f"{market}.json", document)
+
+    def _shared_changed(self, db: sqlite3.Connection) -> None:
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('shared_updated', ?)", (repr(time.time()),))
+
+        if self.export_json:
+            document = {section: {} for section in SECTIONS}
+            for section, key, value in db.execute("SELECT section, key, value FROM shared ORDER BY rowid"):
+                document.setdefault(section, {})[key] = json.loads(value)
+            self._write_json("data.json", document)
+
+    def _write_json(self, name: str, document: dict) -> None:
+        # readers never see a partly written file
+        filepath = os.path.join(self.path, name)
+        tmp_filepath = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_filepath, "w", encoding="utf8") as outfile:
+            json.dump(document, outfile, indent=4)
+        os.replace(tmp_filepath, filepath)
+
+    def _import_json(self, db: sqlite3.Connection) -> None:
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith(".json") or name in NOT_BOTS or name.endswith("output.json"):
+                continue
+
+            document = _read_json(os.path.join(self.path, name))
+            if isinstance(document, dict):
+                self._write_bot(db, name[: -len(".json")], document)
+
+        document = _read_json(os.path.join(self.path, "data.json"))
+        if isinstance(document, dict):
+            for section, items in document.items():
+                if isinstance(items, dict):
+                    db.executemany(
+                        "INSERT OR REPLACE INTO shared (section, key, value) VALUES (?, ?, ?)",
+                        [(section, key, json.dumps(item)) for key, item in items.items()],
+                    )
+
+
+def _read_json(filepath: str):
+    try:
+        with open(filepath, "r", encoding="utf8") as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _timestamp(value) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _changes(before: dict, after: dict, path: tuple = ()) -> list:
+    # (path, value) of every change, nested dictionaries are compared key by key
+    changes = []
+    for key in list(before) + [key for key in after if key not in before]:
+        if key not in after:
+            changes.append((path + (key,), _DELETED))
+        elif key not in before or before[key] != after[key]:
+            if isinstance(before.get(key), dict) and isinstance(after[key], dict):
+                changes.extend(_changes(before[key], after[key], path + (key,)))
+            else:
+                changes.append((path + (key,), after[key]))
+    return changes
+
+
+def _apply(document: dict, path: tuple, value) -> None:
+    for key in path[:-1]:
+        if not isinstance(document.get(key), dict):
+            document[key] = {}
+        document = document[key]
+
+    if value is _DELETED:
+        document.pop(path[-1], None)
+    else:
+        document[path[-1]] = value
@@ -1,11 +1,8 @@
-from json.decoder import JSONDecodeError
 import os
-import json
-from time import sleep
 from datetime import datetime
 
 from pandas.core.frame import DataFrame
-from views.PyCryptoBot import RichText
+from models.helper.StateStoreHelper import StateStore
 
 
 class TelegramBotHelper:
@@ -18,53 +15,18 @@ class TelegramBotHelper:
         self.botfolder = "telegram_data"
         self.botpath = os.path.join(self.app.telegramdatafolder, self.botfolder, self.market)
         self.filename = self.market + ".json"
+        self.data = {}
 
         if not self.app.is_sim and self.app.telegrambotcontrol and not scanner:
-            if not os.path.exists(self.botfolder):
-                os.makedirs(self.botfolder)
-
-            self.data = {}
-
-            if not os.path.exists(os.path.join(self.app.telegramdatafolder, "telegram_data")):
-                os.mkdir(os.path.join(self.app.telegramdatafolder, "telegram_data"))
-
-            if os.path.isfile(os.path.join(self.app.telegramdatafolder, "telegram_data", self.filename)):
-                if not self._read_data():
-                    self.create_bot_data()
-            else:
+            if not self._read_data():
                 self.create_bot_data()
 
-            if os.path.isfile(os.path.join(self.app.telegramdatafolder, "telegram_data", "data.json")):
-
-                write_ok, try_count = False, 0
-                while not write_ok and try_count <= 5:
-                    try_count += 1
-                    self._read_data("data.json")
-                    write_ok = True
-                    if "markets" not in self.data:
-                        self.data.update({"markets": {}})
-                        write_ok = self._write_data("data.json")
-                    if "scannerexceptions" not in self.data:
-                        self.data.update({"scannerexceptions": {}})
-                        write_ok = self._write_data("data.json")
-                    if "opentrades" not in self.data:
-                        self.data.update({"opentrades": {}})
-                        write_ok = self._write_data("data.json")
-            else:
-                write_ok, try_count = False, 0
-                while not write_ok and try_count <= 5:
-                    try_count += 1
-                    ds = {
-                        "trades": {},
-                        "markets": {},
-                        "scannerexceptions": {},
-                        "opentrades": {},
-                    }
-                    self.data = ds
-                    write_ok = self._write_data("data.json")
+    @property
+    def store(self) -> StateStore:
+        return StateStore.open(self.app.telegramdatafolder, self.app.telegramjsonexport)
 
     def create_bot_data(self):
-        """Create pair.json file"""
+        """Create the bot control document of the market"""
         ds = {
             "botcontrol": {
                 "status": "active",
@@ -86,48 +48,27 @@ class TelegramBotHelper:
         self.data = ds
         self._write_data()
 
-    def _read_data(self, name: str = "") -> bool:
-        file = self.filename if name == "" else name
-
-        read_ok, try_count = False, 0
-        while not read_ok and try_count <= 5:
-            try_count += 1
-            try:
-                with open(
-                    os.path.join(self.app.telegramdatafolder, "telegram_data", file),
-                    "r",
-                    encoding="utf8",
-                ) as json_file:
-                    self.data = json.load(json_file)
-                read_ok = True
-            except FileNotFoundError:
-                RichText.notify("File Not Found:  Recreating File..", self.app, "warning")
-                self.create_bot_data()
-            except JSONDecodeError:
-                if len(self.data) > 0:
-                    RichText.notify("JSON Decode Error: Recreating File..", self.app, "warning")
-                    if name == "":
-                        self._write_data()
-                else:
-                    RichText.notify("JSON Decode Error: Removing File..", self.app, "warning")
-                    if name == "":
-                        self.remove_active_bot()
-        return read_ok
-
-    def _write_data(self, name: str = "") -> bool:
-        file = self.filename if name == "" else name
-        try:
-            with open(
-                os.path.join(self.app.telegramdatafolder, "telegram_data", file),
-                "w",
-                encoding="utf8",
-            ) as outfile:
-                json.dump(self.data, outfile, indent=4)
-            return True
-        except JSONDecodeError as err:
-            RichText.notify(str(err), self.app, "critical")
+    def _read_data(self) -> bool:
+        data = self.store.get_bot(self.market)
+        if data is None:
+            return False
+
+        self.data = data
+        return True
+
+    def _write_data(self) -> bool:
+        self.store.put_bot(self.market, self.data)
+        return True
+
+    def _update_data(self, update) -> bool:
+        """Changes the document of the bot in one transaction, False if the bot was removed"""
+        data = self.store.update_bot(self.market, update)
+        if data is None:
             return False
 
+        self.data = data
+        return True
+
     def add_margin(
         self,
         margin: str = "",
@@ -137,7 +78,8 @@ class TelegramBotHelper:
         signal="WAIT",
     ):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            if self._read_data():
+
+            def update(data: dict) -> None:
                 addmarket = {
                     "exchange": self.exchange.value,
                     "signal": signal,
@@ -147,30 +89,32 @@ class TelegramBotHelper:
                     "df_high": " ",
                     "from_df_high": " ",
                     "trailingstoplosstriggered": float(margin.replace("%", "")) > self.app.trailing_stop_loss_trigger
-                    if "trailingstoplosstriggered" in self.data and self.data["trailingstoplosstriggered"] is False
+                    if "trailingstoplosstriggered" in data and data["trailingstoplosstriggered"] is False
                     else True,
-                    "change_pcnt_high": change_pcnt_high
-                    if "trailingstoplosstriggered" in self.data and self.data["trailingstoplosstriggered"] is True
-                    else 0.0,
+                    "change_pcnt_high": change_pcnt_high if "trailingstoplosstriggered" in data and data["trailingstoplosstriggered"] is True else 0.0,
                 }
 
                 if self.app.preventloss:
-                    self.data.update(
+                    data.update(
                         {
                             "preventlosstriggered": float(margin.replace("%", "")) > self.app.preventlosstrigger
-                            if "preventlosstriggered" in self.data and self.data["preventlosstriggered"] is False
+                            if "preventlosstriggered" in data and data["preventlosstriggered"] is False
                             else True
                         }
                     )
 
-                self.data.update(addmarket)
-                self._write_data()
+                data.update(addmarket)
+
+            self._update_data(update)
 
     def update_watch_dog_ping(self):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            if self._read_data() and "botcontrol" in self.data:
-                self.data["botcontrol"]["watchdog_ping"] = datetime.now().isoformat()
-                self._write_data()
+
+            def update(data: dict) -> None:
+                if "botcontrol" in data:
+                    data["botcontrol"]["watchdog_ping"] = datetime.now().isoformat()
+
+            self._update_data(update)
 
     def add_info(
         self,
@@ -181,65 +125,47 @@ class TelegramBotHelper:
         signal="WAIT",
     ) -> None:
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            if self._read_data():
-                addmarket = {
-                    "signal": signal,
-                    "message": message,
-                    "margin": " ",
-                    "delta": " ",
-                    "price": price,
-                    "exchange": self.exchange.value,
-                    "df_high": df_high,
-                    "from_df_high": from_df_high,
-                }
-                self.data.update(addmarket)
-                self._write_data()
+            addmarket = {
+                "signal": signal,
+                "message": message,
+                "margin": " ",
+                "delta": " ",
+                "price": price,
+                "exchange": self.exchange.value,
+                "df_high": df_high,
+                "from_df_high": from_df_high,
+            }
+            self._update_data(lambda data: data.update(addmarket))
 
     def add_indicators(self, indicator, state) -> None:
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            if self._read_data():
-                if "indicators" not in self.data:
-                    self.data.update({"indicators": {}})
-
-                self.data["indicators"].update({indicator: state})
-                self._write_data()
+            self._update_data(lambda data: data.setdefault("indicators", {}).update({indicator: state}))
 
     def delete_margin(self):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            try:
-                os.remove(os.path.join(self.app.telegramdatafolder, "telegram_data", self.filename))
-            except FileNotFoundError:
-                pass
+            self.store.delete_bot(self.market)
 
     def close_trade(self, ts, price, margin):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            write_ok, try_count = False, 0
-            while not write_ok and try_count <= 5:
-                try_count += 1
-                self._read_data("data.json")
-                self.data["trades"].update({ts: {"pair": self.market, "price": price, "margin": margin}})
-                write_ok = self._write_data("data.json")
-                if not write_ok:
-                    sleep(1)
-                    continue
-                self.remove_open_order()
+            self.store.set_shared("trades", ts, {"pair": self.market, "price": price, "margin": margin})
+            self.remove_open_order()
 
     def check_manual_buy_sell(self) -> str:
         result = "WAIT"
 
-        if self._read_data() and "botcontrol" in self.data:
-            if len(self.data["botcontrol"]) > 0:
-                if self.data["botcontrol"]["manualsell"]:
-                    self.data["botcontrol"]["manualsell"] = False
+        def update(data: dict) -> None:
+            nonlocal result
+            # the flags are cleared in the transaction that reads them, a request is never lost or run twice
+            if len(data.get("botcontrol", {})) > 0:
+                if data["botcontrol"]["manualsell"]:
+                    data["botcontrol"]["manualsell"] = False
                     result = "SELL"
-                    self._write_data()
 
-            if len(self.data["botcontrol"]) > 0:
-                if self.data["botcontrol"]["manualbuy"]:
-                    self.data["botcontrol"]["manualbuy"] = False
+                if data["botcontrol"]["manualbuy"]:
+                    data["botcontrol"]["manualbuy"] = False
                     result = "BUY"
-                    self._write_data()
 
+        self._update_data(update)
         return result
 
     def check_bot_control_status(self) -> str:
@@ -252,10 +178,12 @@ class TelegramBotHelper:
 
     def update_bot_status(self, status) -> None:
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            if self._read_data() and "botcontrol" in self.data:
-                if not self.data["botcontrol"]["status"] == status:
-                    self.data["botcontrol"]["status"] = status
-                    self._write_data()
+
+            def update(data: dict) -> None:
+                if "botcontrol" in data:
+                    data["botcontrol"]["status"] = status
+
+            self._update_data(update)
 
     def remove_active_bot(self) -> None:
         if not self.app.is_sim and self.app.telegrambotcontrol:
@@ -298,29 +226,9 @@ class TelegramBotHelper:
 
     def add_open_order(self):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            write_ok, try_count = False, 0
-            while not write_ok and try_count <= 5:
-                try_count += 1
-                self._read_data("data.json")
-                if self.market in self.data["opentrades"]:
-                    if self.exchange != self.data["opentrades"][self.market]:
-                        return
-                self.data["opentrades"].update({self.market: {"exchange": self.exchange.value}})
-                write_ok = self._write_data("data.json")
-                if not write_ok:
-                    sleep(1)
+            # an open trade of the market on another exchange is kept
+            self.store.set_shared("opentrades", self.market, {"exchange": self.exchange.value}, replace=False)
 
     def remove_open_order(self):
         if not self.app.is_sim and self.app.telegrambotcontrol:
-            write_ok, try_count = False, 0
-            while not write_ok and try_count <= 5:
-                try_count += 1
-                self._read_data("data.json")
-
-                if self.market not in self.data["opentrades"]:
-                    return
-
-                self.data["opentrades"].pop(self.market)
-                write_ok = self._write_data("data.json")
-                if not write_ok:
-                    sleep(1)
+            self.store.delete_shared("opentrades", self.market)
@@ -205,7 +205,7 @@ class TelegramActions:
 
             output = output + f"\U0001F4C8 <b>{file} ({self.helper.data['exchange']})</b> "
 
-            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self.helper.datafolder, "telegram_data", f"{file}.json")))
+            last_modified = datetime.now() - datetime.fromtimestamp(self.helper.store.last_updated(file) or datetime.now().timestamp())
             icon = "\U0001F6D1"  # red dot
             if last_modified.seconds > 90 and last_modified.seconds != 86399:
                 output = f"{output} {icon} <b>Status</b>: <i>defaulted</i>"
@@ -376,7 +376,7 @@ class TelegramActions:
             ex = self.helper.get_running_bot_exchange(file)
             self.helper.stop_running_bot(file, "exit", True)
             sleep(3)
-            os.remove(os.path.join(self.helper.datafolder, "telegram_data", f"{file}.json"))
+            self.helper.store.delete_bot(file)
             sleep(1)
 
             if bool(self.helper.settings["notifications"]["enable_screener"]):
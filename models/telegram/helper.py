@@ -1,13 +1,11 @@
 """ Telegram Bot Helper """
 import os
+import copy
 import platform
 import subprocess
 import json
 import logging
 
-# from time import sleep
-from json.decoder import JSONDecodeError
-
 # from time import sleep
 from datetime import datetime
 from typing import List
@@ -16,6 +14,8 @@ import telegram
 from telegram.ext import Updater
 from telegram.ext.callbackcontext import CallbackContext
 
+from models.helper.StateStoreHelper import StateStore
+
 if not os.path.exists(os.path.join(os.curdir, "telegram_logs")):
     os.mkdir(os.path.join(os.curdir, "telegram_logs"))
 
@@ -25,6 +25,7 @@ class TelegramHelper:
 
     def __init__(self, configfile="config.json", logfileprefix="telegrambot", test_run: bool = False) -> None:
         self.data = {}
+        self._snapshot = (None, {})
         self.config_file = configfile
         self.screener = {}
         self.settings = {}
@@ -147,10 +148,17 @@ class TelegramHelper:
 
         self.datafolder = os.curdir
         self.logger_level = "INFO"
+        self.jsonexport = False
 
         if "telegram" in self.config:
             self.datafolder = self.config["telegram"]["datafolder"] if "datafolder" in self.config["telegram"] else os.curdir
             self.logger_level = self.config["telegram"]["logger_level"] if "logger_level" in self.config["telegram"] else "INFO"
+            self.jsonexport = bool(self.config["telegram"]["jsonexport"]) if "jsonexport" in self.config["telegram"] else False
+
+    @property
+    def store(self) -> StateStore:
+        """Bot control and data.json, the data folder can be changed after the config is loaded"""
+        return StateStore.open(self.datafolder, self.jsonexport)
 
     def send_telegram_message(
         self,
@@ -186,45 +194,38 @@ class TelegramHelper:
             )
 
     def read_data(self, name: str = "data.json") -> bool:
-        """Read data from json file"""
+        """Read data.json or the bot control of a market"""
         fname = name if name.__contains__(".json") else f"{name}.json"
         # self.logger.debug("METHOD(read_data) - DATA(%s)", fname)
-        read_ok, try_count = False, 0
-        while not read_ok and try_count <= 20:
-            try_count += 1
-            try:
-                self.data = {}
-                with open(
-                    os.path.join(self.datafolder, "telegram_data", fname),
-                    "r",
-                    encoding="utf8",
-                ) as json_file:
-                    self.data = json.load(json_file)
-                read_ok = True
-            except FileNotFoundError:
-                if try_count == 20:
-                    self.logger.error("File Not Found {%s}", fname)
-            except JSONDecodeError:
-                if try_count == 20:
-                    self.logger.error("Unable to read file {%s}", fname)
-
-        return read_ok
-
-    def write_data(self, name: str = "data.json") -> None:
-        """Write data to json file"""
+        if fname == "data.json":
+            self.data = self.store.get_shared()
+            # write_data() only writes what was changed since
+            self._snapshot = (fname, copy.deepcopy(self.data))
+            # the store always has data.json, even before anything is saved in it
+            return True
+
+        self.data = self.store.get_bot(fname.replace(".json", ""))
+        if self.data is None:
+            self.data = {}
+            self.logger.error("File Not Found {%s}", fname)
+            return False
+
+        self._snapshot = (fname, copy.deepcopy(self.data))
+        return True
+
+    def write_data(self, name: str = "data.json") -> bool:
+        """Write the changes made to the data read by read_data()"""
         fname = name if name.__contains__(".json") else f"{name}.json"
         self.logger.debug("METHOD(write_data) - DATA(%s)", fname)
-        try:
-            with open(
-                os.path.join(self.datafolder, "telegram_data", fname),
-                "w",
-                encoding="utf8",
-            ) as outfile:
-                json.dump(self.data, outfile, indent=4)
-                return True
-        except JSONDecodeError as err:
-            self.logger.error(err)
-            return False
+
+        before = self._snapshot[1] if self._snapshot[0] == fname else {}
+        if fname == "data.json":
+            self.store.merge_shared(before, self.data)
+        else:
+            self.store.merge_bot(fname.replace(".json", ""), before, self.data)
+
+        self._snapshot = (fname, copy.deepcopy(self.data))
+        return True
 
     def read_config(self):
         """Read config file"""
@@ -276,136 +277,41 @@ class TelegramHelper:
             return
 
     def get_all_bot_list(self) -> List[str]:
-        """Return ALL contents of telegram_data folder"""
+        """Return ALL running bots"""
         self.logger.debug("METHOD(get_all_bot_list)")
-        jsonfiles = sorted(os.listdir(os.path.join(self.datafolder, "telegram_data")))
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            if jsonfiles[i] == "data.json" or jsonfiles[i].__contains__("output.json") or jsonfiles[i].__contains__(".csv") or jsonfiles[i] == "settings.json":
-                jsonfiles.pop(i)
-            else:
-                read_ok = self.read_data(jsonfiles[i])
-                if not read_ok:
-                    jsonfiles.pop(i)
-            i -= 1
-        jsonfiles.sort()
-        return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        return self.store.bots()
 
     def get_active_bot_list(self, state: str = "active") -> List[str]:
-        """Return contents of telegram_data folder"""
+        """Return the running bots in the state"""
         self.logger.debug("METHOD(get_active_bot_list) - DATA(%s)", state)
-        jsonfiles = self.get_all_bot_list()
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
-                jsonfiles.pop(i)
-                i -= 1
-                continue
-            if "botcontrol" in self.data:
-                if not self.data["botcontrol"]["status"] == state:
-                    jsonfiles.pop(i)
-            i -= 1
-        jsonfiles.sort()
-        return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        return self.store.bots(status=state)
 
     def get_active_bot_list_with_open_orders(self, state: str = "active") -> List[str]:
-        """Return contents of telegram_data folder active bots with an open order"""
+        """Return the running bots with an open order"""
         self.logger.debug("METHOD(get_active_bot_list_with_open_orders) - DATA(%s)", state)
-        jsonfiles = self.get_all_bot_list()
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
-                jsonfiles.pop(i)
-                i -= 1
-                continue
-            if "botcontrol" in self.data:
-                if self.data["margin"] == " ":
-                    jsonfiles.pop(i)
-            i -= 1
-        jsonfiles.sort()
-        return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        return self.store.bots(open_trade=True)
 
     def get_hung_bot_list(self, state: str = "active") -> List[str]:
-        """Return contents of telegram_data folder - working out which are hung bots"""
+        """Return the running bots that are not in the state or have stopped sending watchdog pings"""
         self.logger.debug("METHOD(get_hung_bot_list) - DATA(%s)", state)
-        jsonfiles = self.get_all_bot_list()
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
-                jsonfiles.pop(i)
-                i -= 1
-                continue
-            elif "botcontrol" in self.data:
-                if "watchdog_ping" in self.data["botcontrol"]:
-                    last_ping = datetime.strptime(self.data["botcontrol"]["watchdog_ping"], "%Y-%m-%dT%H:%M:%S.%f")
-                    current_dt = datetime.now()
-                    ping_delta = int((current_dt - last_ping).total_seconds())
-                    if self.data["botcontrol"]["status"] == state and ping_delta < 600:
-                        jsonfiles.pop(i)
-                else:
-                    start_time = datetime.strptime(self.data["botcontrol"]["started"], "%Y-%m-%dT%H:%M:%S.%f")
-                    current_dt = datetime.now()
-                    start_delta = int((current_dt - start_time).total_seconds())
-                    if self.data["botcontrol"]["status"] == state and start_delta < 300:
-                        jsonfiles.pop(i)
-            i -= 1
-        jsonfiles.sort()
-        return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        return self.store.hung_bots(state)
 
     def get_manual_started_bot_list(self, _startmethod: str = "telegram") -> List[str]:
-        """Return contents of telegram_data folder"""
+        """Return the running bots started by the start method"""
         self.logger.debug("METHOD(get_manual_started_bot_list) - DATA(%s)", _startmethod)
-        jsonfiles = self.get_all_bot_list()
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
-                jsonfiles.pop(i)
-                i -= 1
-                continue
-            if "botcontrol" in self.data:
-                if not self.data["botcontrol"]["startmethod"] == _startmethod:
-                    jsonfiles.pop(i)
-            i -= 1
-        jsonfiles.sort()
-        return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        return self.store.bots(startmethod=_startmethod)
 
     def get_exchange_bot_runing_count(self, exchange):
-        """Return contents of telegram_data folder"""
+        """Return the number of bots running on the exchange"""
         self.logger.debug("METHOD(get_exchange_bot_ruuning_count) - DATA(%s)", exchange)
-        jsonfiles = self.get_all_bot_list()
-
-        i = len(jsonfiles) - 1
-        while i >= 0:
-            read_ok = self.read_data(jsonfiles[i])
-            if not read_ok:
-                jsonfiles.pop(i)
-                i -= 1
-                continue
-            if "exchange" in self.data:
-                if not self.data["exchange"] == exchange:
-                    jsonfiles.pop(i)
-            i -= 1
-        # jsonfiles.sort()
-        # jsonfiles.count()
-        self.logger.debug("METHOD(get_exchange_bot_ruuning_count) - RETURN(%s)", len(jsonfiles))
-        return len(jsonfiles)
+        count = len(self.store.bots(exchange=exchange))
+        self.logger.debug("METHOD(get_exchange_bot_ruuning_count) - RETURN(%s)", count)
+        return count
 
     def is_bot_running(self, pair) -> bool:
-        """Check is bot running (pair.json file exists)"""
+        """Check is bot running (it has bot control)"""
         self.logger.debug("METHOD(is_bot_running) - DATA(%s)", pair)
-        if os.path.isfile(os.path.join(self.datafolder, "telegram_data", f"{pair}.json")):
-            return True
-
-        return False
+        return self.store.last_updated(pair) is not None
 
     def get_running_bot_exchange(self, pair) -> str:
         """Get bots exchange"""
@@ -473,17 +379,19 @@ class TelegramHelper:
         return True
 
     def update_bot_control(self, pair, status) -> bool:
-        """used to update bot json files for controlling state"""
+        """used to update bot control for controlling state"""
         self.logger.debug("METHOD(update_bot_control) - DATA(%s, %s)", pair, status)
-        read_ok = self.read_data(pair)
-        if not read_ok:
+
+        def update(data: dict) -> None:
+            if "botcontrol" in data:
+                data["botcontrol"]["status"] = status
+
+        data = self.store.update_bot(pair, update)
+        if data is None:
             self.logger.warning("update_bot_control for %s unable to read file", pair)
-        elif "botcontrol" in self.data:
-            self.data["botcontrol"]["status"] = status
-            self.write_data(pair)
-            return True
+            return False
 
-        return False
+        return "botcontrol" in data
 
     def stop_running_bot(self, pair, state, is_open: bool = False) -> bool:
         """Stop current running bots"""
@@ -511,16 +419,16 @@ class TelegramHelper:
 
             self.read_data(jfile)
 
-            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json")))
+            last_modified = datetime.now() - datetime.fromtimestamp(self.store.last_updated(jfile) or datetime.now().timestamp())
             if "margin" not in self.data:
                 self.logger.info("deleting %s", jfile)
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                self.store.delete_bot(jfile)
                 continue
             if self.data["botcontrol"]["status"] == "active" and last_modified.seconds > 120 and (last_modified.seconds != 86399 and last_modified.days != -1):
                 self.logger.info("deleting %s %s", jfile, str(last_modified))
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                self.store.delete_bot(jfile)
                 continue
             elif self.data["botcontrol"]["status"] == "exit" and last_modified.seconds > 120 and last_modified.seconds != 86399:
                 self.logger.info("deleting %s %s", jfile, str(last_modified.seconds))
-                os.remove(os.path.join(self.datafolder, "telegram_data", f"{jfile}.json"))
+                self.store.delete_bot(jfile)
         self.logger.debug("cleandata complete")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+"""Monte-Carlo and walk-forward simulation samples
+
+    python3 montecarlo.py --exchange binance --market BTCGBP --granularity 1h --simstartdate 2021-01-01 --simenddate 2022-12-31 --samples 500
+
+The bot arguments and config select the candle history and the strategy, every sample simulates a window of it.
+"""
+
+import sys
+import time
+import argparse
+from rich.console import Console
+from rich.table import Table
+
+from controllers.PyCryptoBot import PyCryptoBot
+from controllers.MonteCarlo import MonteCarlo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monte-Carlo simulation samples, the other arguments are passed to the bot")
+    parser.add_argument("--samples", type=int, default=100, help="random windows to simulate")
+    parser.add_argument("--walkforward", type=int, default=None, help="simulate a window every N candles instead of random windows")
+    parser.add_argument("--window", type=int, default=None, help="candles per window, defaults to adjusttotalperiods")
+    parser.add_argument("--seed", type=int, default=None, help="random seed of the windows")
+    parser.add_argument("--processes", type=int, default=None, help="simulations in parallel, defaults to the number of CPUs")
+    parser.add_argument("--output", type=str, default="montecarlo.csv", help="the metrics of every sample")
+    args, _ = parser.parse_known_args()
+
+    app = PyCryptoBot()
+    montecarlo = MonteCarlo(app, samples=args.samples, window=args.window, walkforward=args.walkforward, seed=args.seed)
+
+    start = time.perf_counter()
+    df = montecarlo.run(args.processes)
+    elapsed = time.perf_counter() - start
+
+    df.to_csv(args.output, index=False)
+
+    distribution = montecarlo.distribution(df)
+    table = Table(title=f"Monte-Carlo: {app.market} ({app.print_granularity()}), {len(df)} windows of {montecarlo.window} candles")
+    table.add_column("metric")
+    for column in distribution.columns:
+        table.add_column(column, justify="right")
+    for metric, row in distribution.iterrows():
+        table.add_row(metric, *[f"{value:.4f}" for value in row])
+
+    console = Console()
+    console.print(table)
+    if "error" in df:
+        console.print(f"{int(df['error'].notna().sum())} samples failed, see {args.output}")
+    console.print(f"{len(df)} samples in {elapsed:.1f}s, results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    if sys.version_info < (3, 6, 0):
+        sys.stderr.write("You need python 3.6 or higher to run this script\n")
+        exit(1)
+
+    main()
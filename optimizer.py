@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+"""Parameter sweep over simulations
+
+    python3 optimizer.py --exchange binance --market BTCGBP --granularity 1h --simstartdate 2022-01-01 --simenddate 2022-06-01 --spec optimizer.json
+
+The bot arguments and config select the candles, the spec the options to sweep (see optimizer.json.sample).
+"""
+
+import sys
+import json
+import time
+import argparse
+from rich.console import Console
+from rich.table import Table
+
+from controllers.PyCryptoBot import PyCryptoBot
+from controllers.Optimizer import Optimizer, METRICS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parameter sweep over simulations, the other arguments are passed to the bot")
+    parser.add_argument("--spec", type=str, default="optimizer.json", help="grid or random search spec")
+    parser.add_argument("--processes", type=int, default=None, help="simulations in parallel, defaults to the number of CPUs")
+    parser.add_argument("--top", type=int, default=20, help="combinations in the table")
+    parser.add_argument("--output", type=str, default="optimizer.csv", help="all results, best first")
+    args, _ = parser.parse_known_args()
+
+    with open(args.spec, encoding="utf8") as json_file:
+        spec = json.load(json_file)
+
+    app = PyCryptoBot()
+    optimizer = Optimizer(app, spec)
+
+    start = time.perf_counter()
+    df = optimizer.run(args.processes)
+    elapsed = time.perf_counter() - start
+
+    df.to_csv(args.output, index=False)
+
+    table = Table(title=f"Optimizer: {app.market} ({app.print_granularity()}) ranked by {optimizer.rank}")
+    for column in df.columns:
+        table.add_column(column, justify="right" if column in METRICS else "left")
+    for _, row in df.head(args.top).iterrows():
+        table.add_row(*["" if isinstance(value, float) and value != value else str(value) for value in row])
+
+    console = Console()
+    console.print(table)
+    console.print(f"{len(df)} combinations in {elapsed:.1f}s, results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    if sys.version_info < (3, 6, 0):
+        sys.stderr.write("You need python 3.6 or higher to run this script\n")
+        exit(1)
+
+    main()
@@ -2,6 +2,8 @@ import os
 import dash_bootstrap_components as dbc
 from dash import dcc, html, callback, Output, Input
 
+from models.helper.LogTailHelper import LogTail
+
 layout = html.Div(
     [
         dbc.Container(
@@ -44,14 +46,7 @@ def read_log_file(n, active_tab):
     """read log file updated"""
     content = html.Div()
     if active_tab is not None:
-        log_entries = (
-            str(get_last_n_lines(active_tab, 1000))
-            .replace("', '", "\n")
-            .replace("['", "")
-            .replace("']", "")
-            .replace("\\r", "")
-        )
-        # .replace("\\r", "\n").replace("'", "").replace(",","").replace("[", "").replace("]", "")
+        log_entries = "\n".join(get_last_n_lines(active_tab, 1000))
 
         content = dbc.Card(
             dbc.CardBody(
@@ -117,41 +112,5 @@ def get_log_content(n):
 
 
 def get_last_n_lines(file_name, N):
-    """Get lines in file"""
-    # Create an empty list to keep the track of last N lines
-    list_of_lines = []
-    # Open file for reading in binary mode
-    with open(file_name, "rb") as read_obj:
-        # Move the cursor to the end of the file
-        read_obj.seek(0, os.SEEK_END)
-        # Create a buffer to keep the last read line
-        buffer = bytearray()
-        # Get the current position of pointer i.e eof
-        pointer_location = read_obj.tell()
-        # Loop till pointer reaches the top of the file
-        while pointer_location >= 0:
-            # Move the file pointer to the location pointed by pointer_location
-            read_obj.seek(pointer_location)
-            # Shift pointer location by -1
-            pointer_location = pointer_location - 1
-            # read that byte / character
-            new_byte = read_obj.read(1)
-            # If the read byte is new line character then it means one line is read
-            if new_byte == b"\n":
-                # Save the line in list of lines
-                list_of_lines.append(buffer.decode()[::-1])
-                # If the size of list reaches N, then return the reversed list
-                if len(list_of_lines) == N:
-                    return list(reversed(list_of_lines))
-                # Reinitialize the byte array to save next line
-                buffer = bytearray()
-            else:
-                # If last read character is not eol then add it in buffer
-                buffer.extend(new_byte)
-
-        # As file is read completely, if there is still data in buffer, then its first line.
-        if len(buffer) > 0:
-            list_of_lines.append(buffer.decode()[::-1])
-
-    # return the reversed list
-    return list(reversed(list_of_lines))
+    """Get lines in file, the file is only read from where the previous refresh stopped"""
+    return LogTail.get(file_name, N).tail()
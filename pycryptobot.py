@@ -5,12 +5,23 @@
 
 import sys
 
-from controllers.PyCryptoBot import PyCryptoBot
+from models.helper.StartupProfileHelper import StartupProfile
+
+if "--profile-startup" in sys.argv:
+    # before the bot is imported, the report includes its imports
+    StartupProfile.start()
+
+from controllers.PyCryptoBot import PyCryptoBot  # noqa: E402
+from controllers.MultiMarketRunner import MultiMarketRunner  # noqa: E402
 
 
 def main() -> None:
-    app = PyCryptoBot()
-    app.run()
+    with StartupProfile.step("config"):
+        app = PyCryptoBot()
+    if len(app.markets) > 0:
+        MultiMarketRunner(app).run()
+    else:
+        app.run()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import time
 import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 from controllers.PyCryptoBot import PyCryptoBot
 from models.exchange import kucoin
@@ -12,8 +13,44 @@ from models.exchange.coinbase_pro import PublicAPI as CPublicAPI
 from models.exchange.kucoin import PublicAPI as KPublicAPI
 from models.exchange.Granularity import Granularity
 from models.exchange.ExchangesEnum import Exchange
+from models.exchange.RateLimiter import RateLimiter
 
 GRANULARITY = Granularity(Granularity.ONE_HOUR)
+DEFAULT_WORKERS = 8
+
+
+def scan_market(ex: Exchange, api, market: str) -> dict:
+    """Fetches and analyses one market, runs in the scanner thread pool"""
+
+    timings = {"wait": 0.0, "candles": 0.0, "analysis": 0.0}
+
+    try:
+        timings["wait"] = RateLimiter.acquire(ex, "klines")
+        start = time.perf_counter()
+        df = api.get_historical_data(market, GRANULARITY, None)
+        timings["candles"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ta = TechnicalAnalysis(df, app=app)
+        ta.add_ema(12)
+        ta.add_ema(26)
+        ta.add_atr(72)
+        df_1h = ta.get_df()
+        df_1h["ema12ltema26"] = df_1h.ema12 < df_1h.ema26
+        df_1h_last = df_1h.tail(1)
+
+        result = {
+            # volatility over the last 72 hours
+            "atr72": float(df_1h_last[["atr72"]].values[0][0]),
+            "buy_next": df_1h_last[df_1h_last["market"] == market]["ema12ltema26"].values[0],
+        }
+        timings["analysis"] = time.perf_counter() - start
+    except Exception as err:
+        print(f"{market}: {err}")
+        result = None
+
+    return {"market": market, "result": result, "timings": timings}
+
 
 try:
     with open("scanner.json", encoding='utf8') as json_file:
@@ -42,6 +79,9 @@ for exchange in config:
         else:
             raise ValueError(f"Invalid exchange: {ex}")
 
+        stage_start = time.perf_counter()
+        RateLimiter.acquire(ex, "ticker_24hr")
+
         markets = []
         resp = api.get_markets_24hr_stats()
         if ex == Exchange.BINANCE:
@@ -81,37 +121,31 @@ for exchange in config:
         df_markets.sort_values(by=["market"], ascending=True, inplace=True)
         df_markets.set_index("market", inplace=True)
 
-        print("Processing, please wait...")
-
-        ROW = 1
-        for market, data in df_markets.T.items():
-            print(f"[{ROW}/{len(df_markets)}] {market} {round((ROW/len(df_markets))*100, 2)}%")
-            try:
-                if int(data["volume"]) > 0:
-                    ta = TechnicalAnalysis(api.get_historical_data(market, GRANULARITY, None), app=app)
-                    ta.add_ema(12)
-                    ta.add_ema(26)
-                    ta.add_atr(72)
-                    df_1h = ta.get_df()
-                    df_1h["ema12ltema26"] = df_1h.ema12 < df_1h.ema26
-                    df_1h_last = df_1h.tail(1)
-
-                    # volatility over the last 72 hours
-                    df_markets.at[market, "atr72"] = float(df_1h_last[["atr72"]].values[0][0])
-                    df_markets["atr72_pcnt"] = (
-                        df_markets["atr72"] / df_markets["price"] * 100
-                    ).round(2)
-                    df_markets.at[market, "buy_next"] = df_1h_last[df_1h_last["market"] == market][
-                        "ema12ltema26"
-                    ].values[0]
-            except Exception as err:
-                print(err)
-
-            # don't flood exchange, sleep 1 second
-            time.sleep(2)
-
-            # current position
-            ROW += 1
+        timing_markets = time.perf_counter() - stage_start
+
+        workers = config[ex.value].get("workers", DEFAULT_WORKERS)
+        print(f"Processing {len(df_markets)} markets with {workers} workers, please wait...")
+
+        # the token bucket replaces the fixed sleep between markets, it is shared by all the workers
+        stage_start = time.perf_counter()
+        scan_markets = [market for market, data in df_markets.T.items() if int(data["volume"]) > 0]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(scan_market, ex, api, market) for market in scan_markets]
+
+            for ROW, future in enumerate(futures, start=1):
+                scan = future.result()
+                print(f"[{ROW}/{len(scan_markets)}] {scan['market']} {round((ROW/len(scan_markets))*100, 2)}%")
+
+        scans = [future.result() for future in futures]
+        timing_scan = time.perf_counter() - stage_start
+
+        for scan in scans:
+            if scan["result"] is not None:
+                df_markets.at[scan["market"], "atr72"] = scan["result"]["atr72"]
+                df_markets.at[scan["market"], "buy_next"] = scan["result"]["buy_next"]
+
+        if "atr72" in df_markets:
+            df_markets.insert(df_markets.columns.get_loc("atr72") + 1, "atr72_pcnt", (df_markets["atr72"] / df_markets["price"] * 100).round(2))
 
         # clear screen
         print(chr(27) + "[2J")
@@ -123,4 +157,13 @@ for exchange in config:
             )
         )
 
+        stage_start = time.perf_counter()
         TGBot(app, scanner=True).save_scanner_output(ex.value, quote, df_markets)
+        timing_save = time.perf_counter() - stage_start
+
+        print(
+            f"{ex.value} {quote} timings: markets {timing_markets:.2f}s, scan {timing_scan:.2f}s "
+            f"(rate limit wait {sum(scan['timings']['wait'] for scan in scans):.2f}s, "
+            f"candles {sum(scan['timings']['candles'] for scan in scans):.2f}s, "
+            f"analysis {sum(scan['timings']['analysis'] for scan in scans):.2f}s), save {timing_save:.2f}s"
+        )
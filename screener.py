@@ -3,12 +3,18 @@ import json
 import pandas as pd
 import re
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from decimal import Decimal
 from itertools import islice
-from tradingview_ta import *
 from importlib.metadata import version
 
+try:
+    from tradingview_ta import *
+except ImportError:
+    # only needed by the tradingview engine
+    pass
+
 from controllers.PyCryptoBot import PyCryptoBot
 from models.helper.TelegramBotHelper import TelegramBotHelper as TGBot
 from models.exchange.binance import PublicAPI as BPublicAPI
@@ -17,6 +23,10 @@ from models.exchange.coinbase_pro import PublicAPI as CPublicAPI
 from models.exchange.kucoin import PublicAPI as KPublicAPI
 from models.exchange.Granularity import Granularity
 from models.exchange.ExchangesEnum import Exchange as CryptoExchange
+from models.exchange.RateLimiter import RateLimiter
+from models.Screener import MINIMUM_CANDLES, Screener, OUTPUT_COLUMNS
+
+DEFAULT_WORKERS = 8
 
 
 def volatility_calculator(bollinger_band_upper, bollinger_band_lower, keltner_upper, keltner_lower, high, low):
@@ -73,6 +83,8 @@ def load_configs():
                 binance_app.minimum_quote_price = exchange_config.get("minimum_quote_price", 0.0000001)
                 binance_app.selection_score = exchange_config.get("selection_score", 10)
                 binance_app.tv_screener_ratings = [rating.upper() for rating in exchange_config.get("tv_screener_ratings", ["STRONG_BUY"])]
+                binance_app.screener_engine = exchange_config.get("engine", "tradingview")
+                binance_app.screener_workers = exchange_config.get("workers", DEFAULT_WORKERS)
                 exchanges_loaded.append(binance_app)
             elif ex == CryptoExchange.COINBASE:
                 coinbase_app = PyCryptoBot(exchange=ex)
@@ -87,6 +99,8 @@ def load_configs():
                 coinbase_app.minimum_quote_price = exchange_config.get("minimum_quote_price", 0.0000001)
                 coinbase_app.selection_score = exchange_config.get("selection_score", 10)
                 coinbase_app.tv_screener_ratings = [rating.upper() for rating in exchange_config.get("tv_screener_ratings", ["STRONG_BUY"])]
+                coinbase_app.screener_engine = exchange_config.get("engine", "tradingview")
+                coinbase_app.screener_workers = exchange_config.get("workers", DEFAULT_WORKERS)
                 exchanges_loaded.append(coinbase_app)
             elif ex == CryptoExchange.COINBASEPRO:
                 coinbase_pro_app = PyCryptoBot(exchange=ex)
@@ -101,6 +115,8 @@ def load_configs():
                 coinbase_pro_app.minimum_quote_price = exchange_config.get("minimum_quote_price", 0.0000001)
                 coinbase_pro_app.selection_score = exchange_config.get("selection_score", 10)
                 coinbase_pro_app.tv_screener_ratings = [rating.upper() for rating in exchange_config.get("tv_screener_ratings", ["STRONG_BUY"])]
+                coinbase_pro_app.screener_engine = exchange_config.get("engine", "tradingview")
+                coinbase_pro_app.screener_workers = exchange_config.get("workers", DEFAULT_WORKERS)
                 exchanges_loaded.append(coinbase_pro_app)
             elif ex == CryptoExchange.KUCOIN:
                 kucoin_app = PyCryptoBot(exchange=ex)
@@ -115,6 +131,8 @@ def load_configs():
                 kucoin_app.minimum_quote_price = exchange_config.get("minimum_quote_price", 0.0000001)
                 kucoin_app.selection_score = exchange_config.get("selection_score", 10)
                 kucoin_app.tv_screener_ratings = [rating.upper() for rating in exchange_config.get("tv_screener_ratings", ["STRONG_BUY"])]
+                kucoin_app.screener_engine = exchange_config.get("engine", "tradingview")
+                kucoin_app.screener_workers = exchange_config.get("workers", DEFAULT_WORKERS)
                 exchanges_loaded.append(kucoin_app)
             else:
                 raise ValueError(f"Invalid exchange found in config: {ex}")
@@ -313,53 +331,65 @@ def process_screener_data(app, markets, quote_currency, exchange_name):
         except Exception:
             pass
 
-    if formatted_ta:
+    save_screener_output(app, quote_currency, pd.DataFrame(formatted_ta))
+
+    return True
+
+
+def process_local_screener_data(app, markets, quote_currency, exchange_name):
+    """
+    Same indicators and score as process_screener_data, calculated locally for all markets in one batch
+    """
+
+    # the screener needs MINIMUM_CANDLES of every market, also with a shorter adjusttotalperiods
+    periods = max(app.adjusttotalperiods, MINIMUM_CANDLES)
+    iso8601end = datetime.utcnow().replace(microsecond=0)
+    iso8601start = iso8601end - timedelta(seconds=app.granularity.to_integer * periods)
+
+    def fetch(market):
+        # the candle store (--candlestore) only requests the candles closed since the last scan
+        RateLimiter.acquire(app.exchange, "klines")
+        try:
+            return app.get_historical_data(market, app.granularity, None, iso8601start.isoformat(), iso8601end.isoformat())
+        except Exception as err:
+            if app.debug:
+                print(f"{market} on {exchange_name}: {err}")
+            return None
+
+    stage_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=app.screener_workers) as executor:
+        candles = dict(zip(markets, executor.map(fetch, markets)))
+    timing_candles = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    screener = Screener(candles)
+    if len(screener.skipped) > 0:
+        print(f"{exchange_name} {quote_currency}: {len(screener.skipped)} markets with fewer than {MINIMUM_CANDLES} candles skipped")
+
+    df_markets = screener.screen(
+        app.tv_screener_ratings,
+        app.selection_score,
+        adx_threshold=app.adx_threshold,
+        volume_threshold=app.volume_threshold,
+        volatility_threshold=app.volatility_threshold,
+        minimum_volatility=app.minimum_volatility,
+        minimum_volume=app.minimum_volume,
+        minimum_quote_price=app.minimum_quote_price,
+    )
+    timing_screen = time.perf_counter() - stage_start
+
+    if app.debug:
+        print(f"{exchange_name} {quote_currency}: candles {timing_candles:.2f}s, screening {timing_screen:.4f}s")
+
+    save_screener_output(app, quote_currency, df_markets)
+
+    return True
+
+
+def save_screener_output(app, quote_currency, df_markets):
+    if len(df_markets) > 0:
         # Stick it in a DF for the bots
-        df_markets = pd.DataFrame(formatted_ta)
-        df_markets = df_markets[
-            [
-                "market",
-                "score",
-                "recommend",
-                "volume",
-                "volatility",
-                "adx",
-                "adx+di",
-                "adx-di",
-                "macd",
-                "macd.signal",
-                "bollinger_upper",
-                "bollinger_lower",
-                "rsi",
-                "stoch_d",
-                "stoch_k",
-                "williamsr",
-                "rating",
-                "buy_next",
-                "atr72_pcnt",
-            ]
-        ]
-        df_markets.columns = [
-            "market",
-            "score",
-            "recommend",
-            "volume",
-            "volatility",
-            "adx",
-            "adx+di",
-            "adx-di",
-            "macd",
-            "macd.signal",
-            "bollinger_upper",
-            "bollinger_lower",
-            "rsi",
-            "stoch_d",
-            "stoch_k",
-            "williamsr",
-            "rating",
-            "buy_next",
-            "atr72_pcnt",
-        ]
+        df_markets = df_markets[OUTPUT_COLUMNS].copy()
         df_markets["score"] = df_markets["score"].astype(float).round(0).astype(int)
         df_markets["recommend"] = df_markets["recommend"].astype(float)
         df_markets["volume"] = df_markets["volume"].astype(float).round(0).astype(int)
@@ -387,32 +417,33 @@ def process_screener_data(app, markets, quote_currency, exchange_name):
         blank_data["buy_next"] = False
         blank_data["atr72_pcnt"] = 0
         blank_data["volume"] = 0
-        formatted_ta.append(blank_data)
 
-        df_markets = pd.DataFrame(formatted_ta)
+        df_markets = pd.DataFrame([blank_data])
         TGBot(app, scanner=True).save_scanner_output(app.exchange.value, quote_currency, df_markets)
         print("No pairs found!")
 
-    return True
-
 
 if __name__ == "__main__":
-    tvlib_ver = version("tradingview-ta")
-    if tvlib_ver >= "3.2.10":
-        print(f"Library is correct version - were good to go! (v {tvlib_ver})")
-    else:
-        print(f"Gotta update your tradingview-ta library please! (v {tvlib_ver})")
-        sys.exit()
-
     start_time = time.time()
     print("Processing, please wait...")
     bootstrap_exchanges = load_configs()
+
+    if any(app.screener_engine != "local" for app in bootstrap_exchanges):
+        tvlib_ver = version("tradingview-ta")
+        if tvlib_ver >= "3.2.10":
+            print(f"Library is correct version - were good to go! (v {tvlib_ver})")
+        else:
+            print(f"Gotta update your tradingview-ta library please! (v {tvlib_ver})")
+            sys.exit()
     for app in bootstrap_exchanges:
         print(f"\n\n{app.exchange.name}")
         for quote_currency in app.scanner_quote_currencies:
             markets = get_markets(app, quote_currency)
             try:
-                process_screener_data(app, markets, quote_currency, app.exchange.name)
+                if app.screener_engine == "local":
+                    process_local_screener_data(app, markets, quote_currency, app.exchange.name)
+                else:
+                    process_screener_data(app, markets, quote_currency, app.exchange.name)
             except Exception as e:
                 print(e)
 
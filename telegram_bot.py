@@ -107,6 +107,11 @@ class TelegramBot(TelegramBotBase):
             help="Use the datafolder at the given location, useful for multi bots running in different folders",
             default="",
         )
+        parser.add_argument(
+            "--jsonexport",
+            action="store_true",
+            help="Also write the bot control and data.json as json files in the datafolder",
+        )
 
         args = parser.parse_args()
 
@@ -120,32 +125,12 @@ class TelegramBot(TelegramBotBase):
         if args.datafolder != "":
             self.helper.datafolder = args.datafolder
 
-        if not os.path.exists(os.path.join(self.helper.datafolder, "telegram_data")):
-            os.mkdir(os.path.join(self.helper.datafolder, "telegram_data"))
+        if args.jsonexport:
+            self.helper.jsonexport = True
 
-        if os.path.isfile(
-            os.path.join(self.helper.datafolder, "telegram_data", "data.json")
-        ):
-            write_ok, try_count = False, 0
-            while not write_ok and try_count <= 5:
-                try_count += 1
-                self.helper.read_data("data.json")
-                write_ok = True
-                if "trades" not in self.helper.data:
-                    self.helper.data.update({"trades": {}})
-                    write_ok = self.helper.write_data()
-                if "markets" not in self.helper.data:
-                    self.helper.data.update({"markets": {}})
-                    write_ok = self.helper.write_data()
-                if "scannerexceptions" not in self.helper.data:
-                    self.helper.data.update({"scannerexceptions": {}})
-                    write_ok = self.helper.write_data()
-                if not write_ok:
-                    sleep(1)
-        else:
-            ds = {"trades": {}, "markets": {}, "scannerexceptions": {}}
-            self.helper.data = ds
-            self.helper.write_data()
+        # the json files of an existing datafolder are imported when the store is opened
+        if self.helper.jsonexport:
+            self.helper.store.export()
 
         self.updater = Updater(
             self.token,
@@ -0,0 +1,83 @@
+import sys
+import numpy as np
+import pandas as pd
+from statsmodels.compat.pandas import assert_frame_equal
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from models.AppState import AppState
+from models.Backtest import Backtest
+from models.TradingAccount import TradingAccount
+
+
+def generate_candles(periods: int = 300, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    close = np.round(30000 + np.cumsum(rng.randn(periods) * 50), 2)
+    tsidx = pd.date_range("2022-01-01", periods=periods, freq="H")
+
+    df = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": "BTC-GBP",
+            "granularity": 3600,
+            "low": close - np.round(rng.rand(periods) * 30, 2),
+            "high": close + np.round(rng.rand(periods) * 30, 2),
+            "open": np.append(close[:1], close[:-1]),
+            "close": close,
+            "volume": np.round(rng.rand(periods) * 10, 4),
+        },
+        index=tsidx,
+    )
+    df.index.name = "ts"
+    return df
+
+
+def simulation(df: pd.DataFrame, **config) -> PyCryptoBot:
+    app = PyCryptoBot()
+    app.is_sim = "fast"
+    app.simresultonly = True
+
+    for key, value in config.items():
+        setattr(app, key, value)
+
+    app.account = TradingAccount(app)
+    app.state = AppState(app, app.account)
+    app.state.init_last_action()
+    app.state.last_buy_size = 1000
+    app.state.first_buy_size = 1000
+    app.trading_data = df.copy()
+    app.app_started = True
+    return app
+
+
+def test_should_match_execute_job_simulation():
+    for config in [
+        {},
+        {"preventloss": True, "sellatloss": 0},
+        {"trailing_stop_loss": -1.0, "trailing_stop_loss_trigger": 0.5, "trailingbuypcnt": 0.5},
+        {"disablebuynearhigh": True, "nobuynearhighpcnt": 2, "adjusttotalperiods": 100},
+    ]:
+        # GIVEN a series of candles
+        df = generate_candles(250, seed=2)
+
+        # WHEN it is simulated one candle at a time and with the backtest engine
+        expected = simulation(df, **config)
+        expected.execute_job()
+        expected.s.run()
+
+        actual = simulation(df, **config)
+        assert Backtest.is_supported(actual) is True
+        Backtest(actual).run()
+
+        # THEN the trades and the summary are the same
+        assert len(actual.trade_tracker) > 0
+        assert_frame_equal(actual.trade_tracker, expected.trade_tracker, check_exact=True)
+        assert actual.state.margintracker == expected.state.margintracker
+        assert actual.state.profitlosstracker == expected.state.profitlosstracker
+        assert actual.state.last_buy_size == expected.state.last_buy_size
+
+
+def test_should_not_support_smart_switch():
+    app = simulation(generate_candles(50), smart_switch=1)
+    assert Backtest.is_supported(app) is False
@@ -0,0 +1,91 @@
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Trading import IncrementalTechnicalAnalysis, TechnicalAnalysis
+from models.exchange.Granularity import Granularity
+from models.helper.CandleFrameHelper import compact_candles, memory_report
+from models.helper.ResampleHelper import resample
+
+
+class App:
+    indicatorfloat32 = True
+
+
+def generate_candles(periods: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    index = pd.DatetimeIndex(pd.date_range("2022-01-01", periods=periods, freq="1H").values, name="ts")
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame(
+        {
+            "date": index,
+            "market": ["BTC-GBP"] * periods,
+            "granularity": [3600] * periods,
+            "low": close - 1,
+            "high": close + 1,
+            "open": close,
+            "close": close,
+            "volume": rng.uniform(100, 1000, periods),
+        },
+        index=index,
+    )
+
+
+def test_should_store_the_labels_once():
+    df = generate_candles()
+
+    # WHEN the candles are compacted
+    compact = compact_candles(df)
+
+    # THEN the labels are categoricals that read as before
+    assert isinstance(compact["market"].dtype, pd.CategoricalDtype)
+    assert compact["market"].iloc[-1] == "BTC-GBP"
+    assert (compact["market"] == "BTC-GBP").all()
+    assert Granularity.convert_to_enum(compact["granularity"].iloc[0]) == Granularity.ONE_HOUR
+    assert compact[["low", "high", "open", "close", "volume"]].equals(df[["low", "high", "open", "close", "volume"]])
+
+    # THEN they take a fraction of the memory
+    before, after = memory_report(df), memory_report(compact)
+    assert after["groups"]["labels"] * 4 < before["groups"]["labels"]
+    assert after["total_bytes"] == sum(after["groups"].values())
+    assert after["simulation"]["total_bytes"] == int(after["bytes_per_row"] * 1000000)
+
+    # THEN the coarser candles are compact too
+    assert isinstance(resample(compact, Granularity.SIX_HOURS)["market"].dtype, pd.CategoricalDtype)
+
+
+def test_should_store_the_indicators_as_float32():
+    df = compact_candles(generate_candles())
+
+    # WHEN the analysis is added in float32 mode
+    ta = TechnicalAnalysis(df.copy(), app=App())
+    ta.add_all()
+    result = ta.get_df()
+
+    # THEN the indicators are float32 and the candles are not changed
+    expected = TechnicalAnalysis(df.copy())
+    expected.add_all()
+    assert result["ema12"].dtype == "float32" and result["rsi14"].dtype == "float32"
+    assert result["close"].dtype == "float64" and result["goldencross"].dtype == "bool"
+    assert np.allclose(result["ema12"], expected.get_df()["ema12"], rtol=1e-6)
+    assert memory_report(result)["groups"]["indicators"] * 2 == memory_report(expected.get_df())["groups"]["indicators"]
+
+    # THEN the incremental analysis of live bots is not disabled by it and adds float32 indicators too
+    candles = compact_candles(generate_candles(301))
+    incremental = IncrementalTechnicalAnalysis(app=App())
+    live = incremental.update(candles.iloc[:-1].copy(), 300)
+    assert incremental.incremental
+    assert live["ema12"].dtype == "float32" and live["goldencross"].dtype == "bool"
+
+    # THEN so does the update of a new candle, from the float64 rolling state
+    stepped = []
+    step = incremental._step
+    incremental._step = lambda i: stepped.append(i) or step(i)
+    live = incremental.update(pd.concat([live, candles.iloc[-1:]]), 301)
+    expected = TechnicalAnalysis(candles.copy())
+    expected.add_all()
+    assert stepped == [299, 300]
+    assert live["ema12"].dtype == "float32" and live["rsi14"].dtype == "float32" and live["close"].dtype == "float64"
+    assert np.array_equal(live["ema12"], expected.get_df()["ema12"].astype("float32"))
@@ -0,0 +1,98 @@
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.binance import WebSocketClient
+from models.exchange.CandleRingBuffer import CandleRingBuffer
+from models.exchange.Granularity import Granularity
+
+
+def generate_candles(periods: int = 300) -> pd.DataFrame:
+    tsidx = pd.date_range("2022-01-01", periods=periods, freq="H")
+    close = np.arange(periods, dtype=float)
+
+    df = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": "BTCGBP",
+            "granularity": "1h",
+            "low": close - 1,
+            "high": close + 1,
+            "open": close,
+            "close": close,
+            "volume": close * 2,
+        },
+        index=tsidx,
+    )
+    df.index.name = "ts"
+    return df
+
+
+def kline(ts: pd.Timestamp, close: float, closed: bool = True) -> dict:
+    # the client subtracts an hour from the local time of the message
+    epoch = int((ts + pd.Timedelta(hours=1)).to_pydatetime().timestamp() * 1000)
+    return {
+        "e": "kline",
+        "s": "BTCGBP",
+        "k": {"t": epoch, "i": "1h", "o": close, "h": close + 1, "l": close - 1, "c": close, "v": 1, "V": close * 2, "x": closed},
+    }
+
+
+def test_should_keep_last_candles_in_order():
+    # GIVEN a full buffer
+    candles = CandleRingBuffer("BTCGBP", "1h", 300)
+    candles.load(generate_candles(350))
+
+    # WHEN newer candles are added
+    expected = generate_candles(400)
+    for ts, row in expected.iloc[350:].iterrows():
+        candles.update(ts, row["low"], row["high"], row["open"], row["close"], row["volume"])
+
+    # THEN the buffer has the last 300 candles, the prices are a view on the buffer
+    actual = candles.to_df()
+    pd.testing.assert_frame_equal(actual, expected.tail(300), check_freq=False)
+
+    candles.update(expected.index[-1], 1, 2, 3, 4, 5)
+    assert actual["close"].iloc[-1] == 4
+    assert candles.to_df(copy=True)["close"].iloc[-1] == 4
+    assert len(candles) == 300
+
+
+def test_should_update_candles_from_kline_messages():
+    # GIVEN a websocket client with historical data
+    client = WebSocketClient(["BTCGBP"], Granularity.ONE_HOUR)
+    client.on_open()
+    client._candles["BTCGBP"] = CandleRingBuffer("BTCGBP", "1h", 300)
+    client._candles["BTCGBP"].load(generate_candles(300))
+    last = client.candles.index[-1]
+
+    # WHEN the open candle closes and the next one closes
+    client.on_message(kline(last, 1000.0, closed=False))
+    client.on_message(kline(last, 1001.0))
+    client.on_message(kline(last + pd.Timedelta(hours=1), 1002.0))
+
+    # THEN the open candle is replaced and the next candle is added
+    df = client.get_candles("BTCGBP")
+    assert len(df) == 300
+    assert df.index[-1] == last + pd.Timedelta(hours=1)
+    assert df["close"].tail(2).tolist() == [1001.0, 1002.0]
+    assert list(df.columns) == ["date", "market", "granularity", "low", "high", "open", "close", "volume"]
+    assert client.message_count == 3
+
+
+def test_should_keep_latest_ticker_per_market():
+    client = WebSocketClient(["BTCGBP"], Granularity.ONE_HOUR)
+    client.on_open()
+    assert client.tickers is None
+
+    for price in ["1.5", "2.5"]:
+        client.on_message({"e": "24hrMiniTicker", "E": 1640995200000, "s": "BTCGBP", "c": price})
+
+    assert len(client.tickers) == 1
+    assert client.tickers["price"].iloc[0] == 2.5
+
+    client.on_error()
+    assert client.tickers is None
+    assert client.candles is None
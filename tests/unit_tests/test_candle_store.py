@@ -0,0 +1,130 @@
+import sys
+import numpy as np
+import pandas as pd
+from statsmodels.compat.pandas import assert_frame_equal
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.Granularity import Granularity
+from models.helper.CandleStoreHelper import CandleStore
+
+HISTORY = pd.date_range("2022-01-01", periods=1000, freq="H")
+
+
+class FakeExchange:
+    """At most 300 candles per response, the oldest or with newest_first the newest of the range"""
+
+    def __init__(self, newest_first: bool = False) -> None:
+        self.calls = []
+        self.newest_first = newest_first
+
+    def get_historical_data(self, start: str, end: str) -> pd.DataFrame:
+        self.calls.append((start, end))
+
+        tsidx = HISTORY[(HISTORY >= start) & (HISTORY <= end)]
+        tsidx = tsidx[-300:] if self.newest_first else tsidx[:300]
+        close = np.arange(len(tsidx), dtype=float) + tsidx.hour.to_numpy()
+
+        df = pd.DataFrame(
+            {
+                "date": tsidx,
+                "market": "BTC-GBP",
+                "granularity": 3600,
+                "low": close - 1,
+                "high": close + 1,
+                "open": close,
+                "close": close,
+                "volume": close * 2,
+            },
+            index=tsidx,
+        )
+        df.index.name = "ts"
+        return df
+
+
+def test_should_only_fetch_missing_ranges(tmp_path):
+    # GIVEN an empty candle store
+    exchange = FakeExchange()
+    store = CandleStore("coinbasepro", "BTC-GBP", Granularity.ONE_HOUR, cache_path=str(tmp_path))
+
+    # WHEN a range is requested
+    expected = exchange.get_historical_data("2022-01-02T00:00:00", "2022-01-05T00:00:00")
+    actual = store.get_historical_data("2022-01-02T00:00:00", "2022-01-05T00:00:00", exchange.get_historical_data)
+
+    # THEN it is fetched from the exchange once
+    assert len(exchange.calls) == 2
+    assert_frame_equal(actual, expected, check_freq=False)
+
+    # WHEN the same range is requested again
+    actual = store.get_historical_data("2022-01-02T00:00:00", "2022-01-05T00:00:00", exchange.get_historical_data)
+
+    # THEN the exchange is not called
+    assert len(exchange.calls) == 2
+    assert_frame_equal(actual, expected, check_freq=False)
+
+    # WHEN an overlapping range is requested
+    actual = store.get_historical_data("2022-01-01T00:00:00", "2022-01-07T00:00:00", exchange.get_historical_data)
+
+    # THEN only the gaps are fetched
+    assert exchange.calls[2:] == [("2022-01-01T00:00:00", "2022-01-02T00:00:00"), ("2022-01-05T00:00:00", "2022-01-07T00:00:00")]
+    assert list(actual.index) == list(HISTORY[:145])
+    assert actual["granularity"].unique().tolist() == [3600]
+
+
+def test_should_fetch_the_whole_gap_from_either_end(tmp_path):
+    for newest_first in [True, False]:
+        # GIVEN an exchange returning 300 candles per request
+        exchange = FakeExchange(newest_first)
+        store = CandleStore("kucoin", "BTC-GBP", Granularity.ONE_HOUR, cache_path=str(tmp_path / str(newest_first)))
+
+        # WHEN a range of 457 candles is requested
+        actual = store.get_historical_data("2022-01-01T00:00:00", "2022-01-20T00:00:00", exchange.get_historical_data)
+
+        # THEN the rest of the range is requested from the end the exchange did not return
+        assert len(exchange.calls) == 2
+        assert list(actual.index) == list(HISTORY[:457])
+
+        # THEN the whole range is in the store
+        actual = store.get_historical_data("2022-01-01T00:00:00", "2022-01-20T00:00:00", exchange.get_historical_data)
+        assert len(exchange.calls) == 2
+        assert list(actual.index) == list(HISTORY[:457])
+
+
+def test_should_not_store_empty_responses(tmp_path):
+    # GIVEN a candle store and an exchange that fails to respond
+    store = CandleStore("binance", "BTCGBP", Granularity.ONE_HOUR, cache_path=str(tmp_path))
+    calls = []
+
+    def fetch(start: str, end: str) -> pd.DataFrame:
+        calls.append((start, end))
+        return pd.DataFrame()
+
+    # WHEN the range is requested twice
+    store.get_historical_data("2022-01-01T00:00:00", "2022-01-02T00:00:00", fetch)
+    actual = store.get_historical_data("2022-01-01T00:00:00", "2022-01-02T00:00:00", fetch)
+
+    # THEN the exchange is asked again
+    assert len(calls) == 2
+    assert len(actual) == 0
+
+
+def test_should_keep_the_series_written_by_another_store(tmp_path):
+    # GIVEN two bots updating the same series, the second writes while the first is fetching
+    exchange = FakeExchange()
+    first = CandleStore("binance", "BTCGBP", Granularity.ONE_HOUR, cache_path=str(tmp_path))
+    second = CandleStore("binance", "BTCGBP", Granularity.ONE_HOUR, cache_path=str(tmp_path))
+
+    def fetch(start: str, end: str) -> pd.DataFrame:
+        second.get_historical_data("2022-01-10T00:00:00", "2022-01-12T00:00:00", exchange.get_historical_data)
+        return exchange.get_historical_data(start, end)
+
+    # WHEN both ranges are stored
+    first.get_historical_data("2022-01-01T00:00:00", "2022-01-03T00:00:00", fetch)
+
+    # THEN the candles and the ranges of both are in the store
+    calls = len(exchange.calls)
+    third = CandleStore("binance", "BTCGBP", Granularity.ONE_HOUR, cache_path=str(tmp_path))
+    for start, end in [("2022-01-01T00:00:00", "2022-01-03T00:00:00"), ("2022-01-10T00:00:00", "2022-01-12T00:00:00")]:
+        actual = third.get_historical_data(start, end, exchange.get_historical_data)
+        assert list(actual.index) == list(HISTORY[(HISTORY >= start) & (HISTORY <= end)])
+    assert len(exchange.calls) == calls
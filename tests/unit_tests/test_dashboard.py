@@ -0,0 +1,89 @@
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper.DashboardHelper import Dashboard
+from models.helper.StateStoreHelper import StateStore
+
+
+def generate_bot(margin: str = "1.5%", signal: str = "WAIT", status: str = "active") -> dict:
+    return {
+        "botcontrol": {"status": status, "started": (datetime.now() - timedelta(hours=2)).isoformat(), "startmethod": "scanner"},
+        "exchange": "binance",
+        "signal": signal,
+        "margin": margin,
+        "delta": " ",
+        "price": 1.0,
+        "df_high": " ",
+        "from_df_high": " ",
+        "indicators": {"BULL": True},
+    }
+
+
+class CountingStore:
+    """The state store, counting the bots that are read"""
+
+    def __init__(self, store: StateStore) -> None:
+        self.store = store
+        self.reads = []
+
+    def __getattr__(self, name: str):
+        return getattr(self.store, name)
+
+    def get_bot(self, market: str) -> dict:
+        self.reads.append(market)
+        return self.store.get_bot(market)
+
+
+def test_should_only_parse_changed_bots(tmp_path):
+    store = StateStore.open(str(tmp_path))
+    store.put_bot("BTCGBP", generate_bot("-2.0%"))
+    store.put_bot("ETHGBP", generate_bot("3.0%", signal="BUY"))
+    store.put_bot("XRPGBP", generate_bot(status="paused"))
+    store.set_shared("trades", (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"), {"pair": "ADAGBP", "price": 1.0, "margin": "4.0%"})
+    store.set_shared("trades", (datetime.now() - timedelta(days=8)).strftime("%Y-%m-%d %H:%M:%S"), {"pair": "ADAGBP", "price": 1.0, "margin": "9.0%"})
+
+    counting_store = CountingStore(store)
+    dashboard = Dashboard(counting_store, refresh_interval=0)
+
+    # WHEN the dashboard is first shown
+    snapshot = dashboard.snapshot()
+
+    # THEN the active bots are in the table
+    assert [row["Trading Pair"] for row in snapshot.records] == ["ETHGBP", "BTCGBP"]
+    assert snapshot.records[1]["Uptime"] == "2h 0m"
+    assert snapshot.records[1]["Margincolor"] == "#99413d"
+    assert snapshot.records[1]["BULL"] == "True"
+    assert round(snapshot.margin_current, 6) == 1.0
+    assert snapshot.margin_7d_total == 4.0
+    assert sorted(counting_store.reads) == ["BTCGBP", "ETHGBP"]
+
+    # WHEN one bot changes
+    counting_store.reads = []
+    store.update_bot("BTCGBP", lambda data: data.update({"margin": "1.0%"}))
+    snapshot = dashboard.snapshot()
+
+    # THEN only that bot is read again
+    assert counting_store.reads == ["BTCGBP"]
+    assert round(snapshot.margin_current, 6) == 4.0
+
+    # WHEN a bot stops
+    store.delete_bot("ETHGBP")
+
+    # THEN it is removed from the table
+    assert [row["Trading Pair"] for row in dashboard.snapshot().records] == ["BTCGBP"]
+
+
+def test_should_share_the_snapshot(tmp_path):
+    store = StateStore.open(str(tmp_path))
+    store.put_bot("BTCGBP", generate_bot())
+
+    dashboard = Dashboard(store, refresh_interval=60)
+    snapshot = dashboard.snapshot()
+
+    # WHEN a bot changes within the refresh interval
+    store.put_bot("ETHGBP", generate_bot())
+
+    # THEN every callback gets the same snapshot
+    assert dashboard.snapshot() is snapshot
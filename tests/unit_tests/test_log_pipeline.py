@@ -0,0 +1,93 @@
+import io
+import sys
+import json
+import threading
+from rich.console import Console
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from models.helper.LogPipelineHelper import LogPipeline, LogSink, RichSink, StreamSink
+from views.PyCryptoBot import RichText
+
+
+class ListSink(LogSink):
+    def __init__(self, level="DEBUG") -> None:
+        super().__init__(level)
+        self.batches = []
+
+    def write(self, records: list) -> None:
+        self.batches.append([record.message for record in records])
+
+
+def test_should_filter_by_level_before_queueing():
+    console = io.StringIO()
+    stream = io.StringIO()
+    debug = {"enabled": False}
+
+    # GIVEN a terminal that follows the debug flag and a JSON lines stream for warnings
+    pipeline = LogPipeline(
+        [
+            RichSink(Console(file=console, no_color=True, width=200), lambda: "DEBUG" if debug["enabled"] else "INFO"),
+            StreamSink(stream, "WARNING", "json"),
+        ]
+    )
+
+    # THEN a level no sink takes is dropped
+    assert pipeline.emit("debug", "dropped", "BTC-GBP", "1h") is False
+
+    # WHEN the notifications are written
+    assert pipeline.emit("info", "first", "BTC-GBP", "1h") is True
+    assert pipeline.emit("error", "second", "BTC-GBP", "1h", date="2022-01-01 00:00:00") is True
+    debug["enabled"] = True
+    assert pipeline.emit("debug", "third", "BTC-GBP", "1h") is True
+    pipeline.flush()
+
+    # THEN each sink has the notifications at its level in order
+    lines = console.getvalue().splitlines()
+    assert [line.split()[-1] for line in lines] == ["first", "second", "third"]
+    assert "2022-01-01 00:00:00" in lines[1]
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(record["level"], record["message"], record["date"]) for record in records] == [("error", "second", "2022-01-01 00:00:00")]
+
+
+def test_should_write_queued_notifications_in_batches():
+    sink = ListSink()
+    pipeline = LogPipeline([sink], batch_size=10)
+
+    # GIVEN a writer that is busy with the first notification
+    written = threading.Event()
+    release = threading.Event()
+    write = sink.write
+
+    def slow_write(records: list) -> None:
+        write(records)
+        written.set()
+        release.wait(5)
+
+    sink.write = slow_write
+    pipeline.emit("normal", "0")
+    assert written.wait(5)
+
+    # WHEN notifications are queued meanwhile
+    for i in range(1, 26):
+        pipeline.emit("normal", str(i))
+    release.set()
+    pipeline.flush()
+
+    # THEN they are written in order, batch_size at a time
+    assert sink.batches == [["0"], [str(i) for i in range(1, 11)], [str(i) for i in range(11, 21)], [str(i) for i in range(21, 26)]]
+
+
+def test_notify_uses_the_log_pipeline():
+    app = PyCryptoBot()
+    sink = ListSink()
+    app.log_pipeline = LogPipeline([sink])
+
+    # WHEN the bot notifies
+    RichText.notify("Plain text notification", app, "warning")
+    app.log_pipeline.flush()
+
+    # THEN the notification is written by the pipeline
+    assert sink.batches == [["Plain text notification"]]
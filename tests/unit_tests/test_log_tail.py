@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper import LogTailHelper
+from models.helper.LogTailHelper import LogTail
+
+
+def write_lines(file_name, lines: list, mode: str = "a") -> None:
+    with open(file_name, mode, encoding="utf8") as log_file:
+        log_file.write("".join(f"{line}\n" for line in lines))
+
+
+def test_should_read_the_last_lines(tmp_path, monkeypatch):
+    # small blocks, the lines span several of them
+    monkeypatch.setattr(LogTailHelper, "BLOCK_SIZE", 16)
+
+    file_name = str(tmp_path / "bot.log")
+    write_lines(file_name, [f"line {i} £" for i in range(100)], "w")
+
+    # WHEN the last lines are requested
+    actual = LogTail(file_name, 5).tail()
+
+    # THEN they are returned in order
+    assert actual == [f"line {i} £" for i in range(95, 100)]
+
+    # THEN a short file is returned whole
+    assert LogTail(file_name, 500).tail() == [f"line {i} £" for i in range(100)]
+
+
+def test_should_only_read_appended_bytes(tmp_path, monkeypatch):
+    file_name = str(tmp_path / "bot.log")
+    write_lines(file_name, ["one", "two"], "w")
+
+    log_tail = LogTail(file_name, 3)
+    assert log_tail.tail() == ["one", "two"]
+
+    reads = []
+    real_read = LogTail._read_last_lines
+
+    def read_last_lines(self, log_file, size):
+        reads.append(size)
+        real_read(self, log_file, size)
+
+    monkeypatch.setattr(LogTail, "_read_last_lines", read_last_lines)
+
+    # WHEN lines are appended, the last one is not complete yet
+    with open(file_name, "a", encoding="utf8") as log_file:
+        log_file.write("three\r\nfour\nfi")
+
+    # THEN the appended lines follow without reading the file again
+    assert log_tail.tail() == ["three", "four", "fi"]
+    assert reads == []
+
+    write_lines(file_name, ["ve"])
+    assert log_tail.tail() == ["three", "four", "five"]
+
+    # WHEN the log is rotated
+    os.rename(file_name, file_name + ".1")
+    write_lines(file_name, ["new"], "w")
+
+    # THEN the new file is read
+    assert log_tail.tail() == ["new"]
+    assert len(reads) == 1
@@ -0,0 +1,73 @@
+import sys
+import pytest
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from controllers.MonteCarlo import MonteCarlo
+from models.Backtest import Backtest
+from models.Trading import TechnicalAnalysis
+from tests.unit_tests.test_backtest import generate_candles, simulation
+
+
+class LocalMonteCarlo(MonteCarlo):
+    def __init__(self, app: PyCryptoBot, df, **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.df = df
+
+    def load(self) -> tuple:
+        technical_analysis = TechnicalAnalysis(self.df.copy(), len(self.df), app=self.app)
+        technical_analysis.add_all()
+        return technical_analysis.get_df(), None
+
+
+def test_should_draw_random_and_walk_forward_windows():
+    app = PyCryptoBot()
+
+    # GIVEN seeded random windows
+    windows = MonteCarlo(app, samples=20, window=100, seed=1).windows(300)
+
+    # THEN they are reproducible and inside the history
+    assert windows == MonteCarlo(app, samples=20, window=100, seed=1).windows(300)
+    assert len(windows) == 20
+    assert all(0 <= start and stop <= 300 and stop - start == 100 for start, stop in windows)
+
+    # GIVEN walk-forward windows
+    windows = MonteCarlo(app, window=100, walkforward=50).windows(300)
+
+    # THEN they roll over the history
+    assert windows == [(0, 100), (50, 150), (100, 200), (150, 250), (200, 300)]
+
+    # THEN a history shorter than a window is rejected
+    with pytest.raises(ValueError):
+        MonteCarlo(app, window=100).windows(99)
+
+
+def test_should_simulate_every_window():
+    df = generate_candles(400, seed=2)
+    app = PyCryptoBot()
+
+    # GIVEN walk-forward windows over one history
+    montecarlo = LocalMonteCarlo(app, df, window=250, walkforward=75)
+
+    # WHEN they are simulated in the worker processes
+    actual = montecarlo.run(processes=2)
+
+    # THEN every sample is a simulation of its slice of the indicators
+    assert "error" not in actual
+    assert len(actual) == 3
+
+    trading_data, _ = montecarlo.load()
+    for (start, stop), (_, row) in zip(montecarlo.windows(len(df)), actual.iterrows()):
+        assert row["start"] == str(trading_data.index[start])
+
+        expected = simulation(trading_data.iloc[start:stop])
+        Backtest(expected).run()
+        assert row["margin"] == expected.simulation_result["data"]["all_trades"].get("margin", 0.0)
+        assert row["sell_count"] == expected.simulation_result["data"]["sell_count"]
+        assert row["max_drawdown"] <= 0
+
+    # THEN the distribution has a row per metric
+    distribution = MonteCarlo.distribution(actual)
+    assert list(distribution.index) == ["margin", "win_rate", "max_drawdown", "profit_loss", "sell_count"]
+    assert distribution.loc["sell_count", "count"] == 3
@@ -0,0 +1,230 @@
+import io
+import sys
+import json
+import time
+import sched
+from datetime import datetime
+from types import SimpleNamespace
+
+from rich.console import Console
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers import MultiMarketRunner as MultiMarketRunnerModule
+from controllers.MultiMarketRunner import BotScheduler, MultiMarketRunner
+from controllers.PyCryptoBot import PyCryptoBot
+from models.helper.StateStoreHelper import StateStore
+
+
+class FakeBot:
+    def __init__(self, scheduler: sched.scheduler, runner: MultiMarketRunner, market: str) -> None:
+        self.market = market
+        self.autorestart = False
+        self.disabletelegramerrormsgs = True
+        self.jobs = 0
+        self.s = BotScheduler(scheduler, runner._guard(self))
+        self.telegram_bot = None
+
+    def execute_job(self):
+        self.jobs += 1
+        # what PyCryptoBot.execute_job does before it schedules the next job
+        list(map(self.s.cancel, self.s.queue))
+        if self.jobs < 3:
+            self.s.enter(0, 1, self.execute_job, ())
+
+
+class ExitBot(FakeBot):
+    def execute_job(self):
+        self.jobs += 1
+        self.s.enter(0, 1, self.execute_job, ())
+        sys.exit(0)
+
+
+def test_should_only_cancel_own_events():
+    # GIVEN two bots on one scheduler
+    scheduler = sched.scheduler(time.time, lambda _: None)
+    first = BotScheduler(scheduler, lambda action, argument, kwargs: action(*argument, **kwargs))
+    second = BotScheduler(scheduler, lambda action, argument, kwargs: action(*argument, **kwargs))
+
+    calls = []
+    first.enter(0, 1, calls.append, ("first",))
+    second.enter(0, 1, calls.append, ("second",))
+
+    # WHEN the first bot cancels its queue
+    list(map(first.cancel, first.queue))
+
+    # THEN only the job of the second bot runs
+    assert len(first.queue) == 0
+    assert len(second.queue) == 1
+    scheduler.run()
+    assert calls == ["second"]
+    assert len(second.queue) == 0
+
+
+def test_should_stop_only_the_exiting_bot():
+    # GIVEN a runner with a bot that exits after its first job
+    scheduler = sched.scheduler(time.time, lambda _: None)
+    runner = MultiMarketRunner.__new__(MultiMarketRunner)
+    runner.bots = []
+
+    bot = FakeBot(scheduler, runner, "BTC-GBP")
+    exit_bot = ExitBot(scheduler, runner, "ETH-GBP")
+    runner.bots = [bot, exit_bot]
+
+    # WHEN the scheduler runs
+    for item in runner.bots:
+        item.s.enter(0, 1, item.execute_job, ())
+    scheduler.run()
+
+    # THEN the other bot keeps running
+    assert bot.jobs == 3
+    assert exit_bot.jobs == 1
+    assert runner.bots == [bot]
+
+
+class Clock:
+    """Scheduler time that advances without sleeping"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.open = True
+        self.closed = 0
+        self.started = 0
+        self.time_elapsed = 0
+
+    def close(self) -> None:
+        self.open = False
+        self.closed += 1
+
+    def start(self) -> None:
+        self.open = True
+        self.started += 1
+
+
+class FakeTelegramBot:
+    def __init__(self, statuses: list) -> None:
+        self.statuses = statuses
+        self.updates = []
+
+    def check_bot_control_status(self) -> str:
+        return self.statuses.pop(0) if len(self.statuses) > 0 else "active"
+
+    def update_bot_status(self, status: str) -> None:
+        self.updates.append(status)
+
+    def remove_active_bot(self) -> None:
+        pass
+
+
+class TelegramBot(FakeBot):
+    """Runs the telegram control part of PyCryptoBot.execute_job on a shared websocket"""
+
+    execute_job = PyCryptoBot.execute_job
+
+    def __init__(self, scheduler: sched.scheduler, runner: MultiMarketRunner, market: str, websocket: FakeWebSocket, statuses: list) -> None:
+        super().__init__(scheduler, runner, market)
+        self.is_live = False
+        self.is_sim = False
+        self.state = SimpleNamespace(account=SimpleNamespace(mode="test"), last_api_call_datetime=datetime.now())
+        self.disabletelegram = False
+        self.telegram_bot = FakeTelegramBot(statuses)
+        self.log_pipeline = SimpleNamespace(emit=lambda *args, **kwargs: None)
+        self.websocket = True
+        self.websocket_connection = websocket
+        self.shared_websocket = True
+
+    def notify_telegram(self, message: str) -> None:
+        pass
+
+    def print_granularity(self) -> str:
+        return "1h"
+
+
+class TickBot(FakeBot):
+    def __init__(self, scheduler: sched.scheduler, runner: MultiMarketRunner, market: str, websocket: FakeWebSocket) -> None:
+        super().__init__(scheduler, runner, market)
+        self.websocket_connection = websocket
+        self.shared_websocket = True
+        self.ticks = []
+
+    def execute_job(self):
+        self.ticks.append(self.websocket_connection.open)
+        if len(self.ticks) < 13:
+            self.s.enter(10, 1, self.execute_job, ())
+
+
+def test_should_pause_a_bot_without_stopping_the_others():
+    clock = Clock()
+    scheduler = sched.scheduler(clock.time, clock.sleep)
+    runner = MultiMarketRunner.__new__(MultiMarketRunner)
+    websocket = FakeWebSocket()
+
+    # GIVEN two bots on one websocket, the first is paused from telegram for 90 seconds
+    paused = TelegramBot(scheduler, runner, "BTC-GBP", websocket, ["pause", "paused", "paused", "exit"])
+    ticker = TickBot(scheduler, runner, "ETH-GBP", websocket)
+    runner.bots = [paused, ticker]
+
+    # WHEN the scheduler runs
+    started = time.time()
+    for bot in runner.bots:
+        bot.s.enter(0, 1, bot.execute_job, ())
+    scheduler.run()
+
+    # THEN the paused bot checked its status every 30 seconds without sleeping
+    assert time.time() - started < 5
+    assert paused.telegram_bot.updates == ["paused"]
+    assert runner.bots == [ticker]
+
+    # THEN the other bot kept receiving ticks from the open websocket
+    assert ticker.ticks == [True] * 13
+    assert websocket.closed == 0
+
+
+def test_should_restart_a_shared_websocket_once(monkeypatch):
+    monkeypatch.setattr(MultiMarketRunnerModule.RichText, "notify", lambda *args, **kwargs: None)
+    scheduler = sched.scheduler(time.time, lambda _: None)
+    runner = MultiMarketRunner.__new__(MultiMarketRunner)
+    runner.scheduler = scheduler
+    websocket = FakeWebSocket()
+
+    # GIVEN three bots on a websocket open for 23 hours
+    runner.bots = [TickBot(scheduler, runner, market, websocket) for market in ["BTC-GBP", "ETH-GBP", "LTC-GBP"]]
+    websocket.time_elapsed = MultiMarketRunnerModule.WEBSOCKET_MAX_AGE + 1
+
+    # WHEN the runner checks the connections
+    runner._restart_websockets()
+
+    # THEN the websocket is restarted once and checked again later
+    assert (websocket.closed, websocket.started) == (1, 1)
+    assert len(scheduler.queue) == 1
+
+
+def test_should_only_list_the_bots_of_the_markets(tmp_path, monkeypatch):
+    # GIVEN a config with telegram bot control and the markets to run
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(
+        json.dumps(
+            {
+                "dummy": {"config": {"market": "ADA-GBP", "markets": "BTC-GBP,ETH-GBP", "telegrambotcontrol": 1}},
+                "telegram": {"token": "000000000:XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX", "client_id": "-1", "datafolder": str(tmp_path)},
+            }
+        )
+    )
+
+    # WHEN the app of the process and the bot of a market are created
+    app = PyCryptoBot(console_log=Console(file=io.StringIO()))
+    bot = PyCryptoBot(market="BTC-GBP", console_log=app.console_log)
+
+    # THEN only the bot of the market is in the telegram bot list
+    assert app.telegrambotcontrol and app.markets == ["BTC-GBP", "ETH-GBP"]
+    assert StateStore.open(str(tmp_path)).bots() == [bot.market]
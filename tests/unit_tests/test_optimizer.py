@@ -0,0 +1,68 @@
+import sys
+import pytest
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from controllers.Optimizer import Optimizer
+from models.Backtest import Backtest
+from models.Trading import TechnicalAnalysis
+from tests.unit_tests.test_backtest import generate_candles, simulation
+
+
+class LocalOptimizer(Optimizer):
+    def __init__(self, app: PyCryptoBot, spec: dict, df) -> None:
+        super().__init__(app, spec)
+        self.df = df
+
+    def load(self) -> tuple:
+        self.app.is_sim = "fast"
+        technical_analysis = TechnicalAnalysis(self.df.copy(), len(self.df), app=self.app)
+        technical_analysis.add_all()
+        return technical_analysis.get_df(), None
+
+
+def test_should_expand_grid_and_random_search():
+    app = PyCryptoBot()
+
+    # GIVEN a grid with a list and a range
+    spec = {"params": {"trailingstoploss": [-1, -2], "sellupperpcnt": {"min": 2, "max": 6, "step": 2}}}
+
+    # THEN every combination is simulated
+    combinations = Optimizer(app, spec).combinations()
+    assert len(combinations) == 6
+    assert combinations[0] == {"trailingstoploss": -1, "sellupperpcnt": 2}
+    assert combinations[-1] == {"trailingstoploss": -2, "sellupperpcnt": 6}
+
+    # GIVEN a random search with more samples than combinations
+    spec = {"search": "random", "samples": 10, "seed": 1, "params": {"trailingstoploss": [-1, -2], "disablebuyobv": [0, 1]}}
+
+    # THEN the combinations are distinct
+    combinations = Optimizer(app, spec).combinations()
+    assert len(combinations) == 4
+    assert len({tuple(combination.values()) for combination in combinations}) == 4
+
+    # THEN options that change the candles are rejected
+    with pytest.raises(ValueError):
+        Optimizer(app, {"params": {"granularity": ["1h", "15m"]}})
+
+
+def test_should_rank_the_simulation_summaries():
+    df = generate_candles(250, seed=2)
+    app = PyCryptoBot()
+
+    # GIVEN a sweep over the trailing stop loss
+    spec = {"rank": "profit_loss", "params": {"trailingstoploss": [-1.0, -3.0], "trailingstoplosstrigger": [0.5]}}
+
+    # WHEN it is run in the worker processes
+    actual = LocalOptimizer(app, spec, df).run(processes=2)
+
+    # THEN the results are the ones of a single simulation, best first
+    assert "error" not in actual
+    assert actual["profit_loss"].is_monotonic_decreasing
+
+    for _, row in actual.iterrows():
+        expected = simulation(df, trailing_stop_loss=row["trailingstoploss"], trailing_stop_loss_trigger=0.5)
+        Backtest(expected).run()
+        assert row["profit_loss"] == expected.simulation_result["data"]["all_trades"]["profit_loss"]
+        assert row["sell_count"] == expected.simulation_result["data"]["sell_count"]
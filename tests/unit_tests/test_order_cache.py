@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import multiprocessing
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper import OrderCacheHelper as OrderCacheModule
+from models.helper.OrderCacheHelper import OrderCache
+
+DAY = 24 * 3600 * 1000
+
+
+def generate_orders(ids: list, market: str = "BTC-USDT", start: int = 1640995200000, prefix: str = "order") -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": [f"{prefix}{i}" for i in ids],
+            "symbol": market,
+            "side": "buy",
+            "size": "0.01",
+            "createdAt": [start + i * DAY // 2 for i in ids],
+        }
+    )
+
+
+def hold_lock(path: str, started, seconds: float) -> None:
+    cache = OrderCache(path)
+    with cache.lock():
+        started.set()
+        time.sleep(seconds)
+        cache.mark_built(0)
+
+
+def test_should_append_new_orders_to_day_partitions(tmp_path):
+    cache = OrderCache(str(tmp_path))
+
+    # GIVEN four orders over two days
+    assert cache.append(generate_orders([0, 1, 2, 3])) == 4
+    assert sorted(os.listdir(tmp_path / "BTC-USDT")) == ["2022-01-01.jsonl", "2022-01-02.jsonl"]
+
+    # WHEN the next build returns some of them again
+    size = os.path.getsize(tmp_path / "BTC-USDT" / "2022-01-01.jsonl")
+    assert cache.append(generate_orders([1, 2, 3, 4, 5])) == 2
+    cache.append(generate_orders([0], market="ETH-USDT", prefix="eth"))
+
+    # THEN only the new orders are appended
+    assert os.path.getsize(tmp_path / "BTC-USDT" / "2022-01-01.jsonl") == size
+    assert list(cache.read("BTC-USDT")["id"]) == [f"order{i}" for i in range(6)]
+    assert len(cache.read()) == 7
+
+    # WHEN the first day is purged
+    cache.purge(1640995200000 + DAY)
+
+    # THEN its partitions are removed
+    assert list(cache.read("BTC-USDT")["id"]) == ["order2", "order3", "order4", "order5"]
+    assert not os.path.exists(tmp_path / "ETH-USDT")
+
+
+def test_should_wait_for_the_building_process(tmp_path):
+    cache = OrderCache(str(tmp_path))
+    assert not cache.is_fresh()
+
+    # GIVEN another process is building the cache
+    started = multiprocessing.Event()
+    process = multiprocessing.Process(target=hold_lock, args=(str(tmp_path), started, 0.5))
+    process.start()
+    assert started.wait(10)
+
+    # WHEN this process wants to build it
+    with cache.lock():
+        # THEN it gets the lock once the other build is complete
+        assert cache.is_fresh()
+
+    process.join()
+
+
+def test_should_only_keep_the_recent_partitions_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(OrderCacheModule, "MAX_PARTITIONS", 2)
+    monkeypatch.setattr(OrderCache, "_partitions", {})
+    cache = OrderCache(str(tmp_path))
+
+    # GIVEN three days of orders
+    cache.append(generate_orders([0, 1, 2, 3, 4, 5]))
+
+    # WHEN they are read
+    assert len(cache.read()) == 6
+
+    # THEN only the two most recent days are kept parsed
+    assert sorted(os.path.basename(path) for path in OrderCache._partitions) == ["2022-01-02.jsonl", "2022-01-03.jsonl"]
+
+    # WHEN the days before the last are purged
+    cache.purge(1640995200000 + 2 * DAY)
+
+    # THEN their parsed orders are dropped too
+    assert [os.path.basename(path) for path in OrderCache._partitions] == ["2022-01-03.jsonl"]
+    assert list(cache.read()["id"]) == ["order4", "order5"]
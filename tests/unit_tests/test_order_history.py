@@ -0,0 +1,82 @@
+import sys
+import pandas as pd
+from statsmodels.compat.pandas import assert_frame_equal
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper.OrderHistoryHelper import OrderHistory
+
+
+def generate_orders(periods: int, start: str = "2022-01-01") -> pd.DataFrame:
+    created_at = pd.date_range(start, periods=periods, freq="H", tz="UTC")
+    return pd.DataFrame(
+        {
+            "created_at": created_at,
+            "market": "BTCGBP",
+            "action": ["buy" if i % 2 == 0 else "sell" for i in range(periods)],
+            "type": "MARKET",
+            "size": [float(100 + i) for i in range(periods)],
+            "filled": 0.01,
+            "fees": 0.1,
+            "price": [float(30000 + i) for i in range(periods)],
+            "status": "done",
+        }
+    )
+
+
+class FakeExchange:
+    def __init__(self, orders: pd.DataFrame) -> None:
+        self.orders = orders
+        self.calls = []
+
+    def get_orders(self, iso8601start: str) -> pd.DataFrame:
+        self.calls.append(iso8601start)
+        if iso8601start == "":
+            return self.orders.copy()
+        return self.orders[self.orders["created_at"] >= pd.Timestamp(iso8601start, tz="UTC")].reset_index(drop=True)
+
+
+def test_should_only_fetch_newer_orders(tmp_path):
+    OrderHistory.clear()
+
+    # GIVEN an empty order history cache
+    exchange = FakeExchange(generate_orders(5))
+    history = OrderHistory("binance", "BTCGBP", cache_path=str(tmp_path))
+
+    # WHEN the orders are requested
+    actual = history.get_orders(exchange.get_orders)
+
+    # THEN the full history is fetched once
+    assert exchange.calls == [""]
+    assert history.cursor == "2022-01-01T04:00:00"
+    assert_frame_equal(actual, exchange.orders)
+
+    # WHEN a new order is placed
+    exchange.orders = generate_orders(7)
+    actual = history.get_orders(exchange.get_orders)
+
+    # THEN only the orders from the cursor are fetched
+    assert exchange.calls == ["", "2022-01-01T04:00:00"]
+    assert history.cursor == "2022-01-01T06:00:00"
+    assert_frame_equal(actual, exchange.orders)
+
+
+def test_should_keep_the_cache_on_disk_and_on_errors(tmp_path):
+    OrderHistory.clear()
+    exchange = FakeExchange(generate_orders(3))
+    OrderHistory("kucoin", "BTC-GBP", cache_path=str(tmp_path)).get_orders(exchange.get_orders)
+
+    # GIVEN a new process
+    OrderHistory.clear()
+
+    # WHEN the exchange returns an error
+    actual = OrderHistory("kucoin", "BTC-GBP", cache_path=str(tmp_path)).get_orders(lambda start: pd.DataFrame())
+
+    # THEN the orders are read from the cache file
+    assert_frame_equal(actual, exchange.orders)
+
+    # WHEN the full sync is due and fails
+    actual = OrderHistory("kucoin", "BTC-GBP", cache_path=str(tmp_path), full_sync_interval=0).get_orders(lambda start: pd.DataFrame())
+
+    # THEN the cached orders are kept
+    assert_frame_equal(actual, exchange.orders)
@@ -0,0 +1,77 @@
+import sys
+import threading
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange import RangeDownloader as RangeDownloaderModule
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.exchange.RangeDownloader import RangeDownloader, RangeDownloadError
+
+
+class FakeExchange:
+    """Hourly candles, without the candles of ``missing`` and failing the requests starting in ``failing``"""
+
+    def __init__(self, missing: list = None, failing: list = None) -> None:
+        self.missing = [pd.Timestamp(date) for date in (missing or [])]
+        self.failing = [pd.Timestamp(date) for date in (failing or [])]
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_historical_data(self, iso8601start: str, iso8601end: str) -> pd.DataFrame:
+        with self._lock:
+            self.requests.append((iso8601start, iso8601end))
+
+        if pd.Timestamp(iso8601start) in self.failing:
+            raise ConnectionError("Read timed out")
+
+        index = pd.date_range(iso8601start, iso8601end, freq="1H")
+        index = index[~index.isin(self.missing)]
+        return pd.DataFrame({"date": index, "close": 1.0}, index=index)
+
+
+def test_should_download_the_range_in_chunks(monkeypatch):
+    monkeypatch.setattr(RangeDownloaderModule, "RETRY_WAIT", 0)
+    exchange = FakeExchange(missing=["2022-01-03 05:00", "2022-01-03 06:00"])
+    downloader = RangeDownloader(Exchange.DUMMY, Granularity.ONE_HOUR, exchange.get_historical_data, chunk_candles=24)
+
+    # WHEN five days and one hour are downloaded
+    df = downloader.download("2022-01-01T00:00:00", "2022-01-06T00:00:00")
+
+    # THEN each request is one day at most
+    assert sorted(exchange.requests)[:2] == [("2022-01-01T00:00:00", "2022-01-01T23:00:00"), ("2022-01-02T00:00:00", "2022-01-02T23:00:00")]
+    assert sorted(exchange.requests)[-1] == ("2022-01-06T00:00:00", "2022-01-06T00:00:00")
+    assert len(exchange.requests) == 6
+
+    # THEN the candles are in order, once
+    assert len(df) == 5 * 24 + 1 - 2
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+
+    # THEN the missing candles are reported
+    assert downloader.gaps == [(pd.Timestamp("2022-01-03 04:00"), pd.Timestamp("2022-01-03 07:00"))]
+
+
+def test_should_resume_after_a_failed_chunk(monkeypatch):
+    monkeypatch.setattr(RangeDownloaderModule, "RETRY_WAIT", 0)
+    exchange = FakeExchange(failing=["2022-01-02"])
+    downloader = RangeDownloader(Exchange.DUMMY, Granularity.ONE_HOUR, exchange.get_historical_data, chunk_candles=24, retries=2)
+
+    # WHEN a chunk fails every retry
+    try:
+        downloader.download("2022-01-01T00:00:00", "2022-01-03T23:00:00")
+        assert False, "RangeDownloadError expected"
+    except RangeDownloadError as err:
+        assert err.failed == [(pd.Timestamp("2022-01-02"), pd.Timestamp("2022-01-02 23:00"))]
+
+    assert len(exchange.requests) == 2 + 2
+
+    # WHEN the download is resumed
+    exchange.failing = []
+    df = downloader.download("2022-01-01T00:00:00", "2022-01-03T23:00:00")
+
+    # THEN only the failed chunk is requested again
+    assert exchange.requests[-1] == ("2022-01-02T00:00:00", "2022-01-02T23:00:00")
+    assert len(exchange.requests) == 5
+    assert len(df) == 3 * 24
+    assert downloader.gaps == []
@@ -0,0 +1,33 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.RateLimiter import RateLimiter, TokenBucket
+
+
+def test_should_allow_burst_then_limit_rate():
+    # GIVEN a bucket of 5 tokens refilled at 100 per second
+    bucket = TokenBucket(rate=100, capacity=5)
+
+    # WHEN 25 requests are made from 5 threads
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda _: bucket.acquire(), range(25)))
+    elapsed = time.monotonic() - start
+
+    # THEN the 20 requests after the burst take 0.2 seconds
+    assert 0.18 <= elapsed < 1.0
+
+
+def test_should_use_request_weights():
+    bucket = RateLimiter.get(Exchange.BINANCE)
+    assert bucket is RateLimiter.get(Exchange.BINANCE)
+    assert RateLimiter.get(Exchange.DUMMY) is None
+    assert RateLimiter.acquire(Exchange.DUMMY, "klines") == 0.0
+
+    tokens = bucket._tokens
+    RateLimiter.acquire(Exchange.BINANCE, "klines")
+    assert bucket._tokens <= tokens - 2 + 0.5
@@ -0,0 +1,134 @@
+import sys
+import numpy as np
+import pandas as pd
+from statsmodels.compat.pandas import assert_frame_equal
+
+sys.path.append(".")
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from models.exchange.Granularity import Granularity
+from models.helper.CandleFrameHelper import compact_candles
+from models.helper.ResampleHelper import Resampler, resample
+
+
+def generate_candles(periods: int, start: str = "2022-01-01", granularity: Granularity = Granularity.FIFTEEN_MINUTES, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    close = np.round(30000 + np.cumsum(rng.randn(periods) * 50), 2)
+    tsidx = pd.date_range(start, periods=periods, freq=f"{granularity.to_integer}S")
+
+    df = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": "BTCGBP",
+            "granularity": granularity.to_short,
+            "low": close - np.round(rng.rand(periods) * 30, 2),
+            "high": close + np.round(rng.rand(periods) * 30, 2),
+            "open": np.append(close[:1], close[:-1]),
+            "close": close,
+            "volume": np.round(rng.rand(periods) * 10, 4),
+        },
+        index=tsidx,
+    )
+    df.index.name = "ts"
+    return df
+
+
+def expected_candles(df: pd.DataFrame, granularity: Granularity) -> pd.DataFrame:
+    expected = df.resample(granularity.get_frequency).agg({"low": "min", "high": "max", "open": "first", "close": "last", "volume": "sum"})
+    expected.insert(0, "date", expected.index)
+    expected.insert(1, "market", "BTCGBP")
+    expected.insert(2, "granularity", granularity.to_short)
+    return compact_candles(expected)
+
+
+def test_should_aggregate_candles_on_exchange_boundaries():
+    # GIVEN 15m candles starting in the middle of a 6h candle
+    df = generate_candles(200, start="2022-01-01 04:45")
+
+    # WHEN they are resampled
+    actual = resample(df, Granularity.SIX_HOURS)
+
+    # THEN the candles start at 00:00, 06:00, 12:00 and 18:00 UTC and the incomplete first candle is dropped
+    expected = expected_candles(df, Granularity.SIX_HOURS).iloc[1:]
+    assert actual["date"].iloc[0] == pd.Timestamp("2022-01-01 06:00")
+    assert_frame_equal(actual, expected, check_freq=False)
+
+    # THEN the granularity is in the format of the exchange
+    df["granularity"] = Granularity.FIFTEEN_MINUTES.to_integer
+    assert resample(df, Granularity.ONE_HOUR)["granularity"].iloc[0] == 3600
+
+
+def test_should_update_the_last_candles_incrementally():
+    df = generate_candles(400)
+
+    # GIVEN 1h candles from the exchange that end before the bot candles
+    resampler = Resampler(Granularity.ONE_HOUR, expected_candles(df.iloc[:100], Granularity.ONE_HOUR))
+
+    # WHEN the bot candles close one at a time
+    for rows in [300, 301, 302, 305, 400]:
+        actual = resampler.update(df.iloc[rows - 300 : rows])
+
+        # THEN the 1h candles are the ones of the whole history
+        assert_frame_equal(actual, expected_candles(df.iloc[:rows], Granularity.ONE_HOUR), check_freq=False)
+
+
+def test_should_keep_the_latest_candles():
+    df = generate_candles(2000)
+
+    # GIVEN a resampler keeping 100 1h candles
+    resampler = Resampler(Granularity.ONE_HOUR, expected_candles(df.iloc[:400], Granularity.ONE_HOUR), max_candles=100)
+
+    # WHEN the bot candles close for weeks
+    for rows in range(700, 2001, 50):
+        actual = resampler.update(df.iloc[rows - 300 : rows])
+
+        # THEN the frame does not grow and ends with the latest candles
+        assert len(actual) == 100
+        assert_frame_equal(actual, expected_candles(df.iloc[:rows], Granularity.ONE_HOUR).iloc[-100:], check_freq=False)
+
+
+def test_should_request_the_coarser_candles_once():
+    app = PyCryptoBot()
+    app.granularity = Granularity.FIFTEEN_MINUTES
+
+    df = generate_candles(700)
+    calls = []
+
+    def get_historical_data(market, granularity, websocket, iso8601start="", iso8601end=""):
+        calls.append(granularity)
+        return expected_candles(df.iloc[:400], granularity)
+
+    app.get_historical_data = get_historical_data
+
+    # WHEN the 1h and 6h candles are requested every time a 15m candle closes
+    for rows in range(400, 700, 25):
+        app.trading_data = df.iloc[rows - 300 : rows]
+        df_1h = app.get_additional_df("1h", None)
+        df_6h = app.get_additional_df("6h", None)
+
+    # THEN the exchange is only asked for the history
+    assert calls == [Granularity.ONE_HOUR, Granularity.SIX_HOURS]
+    assert_frame_equal(df_1h, expected_candles(df.iloc[:675], Granularity.ONE_HOUR), check_freq=False)
+    assert_frame_equal(df_6h, expected_candles(df.iloc[:675], Granularity.SIX_HOURS), check_freq=False)
+
+
+def test_should_resample_the_smart_switch_simulation_candles():
+    app = PyCryptoBot()
+    app.adjusttotalperiods = 50
+
+    df = generate_candles(2000)
+    calls = []
+
+    def get_historical_data(market, granularity, websocket, iso8601start="", iso8601end=""):
+        calls.append((granularity, iso8601start, iso8601end))
+        expected = expected_candles(df, granularity)
+        return expected.loc[iso8601start:iso8601end]
+
+    app.get_historical_data = get_historical_data
+
+    # WHEN the 6h candles of a simulation on 15m candles are requested
+    actual = app.get_resampled_df(None, df.iloc[1000:], "BTCGBP", Granularity.SIX_HOURS)
+
+    # THEN only the history before the 15m candles is requested from the exchange
+    assert calls == [(Granularity.SIX_HOURS, "2021-12-29T18:00:00", "2022-01-11T06:00:00")]
+    assert_frame_equal(actual, expected_candles(df, Granularity.SIX_HOURS), check_freq=False)
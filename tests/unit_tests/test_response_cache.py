@@ -0,0 +1,123 @@
+import sys
+import time
+import threading
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.Granularity import Granularity
+from models.helper import ResponseCacheHelper
+from models.helper.ResponseCacheHelper import ResponseCache, next_candle_close
+
+
+class Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_should_expire_at_the_candle_close():
+    assert next_candle_close(Granularity.FIFTEEN_MINUTES, 1640995200) == 1640995200 + 900
+    assert next_candle_close(Granularity.ONE_HOUR, 1640995200 + 3599.5) == 1640995200 + 3600
+    assert next_candle_close(21600, 1640995200 + 100) == 1640995200 + 21600
+
+    # GIVEN an analysis computed during a candle
+    clock = Clock(1640995200 + 600)
+    cache = ResponseCache(refresh=False, clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(clock.now)
+        return len(calls)
+
+    assert cache.get(("binance", "BTCGBP", Granularity.FIFTEEN_MINUTES), compute, granularity=Granularity.FIFTEEN_MINUTES) == 1
+
+    # WHEN it is requested again before the candle closes
+    clock.now = 1640995200 + 899
+
+    # THEN it is not computed again
+    assert cache.get(("binance", "BTCGBP", Granularity.FIFTEEN_MINUTES), compute, granularity=Granularity.FIFTEEN_MINUTES) == 1
+
+    # WHEN the candle has closed
+    clock.now = 1640995200 + 900
+
+    # THEN it is computed again
+    assert cache.get(("binance", "BTCGBP", Granularity.FIFTEEN_MINUTES), compute, granularity=Granularity.FIFTEEN_MINUTES) == 2
+
+    # THEN other values expire after their time to live
+    assert cache.get("markets", compute, ttl=60) == 3
+    clock.now += 59
+    assert cache.get("markets", compute, ttl=60) == 3
+    clock.now += 1
+    assert cache.get("markets", compute, ttl=60) == 4
+
+
+def test_should_expire_a_computation_spanning_the_candle_close():
+    clock = Clock(1640995200 + 3599)
+    cache = ResponseCache(refresh=False, clock=clock)
+    calls = []
+
+    def compute():
+        # the candles were requested before the close, the result is ready after it
+        calls.append(clock.now)
+        clock.now += 6
+        return len(calls)
+
+    # GIVEN an analysis that started a second before the candle close
+    assert cache.get("BTCGBP", compute, granularity=Granularity.ONE_HOUR) == 1
+
+    # WHEN it is requested after the close
+    clock.now = 1640995200 + 3606
+
+    # THEN it is computed again with the closed candle
+    assert cache.get("BTCGBP", compute, granularity=Granularity.ONE_HOUR) == 2
+    assert calls == [1640995200 + 3599, 1640995200 + 3606]
+
+
+def test_should_compute_once_for_concurrent_requests():
+    cache = ResponseCache(refresh=False)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "analysis"
+
+    # GIVEN a request is computing the analysis
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("BTCGBP", compute, granularity=3600))) for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+
+    # WHEN identical requests arrive
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    # THEN they share its result
+    assert calls == [1]
+    assert results == ["analysis"] * 5
+
+
+def test_should_refresh_viewed_markets_after_the_candle_close(monkeypatch):
+    monkeypatch.setattr(ResponseCacheHelper, "SETTLE_SECONDS", 0)
+    cache = ResponseCache()
+    calls = []
+
+    # GIVEN a market viewed with one second candles
+    cache.get("BTCGBP", lambda: calls.append(1) or len(calls), granularity=1)
+
+    # WHEN a few candles close
+    deadline = time.time() + 5
+    while len(calls) < 3 and time.time() < deadline:
+        time.sleep(0.05)
+
+    # THEN the market was computed again in the background
+    assert len(calls) >= 3
@@ -0,0 +1,73 @@
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Screener import Screener, OUTPUT_COLUMNS
+from models.Trading import TechnicalAnalysis
+
+
+def generate_candles(periods: int = 300, seed: int = 1, market: str = "BTC-GBP") -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    close = 100 + np.cumsum(rng.randn(periods))
+    tsidx = pd.date_range("2022-01-01", periods=periods, freq="H")
+
+    df = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": market,
+            "granularity": 3600,
+            "low": close - rng.rand(periods),
+            "high": close + rng.rand(periods),
+            "open": np.append(close[:1], close[:-1]),
+            "close": close,
+            "volume": rng.rand(periods) * 50000,
+        },
+        index=tsidx,
+    )
+    df.index.name = "ts"
+    return df
+
+
+def test_should_match_technical_analysis_indicators():
+    # GIVEN the candles of three markets
+    candles = {market: generate_candles(300, seed, market) for seed, market in enumerate(["BTC-GBP", "ETH-GBP", "LTC-GBP"])}
+
+    # WHEN the indicators are calculated for all markets at once
+    actual = Screener(candles, 300).indicators()
+
+    # THEN every market has the values of the single market calculations
+    for market, df in candles.items():
+        ta = TechnicalAnalysis(df.copy())
+        adx = ta._average_directional_index(14).iloc[-1]
+        assert np.isclose(actual.at[market, "adx"], adx["adx14"])
+        assert np.isclose(actual.at[market, "adx+di"], adx["+di14"])
+        assert np.isclose(actual.at[market, "adx-di"], adx["-di14"])
+        assert np.isclose(actual.at[market, "atr"], ta._average_true_range(14).iloc[-1])
+
+        macd = df["close"].ewm(span=12, adjust=False).mean() - df["close"].ewm(span=26, adjust=False).mean()
+        assert np.isclose(actual.at[market, "macd"], macd.iloc[-1])
+        assert np.isclose(actual.at[market, "macd.signal"], macd.ewm(span=9, adjust=False).mean().iloc[-1])
+
+        middle = df["close"].rolling(20).mean().iloc[-1]
+        deviation = df["close"].rolling(20).std(ddof=0).iloc[-1]
+        assert np.isclose(actual.at[market, "bollinger_upper"], middle + 2 * deviation)
+
+        highest = df["high"].rolling(14).max().iloc[-1]
+        lowest = df["low"].rolling(14).min().iloc[-1]
+        assert np.isclose(actual.at[market, "williamsr"], -100 * (highest - df["close"].iloc[-1]) / (highest - lowest))
+
+    assert set(actual["rating"]) <= {"STRONG_SELL", "SELL", "NEUTRAL", "BUY", "STRONG_BUY"}
+
+
+def test_should_screen_markets_with_enough_candles():
+    candles = {"BTC-GBP": generate_candles(300, 1), "ETH-GBP": generate_candles(100, 2), "LTC-GBP": None}
+
+    screener = Screener(candles)
+    actual = screener.screen(["STRONG_SELL", "SELL", "NEUTRAL", "BUY", "STRONG_BUY"], -1000, minimum_volume=0, minimum_volatility=0)
+
+    assert screener.markets == ["BTC-GBP"]
+    assert screener.skipped == ["ETH-GBP"]
+    assert list(actual.columns) == OUTPUT_COLUMNS
+    assert actual["market"].tolist() == ["BTC-GBP"]
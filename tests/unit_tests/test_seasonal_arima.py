@@ -0,0 +1,82 @@
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Trading import TechnicalAnalysis
+from models.helper.SeasonalArimaHelper import SeasonalArima
+
+
+def generate_candles(periods: int = 121) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    # without a frequency, as the exchange data
+    index = pd.DatetimeIndex(pd.date_range("2022-01-01", periods=periods, freq="1H").values)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame(
+        {
+            "date": index,
+            "market": "BTC-GBP",
+            "granularity": "1h",
+            "low": close - 1,
+            "high": close + 1,
+            "open": close,
+            "close": close,
+            "volume": 1000.0,
+        },
+        index=index,
+    )
+
+
+def record_fits(monkeypatch) -> list:
+    fits = []
+    real_fit = SeasonalArima._fit
+
+    def fit(close, start_params=None):
+        fits.append(start_params)
+        return real_fit(close, start_params)
+
+    monkeypatch.setattr(SeasonalArima, "_fit", staticmethod(fit))
+    SeasonalArima.clear()
+    return fits
+
+
+def test_should_fit_once_per_candle(monkeypatch):
+    fits = record_fits(monkeypatch)
+    candles = generate_candles()
+
+    # GIVEN the model of the last candle
+    ta = TechnicalAnalysis(candles.iloc[:-1].copy())
+    results = ta.seasonal_arima_model()
+
+    # WHEN it is used again for a prediction and the fitted values
+    prediction = ta.seasonal_arima_model_prediction(180)
+    fitted_values = ta.seasonal_arima_model_fitted_values()
+
+    # THEN it is not fitted again and the data is not changed
+    assert fits == [None]
+    assert prediction is not None and prediction[0] == "2022-01-06 02:00"
+    assert list(fitted_values.index) == list(ta.get_df().index)
+    assert isinstance(ta.get_df().index, pd.DatetimeIndex)
+
+    # WHEN the next candle closes
+    next_results = TechnicalAnalysis(candles.iloc[1:].copy()).seasonal_arima_model()
+
+    # THEN the model is fitted from the previous candle's parameters
+    assert len(fits) == 2
+    assert list(fits[1]) == list(results.params)
+    assert next_results is not results
+    assert np.allclose(next_results.params, results.params, atol=0.1)
+
+
+def test_should_not_wait_for_the_fit(monkeypatch):
+    fits = record_fits(monkeypatch)
+    ta = TechnicalAnalysis(generate_candles())
+
+    # WHEN the prediction is requested from the tick
+    assert ta.seasonal_arima_model_prediction(180, wait=False) is None
+
+    # THEN the model is fitted on the pool and is there for the next tick
+    SeasonalArima.submit(ta.get_df()["close"], "BTC-GBP", "1h").result(60)
+    assert ta.seasonal_arima_model_prediction(180, wait=False) is not None
+    assert len(fits) == 1
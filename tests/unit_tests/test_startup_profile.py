@@ -0,0 +1,57 @@
+import sys
+import importlib
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper.StartupProfileHelper import LazyImport, StartupProfile
+
+
+def write_module(path, name: str, source: str) -> None:
+    (path / f"{name}.py").write_text(source, encoding="utf8")
+
+
+def test_should_import_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    write_module(tmp_path, "lazy_client", "class Client:\n    version = 2\n\n    def __init__(self, key):\n        self.key = key\n")
+
+    # GIVEN a lazy import of a client
+    client = LazyImport("lazy_client", "Client")
+
+    # THEN the module is not loaded yet
+    assert "lazy_client" not in sys.modules
+
+    # WHEN it is used
+    assert client("secret").key == "secret"
+
+    # THEN it is the client of the module
+    assert client.version == 2
+    assert client.target is sys.modules["lazy_client"].Client
+
+
+def test_should_time_imports_and_steps(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    write_module(tmp_path, "profiled_inner", "import time\ntime.sleep(0.05)\n")
+    write_module(tmp_path, "profiled_outer", "import profiled_inner\n")
+
+    # GIVEN a running profile
+    profile = StartupProfile.start()
+    try:
+        assert StartupProfile.start() is profile
+
+        # WHEN modules are imported in a step
+        with StartupProfile.step("config"):
+            importlib.import_module("profiled_outer")
+    finally:
+        StartupProfile.stop()
+
+    # THEN the time of the nested import is not the importing module's own
+    inner_total, inner_own = profile.imports["profiled_inner"]
+    outer_total, outer_own = profile.imports["profiled_outer"]
+    assert inner_own >= 0.05
+    assert outer_total >= inner_total
+    assert outer_own < 0.05
+    assert profile.steps[0][0] == "config" and profile.steps[0][1] >= outer_total
+
+    # THEN the finder is removed
+    assert StartupProfile.active() is None
+    assert profile._finder not in sys.meta_path
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import threading
+from datetime import datetime, timedelta
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.helper.StateStoreHelper import StateStore
+
+
+def generate_bot(status: str = "active", exchange: str = "binance", margin: str = "1.5%", **botcontrol) -> dict:
+    return {
+        "botcontrol": {"status": status, "manualsell": False, "manualbuy": False, "started": datetime.now().isoformat(), "startmethod": "scanner", **botcontrol},
+        "exchange": exchange,
+        "margin": margin,
+        "price": 1.0,
+    }
+
+
+def write_json(folder, name: str, document: dict) -> None:
+    with open(os.path.join(folder, "telegram_data", name), "w", encoding="utf8") as outfile:
+        json.dump(document, outfile)
+
+
+def test_should_import_json_files_once(tmp_path):
+    # GIVEN a data folder written by an older version
+    os.makedirs(tmp_path / "telegram_data")
+    write_json(tmp_path, "BTCGBP.json", generate_bot())
+    write_json(tmp_path, "data.json", {"trades": {"2022-01-01 00:00:00": {"pair": "BTCGBP", "price": 1.0, "margin": "2%"}}, "markets": {}})
+    write_json(tmp_path, "settings.json", {"notifications": {}})
+
+    # WHEN the store is opened
+    store = StateStore.open(str(tmp_path))
+
+    # THEN the bots and data.json are imported
+    assert store.bots() == ["BTCGBP"]
+    assert store.get_bot("BTCGBP")["margin"] == "1.5%"
+    assert list(store.get_shared()["trades"]) == ["2022-01-01 00:00:00"]
+    assert store.get_shared()["opentrades"] == {}
+
+    # WHEN the bot is removed and the store is opened by another process
+    store.delete_bot("BTCGBP")
+
+    # THEN the json file is not imported again
+    assert StateStore(store.path).bots() == []
+
+
+def test_merge_should_keep_concurrent_changes(tmp_path):
+    store = StateStore.open(str(tmp_path))
+    store.put_bot("BTCGBP", generate_bot())
+
+    # GIVEN the telegram bot has read the bot control
+    before = store.get_bot("BTCGBP")
+    after = json.loads(json.dumps(before))
+    after["botcontrol"]["manualsell"] = True
+
+    # WHEN the bot writes a new margin meanwhile
+    store.update_bot("BTCGBP", lambda data: data.update({"margin": "3.2%"}))
+    store.merge_bot("BTCGBP", before, after)
+
+    # THEN both changes are kept
+    assert store.get_bot("BTCGBP")["margin"] == "3.2%"
+    assert store.get_bot("BTCGBP")["botcontrol"]["manualsell"] is True
+
+    # WHEN threads update the same bot
+    def increment() -> None:
+        for _ in range(25):
+            store.update_bot("BTCGBP", lambda data: data.update({"count": data.get("count", 0) + 1}))
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # THEN no update is lost
+    assert store.get_bot("BTCGBP")["count"] == 100
+
+
+def test_bot_lists(tmp_path):
+    store = StateStore.open(str(tmp_path), export_json=True)
+
+    # GIVEN bots in different states
+    long_ago = (datetime.now() - timedelta(hours=1)).isoformat()
+    store.put_bot("ADAGBP", generate_bot(margin=" "))
+    store.put_bot("BTCGBP", generate_bot(watchdog_ping=datetime.now().isoformat()))
+    store.put_bot("ETHGBP", generate_bot(exchange="kucoin", watchdog_ping=long_ago))
+    store.put_bot("XRPGBP", generate_bot(status="paused"))
+
+    # THEN they are filtered like the bot control documents
+    assert store.bots(status="active") == ["ADAGBP", "BTCGBP", "ETHGBP"]
+    assert store.bots(exchange="kucoin") == ["ETHGBP"]
+    assert store.bots(open_trade=True) == ["BTCGBP", "ETHGBP", "XRPGBP"]
+    assert store.hung_bots("active") == ["ETHGBP", "XRPGBP"]
+
+    # THEN the json files are written for the tools that read them
+    with open(tmp_path / "telegram_data" / "ETHGBP.json", encoding="utf8") as json_file:
+        assert json.load(json_file)["exchange"] == "kucoin"
+
+
+def test_forked_process_should_open_its_own_store(tmp_path):
+    # GIVEN a store used by the parent process
+    store = StateStore.open(str(tmp_path))
+    store.put_bot("BTCGBP", generate_bot())
+    connection = store._connection()
+
+    # WHEN a forked process opens it
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            child = StateStore.open(str(tmp_path))
+            child.put_bot("ETHGBP", generate_bot())
+            os.write(write, json.dumps([child is not store, child._connection() is not connection, store._connection() is not connection]).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read) as stream:
+        result = json.loads(stream.read())
+    os.waitpid(pid, 0)
+
+    # THEN it has its own store and connection and its changes are seen by the parent
+    assert result == [True, True, True]
+    assert store.bots() == ["BTCGBP", "ETHGBP"]
+    assert store._connection() is connection
@@ -35,6 +35,14 @@ def test_update_bot_control():  # pylint: disable=missing-function-docstring
     wrapper.helper.read_data(MARKET)
     assert wrapper.helper.data["botcontrol"]["status"] == "active"
 
+def test_closed_trades_without_trades(tmp_path, monkeypatch):  # pylint: disable=missing-function-docstring
+    messages = []
+    monkeypatch.setattr(wrapper.helper, "datafolder", str(tmp_path))
+    monkeypatch.setattr(wrapper.helper, "send_telegram_message", lambda update, reply, *args, **kwargs: messages.append(reply))
+    assert wrapper.helper.read_data()
+    assert wrapper._actions.get_closed_trades(None, 7) == "No closed trades found"
+    assert messages[-1] == "<b>No closed trades found</b>"
+
 def test_actions_isnot_null():  # pylint: disable=missing-function-docstring
     assert wrapper._actions is not None
 
@@ -47,7 +55,8 @@ def test_handler_isnot_null():  # pylint: disable=missing-function-docstring
 def test_authorised_check():  # pylint: disable=missing-function-docstring
     assert not wrapper._handler._check_if_allowed("", None)
 
-def test_get_closed_trades():  # pylint: disable=missing-function-docstring
+def test_get_closed_trades(monkeypatch):  # pylint: disable=missing-function-docstring
+    monkeypatch.setattr(wrapper.helper, "send_telegram_message", lambda *args, **kwargs: None)
     assert wrapper.closed_trades() != ""
 @unittest.skip
 def test_get_running_bot_info():  # pylint: disable=missing-function-docstring
@@ -0,0 +1,156 @@
+import sys
+import json
+import time
+import base64
+import struct
+import hashlib
+import threading
+import socketserver
+import pandas as pd
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.exchange.UserDataStream import AccountState
+from models.exchange.binance import UserDataWebSocketClient
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class LocalServer:
+    """Websocket server standing in for the exchange, sends the events to every client"""
+
+    def __init__(self, events: list) -> None:
+        self.events = events
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handler(self):
+        events = self.events
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                headers = {}
+                for line in iter(self.rfile.readline, b"\r\n"):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()).decode()
+                self.wfile.write(
+                    f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+                )
+
+                for event in events:
+                    payload = json.dumps(event).encode()
+                    # unmasked text frame
+                    self.wfile.write(struct.pack("!BB", 0x81, len(payload)) + payload)
+
+                # answer the close frame of the client, its frames are small and masked
+                while True:
+                    header = self.rfile.read(2)
+                    if len(header) < 2:
+                        return
+                    self.rfile.read(4 + (header[1] & 0x7F))
+                    if header[0] & 0x0F == 0x8:
+                        self.wfile.write(struct.pack("!BB", 0x88, 0))
+                        return
+
+        return Handler
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalUserDataWebSocketClient(UserDataWebSocketClient):
+    recv_timeout = 1
+
+    def __init__(self, url: str) -> None:
+        super().__init__("0" * 64, "0" * 64)
+        self.url = url
+
+    def get_url(self) -> str:
+        return self.url
+
+    def keepalive(self) -> None:
+        pass
+
+
+def generate_balances() -> pd.DataFrame:
+    return pd.DataFrame({"currency": ["BTC", "GBP"], "balance": ["0.1", "1000.0"], "available": ["0.1", "1000.0"]})
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    until = time.monotonic() + timeout
+    while time.monotonic() < until:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_account_state_freshness():
+    state = AccountState(reconcile_interval=300)
+
+    # GIVEN a disconnected stream
+    state.set_balances(generate_balances())
+
+    # THEN the balances are requested from the exchange
+    assert state.get_balances() is None
+
+    # WHEN the stream is connected
+    state.connect()
+    state.set_balances(generate_balances())
+    state.set_orders("BTCGBP", pd.DataFrame({"action": ["buy"]}))
+
+    # THEN the balances and orders are kept
+    assert len(state.get_balances()) == 2
+    assert len(state.get_orders("BTCGBP")) == 1
+
+    # WHEN an error is returned by the exchange
+    state.set_balances(pd.DataFrame())
+
+    # THEN the known balances are kept
+    assert len(state.get_balances()) == 2
+
+    # WHEN the stream disconnects
+    state.disconnect()
+
+    # THEN everything is requested from the exchange again
+    assert state.get_balances() is None
+    assert state.get_orders("BTCGBP") is None
+
+
+def test_binance_events_update_the_account_state():
+    events = [
+        {"e": "outboundAccountPosition", "B": [{"a": "BTC", "f": "0.2", "l": "0.0"}, {"a": "ETH", "f": "1.5", "l": "0.0"}]},
+        {"e": "executionReport", "s": "BTCGBP", "X": "NEW"},
+        {"e": "executionReport", "s": "BTCGBP", "X": "FILLED"},
+    ]
+    server = LocalServer(events)
+
+    stream = LocalUserDataWebSocketClient(f"ws://127.0.0.1:{server.port}")
+    stream.state.connect()
+    stream.state.set_balances(generate_balances())
+    stream.state.set_orders("BTCGBP", pd.DataFrame({"action": ["buy"]}))
+
+    try:
+        # WHEN the exchange pushes the events
+        stream.start()
+        assert wait_for(lambda: stream.message_count == len(events))
+
+        # THEN the balances are updated in place
+        balances = stream.state.get_balances().set_index("currency")
+        assert balances.loc["BTC", "available"] == "0.2"
+        assert balances.loc["ETH", "balance"] == "1.5"
+        assert balances.loc["GBP", "available"] == "1000.0"
+
+        # THEN the filled order invalidates the orders of the market
+        assert stream.state.get_orders("BTCGBP") is None
+    finally:
+        stream.close()
+        server.stop()
+
+    # THEN the closed stream does not keep the balances
+    assert stream.state.get_balances() is None
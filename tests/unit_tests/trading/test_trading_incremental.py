@@ -0,0 +1,94 @@
+import sys
+import numpy as np
+import pandas as pd
+from statsmodels.compat.pandas import assert_frame_equal
+
+sys.path.append(".")
+# pylint: disable=import-error
+from models.Trading import TechnicalAnalysis, IncrementalTechnicalAnalysis
+
+
+def generate_candles(periods: int = 300, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    close = np.round(30000 + np.cumsum(rng.randn(periods) * 50), 2)
+    tsidx = pd.date_range("2022-01-01", periods=periods, freq="H")
+
+    df = pd.DataFrame(
+        {
+            "date": tsidx,
+            "market": "BTC-GBP",
+            "granularity": 3600,
+            "low": close - np.round(rng.rand(periods) * 30, 2),
+            "high": close + np.round(rng.rand(periods) * 30, 2),
+            "open": np.append(close[:1], close[:-1]),
+            "close": close,
+            "volume": np.round(rng.rand(periods) * 10, 4),
+        },
+        index=tsidx,
+    )
+    df.index.name = "ts"
+    return df
+
+
+def full_recompute(df: pd.DataFrame, total_periods: int) -> pd.DataFrame:
+    expected = df[["date", "market", "granularity", "low", "high", "open", "close", "volume"]].copy()
+    TechnicalAnalysis(expected, total_periods).add_all()
+    return expected
+
+
+def test_should_match_add_all_when_seeded():
+    # GIVEN a series of candles
+    df = generate_candles(300)
+
+    # WHEN the incremental engine analyses them for the first time
+    actual = IncrementalTechnicalAnalysis().update(df.copy(), 300)
+
+    # THEN the result is the same as add_all()
+    assert_frame_equal(actual, full_recompute(df, 300), check_exact=True)
+
+
+def test_should_match_add_all_when_last_candle_changes():
+    for periods in [60, 300]:
+        # GIVEN an analysed series of candles
+        df = generate_candles(periods, seed=periods)
+        engine = IncrementalTechnicalAnalysis()
+        engine.update(df, periods)
+        assert engine.incremental is True
+
+        for tick in range(5):
+            # WHEN the live candle is updated by the ticker
+            df.iloc[-1, df.columns.get_loc("close")] += 7.5 * (tick - 2)
+            df.iloc[-1, df.columns.get_loc("high")] = max(df["high"].iloc[-1], df["close"].iloc[-1])
+            df.iloc[-1, df.columns.get_loc("low")] = min(df["low"].iloc[-1], df["close"].iloc[-1])
+            engine.update(df, periods)
+
+            # THEN only the last row is recalculated and it matches add_all() bit for bit
+            assert engine.incremental is True
+            assert_frame_equal(df, full_recompute(df, periods), check_exact=True)
+
+
+def test_should_match_add_all_when_candles_are_appended():
+    # GIVEN an analysed series of candles
+    df = generate_candles(310, seed=7)
+    engine = IncrementalTechnicalAnalysis()
+    engine.update(df.iloc[:300].copy(), 300)
+
+    # WHEN new candles are appended
+    actual = engine.update(df.iloc[:303].copy(), 300)
+
+    # THEN they are analysed incrementally and match add_all()
+    assert engine.incremental is True
+    assert_frame_equal(actual, full_recompute(df.iloc[:303], 300), check_exact=True)
+
+
+def test_should_reseed_when_history_changes():
+    # GIVEN an analysed series of candles
+    df = generate_candles(301, seed=3)
+    engine = IncrementalTechnicalAnalysis()
+    engine.update(df.iloc[:300].copy(), 300)
+
+    # WHEN the window moves on by one candle
+    actual = engine.update(df.iloc[1:].copy(), 300)
+
+    # THEN the analysis is recalculated from scratch
+    assert_frame_equal(actual, full_recompute(df.iloc[1:], 300), check_exact=True)
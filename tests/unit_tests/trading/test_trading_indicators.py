@@ -1,4 +1,5 @@
 import sys
+import numpy as np
 import pandas as pd
 from numpy import around, round, float64, ceil
 from statsmodels.compat.pandas import assert_series_equal, assert_frame_equal
@@ -226,6 +227,36 @@ def test_should_calculate_add_sma_20():
     assert_frame_equal(actual, expected)
 
 
+def test_should_calculate_support_resistance_levels():
+    # GIVEN candles with repeated prices and a missing value
+    rng = np.random.RandomState(7)
+    close = np.round(100 + np.cumsum(rng.randn(2000)), 1)
+    df = pd.DataFrame({"low": close - np.round(rng.rand(2000), 1), "high": close + np.round(rng.rand(2000), 1), "close": close})
+    df.loc[500, "low"] = np.nan
+
+    # WHEN the support and resistance levels are calculated
+    ta = TechnicalAnalysis(df)
+    actual = ta.get_support_resistance_levels()
+
+    # THEN they are the levels of the row by row calculation TechnicalAnalysis used before
+    s = np.mean(df["high"] - df["low"])
+    levels = []
+    for i in range(2, df.shape[0] - 2):
+        if df["low"][i] < df["low"][i - 1] and df["low"][i] < df["low"][i + 1] and df["low"][i + 1] < df["low"][i + 2] and df["low"][i - 1] < df["low"][i - 2]:
+            level = df["low"][i]
+        elif df["high"][i] > df["high"][i - 1] and df["high"][i] > df["high"][i + 1] and df["high"][i + 1] > df["high"][i + 2] and df["high"][i - 1] > df["high"][i - 2]:
+            level = df["high"][i]
+        else:
+            continue
+        # compared with both the row and the level of the earlier levels
+        if np.sum([abs(level - x) < s for x in levels]) == 0:
+            levels.append((i, level))
+    expected = {df.index[i]: level for i, level in levels}
+
+    assert len(actual) > 10
+    assert_series_equal(actual, pd.Series(expected, dtype="float64"))
+
+
 def calculate_mean_on_range(start, end, list) -> float64:
     """
     Calculates the mean on a range of values
@@ -42,6 +42,12 @@ class RichText:
         else:
             color = "violet"
 
+        # filtered by level and written by the log pipeline thread
+        log_pipeline = getattr(app, "log_pipeline", None)
+        if log_pipeline is not None:
+            log_pipeline.emit(level, notification, app.market, app.print_granularity(), style=color)
+            return
+
         table_console = Table(title=None, box=None, show_header=False, show_footer=False)
         table_console.add_row(
             RichText.styled_text("Bot1", "magenta"),
@@ -398,7 +398,7 @@ class TradingGraphs:
         df = pd.DataFrame(self.df["close"])
         start_date = df.last_valid_index()
         end_date = start_date + timedelta(days=days)
-        pred = results_ARIMA.predict(start=str(start_date), end=str(end_date), dynamic=True)
+        pred = results_ARIMA.predict(start=start_date, end=end_date, dynamic=True)
 
         fig, axes = plt.subplots(ncols=1, figsize=(12, 6))  # pylint: disable=unused-variable
         fig.autofmt_xdate()
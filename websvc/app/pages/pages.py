@@ -7,6 +7,14 @@ import datetime
 from models.Trading import TechnicalAnalysis
 from models.exchange.binance import PublicAPI as BPublicAPI
 from models.exchange.coinbase_pro import PublicAPI as CPublicAPI
+from models.helper.ResponseCacheHelper import ResponseCache
+
+# seconds the market listings and the tickers are served from the cache
+MARKETS_TTL = 60
+TICKER_TTL = 10
+
+# shared by the requests, an analysis is kept until its candle closes
+cache = ResponseCache()
 
 
 def header() -> str:
@@ -56,6 +64,41 @@ def is_coinbase_market_valid(market: str) -> bool:
     return False
 
 
+def public_api(exchange: str):
+    if exchange == "binance":
+        return BPublicAPI()
+    return CPublicAPI()
+
+
+def get_markets_24hr_stats(exchange: str):
+    return cache.get((exchange, "markets"), lambda: public_api(exchange).get_markets_24hr_stats(), ttl=MARKETS_TTL)
+
+
+def get_ticker(exchange: str, market: str) -> tuple:
+    return cache.get((exchange, market, "ticker"), lambda: public_api(exchange).get_ticker(market), ttl=TICKER_TTL)
+
+
+def get_analysis(exchange: str, market: str, granularity):
+    """Historical data of the market with all the indicators"""
+
+    def compute():
+        ta = TechnicalAnalysis(public_api(exchange).get_historical_data(market, granularity, None))
+        ta.add_all()
+        return ta.get_df()
+
+    return cache.get((exchange, market, granularity), compute, granularity=granularity)
+
+
+def get_seasonal_arima_model(exchange: str, market: str, granularity):
+    """Seasonal ARIMA model fitted to the market's analysis, once per candle"""
+
+    def compute():
+        # fitted on the model pool, warm started from the previous candle
+        return TechnicalAnalysis(get_analysis(exchange, market, granularity)).seasonal_arima_model()
+
+    return cache.get((exchange, market, granularity, "sarimax"), compute, granularity=granularity)
+
+
 class Pages:
     def __init__(self) -> None:
         self.mike = 1
@@ -95,8 +138,7 @@ class Pages:
         def markets():
             html = ""
 
-            api = BPublicAPI()
-            resp = api.get_markets_24hr_stats()
+            resp = get_markets_24hr_stats("binance")
             for market in resp:
                 if market["lastPrice"] > market["openPrice"]:
                     html += f"""
@@ -170,8 +212,7 @@ class Pages:
         def markets():
             html = ""
 
-            api = CPublicAPI()
-            resp = api.get_markets_24hr_stats()
+            resp = get_markets_24hr_stats("coinbasepro")
             for market in resp:
                 stats_30day_volume = 0
                 if "stats_30day" in resp[market]:
@@ -289,25 +330,15 @@ class Pages:
         else:
             return "Invalid Exchange!"
 
-        if exchange == "binance":
-            api = BPublicAPI()
-        if exchange == "coinbasepro":
-            api = CPublicAPI()
-        ticker = api.get_ticker(market)
+        market_ticker = get_ticker(exchange, market)
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g1, None))
-        ta.add_all()
-        df_15m = ta.get_df()
+        df_15m = get_analysis(exchange, market, g1)
         df_15m_last = df_15m.tail(1)
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g2, None))
-        ta.add_all()
-        df_1h = ta.get_df()
+        df_1h = get_analysis(exchange, market, g2)
         df_1h_last = df_1h.tail(1)
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g3, None))
-        ta.add_all()
-        df_6h = ta.get_df()
+        df_6h = get_analysis(exchange, market, g3)
         df_6h_last = df_6h.tail(1)
 
         if exchange == "binance":
@@ -451,11 +482,11 @@ class Pages:
             adx14_6h_desc = "Weak Trend Up"
 
         def arima_predictions(even_rows: bool = True):
-            results_ARIMA = ta.seasonal_arima_model()
-            start_date = df_1h.last_valid_index()
+            results_ARIMA = get_seasonal_arima_model(exchange, market, g3)
+            start_date = df_6h.last_valid_index()
             end_date = start_date + datetime.timedelta(days=3)
             arima_pred = results_ARIMA.predict(
-                start=str(start_date), end=str(end_date), dynamic=True
+                start=start_date, end=end_date, dynamic=True
             )
 
             if even_rows:
@@ -467,7 +498,7 @@ class Pages:
             for index, pred in arima_pred_rows.items():
                 html += f"""
                 <tbody>
-                    <tr class={'table-success' if pred >= ticker[1] else 'table-danger'}>
+                    <tr class={'table-success' if pred >= market_ticker[1] else 'table-danger'}>
                         <td>{index}</td>
                         <td>{pred}</td>
                     </tr>
@@ -482,8 +513,8 @@ class Pages:
         <div class="container">
             <h4 class="text-center">{exchange_name} - {market}</h4>
 
-            <h6 class="text-center">Last update: {ticker[0]}</h6>
-            <h6 class="text-center">Closing price: {'%.08f' % ticker[1]}</h6>
+            <h6 class="text-center">Last update: {market_ticker[0]}</h6>
+            <h6 class="text-center">Closing price: {'%.08f' % market_ticker[1]}</h6>
 
             <br />
             <h5 class="text-center">Moving Averages</h5>